@@ -11,6 +11,7 @@ import plotly.graph_objects as go
 from typing import Dict, Any, List, Optional
 import json
 import logging
+from contextlib import nullcontext
 from datetime import datetime
 
 # Configure logging
@@ -135,35 +136,55 @@ class AgentOrchestrator:
         self.visualization_module = dspy.ChainOfThought(DataVisualizationAgent)
 
     def _configure_dspy(self):
-        """Configure DSPy with appropriate LLM."""
+        """
+        Build the LM for this orchestrator's configuration.
+
+        The LM is applied per call with dspy.settings.context rather than set
+        globally, so orchestrators for different configurations can be shared
+        across requests and threads at the same time.
+        """
+        self.lm = None
         try:
             import os
 
+            provider = (self.llm_config.get("provider") or "openai").lower()
+
+            # Use Google Gemini when configured for it
+            if provider in ("gemini", "google") and (self.llm_config.get("api_key") or os.getenv("GOOGLE_API_KEY")):
+                from dspy import GoogleGenerativeAI
+
+                self.lm = GoogleGenerativeAI(
+                    model=self.llm_config.get("model") or "gemini-pro",
+                    api_key=self.llm_config.get("api_key") or os.getenv("GOOGLE_API_KEY"),
+                    temperature=self.llm_config.get("temperature", 0.1)
+                )
+                logger.info("DSPy configured with Google Gemini")
+
             # Try to use OpenAI if available
-            if self.llm_config.get("api_key") or os.getenv("OPENAI_API_KEY"):
-                import dspy
+            elif self.llm_config.get("api_key") or os.getenv("OPENAI_API_KEY"):
+                openai_kwargs = {}
+                if self.llm_config.get("api_base"):
+                    openai_kwargs["api_base"] = self.llm_config["api_base"]
 
                 # Configure with OpenAI
-                turbo = dspy.OpenAI(
+                self.lm = dspy.OpenAI(
                     model=self.llm_config.get("model", "gpt-3.5-turbo"),
                     api_key=self.llm_config.get("api_key") or os.getenv("OPENAI_API_KEY"),
                     temperature=self.llm_config.get("temperature", 0.1),
-                    max_tokens=self.llm_config.get("max_tokens", 2000)
+                    max_tokens=self.llm_config.get("max_tokens", 2000),
+                    **openai_kwargs
                 )
-                dspy.settings.configure(lm=turbo)
                 logger.info("DSPy configured with OpenAI")
 
             # Try Google Gemini if available
             elif os.getenv("GOOGLE_API_KEY"):
-                import dspy
                 from dspy import GoogleGenerativeAI
 
-                gemini = GoogleGenerativeAI(
+                self.lm = GoogleGenerativeAI(
                     model="gemini-pro",
                     api_key=os.getenv("GOOGLE_API_KEY"),
                     temperature=self.llm_config.get("temperature", 0.1)
                 )
-                dspy.settings.configure(lm=gemini)
                 logger.info("DSPy configured with Google Gemini")
 
             else:
@@ -173,6 +194,12 @@ class AgentOrchestrator:
             logger.error(f"Failed to configure DSPy LLM: {str(e)}")
             # Continue without LLM configuration - will fail at runtime
 
+    def _lm_context(self):
+        """Scope this orchestrator's LM to the current call (a no-op without one)."""
+        if self.lm is None:
+            return nullcontext()
+        return dspy.settings.context(lm=self.lm)
+
     def route_query(self, goal: str, dataset_info: str, agent_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Route a query to the appropriate agent, either specified or auto-selected.
@@ -186,13 +213,14 @@ class AgentOrchestrator:
             Dictionary containing agent response with code and summary
         """
         try:
-            if agent_name and agent_name.startswith('@'):
-                # Remove @ prefix and route to specific agent
-                agent_name = agent_name[1:]
-                return self._execute_specific_agent(agent_name, goal, dataset_info)
-            else:
-                # Use planner to auto-select agent
-                return self._auto_route_query(goal, dataset_info)
+            with self._lm_context():
+                if agent_name and agent_name.startswith('@'):
+                    # Remove @ prefix and route to specific agent
+                    agent_name = agent_name[1:]
+                    return self._execute_specific_agent(agent_name, goal, dataset_info)
+                else:
+                    # Use planner to auto-select agent
+                    return self._auto_route_query(goal, dataset_info)
 
         except Exception as e:
             logger.error(f"Error in query routing: {str(e)}")
@@ -1695,12 +1695,11 @@ async def _get_system_health_status(db: Session) -> Dict[str, Any]:
         # Check MindsDB connection
         mindsdb_status = {"connected": False, "error": None}
         try:
-            from app.services.mindsdb import MindsDBService
-            mindsdb_service = MindsDBService()
-            health_check = mindsdb_service.health_check()
+            from app.services.mindsdb_async import mindsdb_async
+            health_check = await mindsdb_async.health_check()
             mindsdb_status = {
                 "connected": health_check.get("status") == "healthy",
-                "url": mindsdb_service.base_url,
+                "url": mindsdb_async.service.base_url,
                 "response_time": health_check.get("response_time"),
                 "error": health_check.get("error")
             }
@@ -13,6 +13,8 @@ from app.core.auth import get_current_user
 from app.models.user import User
 from app.models.dataset import Dataset
 from app.services.agent_service import create_agent_service
+from app.services.agent_orchestrator_registry import agent_orchestrator_registry
+from app.services.code_sandbox import code_sandbox_pool
 from app.services.data_sharing import DataSharingService
 
 logger = logging.getLogger(__name__)
@@ -48,6 +50,8 @@ class CodeExecutionResponse(BaseModel):
     result: Optional[str] = None
     output: Optional[str] = None
     error: Optional[str] = None
+    plotly_figures: List[Dict[str, Any]] = []
+    matplotlib_figures: List[Dict[str, Any]] = []
 
 @router.get("/", response_model=List[AgentInfo])
 async def get_available_agents(
@@ -92,8 +96,8 @@ async def chat_with_dataset_agents(
             )
 
         # Create agent service and process chat
-        agent_service = create_agent_service(db)
-        result = agent_service.chat_with_dataset(
+        agent_service = create_agent_service(db, current_user.organization_id)
+        result = await agent_service.chat_with_dataset(
             dataset_id=dataset_id,
             message=request.message,
             agent_name=request.agent_name,
@@ -136,11 +140,11 @@ async def execute_agent_code(
                 detail="Access denied to this dataset"
             )
 
-        # Execute code using agent service
-        agent_service = create_agent_service(db)
-        result = agent_service.execute_code_safely(
+        # Execute code in the sandbox pool against the dataset
+        agent_service = create_agent_service(db, current_user.organization_id)
+        result = await agent_service.execute_code_safely(
             code=request.code,
-            dataset_id=dataset_id
+            dataset=dataset
         )
 
         return CodeExecutionResponse(**result)
@@ -223,7 +227,9 @@ async def agent_health_check():
         return {
             "status": "healthy",
             "agents_available": True,
-            "timestamp": "2024-01-01T00:00:00Z"  # Use actual timestamp
+            "timestamp": "2024-01-01T00:00:00Z",  # Use actual timestamp
+            "orchestrators": agent_orchestrator_registry.get_metrics(),
+            "code_sandbox": code_sandbox_pool.get_metrics()
         }
     except Exception as e:
         logger.error(f"Agent health check failed: {str(e)}")
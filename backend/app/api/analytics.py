@@ -17,6 +17,7 @@ from app.models.analytics import (
     APIUsage, UsageStats, SystemMetrics
 )
 from app.services.analytics import analytics_service
+from app.services.analytics_buffer import analytics_buffer
 from app.schemas.analytics import (
     DatasetAnalyticsResponse, OrganizationAnalyticsResponse,
     UsageStatsResponse, SystemMetricsResponse
@@ -989,7 +990,8 @@ async def get_system_metrics(
                 for metric in metrics
             ],
             "period_hours": hours,
-            "total_records": len(metrics)
+            "total_records": len(metrics),
+            "event_buffer": analytics_buffer.get_metrics()
         }
         
     except HTTPException:
@@ -285,10 +285,11 @@ async def test_connector_connection(
 async def sync_connector_data(
     connector_id: int,
     force: bool = False,
+    full_refresh: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Manually sync data from a real-time enabled connector."""
+    """Manually sync data from a real-time enabled connector into local snapshots."""
     if not current_user.organization_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -320,17 +321,18 @@ async def sync_connector_data(
         connector_service = ConnectorService(db)
         
         # Perform sync
-        sync_result = await connector_service.sync_connector_data(connector)
+        sync_result = await connector_service.sync_connector_data(connector, full_refresh=full_refresh)
         
         # Update sync timestamp
-        connector.last_synced_at = datetime.utcnow()
-        db.commit()
+        if sync_result["success"]:
+            connector.last_synced_at = datetime.utcnow()
+            db.commit()
         
         return {
             "success": sync_result["success"],
-            "message": sync_result.get("message", "Data sync completed"),
+            "message": sync_result.get("message", sync_result.get("error", "Data sync completed")),
             "records_synced": sync_result.get("records_synced", 0),
-            "sync_time": connector.last_synced_at.isoformat(),
+            "sync_time": (connector.last_synced_at or datetime.utcnow()).isoformat(),
             "details": sync_result.get("details", {})
         }
         
@@ -15,7 +15,7 @@ from app.core.auth import get_current_user
 from app.models.user import User
 from app.models.dataset import Dataset, ShareAccessSession
 from app.services.data_sharing import DataSharingService
-from app.services.mindsdb import MindsDBService
+from app.services.mindsdb_async import mindsdb_async, MindsDBCallError
 
 logger = logging.getLogger(__name__)
 
@@ -247,34 +247,17 @@ async def validate_shared_resources(
                         if dataset_files:
                             # Check if files exist using storage service
                             from app.services.storage import storage_service
-                            files_exist = False
-                            for dataset_file in dataset_files:
-                                if dataset_file.file_path:
-                                    try:
-                                        file_path = dataset_file.relative_path or dataset_file.file_path
-                                        content = await storage_service.retrieve_dataset_file(file_path)
-                                        if content is not None:
-                                            files_exist = True
-                                            break
-                                    except Exception:
-                                        continue
-                            file_valid = files_exist
+                            file_valid = await storage_service.any_file_exists([
+                                f.relative_path or f.file_path for f in dataset_files if f.file_path
+                            ])
                         elif dataset.file_path:
                             # Legacy file_path validation using storage service
                             from app.services.storage import storage_service
-                            try:
-                                content = await storage_service.retrieve_dataset_file(dataset.file_path)
-                                file_valid = content is not None
-                            except Exception:
-                                file_valid = False
+                            file_valid = await storage_service.file_exists(dataset.file_path)
                         elif dataset.source_url and not dataset.source_url.startswith(('http://', 'https://')):
                             # Check source_url using storage service
                             from app.services.storage import storage_service
-                            try:
-                                content = await storage_service.retrieve_dataset_file(dataset.source_url)
-                                file_valid = content is not None
-                            except Exception:
-                                file_valid = False
+                            file_valid = await storage_service.file_exists(dataset.source_url)
                         else:
                             file_valid = False
                     
@@ -377,41 +360,21 @@ async def get_my_shared_datasets(
             if dataset_files:
                 # For datasets with entries in dataset_files table, check if files exist using storage service
                 from app.services.storage import storage_service
-                files_exist = False
-                for dataset_file in dataset_files:
-                    if dataset_file.file_path:
-                        try:
-                            # Use storage service to check file existence (works for both S3 and local)
-                            file_path = dataset_file.relative_path or dataset_file.file_path
-                            content = await storage_service.retrieve_dataset_file(file_path)
-                            if content is not None:
-                                files_exist = True
-                                break
-                        except Exception as e:
-                            logger.debug(f"File check failed for {dataset_file.file_path}: {e}")
-                            continue
-                file_valid = files_exist
+                # Metadata-only check (works for both S3 and local, briefly cached)
+                file_valid = await storage_service.any_file_exists([
+                    f.relative_path or f.file_path for f in dataset_files if f.file_path
+                ])
                 logger.debug(f"Dataset {dataset.id} file validation via dataset_files: {file_valid}")
             elif dataset.file_path:
                 # For legacy datasets with file_path, use storage service
                 from app.services.storage import storage_service
-                try:
-                    content = await storage_service.retrieve_dataset_file(dataset.file_path)
-                    file_valid = content is not None
-                    logger.debug(f"Dataset {dataset.id} legacy file validation via storage service: {file_valid}")
-                except Exception as e:
-                    logger.warning(f"Storage service validation failed for dataset {dataset.id}: {e}")
-                    file_valid = False
+                file_valid = await storage_service.file_exists(dataset.file_path)
+                logger.debug(f"Dataset {dataset.id} legacy file validation via storage service: {file_valid}")
             elif dataset.source_url and not dataset.source_url.startswith(('http://', 'https://')):
                 # For source_url based datasets (non-HTTP URLs are file paths)
                 from app.services.storage import storage_service
-                try:
-                    content = await storage_service.retrieve_dataset_file(dataset.source_url)
-                    file_valid = content is not None
-                    logger.debug(f"Dataset {dataset.id} source_url file validation via storage service: {file_valid}")
-                except Exception as e:
-                    logger.warning(f"Storage service validation failed for source_url {dataset.source_url}: {e}")
-                    file_valid = False
+                file_valid = await storage_service.file_exists(dataset.source_url)
+                logger.debug(f"Dataset {dataset.id} source_url file validation via storage service: {file_valid}")
             else:
                 # No file references found
                 file_valid = False
@@ -654,10 +617,10 @@ async def chat_with_shared_dataset(
                 db.commit()
                 session = None
     
-    # Use MindsDB service for chat
-    mindsdb_service = MindsDBService()
+    # Use the shared MindsDB service for chat, off the event loop
     try:
-        chat_response = mindsdb_service.chat_with_dataset(
+        chat_response = await mindsdb_async.chat_with_dataset(
+            request=request,
             dataset_id=str(dataset.id),
             message=chat_request.message,
             user_id=None,  # Anonymous user
@@ -673,6 +636,8 @@ async def chat_with_shared_dataset(
         
         return chat_response
         
+    except MindsDBCallError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         logger.error(f"Chat failed for shared dataset {dataset.id}: {e}")
         raise HTTPException(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Body
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Body, Header, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from typing import List, Optional, Dict, Any
@@ -10,13 +10,18 @@ from app.models.dataset import Dataset, DatasetType, DatasetStatus, AIProcessing
 from app.models.organization import DataSharingLevel
 from app.schemas.dataset import (
     DatasetCreate, DatasetUpdate, DatasetResponse, 
-    DatasetUpload, DatasetStats, DatasetAccessLog
+    DatasetUpload, DatasetStats, DatasetAccessLog, UploadSessionCreate
 )
 from app.services.data_sharing import DataSharingService
 from app.services.mindsdb import mindsdb_service
+from app.services.mindsdb_async import mindsdb_async, MindsDBCallError
 from app.services.storage import storage_service
+from app.services.columnar_cache import columnar_cache, TABULAR_EXTENSIONS
+from app.services.csv_row_index import csv_row_index
+from app.services.query_result_cache import query_result_cache
 from app.services.metadata import MetadataService
 from app.services.preview import PreviewService
+from app.services.upload_sessions import upload_session_manager
 import json
 import logging
 import time
@@ -63,6 +68,32 @@ def _analyze_json_types(obj, max_depth=3, current_depth=0):
     else:
         return type(obj).__name__
 
+# Helper functions for streaming uploads
+def _upload_file_size(upload_file: UploadFile) -> int:
+    """Get the size of an uploaded file without reading it into memory"""
+    if upload_file.size is not None:
+        return upload_file.size
+    position = upload_file.file.tell()
+    upload_file.file.seek(0, os.SEEK_END)
+    size = upload_file.file.tell()
+    upload_file.file.seek(position)
+    return size
+
+def _summarize_csv_file(file_path: str, sample_rows: int = 10000, chunk_size: int = 100000) -> Dict[str, Any]:
+    """Infer CSV columns and dtypes from a sample and count rows chunk by chunk"""
+    import pandas as pd
+    sample = pd.read_csv(file_path, nrows=sample_rows)
+    row_count = 0
+    for chunk in pd.read_csv(file_path, usecols=[0], chunksize=chunk_size):
+        row_count += len(chunk)
+    return {
+        "row_count": row_count,
+        "column_count": len(sample.columns),
+        "columns": sample.columns.tolist(),
+        "dtypes": {col: str(dtype) for col, dtype in sample.dtypes.items()},
+        "content_preview": sample.head(3).to_string()
+    }
+
 router = APIRouter()
 
 @router.get("/", response_model=List[DatasetResponse])
@@ -483,6 +514,10 @@ async def edit_dataset_content(
                 detail="Content is required for content update"
             )
         
+        # Cached query results of the old content are stale; the stored file (and its
+        # sidecars, which may belong to a shared blob) is not rewritten here
+        query_result_cache.invalidate_dataset(dataset.id)
+        
         # Update content preview and metadata
         dataset.content_preview = new_content[:1000] + "..." if len(new_content) > 1000 else new_content
         dataset.size_bytes = len(new_content.encode('utf-8'))
@@ -659,7 +694,15 @@ async def delete_dataset(
         logger.info(f"Found {len(dataset_files)} files in DatasetFile table for dataset {dataset_id}")
         for dataset_file in dataset_files:
             try:
-                if dataset_file.file_path and os.path.exists(dataset_file.file_path):
+                if storage_service.blob_store.is_blob_path(dataset_file.relative_path or dataset_file.file_path):
+                    # Shared content-addressed blob: drop this file's reference
+                    success = await storage_service.delete_dataset_file(dataset_file.relative_path or dataset_file.file_path)
+                    file_deletion_results.append({
+                        "file": dataset_file.filename,
+                        "success": success,
+                        "method": "blob_release"
+                    })
+                elif dataset_file.file_path and os.path.exists(dataset_file.file_path):
                     os.remove(dataset_file.file_path)
                     logger.info(f"Deleted file: {dataset_file.file_path}")
                     file_deletion_results.append({
@@ -687,6 +730,11 @@ async def delete_dataset(
                     "error": str(e)
                 })
     
+        # A reupload points the dataset at a blob its file records don't reference
+        file_record_paths = {f.relative_path or f.file_path for f in dataset_files}
+        if storage_service.blob_store.is_blob_path(dataset.file_path) and dataset.file_path not in file_record_paths:
+            await storage_service.delete_dataset_file(dataset.file_path)
+    
     # Also check legacy file_path and source_url fields for backward compatibility
     elif dataset.file_path or dataset.source_url:
         try:
@@ -928,6 +976,26 @@ async def upload_dataset_file(
             detail="No files provided"
         )
     
+    return await _create_dataset_from_uploads(upload_files, name, description, sharing_level, db, current_user)
+
+
+async def _create_dataset_from_uploads(
+    upload_files: List[Any],
+    name: Optional[str],
+    description: Optional[str],
+    sharing_level: str,
+    db: Session,
+    current_user: User,
+    store_file=None
+) -> Dict[str, Any]:
+    """
+    Create a dataset from uploaded files: store them, extract metadata and set up AI models
+    
+    Args:
+        upload_files: UploadFiles, or StagedUploads of completed upload sessions
+        store_file: Async callable (upload, dataset_id, organization_id) returning the
+            storage result; defaults to streaming the upload to storage
+    """
     is_multi_file = len(upload_files) > 1
     
     # Convert sharing level string to enum
@@ -957,10 +1025,7 @@ async def upload_dataset_file(
                 detail=f"Unsupported file type '{file_extension}' in '{upload_file.filename}'. Supported formats: {', '.join(allowed_extensions).upper()}"
             )
         
-        # Get file size (will be read later)
-        content = await upload_file.read()
-        await upload_file.seek(0)  # Reset file pointer
-        total_size += len(content)
+        total_size += _upload_file_size(upload_file)
     
     # Determine dataset name and primary file info
     primary_file = upload_files[0]
@@ -1010,17 +1075,17 @@ async def upload_dataset_file(
         from app.models.dataset import DatasetFile
         
         for i, upload_file in enumerate(upload_files):
-            # Read file content
-            content = await upload_file.read()
-            file_size = len(content)
-            
-            # Store file
-            storage_result = await storage_service.store_dataset_file(
-                file_content=content,
-                original_filename=upload_file.filename,
-                dataset_id=temp_dataset.id,
-                organization_id=current_user.organization_id
-            )
+            if store_file is not None:
+                storage_result = await store_file(upload_file, temp_dataset.id, current_user.organization_id)
+            else:
+                # Stream file to storage (size and hash are computed chunk by chunk)
+                storage_result = await storage_service.store_dataset_file_stream(
+                    upload_file=upload_file,
+                    original_filename=upload_file.filename,
+                    dataset_id=temp_dataset.id,
+                    organization_id=current_user.organization_id
+                )
+            file_size = storage_result['file_size']
             
             # Create DatasetFile record
             file_extension = upload_file.filename.split('.')[-1].lower()
@@ -1041,7 +1106,6 @@ async def upload_dataset_file(
             stored_files.append({
                 'file_record': dataset_file,
                 'storage_result': storage_result,
-                'content': content,
                 'upload_file': upload_file
             })
         
@@ -1068,7 +1132,6 @@ async def upload_dataset_file(
     
     # Process primary file for metadata (if it's processable)
     primary_file_info = stored_files[0]
-    primary_content = primary_file_info['content']
     primary_upload_file = primary_file_info['upload_file']
     primary_extension = primary_file_info['file_record'].file_type
     
@@ -1084,16 +1147,8 @@ async def upload_dataset_file(
     column_statistics = {}
     preview_data = {}
     
-    # Save file temporarily for processing
-    import tempfile
-    import os
-    
-    temp_file_path = None
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as temp_file:
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
+    # Process the stored file (remote backends stream it to a temporary file)
+    async with storage_service.local_copy(storage_result['relative_path'], suffix=f".{file_extension}") as temp_file_path:
         # Process different file types
         if file_extension in ["pdf", "json"]:
             try:
@@ -1116,7 +1171,7 @@ async def upload_dataset_file(
                             # Enhanced schema metadata for JSON
                             schema_metadata = {
                                 'file_type': 'json',
-                                'original_filename': file.filename,
+                                'original_filename': primary_file.filename,
                                 'encoding': 'utf-8',
                                 'structure': {
                                     'type': type(json_data).__name__,
@@ -1161,25 +1216,19 @@ async def upload_dataset_file(
         # For CSV files, try to get basic info
         elif file_extension == "csv":
             try:
-                import pandas as pd
-                df = pd.read_csv(temp_file_path)
-                file_metadata = {
-                    "row_count": len(df),
-                    "column_count": len(df.columns),
-                    "columns": df.columns.tolist(),
-                    "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()}
-                }
-                content_preview = df.head(3).to_string()
-                row_count = len(df)
-                column_count = len(df.columns)
+                file_metadata = _summarize_csv_file(temp_file_path)
+                content_preview = file_metadata.pop("content_preview")
+                row_count = file_metadata["row_count"]
+                column_count = file_metadata["column_count"]
                 logger.info(f"Successfully analyzed CSV file: {file_metadata}")
             except Exception as e:
                 logger.warning(f"Could not analyze CSV file: {e}")
-    
-    finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+        
+        # Convert tabular files once into a columnar sidecar for later reads
+        if file_extension in TABULAR_EXTENSIONS:
+            await columnar_cache.build_sidecar(temp_file_path, storage_result['relative_path'], file_extension)
+        if file_extension == "csv":
+            await csv_row_index.build_and_store(temp_file_path, storage_result['relative_path'])
 
     # Generate enhanced metadata for files that haven't been processed yet
     # (CSV files and JSON files are already processed above)
@@ -1187,7 +1236,7 @@ async def upload_dataset_file(
         # Enhanced schema metadata
         schema_metadata = {
             "file_type": file_extension,
-            "original_filename": file.filename,
+            "original_filename": primary_file.filename,
             "encoding": "utf-8",  # Default assumption
             "structure": file_metadata.get("structure", {}),
             "columns": file_metadata.get("columns", []),
@@ -1353,6 +1402,137 @@ async def upload_dataset_file(
     
     return response_data
 
+@router.post("/uploads", status_code=201)
+async def create_upload_session(
+    request: UploadSessionCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a resumable upload of a large dataset file.
+    
+    PUT the file in chunk_size pieces to /uploads/{session_id}/chunks/{index}, in any
+    order and in parallel, then POST /uploads/{session_id}/complete to create the dataset.
+    """
+    if not current_user.organization_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Must be part of an organization to upload datasets"
+        )
+    
+    from app.core.config import settings
+    file_extension = request.filename.split('.')[-1].lower()
+    allowed_extensions = settings.get_allowed_file_types()
+    if file_extension not in allowed_extensions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type '{file_extension}' in '{request.filename}'. Supported formats: {', '.join(allowed_extensions).upper()}"
+        )
+    
+    session = await upload_session_manager.create_session(
+        owner_id=current_user.id,
+        organization_id=current_user.organization_id,
+        filename=request.filename,
+        file_size=request.file_size,
+        content_type=request.content_type,
+        chunk_size=request.chunk_size,
+        sha256=request.sha256,
+        dataset_options={
+            "name": request.name,
+            "description": request.description,
+            "sharing_level": request.sharing_level
+        }
+    )
+    return {
+        "session_id": session["session_id"],
+        "filename": session["filename"],
+        "file_size": session["file_size"],
+        "chunk_size": session["chunk_size"],
+        "total_chunks": session["total_chunks"],
+        "expires_at": session["expires_at"]
+    }
+
+@router.put("/uploads/{session_id}/chunks/{index}")
+async def upload_session_chunk(
+    session_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Upload one chunk (numbered from 0) with its hex SHA-256 in the X-Chunk-SHA256 header."""
+    session = await upload_session_manager.get_session(session_id, current_user.id)
+    
+    # Never hold more than one chunk of a request body in memory
+    body = bytearray()
+    async for piece in request.stream():
+        body.extend(piece)
+        if len(body) > session["chunk_size"]:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail={"error_code": "CHUNK_TOO_LARGE", "message": f"Chunks are at most {session['chunk_size']} bytes"}
+            )
+    
+    return await upload_session_manager.put_chunk(session, index, bytes(body), x_chunk_sha256)
+
+@router.get("/uploads/{session_id}")
+async def get_upload_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Report the chunks and byte ranges received so far, and the chunks still missing."""
+    session = await upload_session_manager.get_session(session_id, current_user.id)
+    return await upload_session_manager.get_status(session)
+
+@router.post("/uploads/{session_id}/complete")
+async def complete_upload_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Assemble the uploaded chunks and create the dataset, exactly as a direct upload would.
+    
+    A session creates one dataset: repeated or concurrent calls get a 409 (with the
+    dataset id once it exists).
+    """
+    session = await upload_session_manager.get_session(session_id, current_user.id)
+    
+    async def store_staged(upload, dataset_id: int, organization_id: int) -> Dict[str, Any]:
+        # The assembled object is moved into place, not uploaded a second time
+        return await storage_service.store_staged_dataset_file(
+            staged_path=upload.staged_path,
+            original_filename=upload.filename,
+            dataset_id=dataset_id,
+            organization_id=organization_id,
+            sha256=upload.sha256,
+            file_size=upload.size
+        )
+    
+    async with upload_session_manager.finalizing(session) as session:
+        staged = await upload_session_manager.assemble(session)
+        options = session.get("dataset") or {}
+        response_data = await _create_dataset_from_uploads(
+            [staged],
+            options.get("name"),
+            options.get("description"),
+            options.get("sharing_level") or "private",
+            db,
+            current_user,
+            store_file=store_staged
+        )
+        await upload_session_manager.complete(session, response_data["dataset"].id)
+    return response_data
+
+@router.delete("/uploads/{session_id}")
+async def abort_upload_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Abort a resumable upload and discard the chunks received."""
+    session = await upload_session_manager.get_session(session_id, current_user.id)
+    await upload_session_manager.close(session, outcome="aborted")
+    return {"message": "Upload session aborted", "session_id": session_id}
+
 @router.get("/{dataset_id}/download")
 async def download_dataset(
     dataset_id: int,
@@ -1375,13 +1555,14 @@ async def download_dataset(
 @router.get("/download/{download_token}")
 async def execute_download(
     download_token: str,
-    range: Optional[str] = None,
+    range: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Execute the actual file download using a secure token with resumable download support.
     
-    The Range header can be used for resumable downloads (e.g., "bytes=1024-").
+    The Range header can be used for resumable downloads (e.g., "bytes=1024-"),
+    including multiple ranges ("bytes=0-99,200-299") served as multipart/byteranges.
     """
     from app.services.download import DownloadService
     
@@ -1602,6 +1783,7 @@ async def get_dataset_stats(
 async def chat_with_dataset(
     dataset_id: int,
     message: dict,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -1639,9 +1821,9 @@ async def chat_with_dataset(
         if use_agents:
             try:
                 from app.services.agent_service import create_agent_service
-                agent_service = create_agent_service(db)
+                agent_service = create_agent_service(db, current_user.organization_id)
 
-                agent_response = agent_service.chat_with_dataset(
+                agent_response = await agent_service.chat_with_dataset(
                     dataset_id=dataset_id,
                     message=user_message,
                     agent_name=agent_name,
@@ -1690,8 +1872,9 @@ async def chat_with_dataset(
             except Exception as e:
                 logger.warning(f"Agent chat error, falling back to MindsDB: {str(e)}")
 
-        # Fallback to original MindsDB chat
-        response = mindsdb_service.chat_with_dataset(
+        # Fallback to original MindsDB chat, off the event loop
+        response = await mindsdb_async.chat_with_dataset(
+            request=request,
             dataset_id=str(dataset_id),
             message=user_message,
             user_id=current_user.id,
@@ -1715,6 +1898,8 @@ async def chat_with_dataset(
             **response
         }
 
+    except MindsDBCallError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         logger.error(f"Dataset chat failed for dataset {dataset_id}: {e}")
         raise HTTPException(
@@ -1756,7 +1941,7 @@ async def get_dataset_models(
         # Query MindsDB for model status
         try:
             models_query = f"SHOW MODELS WHERE name LIKE 'dataset_{dataset_id}_%';"
-            result = mindsdb_service.execute_query(models_query)
+            result = await mindsdb_async.execute_query(models_query)
             
             if result.get('data'):
                 for model_data in result['data']:
@@ -2391,11 +2576,27 @@ async def _get_connector_preview(dataset: Dataset, preview_rows: int, db: Sessio
         }
     }
     
+    # Serve from the local snapshot kept by connector sync, without a round trip to the source
+    snapshot_key = columnar_cache.storage_key_for_dataset(dataset)
+    if await columnar_cache.ensure_local_sidecar(snapshot_key):
+        df = columnar_cache.read_rows(snapshot_key, limit=preview_rows)
+        if df is not None:
+            connector_preview["live_preview"] = {
+                "sample_data": json.loads(df.head(10).to_json(orient="records", date_format="iso")),
+                "total_rows_available": columnar_cache.num_rows(snapshot_key),
+                "is_live": False,
+                "source": "snapshot",
+                "synced_at": connector.last_synced_at.isoformat() if connector.last_synced_at else None
+            }
+            return connector_preview
+
     # Try to get live preview from connector
     try:
         if dataset.mindsdb_table_name and dataset.mindsdb_database:
             query = f"SELECT * FROM {dataset.mindsdb_database}.{dataset.mindsdb_table_name} LIMIT {preview_rows};"
-            result = mindsdb_service.execute_query(query)
+            result = await mindsdb_async.execute_query(
+                query, cache_context=query_result_cache.context_for_dataset(dataset)
+            )
             
             if result.get('data'):
                 connector_preview["live_preview"] = {
@@ -2475,20 +2676,17 @@ async def reupload_dataset_file(
                 "tags": getattr(dataset, 'tags', [])
             }
         
-        # Read new file content
-        content = await file.read()
-        file_size = len(content)
-        
         # Backup old file path (in case rollback is needed)
         old_file_path = dataset.file_path
         
-        # Store new file using storage service
-        storage_result = await storage_service.store_dataset_file(
-            file_content=content,
+        # Stream new file to storage
+        storage_result = await storage_service.store_dataset_file_stream(
+            upload_file=file,
             original_filename=file.filename,
             dataset_id=dataset_id,
             organization_id=current_user.organization_id
         )
+        file_size = storage_result['file_size']
         
         # Determine new dataset type
         if file_extension == 'csv':
@@ -2510,16 +2708,8 @@ async def reupload_dataset_file(
         row_count = None
         column_count = None
         
-        # Save file temporarily for processing
-        import tempfile
-        import os
-        
-        temp_file_path = None
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as temp_file:
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-            
+        # Process the stored file (remote backends stream it to a temporary file)
+        async with storage_service.local_copy(storage_result['relative_path'], suffix=f".{file_extension}") as temp_file_path:
             # Process different file types
             if file_extension in ["pdf", "json"]:
                 try:
@@ -2539,25 +2729,23 @@ async def reupload_dataset_file(
             # For CSV files, try to get basic info
             elif file_extension == "csv":
                 try:
-                    import pandas as pd
-                    df = pd.read_csv(temp_file_path)
-                    file_metadata = {
-                        "row_count": len(df),
-                        "column_count": len(df.columns),
-                        "columns": df.columns.tolist(),
-                        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()}
-                    }
-                    content_preview = df.head(3).to_string()
-                    row_count = len(df)
-                    column_count = len(df.columns)
+                    file_metadata = _summarize_csv_file(temp_file_path)
+                    content_preview = file_metadata.pop("content_preview")
+                    row_count = file_metadata["row_count"]
+                    column_count = file_metadata["column_count"]
                     logger.info(f"Successfully analyzed reuploaded CSV file: {file_metadata}")
                 except Exception as e:
                     logger.warning(f"Could not analyze reuploaded CSV file: {e}")
-        
-        finally:
-            # Clean up temporary file
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+            
+            # The old sidecar no longer matches the dataset; build one for the new file
+            # (blob sidecars belong to immutable shared content and stay valid)
+            if not storage_service.blob_store.is_blob_path(old_file_path):
+                await columnar_cache.invalidate(old_file_path)
+            query_result_cache.invalidate_dataset(dataset.id)
+            if file_extension in TABULAR_EXTENSIONS:
+                await columnar_cache.build_sidecar(temp_file_path, storage_result['relative_path'], file_extension)
+            if file_extension == "csv":
+                await csv_row_index.build_and_store(temp_file_path, storage_result['relative_path'])
         
         # Generate enhanced metadata for new file
         schema_metadata = {}
@@ -2642,6 +2830,23 @@ async def reupload_dataset_file(
         db.commit()
         db.refresh(dataset)
         
+        # Blob references: the dataset's own file_path holds one unless a file record covers it
+        from app.models.dataset import DatasetFile
+        file_record_paths = {
+            f.relative_path or f.file_path for f in db.query(DatasetFile).filter(
+                DatasetFile.dataset_id == dataset_id,
+                DatasetFile.is_deleted == False
+            ).all()
+        }
+        new_file_path = dataset.file_path
+        if storage_service.blob_store.is_blob_path(new_file_path) and (
+            new_file_path == old_file_path or new_file_path in file_record_paths
+        ):
+            await storage_service.delete_dataset_file(new_file_path)
+        if (storage_service.blob_store.is_blob_path(old_file_path) and old_file_path != new_file_path
+                and old_file_path not in file_record_paths):
+            await storage_service.delete_dataset_file(old_file_path)
+        
         # Try to recreate ML models for the new file
         ml_model_result = None
         try:
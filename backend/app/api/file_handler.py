@@ -3,11 +3,12 @@ File Handler API endpoints
 Provides endpoints for file upload and MindsDB integration
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks, Form, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
+import os
 
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
@@ -17,6 +18,7 @@ from app.models.dataset import Dataset, DatasetType, DatasetStatus, DatabaseConn
 from app.models.organization import DataSharingLevel
 from app.models.file_handler import FileUpload, MindsDBHandler, FileType
 from app.services.file_handler import FileHandlerService
+from app.services.storage import is_not_modified
 
 logger = logging.getLogger(__name__)
 
@@ -1066,6 +1068,16 @@ async def get_enhanced_image_preview(
                     "error": f"Technical details unavailable: {str(e)}"
                 }
         
+        # Binary preview renditions (thumbnail, medium, webp) served with HTTP caching
+        from app.services.image_processing import RENDITIONS
+        preview_response["renditions"] = {
+            name: {
+                "url": f"/api/files/{file_upload_id}/renditions/{name}",
+                **{key: value for key, value in info.items() if key != "path"}
+            }
+            for name, info in ((file_upload.file_metadata or {}).get("renditions") or dict.fromkeys(RENDITIONS, {})).items()
+        }
+        
         # Enhanced metadata from file metadata
         if include_metadata and file_upload.file_metadata:
             preview_response["preview_metadata"]["image_metadata"] = {
@@ -1116,6 +1128,71 @@ async def get_enhanced_image_preview(
         )
 
 
+@router.get("/{file_upload_id}/renditions/{name}")
+async def get_image_rendition(
+    file_upload_id: int,
+    name: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Serve a stored preview rendition of an image as binary
+    
+    Renditions are content-addressed by the source image's hash, so responses are
+    immutable and revalidate with If-None-Match. Images uploaded before renditions
+    existed get them generated on first request.
+    """
+    from app.services.image_processing import image_processing_service, RENDITIONS
+    
+    if name not in RENDITIONS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown rendition '{name}'. Available: {', '.join(RENDITIONS)}"
+        )
+    
+    file_upload = db.query(FileUpload).filter(
+        FileUpload.id == file_upload_id,
+        FileUpload.organization_id == current_user.organization_id,
+        FileUpload.file_type == "image"
+    ).first()
+    
+    if not file_upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    
+    etag = f'"{file_upload.file_hash[:16]}-{name}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
+    if is_not_modified(request.headers, etag, None):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    storage = image_processing_service.storage
+    manifest = (file_upload.file_metadata or {}).get("renditions") or {}
+    info = manifest.get(name)
+    content = await storage.backend.retrieve_file(info["path"]) if info else None
+    
+    if content is None:
+        if not file_upload.file_path or not os.path.exists(file_upload.file_path):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Image rendition not available"
+            )
+        manifest = await image_processing_service.create_renditions(file_upload.file_path, file_upload.file_hash)
+        if name not in manifest:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate image rendition"
+            )
+        file_upload.file_metadata = {**(file_upload.file_metadata or {}), "renditions": manifest}
+        db.commit()
+        info = manifest[name]
+        content = await storage.backend.retrieve_file(info["path"])
+    
+    return Response(content=content, media_type=info["content_type"], headers=headers)
+
+
 async def _get_image_technical_details(file_upload: FileUpload) -> Dict[str, Any]:
     """Get technical details for an image file."""
     technical_details = {
@@ -1153,7 +1230,7 @@ async def _get_image_ai_analysis(file_upload: FileUpload, db: Session) -> Dict[s
     # Get AI analysis from MindsDB if available
     if file_upload.mindsdb_file_id:
         try:
-            from app.services.mindsdb import mindsdb_service
+            from app.services.mindsdb_async import mindsdb_async
             
             # Query for AI analysis results
             analysis_query = f"""
@@ -1162,7 +1239,7 @@ async def _get_image_ai_analysis(file_upload: FileUpload, db: Session) -> Dict[s
                 LIMIT 1;
             """
             
-            result = mindsdb_service.execute_query(analysis_query)
+            result = await mindsdb_async.execute_query(analysis_query)
             
             if result.get('data') and len(result['data']) > 0:
                 analysis_data = result['data'][0]
@@ -2,7 +2,7 @@
 File Server API for serving stored files to external services like MindsDB
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
 from app.services.storage import storage_service
 import logging
@@ -14,10 +14,13 @@ router = APIRouter()
 
 
 @router.get("/serve/{file_path:path}")
-async def serve_file(file_path: str):
+async def serve_file(file_path: str, request: Request):
     """
     Serve a file from storage for external access (MindsDB, etc.)
     This endpoint provides direct file access for AI/ML services
+    
+    Responses carry ETag and Last-Modified; conditional re-fetches of an unchanged
+    file get an empty 304.
     """
     try:
         # Decode the file path
@@ -26,7 +29,7 @@ async def serve_file(file_path: str):
         logger.info(f"Serving file: {decoded_path}")
         
         # Get file stream from storage service
-        response = await storage_service.get_dataset_file_stream(decoded_path)
+        response = await storage_service.get_dataset_file_stream(decoded_path, request.headers)
         
         # Add CORS headers for external access
         response.headers["Access-Control-Allow-Origin"] = "*"
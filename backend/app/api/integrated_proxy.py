@@ -10,6 +10,9 @@ import logging
 
 from app.core.database import get_db
 from app.services.integrated_proxy_service import integrated_proxy
+from app.services.proxy_connection_pool import proxy_connection_pools
+from app.services.http_client_pool import http_client_pool
+from app.services.api_response_cache import api_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +29,10 @@ async def proxy_health():
     return {
         "status": "healthy",
         "service": "integrated_proxy",
-        "timestamp": integrated_proxy.get_proxy_info()
+        "timestamp": integrated_proxy.get_proxy_info(),
+        "connection_pools": proxy_connection_pools.get_metrics(),
+        "http_clients": http_client_pool.get_metrics(),
+        "response_cache": api_response_cache.get_metrics()
     }
 
 @router.get("/info")
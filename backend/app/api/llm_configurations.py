@@ -13,6 +13,7 @@ from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.models.user import User
 from app.models.dataset import LLMConfiguration
+from app.services.agent_orchestrator_registry import agent_orchestrator_registry
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -225,6 +226,9 @@ async def update_llm_configuration(
     db.commit()
     db.refresh(config)
     
+    # Agents pick up the new settings on their next request
+    agent_orchestrator_registry.invalidate(source=f"llm_configuration:{config_id}")
+    
     return config
 
 
@@ -263,6 +267,7 @@ async def delete_llm_configuration(
         config.soft_delete(current_user.id)
     
     db.commit()
+    agent_orchestrator_registry.invalidate(source=f"llm_configuration:{config_id}")
     
     return {"message": "LLM configuration deleted successfully"}
 
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import Dict, List, Any
 from app.core.auth import get_current_active_user
 from app.models.user import User
 from app.services.mindsdb import mindsdb_service
+from app.services.mindsdb_async import mindsdb_async, MindsDBCallError
+from app.services.mindsdb_registry import mindsdb_registry
+from app.services.query_result_cache import query_result_cache
 
 router = APIRouter()
 
@@ -11,16 +14,24 @@ router = APIRouter()
 async def check_mindsdb_status(current_user: User = Depends(get_current_active_user)):
     """Check MindsDB connection status."""
     try:
-        is_connected = mindsdb_service.test_connection()
+        health = await mindsdb_async.health_check()
         return {
-            "status": "connected" if is_connected else "disconnected",
-            "url": mindsdb_service.base_url
+            "status": "connected" if health.get("connection") == "connected" else "disconnected",
+            "url": mindsdb_service.base_url,
+            "executor": mindsdb_async.get_metrics(),
+            "registry": mindsdb_registry.get_metrics(),
+            "pool": mindsdb_service.pool.get_metrics(),
+            "query_cache": query_result_cache.get_metrics()
         }
     except Exception as e:
         return {
             "status": "error",
             "error": str(e),
-            "url": mindsdb_service.base_url
+            "url": mindsdb_service.base_url,
+            "executor": mindsdb_async.get_metrics(),
+            "registry": mindsdb_registry.get_metrics(),
+            "pool": mindsdb_service.pool.get_metrics(),
+            "query_cache": query_result_cache.get_metrics()
         }
 
 
@@ -216,6 +227,7 @@ async def initialize_gemini_integration(current_user: User = Depends(get_current
 @router.post("/gemini/chat")
 async def gemini_chat(
     chat_data: Dict[str, Any],
+    request: Request,
     current_user: User = Depends(get_current_active_user)
 ):
     """Chat with Gemini Flash 2 AI."""
@@ -224,8 +236,12 @@ async def gemini_chat(
         if not prompt:
             raise HTTPException(status_code=400, detail="Prompt is required")
         
-        result = mindsdb_service.ai_chat(prompt)
+        result = await mindsdb_async.ai_chat(prompt, request=request)
         return {"response": result}
+    except HTTPException:
+        raise
+    except MindsDBCallError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to chat with Gemini: {str(e)}")
 
@@ -264,13 +280,18 @@ async def create_gemini_model(
         if not model_name:
             raise HTTPException(status_code=400, detail="Model name is required")
         
-        result = mindsdb_service.create_gemini_model(
+        result = await mindsdb_async.call(
+            "create_gemini_model",
             model_name=model_name,
             model_type=model_type,
             prompt_template=prompt_template,
             mode=mode
         )
         return {"message": "Gemini model created successfully", "result": result}
+    except HTTPException:
+        raise
+    except MindsDBCallError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create Gemini model: {str(e)}")
 
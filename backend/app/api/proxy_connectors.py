@@ -15,6 +15,7 @@ from app.models.user import User
 from app.models.proxy_connector import ProxyConnector, SharedProxyLink, ProxyAccessLog
 from app.services.proxy_service import ProxyService
 from app.services.integrated_proxy_service import integrated_proxy
+from app.services.api_response_cache import api_response_cache
 from app.utils.proxy_url_converter import get_corrected_proxy_url, convert_proxy_urls_in_response
 
 logger = logging.getLogger(__name__)
@@ -228,6 +229,7 @@ async def delete_proxy_connector(
     
     connector.is_active = False
     db.commit()
+    api_response_cache.invalidate_connector(connector.id)
     
     return {"message": "Proxy connector deleted successfully"}
 
@@ -182,8 +182,7 @@ async def verify_storage_integrity(
             # Check single-file datasets
             if dataset.file_path and not dataset.is_multi_file_dataset:
                 verification_result['files_checked'] += 1
-                file_content = await storage_service.retrieve_dataset_file(dataset.file_path)
-                if file_content is None:
+                if not await storage_service.file_exists(dataset.file_path, use_cache=False):
                     verification_result['missing_files'].append({
                         'type': 'dataset',
                         'dataset_id': dataset.id,
@@ -201,8 +200,7 @@ async def verify_storage_integrity(
                 
                 for df in dataset_files:
                     verification_result['files_checked'] += 1
-                    file_content = await storage_service.retrieve_dataset_file(df.relative_path or df.file_path)
-                    if file_content is None:
+                    if not await storage_service.file_exists(df.relative_path or df.file_path, use_cache=False):
                         verification_result['missing_files'].append({
                             'type': 'dataset_file',
                             'dataset_id': dataset.id,
@@ -231,6 +229,52 @@ async def verify_storage_integrity(
             detail=f"Storage verification failed: {str(e)}"
         )
 
+@router.post("/storage/cleanup-orphans")
+async def cleanup_orphaned_files(
+    dry_run: bool = True,
+    prefix: str = "",
+    cursor: Optional[str] = None,
+    max_objects: Optional[int] = None,
+    min_age_seconds: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Sweep storage for files no dataset references
+    
+    Defaults to a dry run. Pass the returned next_cursor back to resume a sweep
+    that stopped at max_objects.
+    """
+    result = await storage_service.cleanup_orphaned_files(
+        db,
+        dry_run=dry_run,
+        prefix=prefix,
+        cursor=cursor,
+        max_objects=max_objects,
+        min_age_seconds=min_age_seconds
+    )
+    if "error" in result:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Orphan cleanup failed: {result['error']} (resume with cursor {result['next_cursor']!r})"
+        )
+    return {
+        "message": "Orphan cleanup dry run completed" if dry_run else "Orphan cleanup completed",
+        "result": result
+    }
+
+@router.post("/storage/blob-gc")
+async def collect_unreferenced_blobs(
+    grace_seconds: Optional[float] = None,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Run the deduplicated blob collector now instead of waiting for its next scheduled run"""
+    result = await storage_service.blob_store.collect(storage_service, grace_seconds=grace_seconds)
+    return {
+        "message": "Blob garbage collection completed",
+        "result": result
+    }
+
 @router.get("/storage/recommendations")
 async def get_storage_recommendations(
     db: Session = Depends(get_db),
@@ -7,7 +7,7 @@ from .dataset import (
     Dataset, DatasetAccessLog, DatasetModel, DatasetChatSession, 
     ChatMessage, DatasetShareAccess, DatasetType, DatasetStatus, 
     AIProcessingStatus, DatabaseConnector, DatasetDownload, 
-    LLMConfiguration, ShareAccessSession
+    LLMConfiguration, ShareAccessSession, DatasetFile, StorageBlob
 )
 from .file_handler import FileUpload, MindsDBHandler, FileProcessingLog, UploadStatus, ProcessingStatus
 from .analytics import (
@@ -37,7 +37,7 @@ __all__ = [
     "Dataset", "DatasetAccessLog", "DatasetModel", "DatasetChatSession",
     "ChatMessage", "DatasetShareAccess", "DatasetType", "DatasetStatus",
     "AIProcessingStatus", "DatabaseConnector", "DatasetDownload",
-    "LLMConfiguration", "ShareAccessSession",
+    "LLMConfiguration", "ShareAccessSession", "DatasetFile", "StorageBlob",
     
     # File handler models
     "FileUpload", "MindsDBHandler", "FileProcessingLog", "UploadStatus", "ProcessingStatus",
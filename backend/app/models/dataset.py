@@ -561,6 +561,24 @@ class DatasetFile(Base):
         self.is_deleted = True
         self.updated_at = datetime.utcnow()
 
+
+class StorageBlob(Base):
+    """Content-addressed stored file shared by every dataset file with the same content"""
+    __tablename__ = "storage_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)  # Content hash
+    storage_path = Column(String, nullable=False, unique=True, index=True)  # blobs/<aa>/<bb>/<sha256>.<ext>
+    size_bytes = Column(Integer, nullable=True)
+    
+    # Number of dataset files pointing at this blob; garbage collected at zero
+    ref_count = Column(Integer, nullable=False, default=0)
+    orphaned_at = Column(DateTime, nullable=True)  # When ref_count last dropped to zero
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_referenced_at = Column(DateTime, default=datetime.utcnow)
+
 # Add to User model relationship
 # Note: This would need to be added to the User model in user.py
 # owned_datasets = relationship("Dataset", back_populates="owner") 
\ No newline at end of file
@@ -114,6 +114,24 @@ class DatasetUpload(BaseModel):
     sharing_level: DataSharingLevel = DataSharingLevel.PRIVATE
 
 
+class UploadSessionCreate(BaseModel):
+    filename: str
+    file_size: int
+    content_type: Optional[str] = None
+    chunk_size: Optional[int] = None
+    sha256: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    sharing_level: str = "private"
+
+    @validator('chunk_size')
+    def validate_chunk_size(cls, v):
+        # The server caps it at UPLOAD_SESSION_MAX_CHUNK_SIZE_MB
+        if v is not None and v <= 0:
+            raise ValueError('chunk_size must be positive')
+        return v
+
+
 class DatasetStats(BaseModel):
     dataset_id: int
     total_size: Optional[int] = None
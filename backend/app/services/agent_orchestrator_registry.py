@@ -0,0 +1,153 @@
+"""
+Agent Orchestrator Registry
+Process-wide cache of agent orchestrators keyed by LLM configuration. Building an
+orchestrator configures an LM client and compiles the DSPy planner and agent
+modules, which is far too slow to repeat per request; orchestrators hold no
+per-request state, so one per distinct configuration is shared by all requests.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AgentOrchestratorRegistry:
+    """LRU map of LLM configuration -> shared AgentOrchestrator"""
+
+    def __init__(self, factory: Optional[Callable] = None, max_entries: Optional[int] = None):
+        self._factory = factory
+        self.max_entries = max_entries or int(os.getenv("AGENT_ORCHESTRATOR_CACHE_SIZE", "16"))
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One build per key at a time; concurrent requests for it wait for the result
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self.stats = {
+            "hits": 0,
+            "builds": 0,
+            "build_failures": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "build_seconds_total": 0.0
+        }
+
+    @property
+    def factory(self) -> Callable:
+        if self._factory is None:
+            from app.agents.base_agents import create_agent_orchestrator
+            self._factory = create_agent_orchestrator
+        return self._factory
+
+    @staticmethod
+    def config_key(llm_config: Dict[str, Any]) -> str:
+        """Stable key of an LLM configuration (a digest, so API keys never appear in it)"""
+        canonical = json.dumps(llm_config, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+    def get(self, llm_config: Dict[str, Any], source: Optional[str] = None):
+        """
+        Get the shared orchestrator for an LLM configuration, building it on first use
+
+        Args:
+            llm_config: LLM configuration passed to the orchestrator
+            source: Where the configuration came from (e.g. "llm_configuration:3"),
+                so entries can be dropped when that source changes
+        """
+        key = self.config_key(llm_config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry["orchestrator"]
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self.stats["hits"] += 1
+                    return entry["orchestrator"]
+
+            started = time.perf_counter()
+            try:
+                orchestrator = self.factory(llm_config)
+            except Exception:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+                self.stats["build_failures"] += 1
+                raise
+            elapsed = time.perf_counter() - started
+
+            # Store the entry before retiring the build lock, so a request arriving in
+            # between finds the orchestrator instead of starting a second build
+            with self._lock:
+                self._build_locks.pop(key, None)
+                self._entries[key] = {
+                    "orchestrator": orchestrator,
+                    "source": source,
+                    "provider": llm_config.get("provider"),
+                    "model": llm_config.get("model"),
+                    "built_at": time.time(),
+                    "build_seconds": elapsed
+                }
+                self.stats["builds"] += 1
+                self.stats["build_seconds_total"] += elapsed
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+
+        logger.info(
+            f"🤖 Agent orchestrator built for {llm_config.get('provider')}/{llm_config.get('model')} "
+            f"in {elapsed * 1000:.0f}ms (key {key})"
+        )
+        return orchestrator
+
+    def invalidate(self, source: Optional[str] = None) -> int:
+        """
+        Drop cached orchestrators, all of them or those built from one source
+
+        Requests already holding an orchestrator keep using it; the next request
+        builds a fresh one from the current configuration.
+        """
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items()
+                if source is None or entry["source"] == source
+            ]
+            for key in keys:
+                del self._entries[key]
+            self.stats["invalidations"] += len(keys)
+        if keys:
+            logger.info(f"🔄 Dropped {len(keys)} cached agent orchestrators ({source or 'all'})")
+        return len(keys)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = [
+                {
+                    "key": key,
+                    "source": entry["source"],
+                    "provider": entry["provider"],
+                    "model": entry["model"],
+                    "build_ms": round(entry["build_seconds"] * 1000, 1)
+                }
+                for key, entry in self._entries.items()
+            ]
+        return {
+            "max_entries": self.max_entries,
+            "entries": entries,
+            **self.stats,
+            "build_seconds_total": round(self.stats["build_seconds_total"], 3)
+        }
+
+
+# Global instance
+agent_orchestrator_registry = AgentOrchestratorRegistry()
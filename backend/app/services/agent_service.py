@@ -2,42 +2,74 @@
 Agent service for managing DSPy-based agents and dataset interactions.
 """
 
+import asyncio
 import logging
 import json
-from typing import Dict, Any, List, Optional
+import os
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.agents.base_agents import AgentOrchestrator, create_agent_orchestrator
-from app.models.dataset import Dataset
+from app.models.dataset import Dataset, LLMConfiguration
 from app.core.config import settings
 from app.services.code_execution_service import CodeExecutionService
+from app.services.agent_orchestrator_registry import agent_orchestrator_registry
 
 logger = logging.getLogger(__name__)
 
+# Rows of the dataset handed to sandboxed agent code; larger datasets are sampled
+CODE_SANDBOX_MAX_ROWS = int(os.getenv("CODE_SANDBOX_MAX_ROWS", "100000"))
+
 class AgentService:
     """Service for managing agents and their interactions with datasets."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, organization_id: Optional[int] = None):
         self.db = db
+        self.organization_id = organization_id
         self.orchestrator = None
         self.code_execution_service = CodeExecutionService()
         self._initialize_orchestrator()
 
+    def _resolve_llm_config(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Get the organization's default LLM configuration, falling back to the app settings."""
+        llm_config = {
+            "provider": getattr(settings, "DEFAULT_LLM_PROVIDER", "openai"),
+            "model": getattr(settings, "DEFAULT_LLM_MODEL", "gpt-3.5-turbo"),
+            "api_key": getattr(settings, "OPENAI_API_KEY", None),
+            "temperature": 0.1,
+            "max_tokens": 2000
+        }
+        if not self.organization_id:
+            return llm_config, None
+
+        config = self.db.query(LLMConfiguration).filter(
+            LLMConfiguration.organization_id == self.organization_id,
+            LLMConfiguration.is_active == True,
+            LLMConfiguration.is_deleted == False
+        ).order_by(
+            LLMConfiguration.is_default.desc(),
+            LLMConfiguration.updated_at.desc()
+        ).first()
+        if config is None:
+            return llm_config, None
+
+        params = config.model_params or {}
+        llm_config.update({
+            "provider": config.provider,
+            "model": config.llm_model_name,
+            "api_key": config.api_key,
+            "api_base": config.api_base,
+            "temperature": params.get("temperature", llm_config["temperature"]),
+            "max_tokens": params.get("max_tokens", llm_config["max_tokens"])
+        })
+        return llm_config, f"llm_configuration:{config.id}"
+
     def _initialize_orchestrator(self):
-        """Initialize the agent orchestrator with LLM configuration."""
+        """Get the shared agent orchestrator for the LLM configuration in effect."""
         try:
-            # Configure LLM settings
-            llm_config = {
-                "provider": getattr(settings, "DEFAULT_LLM_PROVIDER", "openai"),
-                "model": getattr(settings, "DEFAULT_LLM_MODEL", "gpt-3.5-turbo"),
-                "api_key": getattr(settings, "OPENAI_API_KEY", None),
-                "temperature": 0.1,
-                "max_tokens": 2000
-            }
-
-            self.orchestrator = create_agent_orchestrator(llm_config)
-            logger.info("Agent orchestrator initialized successfully")
+            llm_config, source = self._resolve_llm_config()
+            # Orchestrators are built once per configuration and shared across requests
+            self.orchestrator = agent_orchestrator_registry.get(llm_config, source=source)
 
         except Exception as e:
             logger.error(f"Failed to initialize agent orchestrator: {str(e)}")
@@ -76,7 +108,7 @@ class AgentService:
             }
         ]
 
-    def chat_with_dataset(
+    async def chat_with_dataset(
         self,
         dataset_id: int,
         message: str,
@@ -107,8 +139,9 @@ class AgentService:
             # Prepare dataset information for agents
             dataset_info = self._prepare_dataset_info(dataset)
 
-            # Route query to appropriate agent
-            result = self.orchestrator.route_query(
+            # Route query to appropriate agent (blocking LLM calls run off the event loop)
+            result = await asyncio.to_thread(
+                self.orchestrator.route_query,
                 goal=message,
                 dataset_info=dataset_info,
                 agent_name=agent_name
@@ -122,10 +155,11 @@ class AgentService:
             if result.get("success") and result.get("code"):
                 code = result.get("code", "")
 
-                # Execute code with visualization capture
-                execution_result = self.code_execution_service.execute_agent_code(
+                # Execute code with visualization capture against the real dataset
+                execution_result = await self.code_execution_service.execute_agent_code(
                     code=code,
-                    dataset_info=self._prepare_dataset_info_dict(dataset)
+                    dataset_info=self._prepare_dataset_info_dict(dataset),
+                    data_path=await self._prepare_sandbox_data(dataset)
                 )
 
                 if execution_result.get("success"):
@@ -173,6 +207,36 @@ class AgentService:
                 "response": f"Failed to process request: {str(e)}"
             }
 
+    async def _prepare_sandbox_data(self, dataset: Dataset) -> Optional[str]:
+        """
+        Get a memory-mappable Arrow file with the dataset (or a sample of it) for the sandbox.
+
+        Uses the columnar sidecar, building it first for tabular files uploaded before
+        sidecars existed. Returns None when the dataset has no tabular source file.
+        """
+        from app.services.columnar_cache import columnar_cache, TABULAR_EXTENSIONS
+        from app.services.storage import storage_service
+
+        storage_key = columnar_cache.storage_key_for_dataset(dataset)
+        if not storage_key or not columnar_cache.enabled:
+            return None
+
+        try:
+            if not await columnar_cache.ensure_local_sidecar(storage_key):
+                file_type = storage_key.rsplit('.', 1)[-1].lower()
+                if file_type not in TABULAR_EXTENSIONS:
+                    return None
+                async with storage_service.local_copy(storage_key, suffix=f".{file_type}") as local_path:
+                    build = await columnar_cache.build_sidecar(local_path, storage_key, file_type)
+                if not build.get("success"):
+                    return None
+
+            return await asyncio.to_thread(columnar_cache.export_arrow_sample, storage_key, CODE_SANDBOX_MAX_ROWS)
+
+        except Exception as e:
+            logger.warning(f"Could not prepare sandbox data for dataset {dataset.id}: {str(e)}")
+            return None
+
     def _prepare_dataset_info(self, dataset: Dataset) -> str:
         """Prepare dataset information for agents."""
         try:
@@ -298,30 +362,33 @@ class AgentService:
         except Exception as e:
             logger.error(f"Failed to log agent interaction: {str(e)}")
 
-    def execute_code_safely(self, code: str, dataset_id: int) -> Dict[str, Any]:
+    async def execute_code_safely(self, code: str, dataset: Dataset) -> Dict[str, Any]:
         """
-        Execute generated code safely in a controlled environment.
+        Execute code against a dataset in a code sandbox worker, as agent chat does.
 
-        Note: This is a placeholder for code execution functionality.
-        In production, you would want to use a sandboxed environment.
+        The dataset (or a sample of CODE_SANDBOX_MAX_ROWS rows) is loaded as `df`;
+        captured figures are returned formatted for the frontend.
         """
-        try:
-            # This would typically execute in a sandboxed Python environment
-            # For now, we'll just return the code for display
-            return {
-                "success": True,
-                "code": code,
-                "result": "Code execution would happen in a sandboxed environment",
-                "output": "Generated code is ready for execution"
-            }
-
-        except Exception as e:
-            logger.error(f"Code execution failed: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "code": code
-            }
+        execution_result = await self.code_execution_service.execute_agent_code(
+            code=code,
+            dataset_info=self._prepare_dataset_info_dict(dataset),
+            data_path=await self._prepare_sandbox_data(dataset)
+        )
+        if not execution_result.get("success"):
+            logger.error(f"Code execution failed for dataset {dataset.id}: {execution_result.get('error')}")
+
+        return {
+            "success": execution_result.get("success", False),
+            "code": code,
+            "output": execution_result.get("output", ""),
+            "error": execution_result.get("error"),
+            "plotly_figures": self.code_execution_service.format_plotly_figures_for_frontend(
+                execution_result.get("plotly_figures") or []
+            ),
+            "matplotlib_figures": self.code_execution_service.format_matplotlib_figures_for_frontend(
+                execution_result.get("matplotlib_figures") or []
+            )
+        }
 
     def get_agent_templates(self) -> List[Dict[str, Any]]:
         """Get predefined agent templates for custom agent creation."""
@@ -354,6 +421,6 @@ class AgentService:
             }
         ]
 
-def create_agent_service(db: Session) -> AgentService:
+def create_agent_service(db: Session, organization_id: Optional[int] = None) -> AgentService:
     """Factory function to create agent service."""
-    return AgentService(db)
\ No newline at end of file
+    return AgentService(db, organization_id)
\ No newline at end of file
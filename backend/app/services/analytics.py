@@ -2,21 +2,22 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, text
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
-import asyncio
 from fastapi import Request
 import psutil
 import logging
 import json
+import uuid
 
 from app.core.database import get_db
 from app.models.analytics import (
     DatasetAccess, ChatInteraction, 
-    APIUsage, UsageStats, SystemMetrics
+    APIUsage, SystemMetrics
 )
 from app.models.dataset import DatasetDownload
 from app.models.dataset import Dataset
 from app.models.user import User
 from app.models.organization import Organization
+from app.services.analytics_buffer import analytics_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -50,8 +51,6 @@ class AnalyticsService:
             access_id: Unique identifier for this access event
         """
         try:
-            db = next(get_db())
-            
             # Extract technical details from request
             ip_address = None
             user_agent = None
@@ -62,37 +61,35 @@ class AnalyticsService:
                 user_agent = request.headers.get("user-agent")
                 referer = request.headers.get("referer")
             
-            access_log = DatasetAccess(
-                dataset_id=dataset_id,
-                user_id=user_id,
-                session_id=session_id,
+            access_id = str(uuid.uuid4())
+            queued = await analytics_buffer.enqueue(
+                DatasetAccess,
+                {
+                    "access_id": access_id,
+                    "dataset_id": dataset_id,
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "access_type": access_type,
+                    "access_method": kwargs.get('access_method', 'web'),
+                    "ip_address": ip_address,
+                    "user_agent": user_agent,
+                    "referer": referer,
+                    "timestamp": datetime.utcnow(),
+                    "content_preview": kwargs.get('content_preview'),
+                    "query_text": kwargs.get('query_text'),
+                    "organization_id": kwargs.get('organization_id'),
+                    "success": kwargs.get('success', True),
+                    "error_message": kwargs.get('error_message'),
+                    "duration_seconds": kwargs.get('duration_seconds')
+                },
+                # Counted towards the hourly UsageStats aggregate on flush
                 access_type=access_type,
-                access_method=kwargs.get('access_method', 'web'),
-                ip_address=ip_address,
-                user_agent=user_agent,
-                referer=referer,
-                content_preview=kwargs.get('content_preview'),
-                query_text=kwargs.get('query_text'),
-                organization_id=kwargs.get('organization_id'),
-                department_id=kwargs.get('department_id'),
-                success=kwargs.get('success', True),
-                error_message=kwargs.get('error_message'),
-                duration_seconds=kwargs.get('duration_seconds')
-            )
-            
-            db.add(access_log)
-            db.commit()
-            db.refresh(access_log)
-            
-            # Trigger background aggregation update
-            asyncio.create_task(self._update_usage_stats(
                 dataset_id=dataset_id,
                 user_id=user_id,
-                organization_id=kwargs.get('organization_id'),
-                access_type=access_type
-            ))
+                organization_id=kwargs.get('organization_id')
+            )
             
-            return access_log.access_id
+            return access_id if queued else None
             
         except Exception as e:
             logger.error(f"Error logging dataset access: {str(e)}")
@@ -166,8 +163,6 @@ class AnalyticsService:
     ) -> str:
         """Log AI chat interaction"""
         try:
-            db = next(get_db())
-            
             ip_address = None
             user_agent = None
             
@@ -175,26 +170,25 @@ class AnalyticsService:
                 ip_address = request.client.host if request.client else None
                 user_agent = request.headers.get("user-agent")
             
-            chat_log = ChatInteraction(
-                dataset_id=dataset_id,
-                user_id=user_id,
-                session_id=session_id,
-                user_message=user_message,
-                ai_response=ai_response,
-                llm_provider=kwargs.get('llm_provider'),
-                llm_model=kwargs.get('llm_model'),
-                tokens_used=kwargs.get('tokens_used'),
-                response_time_seconds=kwargs.get('response_time_seconds'),
-                ip_address=ip_address,
-                user_agent=user_agent,
-                organization_id=kwargs.get('organization_id'),
-                success=kwargs.get('success', True),
-                error_message=kwargs.get('error_message')
-            )
-            
-            db.add(chat_log)
-            db.commit()
-            db.refresh(chat_log)
+            interaction_id = str(uuid.uuid4())
+            queued = await analytics_buffer.enqueue(ChatInteraction, {
+                "interaction_id": interaction_id,
+                "dataset_id": dataset_id,
+                "user_id": user_id,
+                "session_id": session_id,
+                "user_message": user_message,
+                "ai_response": ai_response,
+                "llm_provider": kwargs.get('llm_provider'),
+                "llm_model": kwargs.get('llm_model'),
+                "tokens_used": kwargs.get('tokens_used'),
+                "response_time_seconds": kwargs.get('response_time_seconds'),
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "timestamp": datetime.utcnow(),
+                "organization_id": kwargs.get('organization_id'),
+                "success": kwargs.get('success', True),
+                "error_message": kwargs.get('error_message')
+            })
             
             # Also log as general access
             await self.log_dataset_access(
@@ -207,7 +201,7 @@ class AnalyticsService:
                 organization_id=kwargs.get('organization_id')
             )
             
-            return chat_log.interaction_id
+            return interaction_id if queued else None
             
         except Exception as e:
             logger.error(f"Error logging chat interaction: {str(e)}")
@@ -225,8 +219,6 @@ class AnalyticsService:
     ) -> str:
         """Log API endpoint usage"""
         try:
-            db = next(get_db())
-            
             ip_address = None
             user_agent = None
             
@@ -234,84 +226,30 @@ class AnalyticsService:
                 ip_address = request.client.host if request.client else None
                 user_agent = request.headers.get("user-agent")
             
-            api_log = APIUsage(
-                endpoint=endpoint,
-                method=method,
-                user_id=user_id,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                response_time_ms=response_time_ms,
-                status_code=status_code,
-                dataset_id=kwargs.get('dataset_id'),
-                organization_id=kwargs.get('organization_id'),
-                request_size_bytes=kwargs.get('request_size_bytes'),
-                response_size_bytes=kwargs.get('response_size_bytes'),
-                error_message=kwargs.get('error_message')
-            )
-            
-            db.add(api_log)
-            db.commit()
-            db.refresh(api_log)
-            
-            return api_log.request_id
+            request_id = str(uuid.uuid4())
+            queued = await analytics_buffer.enqueue(APIUsage, {
+                "request_id": request_id,
+                "endpoint": endpoint,
+                "method": method,
+                "user_id": user_id,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "timestamp": datetime.utcnow(),
+                "response_time_ms": response_time_ms,
+                "status_code": status_code,
+                "dataset_id": kwargs.get('dataset_id'),
+                "organization_id": kwargs.get('organization_id'),
+                "request_size_bytes": kwargs.get('request_size_bytes'),
+                "response_size_bytes": kwargs.get('response_size_bytes'),
+                "error_message": kwargs.get('error_message')
+            })
+            
+            return request_id if queued else None
             
         except Exception as e:
             logger.error(f"Error logging API usage: {str(e)}")
             return None
     
-    async def _update_usage_stats(
-        self,
-        dataset_id: Optional[int] = None,
-        user_id: Optional[int] = None,
-        organization_id: Optional[int] = None,
-        access_type: Optional[str] = None
-    ):
-        """Update aggregated usage statistics"""
-        try:
-            db = next(get_db())
-            
-            # Update hourly stats
-            current_hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
-            
-            # Find or create usage stats record
-            stats = db.query(UsageStats).filter(
-                and_(
-                    UsageStats.date == current_hour,
-                    UsageStats.period_type == 'hour',
-                    UsageStats.dataset_id == dataset_id,
-                    UsageStats.organization_id == organization_id
-                )
-            ).first()
-            
-            if not stats:
-                stats = UsageStats(
-                    date=current_hour,
-                    period_type='hour',
-                    dataset_id=dataset_id,
-                    user_id=user_id,
-                    organization_id=organization_id
-                )
-                db.add(stats)
-            
-            # Update counters based on access type (handle None values)
-            if access_type == 'view':
-                stats.total_views = (stats.total_views or 0) + 1
-            elif access_type == 'download':
-                stats.total_downloads = (stats.total_downloads or 0) + 1
-            elif access_type == 'chat':
-                stats.total_chats = (stats.total_chats or 0) + 1
-            elif access_type == 'api_call':
-                stats.total_api_calls = (stats.total_api_calls or 0) + 1
-            elif access_type == 'share':
-                stats.total_shares = (stats.total_shares or 0) + 1
-            
-            stats.updated_at = datetime.utcnow()
-            
-            db.commit()
-            
-        except Exception as e:
-            logger.error(f"Error updating usage stats: {str(e)}")
-    
     async def get_dataset_analytics(
         self,
         dataset_id: int,
@@ -0,0 +1,441 @@
+"""
+Analytics Event Buffer
+In-process buffer for analytics events. Event rows are queued in memory and written
+with one bulk INSERT per table when the batch fills or the flush interval elapses;
+hourly UsageStats counters are aggregated in memory and upserted once per flush.
+Producers are slowed down (and eventually shed) when the buffer is full, and the
+buffer is drained on application shutdown. When the database rejects a batch, the
+tables, rows and buckets are retried one at a time so a single bad event cannot hold
+the rest back; events that keep being rejected are dropped after a few flushes.
+"""
+
+import asyncio
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Callable
+import logging
+
+from sqlalchemy import text, and_
+from sqlalchemy.exc import StatementError, OperationalError, InterfaceError
+
+from app.core.database import SessionLocal
+from app.models.analytics import UsageStats
+
+logger = logging.getLogger(__name__)
+
+# access_type -> UsageStats counter column
+USAGE_COUNTERS = {
+    "view": "total_views",
+    "download": "total_downloads",
+    "chat": "total_chats",
+    "api_call": "total_api_calls",
+    "share": "total_shares"
+}
+
+# Other UsageStats totals the buffer does not track; the raw SQL upsert bypasses the
+# ORM column defaults, so it writes their 0 explicitly
+ZEROED_USAGE_COLUMNS = ("total_tokens_used", "total_bytes_transferred", "unique_users", "unique_sessions")
+
+# Hourly bucket key: (hour, dataset_id, organization_id)
+StatsKey = Tuple[datetime, Optional[int], Optional[int]]
+
+
+class AnalyticsEventBuffer:
+    """Batches analytics inserts and usage counter updates into periodic bulk writes"""
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        enqueue_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or int(os.getenv("ANALYTICS_BATCH_SIZE", "500"))
+        self.flush_interval = flush_interval or float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "2"))
+        self.max_pending = max_pending or int(os.getenv("ANALYTICS_MAX_PENDING", "10000"))
+        self.enqueue_timeout = enqueue_timeout if enqueue_timeout is not None else float(os.getenv("ANALYTICS_ENQUEUE_TIMEOUT", "5"))
+        self.max_retries = max_retries or int(os.getenv("ANALYTICS_MAX_RETRIES", "3"))
+
+        # model -> pending row mappings
+        self._rows: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+        self._pending = 0
+        # Hourly bucket -> {"user_id": ..., counter column: increment}
+        self._counters: Dict[StatsKey, Dict[str, Any]] = {}
+        # Times a queued row (by id, while it is held in _rows) / bucket was rejected on its own
+        self._row_rejections: Dict[int, int] = {}
+        self._bucket_rejections: Dict[StatsKey, int] = {}
+
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "backpressure_waits": 0,
+            "last_flush_ms": 0.0
+        }
+
+    def _ensure_started(self) -> None:
+        """Bind asyncio primitives to the running loop and start the flusher on first use"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._space = asyncio.Condition()
+            self._flush_lock = asyncio.Lock()
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def start(self) -> None:
+        """App startup hook"""
+        self._ensure_started()
+        logger.info(
+            f"📊 Analytics buffer started: batch {self.batch_size}, "
+            f"interval {self.flush_interval}s, max pending {self.max_pending}"
+        )
+
+    async def stop(self) -> None:
+        """App shutdown hook: stop the flusher and write out everything still buffered"""
+        self._stopping = True
+        if self._task is not None and not self._task.done():
+            self._wakeup.set()
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Analytics flusher exited with error: {e}")
+        self._task = None
+        # Final drain, in case the flusher was never started or the last flush failed
+        await self.flush()
+        if self._pending:
+            logger.error(f"❌ {self._pending} analytics events could not be written on shutdown")
+        else:
+            logger.info("📊 Analytics buffer drained")
+
+    async def enqueue(
+        self,
+        model: Any,
+        row: Dict[str, Any],
+        access_type: Optional[str] = None,
+        dataset_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        organization_id: Optional[int] = None
+    ) -> bool:
+        """
+        Queue a row for bulk insert, optionally counting it towards hourly usage stats
+
+        Waits (up to enqueue_timeout) while the buffer is full; the event is dropped
+        if no space frees up in time.
+
+        Returns:
+            True if the event was buffered
+        """
+        self._ensure_started()
+
+        if self._pending >= self.max_pending:
+            self.stats["backpressure_waits"] += 1
+            self._wakeup.set()
+            try:
+                async with self._space:
+                    await asyncio.wait_for(
+                        self._space.wait_for(lambda: self._pending < self.max_pending),
+                        timeout=self.enqueue_timeout
+                    )
+            except asyncio.TimeoutError:
+                self.stats["dropped"] += 1
+                logger.warning(f"⚠️ Analytics buffer full ({self._pending} pending); dropping {model.__tablename__} event")
+                return False
+
+        self._rows[model].append(row)
+        self._pending += 1
+        self.stats["enqueued"] += 1
+
+        if access_type in USAGE_COUNTERS:
+            self._count(access_type, dataset_id, user_id, organization_id)
+
+        if self._pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _count(
+        self,
+        access_type: str,
+        dataset_id: Optional[int],
+        user_id: Optional[int],
+        organization_id: Optional[int]
+    ) -> None:
+        hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        bucket = self._counters.setdefault((hour, dataset_id, organization_id), {"user_id": user_id})
+        column = USAGE_COUNTERS[access_type]
+        bucket[column] = bucket.get(column, 0) + 1
+
+    async def _run(self) -> None:
+        """Background flusher: flush on a full batch or when the interval elapses"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write all buffered rows and counters in one transaction; returns rows written"""
+        async with self._flush_lock:
+            if not self._pending and not self._counters:
+                return 0
+
+            rows, self._rows = self._rows, defaultdict(list)
+            counters, self._counters = self._counters, {}
+            count, self._pending = self._pending, 0
+
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write, rows, counters)
+            except Exception as e:
+                self.stats["failed_flushes"] += 1
+                if not self._is_rejection(e):
+                    # Database unreachable: keep the whole batch for the next flush
+                    logger.error(f"❌ Analytics flush of {count} events failed: {e}")
+                    self._requeue(rows, counters)
+                    return 0
+                logger.warning(f"⚠️ Analytics batch of {count} events rejected, retrying one by one: {e}")
+                failed_rows, failed_counters = await asyncio.to_thread(self._write_isolated, rows, counters)
+                count -= sum(len(model_rows) for model_rows in failed_rows.values())
+                self._requeue_rejected(failed_rows, failed_counters)
+            finally:
+                await self._notify_space()
+            self._prune_rejections()
+
+            self.stats["flushes"] += 1
+            self.stats["written"] += count
+            self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            logger.debug(f"📊 Flushed {count} analytics events and {len(counters)} usage buckets")
+            return count
+
+    def _requeue(self, rows: Dict[Any, List[Dict[str, Any]]], counters: Dict[StatsKey, Dict[str, Any]]) -> None:
+        """Put a failed batch back in front of newer events, shedding what no longer fits"""
+        room = self.max_pending - self._pending
+        for model, model_rows in rows.items():
+            kept = model_rows[:max(room, 0)]
+            room -= len(kept)
+            self.stats["dropped"] += len(model_rows) - len(kept)
+            self._rows[model][:0] = kept
+            self._pending += len(kept)
+
+        for key, bucket in counters.items():
+            current = self._counters.setdefault(key, {"user_id": bucket.get("user_id")})
+            for column in USAGE_COUNTERS.values():
+                if column in bucket:
+                    current[column] = current.get(column, 0) + bucket[column]
+
+    def _requeue_rejected(
+        self,
+        rows: Dict[Any, List[Dict[str, Any]]],
+        counters: Dict[StatsKey, Dict[str, Any]]
+    ) -> None:
+        """Requeue rows and buckets the database rejected on their own, up to max_retries times"""
+        retry_rows: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+        for model, model_rows in rows.items():
+            for row in model_rows:
+                rejections = self._row_rejections.get(id(row), 0) + 1
+                if rejections >= self.max_retries:
+                    self._row_rejections.pop(id(row), None)
+                    self.stats["rejected"] += 1
+                    logger.error(f"❌ Dropping {model.__tablename__} event rejected {rejections} times: {row}")
+                    continue
+                self._row_rejections[id(row)] = rejections
+                retry_rows[model].append(row)
+
+        retry_counters: Dict[StatsKey, Dict[str, Any]] = {}
+        for key, bucket in counters.items():
+            rejections = self._bucket_rejections.get(key, 0) + 1
+            if rejections >= self.max_retries:
+                self._bucket_rejections.pop(key, None)
+                self.stats["rejected"] += 1
+                logger.error(f"❌ Dropping usage bucket {key} rejected {rejections} times: {bucket}")
+                continue
+            self._bucket_rejections[key] = rejections
+            retry_counters[key] = bucket
+
+        self._requeue(retry_rows, retry_counters)
+
+    def _prune_rejections(self) -> None:
+        """Forget rejection counts of rows and buckets that are no longer queued"""
+        if self._row_rejections:
+            queued = {id(row) for model_rows in self._rows.values() for row in model_rows}
+            self._row_rejections = {
+                row_id: n for row_id, n in self._row_rejections.items() if row_id in queued
+            }
+        if self._bucket_rejections:
+            self._bucket_rejections = {
+                key: n for key, n in self._bucket_rejections.items() if key in self._counters
+            }
+
+    @staticmethod
+    def _is_rejection(error: Exception) -> bool:
+        """True if the database refused the statement, as opposed to being unreachable"""
+        return isinstance(error, StatementError) and not isinstance(error, (OperationalError, InterfaceError))
+
+    async def _notify_space(self) -> None:
+        if self._space is None:
+            return
+        async with self._space:
+            self._space.notify_all()
+
+    def _write(self, rows: Dict[Any, List[Dict[str, Any]]], counters: Dict[StatsKey, Dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            for model, model_rows in rows.items():
+                if model_rows:
+                    db.bulk_insert_mappings(model, model_rows)
+            if counters:
+                self._upsert_usage_stats(db, counters)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_isolated(
+        self,
+        rows: Dict[Any, List[Dict[str, Any]]],
+        counters: Dict[StatsKey, Dict[str, Any]]
+    ) -> Tuple[Dict[Any, List[Dict[str, Any]]], Dict[StatsKey, Dict[str, Any]]]:
+        """
+        Retry a rejected batch per table, then per row / bucket within the tables that
+        still fail; returns the rows and buckets that were rejected on their own
+        """
+        failed_rows: Dict[Any, List[Dict[str, Any]]] = {}
+        for model, model_rows in rows.items():
+            if model_rows and not self._try_write({model: model_rows}, {}):
+                failed = [row for row in model_rows if not self._try_write({model: [row]}, {})]
+                if failed:
+                    failed_rows[model] = failed
+
+        failed_counters: Dict[StatsKey, Dict[str, Any]] = {}
+        if counters and not self._try_write({}, counters):
+            failed_counters = {
+                key: bucket for key, bucket in counters.items() if not self._try_write({}, {key: bucket})
+            }
+        return failed_rows, failed_counters
+
+    def _try_write(self, rows: Dict[Any, List[Dict[str, Any]]], counters: Dict[StatsKey, Dict[str, Any]]) -> bool:
+        try:
+            self._write(rows, counters)
+            return True
+        except Exception as e:
+            logger.debug(f"Analytics write rejected: {e}")
+            return False
+
+    def _upsert_usage_stats(self, db, counters: Dict[StatsKey, Dict[str, Any]]) -> None:
+        """Add the aggregated hourly increments to UsageStats"""
+        if db.get_bind().dialect.name == "postgresql":
+            self._upsert_usage_stats_postgresql(db, counters)
+            return
+
+        # Portable fallback: find-or-create per bucket inside the flush transaction
+        now = datetime.utcnow()
+        for (hour, dataset_id, organization_id), bucket in counters.items():
+            stats = db.query(UsageStats).filter(
+                and_(
+                    UsageStats.date == hour,
+                    UsageStats.period_type == 'hour',
+                    UsageStats.dataset_id == dataset_id,
+                    UsageStats.organization_id == organization_id
+                )
+            ).first()
+            if not stats:
+                stats = UsageStats(
+                    date=hour,
+                    period_type='hour',
+                    dataset_id=dataset_id,
+                    user_id=bucket.get("user_id"),
+                    organization_id=organization_id
+                )
+                db.add(stats)
+            for column in USAGE_COUNTERS.values():
+                if column in bucket:
+                    setattr(stats, column, (getattr(stats, column) or 0) + bucket[column])
+            stats.updated_at = now
+
+    def _upsert_usage_stats_postgresql(self, db, counters: Dict[StatsKey, Dict[str, Any]]) -> None:
+        """
+        Single-statement upsert: update the existing hourly rows and insert the missing
+        ones in one data-modifying CTE (usage_stats has no unique key to ON CONFLICT on)
+        """
+        columns = list(USAGE_COUNTERS.values())
+        values = []
+        params: Dict[str, Any] = {"now": datetime.utcnow()}
+        for i, ((hour, dataset_id, organization_id), bucket) in enumerate(counters.items()):
+            values.append(
+                f"(CAST(:date_{i} AS timestamp), CAST(:dataset_{i} AS integer), "
+                f"CAST(:org_{i} AS integer), CAST(:user_{i} AS integer), "
+                + ", ".join(f"CAST(:{column}_{i} AS integer)" for column in columns)
+                + ")"
+            )
+            params.update({
+                f"date_{i}": hour,
+                f"dataset_{i}": dataset_id,
+                f"org_{i}": organization_id,
+                f"user_{i}": bucket.get("user_id"),
+                **{f"{column}_{i}": bucket.get(column, 0) for column in columns}
+            })
+
+        match = (
+            "s.period_type = 'hour' AND s.date = i.date "
+            "AND s.dataset_id IS NOT DISTINCT FROM i.dataset_id "
+            "AND s.organization_id IS NOT DISTINCT FROM i.organization_id"
+        )
+        db.execute(text(f"""
+            WITH incoming (date, dataset_id, organization_id, user_id, {", ".join(columns)}) AS (
+                VALUES {", ".join(values)}
+            ),
+            updated AS (
+                UPDATE usage_stats s SET
+                    {", ".join(f"{column} = COALESCE(s.{column}, 0) + i.{column}" for column in columns)},
+                    {", ".join(f"{column} = COALESCE(s.{column}, 0)" for column in ZEROED_USAGE_COLUMNS)},
+                    updated_at = :now
+                FROM incoming i
+                WHERE {match}
+                RETURNING s.date, s.dataset_id, s.organization_id
+            )
+            INSERT INTO usage_stats (date, period_type, dataset_id, organization_id, user_id,
+                                     {", ".join(columns)}, {", ".join(ZEROED_USAGE_COLUMNS)},
+                                     created_at, updated_at)
+            SELECT i.date, 'hour', i.dataset_id, i.organization_id, i.user_id,
+                   {", ".join(f"i.{column}" for column in columns)},
+                   {", ".join("0" for _ in ZEROED_USAGE_COLUMNS)}, :now, :now
+            FROM incoming i
+            WHERE NOT EXISTS (
+                SELECT 1 FROM updated s WHERE s.date = i.date
+                AND s.dataset_id IS NOT DISTINCT FROM i.dataset_id
+                AND s.organization_id IS NOT DISTINCT FROM i.organization_id
+            )
+        """), params)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "pending": self._pending,
+            "pending_usage_buckets": len(self._counters),
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "max_pending": self.max_pending,
+            "max_retries": self.max_retries,
+            "running": self._task is not None and not self._task.done(),
+            **self.stats
+        }
+
+
+# Global instance
+analytics_buffer = AnalyticsEventBuffer()
@@ -0,0 +1,254 @@
+"""
+API Response Cache Service
+Caches upstream GET responses of proxied API connectors so repeated requests for
+the same connector, endpoint and query parameters are answered without going
+upstream. Entries expire after a per-connector TTL and are then revalidated with
+If-None-Match / If-Modified-Since; the cache is an LRU bounded by total body size,
+and concurrent identical misses share a single upstream request.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Upstream statuses whose bodies may be cached
+CACHEABLE_STATUS_CODES = {200, 203}
+
+
+class _CacheEntry:
+    __slots__ = ("status_code", "headers", "content", "expires_at", "etag", "last_modified", "size")
+
+    def __init__(self, response: httpx.Response, ttl: float):
+        self.status_code = response.status_code
+        self.headers = dict(response.headers)
+        self.content = response.content
+        self.expires_at = time.monotonic() + ttl
+        self.etag = response.headers.get("etag")
+        self.last_modified = response.headers.get("last-modified")
+        self.size = len(self.content) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    def to_response(self, request: Optional[httpx.Request] = None) -> httpx.Response:
+        # Drop transfer headers; the body here is already decoded
+        headers = {
+            k: v for k, v in self.headers.items()
+            if k.lower() not in ("content-encoding", "transfer-encoding", "content-length")
+        }
+        return httpx.Response(self.status_code, headers=headers, content=self.content, request=request)
+
+
+class APIResponseCache:
+    """Byte-bounded LRU cache of upstream API responses with revalidation and request coalescing"""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_entry_bytes: Optional[int] = None,
+        default_ttl: Optional[float] = None
+    ):
+        self.max_bytes = max_bytes or int(os.getenv("API_CACHE_MAX_MB", "64")) * 1024 * 1024
+        self.max_entry_bytes = max_entry_bytes or int(os.getenv("API_CACHE_MAX_ENTRY_MB", "2")) * 1024 * 1024
+        self.default_ttl = default_ttl if default_ttl is not None else float(os.getenv("API_CACHE_DEFAULT_TTL", "60"))
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "coalesced": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bypassed": 0
+        }
+
+    def ttl_for(self, connection_config: Optional[Dict[str, Any]]) -> float:
+        """Per-connector TTL from its config ("cache_ttl" seconds, 0 disables caching)"""
+        if connection_config and connection_config.get("cache_ttl") is not None:
+            try:
+                return float(connection_config["cache_ttl"])
+            except (TypeError, ValueError):
+                pass
+        return self.default_ttl
+
+    @staticmethod
+    def build_key(
+        connector_id: Any,
+        connection_config: Any,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        vary: Optional[Dict[str, str]] = None,
+        credentials: Any = None
+    ) -> str:
+        """
+        Key a request by connector (id, config and credentials fingerprint), URL and normalized query params
+
+        Parameter order and single-value lists are normalized so equivalent requests share an entry.
+        Forwarded client headers that change the upstream response go in vary. Rotated
+        credentials give new keys, so responses fetched with the old ones are not served.
+        """
+        normalized = []
+        for name, value in (params or {}).items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            normalized.append((str(name), sorted(str(v) for v in values)))
+        normalized.sort()
+
+        def fingerprint(value: Any) -> str:
+            return value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+
+        vary_items = sorted((k.lower(), str(v)) for k, v in (vary or {}).items())
+        raw = json.dumps(
+            [fingerprint(connection_config), fingerprint(credentials), url, normalized, vary_items],
+            separators=(",", ":")
+        )
+        return f"{connector_id}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def _get(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _store(self, key: str, response: httpx.Response, ttl: float) -> None:
+        cache_control = response.headers.get("cache-control", "").lower()
+        if response.status_code not in CACHEABLE_STATUS_CODES or "no-store" in cache_control:
+            self._remove(key)
+            return
+
+        entry = _CacheEntry(response, ttl)
+        if entry.size > self.max_entry_bytes:
+            self._remove(key)
+            return
+
+        self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self.stats["stores"] += 1
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.stats["evictions"] += 1
+
+    async def fetch(
+        self,
+        key: str,
+        ttl: float,
+        fetcher: Callable[[Dict[str, str]], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """
+        Get a response from the cache, or from upstream via fetcher
+
+        Args:
+            key: Cache key from build_key
+            ttl: Seconds a stored response stays fresh (0 bypasses the cache)
+            fetcher: Async callable performing the upstream GET with the given extra
+                conditional headers
+
+        Returns:
+            The upstream (or reconstructed cached) response
+        """
+        if ttl <= 0:
+            self.stats["bypassed"] += 1
+            return await fetcher({})
+
+        entry = self._get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self.stats["hits"] += 1
+            return entry.to_response()
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            response = await asyncio.shield(inflight)
+            return response
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self._refresh(key, ttl, entry, fetcher)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when no one else was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _refresh(
+        self,
+        key: str,
+        ttl: float,
+        entry: Optional[_CacheEntry],
+        fetcher: Callable[[Dict[str, str]], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        conditional_headers = {}
+        if entry is not None:
+            if entry.etag:
+                conditional_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                conditional_headers["If-Modified-Since"] = entry.last_modified
+
+        response = await fetcher(conditional_headers)
+
+        if response.status_code == 304 and entry is not None:
+            self.stats["revalidated"] += 1
+            entry.expires_at = time.monotonic() + ttl
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            try:
+                request = response.request
+            except RuntimeError:
+                request = None
+            return entry.to_response(request)
+
+        self.stats["misses"] += 1
+        self._store(key, response, ttl)
+        return response
+
+    def invalidate_connector(self, connector_id: Any) -> int:
+        """Drop every cached response of a connector"""
+        prefix = f"{connector_id}:"
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        if keys:
+            logger.info(f"🗑️ Invalidated {len(keys)} cached responses for connector {connector_id}")
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["revalidated"]
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "default_ttl": self.default_ttl,
+            "hit_ratio": round((self.stats["hits"] + self.stats["revalidated"]) / lookups, 3) if lookups else 0.0,
+            **self.stats
+        }
+
+
+# Global instance
+api_response_cache = APIResponseCache()
@@ -0,0 +1,279 @@
+"""
+Blob Store Service
+Content-addressed, reference-counted storage for uploaded dataset files. Files are
+stored once under a path derived from their SHA-256; every dataset file with the
+same content points at that blob and holds a reference. Releasing the last
+reference marks the blob orphaned, and a background collector deletes orphaned
+blobs after a grace period.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Callable
+import logging
+
+from sqlalchemy import or_, and_
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import SessionLocal
+from app.models.dataset import StorageBlob, Dataset, DatasetFile
+
+logger = logging.getLogger(__name__)
+
+# Prefix of every content-addressed path in the storage backend
+BLOB_PREFIX = "blobs/"
+
+
+class BlobStore:
+    """Reference counts of content-addressed blobs, and their garbage collection"""
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        enabled: Optional[bool] = None,
+        gc_interval: Optional[float] = None,
+        gc_grace_seconds: Optional[float] = None,
+        gc_batch_size: int = 500
+    ):
+        self.session_factory = session_factory
+        if enabled is None:
+            enabled = os.getenv("STORAGE_DEDUP_ENABLED", "true").lower() == "true"
+        self.enabled = enabled
+        self.gc_interval = gc_interval or float(os.getenv("BLOB_GC_INTERVAL", "3600"))
+        self.gc_grace_seconds = gc_grace_seconds if gc_grace_seconds is not None else float(os.getenv("BLOB_GC_GRACE_SECONDS", "86400"))
+        self.gc_batch_size = gc_batch_size
+
+        self._gc_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "stored": 0,
+            "deduplicated": 0,
+            "bytes_deduplicated": 0,
+            "released": 0,
+            "collected": 0,
+            "bytes_collected": 0,
+            "gc_runs": 0
+        }
+
+    @staticmethod
+    def blob_path(sha256: str, extension: str = "") -> str:
+        """Storage path of a blob; the extension is kept so type detection by path still works"""
+        extension = extension.lower().lstrip(".")
+        name = f"{sha256}.{extension}" if extension else sha256
+        return f"{BLOB_PREFIX}{sha256[:2]}/{sha256[2:4]}/{name}"
+
+    @staticmethod
+    def is_blob_path(file_path: Optional[str]) -> bool:
+        return bool(file_path) and file_path.startswith(BLOB_PREFIX)
+
+    async def acquire(self, storage_path: str) -> bool:
+        """
+        Take a reference on an existing blob
+
+        Returns:
+            True if the blob is registered (the caller must not write it again);
+            False if it is unknown and the caller should write it and call register()
+        """
+        def acquire_sync():
+            db = self.session_factory()
+            try:
+                blob = db.query(StorageBlob).filter(
+                    StorageBlob.storage_path == storage_path
+                ).with_for_update().first()
+                if blob is None:
+                    return False
+                blob.ref_count = max(blob.ref_count or 0, 0) + 1
+                blob.orphaned_at = None
+                blob.last_referenced_at = datetime.utcnow()
+                db.commit()
+                return True
+            finally:
+                db.close()
+
+        return await asyncio.to_thread(acquire_sync)
+
+    async def register(self, sha256: str, storage_path: str, size_bytes: int) -> None:
+        """Record a newly written blob with one reference (or add one if a concurrent upload won)"""
+        def register_sync():
+            db = self.session_factory()
+            try:
+                db.add(StorageBlob(
+                    sha256=sha256,
+                    storage_path=storage_path,
+                    size_bytes=size_bytes,
+                    ref_count=1
+                ))
+                db.commit()
+                return
+            except IntegrityError:
+                db.rollback()
+            finally:
+                db.close()
+            # Same content stored concurrently: share the winner's row
+            self._add_reference_sync(storage_path)
+
+        await asyncio.to_thread(register_sync)
+        self.stats["stored"] += 1
+
+    def _add_reference_sync(self, storage_path: str) -> None:
+        db = self.session_factory()
+        try:
+            blob = db.query(StorageBlob).filter(
+                StorageBlob.storage_path == storage_path
+            ).with_for_update().first()
+            blob.ref_count = max(blob.ref_count or 0, 0) + 1
+            blob.orphaned_at = None
+            blob.last_referenced_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    def record_deduplicated(self, size_bytes: int) -> None:
+        self.stats["deduplicated"] += 1
+        self.stats["bytes_deduplicated"] += size_bytes
+
+    async def release(self, storage_path: Optional[str]) -> bool:
+        """
+        Drop a reference to a blob; at zero the blob is left for the collector
+
+        Returns:
+            True if the path is a blob (non-blob paths are the caller's to delete)
+        """
+        if not self.is_blob_path(storage_path):
+            return False
+
+        def release_sync():
+            db = self.session_factory()
+            try:
+                blob = db.query(StorageBlob).filter(
+                    StorageBlob.storage_path == storage_path
+                ).with_for_update().first()
+                if blob is None:
+                    return
+                blob.ref_count = max((blob.ref_count or 0) - 1, 0)
+                if blob.ref_count == 0:
+                    blob.orphaned_at = datetime.utcnow()
+                db.commit()
+            finally:
+                db.close()
+
+        await asyncio.to_thread(release_sync)
+        self.stats["released"] += 1
+        return True
+
+    def _live_references(self, db, storage_path: str) -> int:
+        """Dataset records still pointing at a blob (guards against lost acquire/release pairs)"""
+        files = db.query(DatasetFile).filter(
+            DatasetFile.is_deleted == False,
+            or_(DatasetFile.file_path == storage_path, DatasetFile.relative_path == storage_path)
+        ).count()
+        datasets = db.query(Dataset).filter(
+            Dataset.is_deleted == False,
+            or_(Dataset.file_path == storage_path, Dataset.source_url == storage_path)
+        ).count()
+        return files + datasets
+
+    async def collect(self, storage, grace_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Delete blobs whose reference count has been zero for longer than the grace period
+
+        Each candidate is re-checked under a row lock and its object deleted before the
+        row, so a concurrent upload of the same content either re-acquires the row
+        first (and the blob survives) or writes a fresh copy after it is gone.
+        """
+        grace = self.gc_grace_seconds if grace_seconds is None else grace_seconds
+        cutoff = datetime.utcnow() - timedelta(seconds=grace)
+        result = {"collected": 0, "bytes_collected": 0, "repaired": 0, "errors": 0}
+        started = time.perf_counter()
+
+        def candidates_sync():
+            db = self.session_factory()
+            try:
+                return [
+                    blob_id for (blob_id,) in db.query(StorageBlob.id).filter(
+                        and_(StorageBlob.ref_count <= 0, StorageBlob.orphaned_at <= cutoff)
+                    ).limit(self.gc_batch_size)
+                ]
+            finally:
+                db.close()
+
+        for blob_id in await asyncio.to_thread(candidates_sync):
+            db = self.session_factory()
+            try:
+                blob = await asyncio.to_thread(
+                    lambda: db.query(StorageBlob).filter(StorageBlob.id == blob_id).with_for_update().first()
+                )
+                if blob is None or blob.ref_count > 0 or blob.orphaned_at is None or blob.orphaned_at > cutoff:
+                    await asyncio.to_thread(db.rollback)
+                    continue
+
+                live = await asyncio.to_thread(self._live_references, db, blob.storage_path)
+                if live:
+                    blob.ref_count = live
+                    blob.orphaned_at = None
+                    await asyncio.to_thread(db.commit)
+                    result["repaired"] += 1
+                    logger.warning(f"Blob {blob.storage_path} still referenced {live} times; refcount repaired")
+                    continue
+
+                await storage.delete_stored_object(blob.storage_path)
+                size = blob.size_bytes or 0
+                db.delete(blob)
+                await asyncio.to_thread(db.commit)
+                result["collected"] += 1
+                result["bytes_collected"] += size
+            except Exception as e:
+                result["errors"] += 1
+                logger.error(f"Blob collection failed for blob {blob_id}: {e}")
+                await asyncio.to_thread(db.rollback)
+            finally:
+                db.close()
+
+        self.stats["gc_runs"] += 1
+        self.stats["collected"] += result["collected"]
+        self.stats["bytes_collected"] += result["bytes_collected"]
+        result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        if result["collected"] or result["repaired"] or result["errors"]:
+            logger.info(
+                f"🧹 Blob GC: collected {result['collected']} blobs ({result['bytes_collected']} bytes), "
+                f"repaired {result['repaired']}, {result['errors']} errors"
+            )
+        return result
+
+    async def _gc_loop(self, storage) -> None:
+        while True:
+            await asyncio.sleep(self.gc_interval)
+            try:
+                await self.collect(storage)
+            except Exception as e:
+                logger.error(f"Blob GC run failed: {e}")
+
+    async def start_gc(self, storage) -> None:
+        """App startup hook"""
+        if not self.enabled or (self._gc_task is not None and not self._gc_task.done()):
+            return
+        self._gc_task = asyncio.get_running_loop().create_task(self._gc_loop(storage))
+        logger.info(f"🧹 Blob GC scheduled every {self.gc_interval}s (grace {self.gc_grace_seconds}s)")
+
+    async def stop_gc(self) -> None:
+        """App shutdown hook"""
+        if self._gc_task is not None:
+            self._gc_task.cancel()
+            try:
+                await self._gc_task
+            except asyncio.CancelledError:
+                pass
+            self._gc_task = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "gc_interval": self.gc_interval,
+            "gc_grace_seconds": self.gc_grace_seconds,
+            **self.stats
+        }
+
+
+# Global instance
+blob_store = BlobStore()
@@ -1,79 +1,57 @@
 """
 Code execution service that captures plotly visualizations and matplotlib charts.
 Based on Auto-Analyst's format_response.py approach.
+
+Code runs in the pre-warmed worker processes of the code sandbox pool, never in
+the API process.
 """
 
-import sys
-import contextlib
-from io import StringIO
 import json
 import re
 import logging
-import pandas as pd
-import numpy as np
-import base64
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Optional
 
-logger = logging.getLogger(__name__)
+from app.services.code_sandbox import code_sandbox_pool
 
-@contextlib.contextmanager
-def stdoutIO(stdout=None):
-    """Context manager to capture stdout."""
-    old = sys.stdout
-    if stdout is None:
-        stdout = StringIO()
-    sys.stdout = stdout
-    yield stdout
-    sys.stdout = old
+logger = logging.getLogger(__name__)
 
 class CodeExecutionService:
     """Service for safely executing agent-generated code and capturing visualizations."""
 
-    def __init__(self):
-        self.json_outputs = []
-        self.matplotlib_outputs = []
+    def __init__(self, sandbox=None):
+        self.sandbox = sandbox or code_sandbox_pool
 
-    def execute_agent_code(self, code: str, dataset_info: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute_agent_code(
+        self,
+        code: str,
+        dataset_info: Dict[str, Any],
+        data_path: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Execute agent-generated code and capture plotly visualizations.
+        Execute agent-generated code in a sandbox worker and capture plotly visualizations.
 
         Args:
             code: Python code to execute
             dataset_info: Information about the dataset
+            data_path: Arrow IPC file with the dataset (or a sample of it), loaded as `df`
 
         Returns:
             Dictionary containing execution results, plotly figures, and output
         """
         try:
-            # Reset outputs
-            self.json_outputs = []
-            self.matplotlib_outputs = []
-
-            # Prepare execution context
-            context = self._prepare_execution_context(dataset_info)
-
             # Modify code to capture plotly figures
             modified_code = self._modify_code_for_capture(code)
 
-            # Execute the code
-            output_text = ""
-            with stdoutIO() as s:
-                try:
-                    exec(modified_code, context)
-                    output_text = s.getvalue()
-                except Exception as e:
-                    output_text = f"Execution error: {str(e)}"
-                    logger.error(f"Code execution error: {str(e)}")
-
-            # Extract captured visualizations
-            json_outputs = context.get('json_outputs', [])
-            matplotlib_outputs = context.get('matplotlib_outputs', [])
+            result = await self.sandbox.execute(modified_code, data_path=data_path)
+            if not result.get("success"):
+                logger.error(f"Code execution error for dataset {dataset_info.get('name')}: {result.get('error')}")
 
             return {
-                "success": True,
-                "output": output_text,
-                "plotly_figures": json_outputs,
-                "matplotlib_figures": matplotlib_outputs,
+                "success": result.get("success", False),
+                "error": result.get("error"),
+                "output": result.get("output", ""),
+                "plotly_figures": result.get("plotly_figures", []),
+                "matplotlib_figures": result.get("matplotlib_figures", []),
                 "code": code
             }
 
@@ -88,65 +66,6 @@ class CodeExecutionService:
                 "code": code
             }
 
-    def _prepare_execution_context(self, dataset_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Prepare the execution context with necessary imports and data."""
-        # Import necessary libraries
-        import plotly.express as px
-        import plotly.graph_objects as go
-        import plotly
-        import matplotlib.pyplot as plt
-        import pandas as pd
-        import numpy as np
-
-        # Create mock dataset if needed (for demonstration)
-        df = self._create_mock_dataset(dataset_info)
-
-        # Lists to store captured outputs
-        json_outputs = []
-        matplotlib_outputs = []
-
-        # Custom matplotlib capture function
-        def capture_matplotlib_chart():
-            """Capture current matplotlib figure as base64 encoded image"""
-            try:
-                fig = plt.gcf()  # Get current figure
-                if fig.get_axes():  # Check if figure has any plots
-                    buffer = StringIO()
-                    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight',
-                               facecolor='white', edgecolor='none')
-                    buffer.seek(0)
-                    image_base64 = base64.b64encode(buffer.getvalue().encode()).decode()
-                    plt.close(fig)  # Close the figure to free memory
-                    return image_base64
-            except Exception as e:
-                logger.error(f"Error capturing matplotlib chart: {str(e)}")
-            return None
-
-        # Custom plt.show that captures the chart instead of displaying it
-        def custom_plt_show():
-            """Custom plt.show that captures the chart instead of displaying it"""
-            img_base64 = capture_matplotlib_chart()
-            if img_base64:
-                matplotlib_outputs.append(img_base64)
-
-        # Prepare execution context
-        context = {
-            'pd': pd,
-            'np': np,
-            'px': px,
-            'go': go,
-            'plt': plt,
-            'plotly': plotly,
-            'df': df,
-            'json_outputs': json_outputs,
-            'matplotlib_outputs': matplotlib_outputs,
-        }
-
-        # Override plt.show to capture charts
-        context['plt'].show = custom_plt_show
-
-        return context
-
     def _modify_code_for_capture(self, code: str) -> str:
         """Modify code to capture plotly figures when fig.show() is called."""
         # Replace fig.show() with code that captures the figure as JSON
@@ -169,59 +88,6 @@ class CodeExecutionService:
 
         return modified_code
 
-    def _create_mock_dataset(self, dataset_info: Dict[str, Any]) -> pd.DataFrame:
-        """Create a mock dataset for demonstration purposes."""
-        try:
-            # Try to extract column information from dataset_info
-            if isinstance(dataset_info, dict) and 'columns' in dataset_info:
-                columns = dataset_info['columns']
-                if isinstance(columns, list):
-                    # Create sample data with these columns
-                    data = {}
-                    for col in columns[:10]:  # Limit to 10 columns
-                        # Use exact column names (lowercase)
-                        col_lower = str(col).lower() if not str(col).islower() else col
-
-                        if any(word in col_lower for word in ['price', 'cost', 'amount', 'value', 'sales', 'salary']):
-                            # Numeric column
-                            data[col_lower] = np.random.uniform(10000, 100000, 100)
-                        elif any(word in col_lower for word in ['age']):
-                            # Age column
-                            data[col_lower] = np.random.randint(22, 65, 100)
-                        elif any(word in col_lower for word in ['date', 'time']):
-                            # Date column
-                            data[col_lower] = pd.date_range('2023-01-01', periods=100, freq='D')
-                        elif any(word in col_lower for word in ['name', 'first', 'last']):
-                            # Name column
-                            names = [f"Person_{i}" for i in range(100)]
-                            data[col_lower] = names
-                        elif any(word in col_lower for word in ['category', 'type', 'region', 'segment', 'department', 'dept']):
-                            # Categorical column
-                            categories = ['Sales', 'Engineering', 'Marketing', 'HR', 'Finance']
-                            data[col_lower] = np.random.choice(categories, 100)
-                        else:
-                            # Default numeric
-                            data[col_lower] = np.random.uniform(1, 100, 100)
-
-                    return pd.DataFrame(data)
-
-            # Default fallback dataset
-            return pd.DataFrame({
-                'Category': np.random.choice(['A', 'B', 'C', 'D'], 100),
-                'Values': np.random.uniform(10, 100, 100),
-                'Price': np.random.uniform(20, 200, 100),
-                'Sales': np.random.uniform(100, 1000, 100),
-                'Date': pd.date_range('2023-01-01', periods=100, freq='D')
-            })
-
-        except Exception as e:
-            logger.error(f"Error creating mock dataset: {str(e)}")
-            # Very basic fallback
-            return pd.DataFrame({
-                'x': range(10),
-                'y': np.random.uniform(0, 10, 10)
-            })
-
     def format_plotly_figures_for_frontend(self, plotly_figures: List[str]) -> List[Dict[str, Any]]:
         """Format plotly figures for frontend display."""
         formatted_figures = []
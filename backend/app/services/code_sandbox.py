@@ -0,0 +1,285 @@
+"""
+Code Sandbox Service
+Pool of pre-warmed worker processes that run agent-generated analysis code
+outside the API process. Each worker has pandas, numpy, plotly and matplotlib
+already imported, runs one job at a time under CPU-time and memory limits, and
+is killed and replaced if a job exceeds its wall-clock timeout or crashes.
+
+Datasets are handed over as memory-mapped Arrow IPC files, so workers share the
+page cache instead of receiving a copy of the data through the pipe.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import select
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "code_sandbox_worker.py")
+HEADER = struct.Struct(">Q")
+
+# Environment passed to workers; API secrets (database URL, API keys) are not inherited
+WORKER_ENV_KEYS = ("PATH", "LANG", "LC_ALL", "TZ", "PYTHONPATH", "VIRTUAL_ENV")
+
+
+class SandboxWorkerError(Exception):
+    pass
+
+
+class _SandboxWorker:
+    """One worker process and its pipes"""
+
+    def __init__(self, memory_mb: int):
+        self.workdir = tempfile.mkdtemp(prefix="code_sandbox_")
+        env = {key: os.environ[key] for key in WORKER_ENV_KEYS if key in os.environ}
+        env.update({
+            "HOME": self.workdir,
+            "MPLBACKEND": "Agg",
+            "MPLCONFIGDIR": os.path.join(self.workdir, ".matplotlib"),
+            # One BLAS thread per worker; the pool is the unit of parallelism
+            "OMP_NUM_THREADS": "1",
+            "OPENBLAS_NUM_THREADS": "1",
+            "MKL_NUM_THREADS": "1",
+            "SANDBOX_MEMORY_MB": str(memory_mb),
+        })
+        self.process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=self.workdir,
+            env=env
+        )
+        self.ready = False
+        self.jobs_run = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_exact(self, size: int, deadline: float) -> bytes:
+        stream = self.process.stdout
+        fd = stream.fileno()
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                raise TimeoutError("Sandbox worker timed out")
+            readable, _, _ = select.select([fd], [], [], timeout)
+            if not readable:
+                continue
+            chunk = os.read(fd, min(remaining, 1024 * 1024))
+            if not chunk:
+                raise SandboxWorkerError(f"Sandbox worker exited (code {self.process.poll()})")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    def receive(self, timeout: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        (length,) = HEADER.unpack(self._read_exact(HEADER.size, deadline))
+        # Frames come from untrusted code, so they are only ever parsed as JSON
+        try:
+            message = json.loads(self._read_exact(length, deadline))
+        except ValueError as e:
+            raise SandboxWorkerError(f"Malformed frame from sandbox worker: {e}")
+        if not isinstance(message, dict):
+            raise SandboxWorkerError("Malformed frame from sandbox worker: expected an object")
+        return message
+
+    def send(self, message: Dict[str, Any]) -> None:
+        payload = json.dumps(message).encode("utf-8")
+        try:
+            self.process.stdin.write(HEADER.pack(len(payload)) + payload)
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise SandboxWorkerError(f"Sandbox worker is gone: {e}")
+
+    def wait_ready(self, timeout: float) -> None:
+        if not self.ready:
+            self.receive(timeout)
+            self.ready = True
+
+    def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def stop(self) -> None:
+        try:
+            self.send({"stop": True})
+            self.process.wait(timeout=2)
+        except Exception:
+            pass
+        self.kill()
+
+
+class CodeSandboxPool:
+    """Fixed-size pool of sandbox worker processes"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cpu_seconds: Optional[float] = None,
+        memory_mb: Optional[int] = None,
+        timeout: Optional[float] = None,
+        startup_timeout: Optional[float] = None,
+        max_jobs_per_worker: Optional[int] = None
+    ):
+        self.size = workers or int(os.getenv("CODE_SANDBOX_WORKERS", "2"))
+        self.cpu_seconds = cpu_seconds or float(os.getenv("CODE_SANDBOX_CPU_SECONDS", "30"))
+        self.memory_mb = memory_mb if memory_mb is not None else int(os.getenv("CODE_SANDBOX_MEMORY_MB", "2048"))
+        self.timeout = timeout or float(os.getenv("CODE_SANDBOX_TIMEOUT", "60"))
+        self.startup_timeout = startup_timeout or float(os.getenv("CODE_SANDBOX_STARTUP_TIMEOUT", "60"))
+        # Recycle workers now and then so memory fragmentation or leaked state cannot build up
+        self.max_jobs_per_worker = max_jobs_per_worker or int(os.getenv("CODE_SANDBOX_MAX_JOBS_PER_WORKER", "100"))
+
+        self._idle: "queue.Queue[_SandboxWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        # One thread per worker: jobs beyond the pool size wait in the executor queue,
+        # never on the event loop
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {
+            "jobs": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "crashes": 0,
+            "workers_started": 0,
+            "workers_recycled": 0,
+            "queue_wait_seconds_total": 0.0,
+            "run_seconds_total": 0.0
+        }
+
+    def _spawn(self) -> _SandboxWorker:
+        worker = _SandboxWorker(self.memory_mb)
+        self.stats["workers_started"] += 1
+        return worker
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="code-sandbox")
+            for _ in range(self.size):
+                self._idle.put(self._spawn())
+            self._started = True
+            logger.info(f"🧪 Code sandbox pool started with {self.size} workers")
+
+    def _run_sync(self, job: Dict[str, Any], queued_at: float) -> Dict[str, Any]:
+        worker = self._idle.get()
+        self.stats["queue_wait_seconds_total"] += time.monotonic() - queued_at
+        started = time.monotonic()
+        replace = False
+        try:
+            worker.wait_ready(self.startup_timeout)
+            worker.send(job)
+            result = worker.receive(self.timeout)
+            worker.jobs_run += 1
+            replace = worker.jobs_run >= self.max_jobs_per_worker
+            if replace:
+                self.stats["workers_recycled"] += 1
+            return result
+        except TimeoutError:
+            replace = True
+            self.stats["timeouts"] += 1
+            logger.warning(f"Sandbox job exceeded {self.timeout}s wall-clock limit; worker killed")
+            return self._failure(f"Execution timed out after {self.timeout:.0f}s")
+        except SandboxWorkerError as e:
+            replace = True
+            self.stats["crashes"] += 1
+            logger.warning(f"Sandbox worker died during a job: {e}")
+            return self._failure("Execution aborted: the code exceeded its resource limits or crashed")
+        finally:
+            self.stats["run_seconds_total"] += time.monotonic() - started
+            if replace or not worker.alive:
+                worker.kill()
+                worker = self._spawn()
+            self._idle.put(worker)
+
+    @staticmethod
+    def _failure(message: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": message,
+            "output": f"Execution error: {message}",
+            "plotly_figures": [],
+            "matplotlib_figures": []
+        }
+
+    async def execute(self, code: str, data_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run code in a sandbox worker
+
+        Args:
+            code: Python code; `df` holds the dataset, `json_outputs` collects plotly
+                figure JSON and plt.show() captures matplotlib figures
+            data_path: Arrow IPC file with the dataset (or a sample of it)
+
+        Returns:
+            {"success", "error", "output", "plotly_figures", "matplotlib_figures"}
+        """
+        self._ensure_started()
+        job = {"code": code, "data_path": data_path, "cpu_seconds": self.cpu_seconds}
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, self._run_sync, job, time.monotonic())
+        self.stats["jobs"] += 1
+        if not result.get("success"):
+            self.stats["failed"] += 1
+        return result
+
+    async def start(self) -> None:
+        """App startup hook: spawn the workers so their imports happen before the first job"""
+        await asyncio.to_thread(self._ensure_started)
+
+    async def stop(self) -> None:
+        """App shutdown hook"""
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            executor, self._executor = self._executor, None
+        executor.shutdown(wait=True)
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            await asyncio.to_thread(worker.stop)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.size,
+            "idle_workers": self._idle.qsize(),
+            "cpu_seconds": self.cpu_seconds,
+            "memory_mb": self.memory_mb,
+            "timeout": self.timeout,
+            **self.stats,
+            "queue_wait_seconds_total": round(self.stats["queue_wait_seconds_total"], 3),
+            "run_seconds_total": round(self.stats["run_seconds_total"], 3)
+        }
+
+
+# Global instance
+code_sandbox_pool = CodeSandboxPool()
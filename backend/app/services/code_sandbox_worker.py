@@ -0,0 +1,204 @@
+"""
+Code Sandbox Worker
+Standalone process that runs agent-generated analysis code for the code sandbox
+pool. It is started by file path (not as part of the app package), imports the
+data libraries once up front, then runs jobs sent over stdin until told to stop.
+
+Protocol: 8-byte big-endian length followed by a JSON object, in both directions.
+The worker announces {"ready": True} once its imports are done.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import struct
+import sys
+import time
+import traceback
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Not available on Windows
+    RESOURCE_AVAILABLE = False
+
+HEADER = struct.Struct(">Q")
+MAX_OUTPUT_CHARS = 100_000
+
+
+class CPUTimeExceeded(Exception):
+    pass
+
+
+def read_frame(stream):
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    (length,) = HEADER.unpack(header)
+    return json.loads(stream.read(length))
+
+
+def write_frame(stream, message):
+    # Anything the job left in its outputs that JSON cannot represent is sent as text
+    payload = json.dumps(message, default=str).encode("utf-8")
+    stream.write(HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def _on_cpu_limit(signum, frame):
+    raise CPUTimeExceeded("CPU time limit exceeded")
+
+
+def _cpu_seconds_used():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Worker:
+    def __init__(self):
+        # Pre-warm: pay the data library import cost once per process, not per job
+        import numpy as np
+        import pandas as pd
+        self.np = np
+        self.pd = pd
+        self.modules = {"pd": pd, "np": np}
+
+        try:
+            import pyarrow as pa
+            self.pa = pa
+        except ImportError:
+            self.pa = None
+
+        try:
+            import plotly
+            import plotly.io
+            import plotly.express as px
+            import plotly.graph_objects as go
+            self.modules.update({"plotly": plotly, "px": px, "go": go})
+        except ImportError:
+            pass
+
+        try:
+            import matplotlib
+            matplotlib.use("Agg")
+            import matplotlib.pyplot as plt
+            self.plt = plt
+            self.modules["plt"] = plt
+        except ImportError:
+            self.plt = None
+
+        # Memory-mapped Arrow table of the last dataset, reused by consecutive jobs on it
+        self._table_path = None
+        self._table = None
+
+    def load_dataframe(self, data_path):
+        if not data_path or self.pa is None:
+            return self.pd.DataFrame()
+        if data_path != self._table_path:
+            source = self.pa.memory_map(data_path, "r")
+            self._table = self.pa.ipc.open_file(source).read_all()
+            self._table_path = data_path
+        # A fresh DataFrame per job so one job's mutations never leak into the next
+        return self._table.to_pandas()
+
+    def run(self, job):
+        started = time.perf_counter()
+        json_outputs = []
+        matplotlib_outputs = []
+        plt = self.plt
+
+        def show(*args, **kwargs):
+            """plt.show() captures the current figure as a base64 PNG instead of displaying it"""
+            import base64
+            fig = plt.gcf()
+            if fig.get_axes():
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format="png", dpi=150, bbox_inches="tight", facecolor="white", edgecolor="none")
+                matplotlib_outputs.append(base64.b64encode(buffer.getvalue()).decode())
+            plt.close(fig)
+
+        context = dict(self.modules)
+        context.update({
+            "__name__": "__sandbox__",
+            "df": self.load_dataframe(job.get("data_path")),
+            "json_outputs": json_outputs,
+            "matplotlib_outputs": matplotlib_outputs,
+        })
+        if plt is not None:
+            plt.show = show
+
+        cpu_limit = job.get("cpu_seconds")
+        if RESOURCE_AVAILABLE and cpu_limit:
+            # RLIMIT_CPU counts the whole process, so the budget is relative to usage so far.
+            # Only the soft limit moves (a lowered hard limit could never be raised again);
+            # code stuck in C without returning to the interpreter hits the wall-clock timeout
+            hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+            soft = int(_cpu_seconds_used() + cpu_limit) + 1
+            if hard != resource.RLIM_INFINITY:
+                soft = min(soft, hard)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+        stdout = io.StringIO()
+        error = None
+        try:
+            with contextlib.redirect_stdout(stdout):
+                exec(compile(job["code"], "<agent_code>", "exec"), context)
+        except CPUTimeExceeded as e:
+            error = str(e)
+        except MemoryError:
+            error = "Memory limit exceeded"
+        except BaseException as e:  # noqa: BLE001 - report anything the code raised
+            error = f"{type(e).__name__}: {e}"
+            stdout.write("\n" + "".join(traceback.format_exception_only(type(e), e)))
+        finally:
+            if RESOURCE_AVAILABLE and cpu_limit:
+                resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+            if plt is not None:
+                plt.close("all")
+
+        output = stdout.getvalue()
+        if len(output) > MAX_OUTPUT_CHARS:
+            output = output[:MAX_OUTPUT_CHARS] + "\n... output truncated"
+        return {
+            "success": error is None,
+            "error": error,
+            "output": output if error is None else f"Execution error: {error}\n{output}",
+            "plotly_figures": json_outputs,
+            "matplotlib_figures": matplotlib_outputs,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+def main():
+    # Frames go over the original stdout; anything else printed at C level goes to stderr
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    protocol_in = sys.stdin.buffer
+
+    worker = Worker()
+
+    memory_mb = int(os.environ.get("SANDBOX_MEMORY_MB", "0"))
+    if RESOURCE_AVAILABLE and memory_mb > 0:
+        # Applied after the imports, so the limit bounds what jobs allocate
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if RESOURCE_AVAILABLE:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+    write_frame(protocol_out, {"ready": True, "pid": os.getpid()})
+    while True:
+        job = read_frame(protocol_in)
+        if job is None or job.get("stop"):
+            break
+        try:
+            result = worker.run(job)
+        except BaseException as e:  # noqa: BLE001 - keep the worker alive for the next job
+            result = {"success": False, "error": f"{type(e).__name__}: {e}", "output": "",
+                      "plotly_figures": [], "matplotlib_figures": []}
+        write_frame(protocol_out, result)
+
+
+if __name__ == "__main__":
+    main()
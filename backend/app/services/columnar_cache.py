@@ -0,0 +1,380 @@
+"""
+Columnar Cache Service
+Converts tabular dataset files (CSV, Excel, JSON) once into a Parquet sidecar
+stored through StorageService, so previews, schema analysis and visualizations
+can read projected columns from a memory-mapped file instead of re-parsing the source.
+"""
+
+import os
+import asyncio
+import hashlib
+import tempfile
+from typing import Dict, Any, Optional, List
+from datetime import datetime
+import logging
+
+import pandas as pd
+
+from app.services.storage import storage_service, LocalStorageBackend, CONNECTOR_SNAPSHOT_PREFIX
+
+# Optional Arrow imports
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TABULAR_EXTENSIONS = {"csv", "xlsx", "xls", "json"}
+
+
+class ColumnarCacheService:
+    """Service for building and reading Parquet sidecars of tabular dataset files"""
+
+    SIDECAR_KIND = "columnar"
+    ROW_GROUP_SIZE = 64 * 1024  # Small row groups keep paginated reads cheap
+
+    def __init__(self, storage=None, cache_dir: Optional[str] = None):
+        self.storage = storage or storage_service
+        if cache_dir is None:
+            try:
+                from app.core.config import settings
+                cache_dir = os.path.join(settings.TEMPORARY_FILES_PATH, "columnar")
+            except Exception:
+                cache_dir = os.path.join(tempfile.gettempdir(), "aishare_columnar")
+        # Local mirror of sidecars for remote (S3) backends, needed for memory-mapping
+        self.cache_dir = cache_dir
+
+    @property
+    def enabled(self) -> bool:
+        return ARROW_AVAILABLE
+
+    def storage_key_for_dataset(self, dataset) -> Optional[str]:
+        """Get the storage path of a dataset's source file"""
+        if getattr(dataset, "connector_id", None):
+            # Connector-backed datasets are read from the snapshot kept by the connector sync
+            return f"{CONNECTOR_SNAPSHOT_PREFIX}{dataset.connector_id}/{dataset.id}"
+        for candidate in (dataset.file_path, dataset.source_url):
+            if candidate and not candidate.startswith("http"):
+                return candidate
+        return None
+
+    def local_sidecar_path(self, file_path: str) -> str:
+        """Get the local path a sidecar is read from (storage dir or remote mirror)"""
+        sidecar_path = self.storage.get_sidecar_path(file_path, self.SIDECAR_KIND)
+        local_path = self.storage.get_local_path(sidecar_path)
+        if local_path is None:
+            local_path = os.path.join(self.cache_dir, sidecar_path)
+        return local_path
+
+    def _is_fresh(self, file_path: str, sidecar_local_path: str) -> bool:
+        """A sidecar is stale when a local source file was modified after it was built"""
+        if not os.path.exists(sidecar_local_path):
+            return False
+        source_local_path = self.storage.get_local_path(file_path)
+        if source_local_path and os.path.exists(source_local_path):
+            return os.path.getmtime(sidecar_local_path) >= os.path.getmtime(source_local_path)
+        return True
+
+    def has_sidecar(self, file_path: Optional[str]) -> bool:
+        """Check whether a fresh sidecar is available locally"""
+        if not self.enabled or not file_path:
+            return False
+        return self._is_fresh(file_path, self.local_sidecar_path(file_path))
+
+    async def build_sidecar(self, source_local_path: str, file_path: str, file_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Convert a tabular source file into a Parquet sidecar and store it
+
+        Args:
+            source_local_path: Local path of the source file to parse
+            file_path: Storage path of the dataset file the sidecar belongs to
+            file_type: File extension of the source (csv, xlsx, xls, json)
+
+        Returns:
+            Dict with sidecar information
+        """
+        if not self.enabled:
+            return {"success": False, "error": "pyarrow not installed"}
+
+        file_type = (file_type or source_local_path.rsplit('.', 1)[-1]).lower()
+        if file_type not in TABULAR_EXTENSIONS:
+            return {"success": False, "error": f"Unsupported file type for columnar cache: {file_type}"}
+
+        sidecar_local_path = self.local_sidecar_path(file_path)
+        os.makedirs(os.path.dirname(sidecar_local_path), exist_ok=True)
+        tmp_path = f"{sidecar_local_path}.tmp"
+
+        try:
+            # Parsing and encoding are CPU bound; keep them off the event loop
+            num_rows = await asyncio.to_thread(self._write_sidecar, source_local_path, file_type, tmp_path)
+            os.replace(tmp_path, sidecar_local_path)
+
+            # Remote backends keep the canonical copy; the local file is the mmap mirror
+            if not isinstance(self.storage.backend, LocalStorageBackend) and not os.path.isabs(file_path):
+                await self.storage.store_sidecar_file(file_path, self.SIDECAR_KIND, sidecar_local_path)
+
+            logger.info(f"Columnar sidecar built for {file_path}: {num_rows} rows")
+            return {
+                "success": True,
+                "sidecar_path": self.storage.get_sidecar_path(file_path, self.SIDECAR_KIND),
+                "num_rows": num_rows,
+                "size_bytes": os.path.getsize(sidecar_local_path),
+                "built_at": datetime.utcnow().isoformat()
+            }
+
+        except Exception as e:
+            logger.warning(f"Could not build columnar sidecar for {file_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return {"success": False, "error": str(e)}
+
+    def _write_sidecar(self, source_local_path: str, file_type: str, target_path: str) -> int:
+        """Convert a source file into a Parquet file at target_path; returns the row count"""
+        if file_type == "csv":
+            return self._write_csv_sidecar(source_local_path, target_path)
+        if file_type in ("xlsx", "xls"):
+            df = pd.read_excel(source_local_path)
+        else:
+            df = pd.read_json(source_local_path)
+        return self._write_dataframe_sidecar(df, target_path)
+
+    def _write_csv_sidecar(self, source_local_path: str, target_path: str) -> int:
+        """Stream a CSV file into Parquet batch by batch"""
+        try:
+            reader = pa_csv.open_csv(source_local_path, convert_options=self._csv_convert_options(source_local_path))
+            writer = None
+            num_rows = 0
+            try:
+                for batch in reader:
+                    if writer is None:
+                        writer = pq.ParquetWriter(target_path, batch.schema)
+                    writer.write_batch(batch, row_group_size=self.ROW_GROUP_SIZE)
+                    num_rows += batch.num_rows
+                if writer is None:
+                    writer = pq.ParquetWriter(target_path, reader.schema)
+            finally:
+                if writer is not None:
+                    writer.close()
+            return num_rows
+        except pa.ArrowInvalid as e:
+            # Type inference from the first block failed on a later block; fall back to pandas
+            logger.info(f"Streaming CSV conversion failed ({e}), falling back to pandas")
+            return self._write_dataframe_sidecar(pd.read_csv(source_local_path, low_memory=False), target_path)
+
+    @staticmethod
+    def _csv_convert_options(source_local_path: str) -> "pa_csv.ConvertOptions":
+        """
+        Keep date / time / timestamp columns as text, the way pd.read_csv returns them,
+        so readers of the sidecar see the same values as readers of the CSV
+        """
+        inferred = pa_csv.open_csv(source_local_path).schema
+        temporal = {field.name: pa.string() for field in inferred if pa.types.is_temporal(field.type)}
+        return pa_csv.ConvertOptions(column_types=temporal)
+
+    def _write_dataframe_sidecar(self, df: pd.DataFrame, target_path: str) -> int:
+        """Write a DataFrame as Parquet"""
+        # Mixed-type object columns cannot be encoded by Arrow; store them as strings
+        for col in df.columns:
+            if df[col].dtype == 'object':
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        df.columns = [str(col) for col in df.columns]
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, target_path, row_group_size=self.ROW_GROUP_SIZE)
+        return table.num_rows
+
+    async def ensure_local_sidecar(self, file_path: Optional[str]) -> bool:
+        """Make a sidecar available locally, fetching it from remote storage if needed"""
+        if not self.enabled or not file_path:
+            return False
+        if self.has_sidecar(file_path):
+            return True
+        if isinstance(self.storage.backend, LocalStorageBackend):
+            return False
+
+        content = await self.storage.retrieve_dataset_file(
+            self.storage.get_sidecar_path(file_path, self.SIDECAR_KIND)
+        )
+        if content is None:
+            return False
+
+        sidecar_local_path = self.local_sidecar_path(file_path)
+        os.makedirs(os.path.dirname(sidecar_local_path), exist_ok=True)
+        with open(sidecar_local_path, "wb") as f:
+            f.write(content)
+        return True
+
+    def _open(self, file_path: Optional[str]):
+        if not self.has_sidecar(file_path):
+            return None
+        try:
+            return pq.ParquetFile(self.local_sidecar_path(file_path), memory_map=True)
+        except Exception as e:
+            logger.warning(f"Could not open columnar sidecar for {file_path}: {e}")
+            return None
+
+    def num_rows(self, file_path: Optional[str]) -> Optional[int]:
+        """Get the exact row count from the sidecar footer"""
+        parquet_file = self._open(file_path)
+        return parquet_file.metadata.num_rows if parquet_file else None
+
+    def column_names(self, file_path: Optional[str]) -> Optional[List[str]]:
+        """Get column names from the sidecar schema"""
+        parquet_file = self._open(file_path)
+        return parquet_file.schema_arrow.names if parquet_file else None
+
+    def read_rows(
+        self,
+        file_path: Optional[str],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Read a slice of rows from the sidecar, touching only the row groups that cover it
+
+        Args:
+            file_path: Storage path of the dataset file
+            offset: Index of the first row to return
+            limit: Maximum number of rows to return (None for all)
+            columns: Columns to project (None for all)
+
+        Returns:
+            DataFrame with the requested rows, or None if no sidecar is available
+        """
+        parquet_file = self._open(file_path)
+        if parquet_file is None:
+            return None
+
+        try:
+            metadata = parquet_file.metadata
+            end = metadata.num_rows if limit is None else min(offset + limit, metadata.num_rows)
+            if offset >= end:
+                schema = parquet_file.schema_arrow
+                names = columns or schema.names
+                return schema.empty_table().select(names).to_pandas()
+
+            row_groups = []
+            first_group_start = None
+            group_start = 0
+            for index in range(metadata.num_row_groups):
+                group_rows = metadata.row_group(index).num_rows
+                group_end = group_start + group_rows
+                if group_end > offset and group_start < end:
+                    row_groups.append(index)
+                    if first_group_start is None:
+                        first_group_start = group_start
+                group_start = group_end
+
+            table = parquet_file.read_row_groups(row_groups, columns=columns)
+            table = table.slice(offset - first_group_start, end - offset)
+            return table.to_pandas()
+
+        except Exception as e:
+            logger.warning(f"Could not read columnar sidecar for {file_path}: {e}")
+            return None
+
+    def read_sample(
+        self,
+        file_path: Optional[str],
+        max_rows: int,
+        columns: Optional[List[str]] = None,
+        random_state: int = 42
+    ) -> Optional[pd.DataFrame]:
+        """Read the whole sidecar, or a uniform random sample of max_rows rows when larger"""
+        parquet_file = self._open(file_path)
+        if parquet_file is None:
+            return None
+
+        try:
+            return self._sample_table(parquet_file, max_rows, columns, random_state).to_pandas()
+        except Exception as e:
+            logger.warning(f"Could not sample columnar sidecar for {file_path}: {e}")
+            return None
+
+    @staticmethod
+    def _sample_table(
+        parquet_file,
+        max_rows: int,
+        columns: Optional[List[str]] = None,
+        random_state: int = 42
+    ) -> "pa.Table":
+        """
+        Uniform random sample of max_rows rows, decoding one row group at a time
+
+        Row indices are drawn from the footer's row count, then only the row groups
+        holding sampled rows are read, so memory stays at one row group plus the sample.
+        """
+        total_rows = parquet_file.metadata.num_rows
+        if total_rows <= max_rows:
+            return parquet_file.read(columns=columns)
+
+        import numpy as np
+        indices = np.sort(np.random.default_rng(random_state).choice(total_rows, max_rows, replace=False))
+        group_sizes = [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)]
+        group_starts = np.concatenate(([0], np.cumsum(group_sizes)))
+        # Slice of the sorted indices falling in each row group
+        bounds = np.searchsorted(indices, group_starts)
+
+        pieces = []
+        for group in range(parquet_file.num_row_groups):
+            selected = indices[bounds[group]:bounds[group + 1]]
+            if len(selected):
+                table = parquet_file.read_row_group(group, columns=columns)
+                pieces.append(table.take(selected - group_starts[group]))
+        return pa.concat_tables(pieces)
+
+    def export_arrow_sample(self, file_path: Optional[str], max_rows: int) -> Optional[str]:
+        """
+        Write the sidecar (or a sample of max_rows rows) as an uncompressed Arrow IPC file
+
+        Other processes can memory-map the result and read it without decoding, so
+        sandbox workers get the data through the shared page cache. The file is
+        reused until the sidecar changes.
+
+        Returns:
+            Local path of the Arrow file, or None if no sidecar is available
+        """
+        if not self.has_sidecar(file_path):
+            return None
+
+        sidecar_local_path = self.local_sidecar_path(file_path)
+        digest = hashlib.sha1(sidecar_local_path.encode()).hexdigest()[:16]
+        arrow_path = os.path.join(self.cache_dir, "arrow", f"{digest}_{max_rows}.arrow")
+        if os.path.exists(arrow_path) and os.path.getmtime(arrow_path) >= os.path.getmtime(sidecar_local_path):
+            return arrow_path
+
+        try:
+            table = self._sample_table(pq.ParquetFile(sidecar_local_path, memory_map=True), max_rows)
+
+            os.makedirs(os.path.dirname(arrow_path), exist_ok=True)
+            tmp_path = f"{arrow_path}.{os.getpid()}.tmp"
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, arrow_path)
+            return arrow_path
+        except Exception as e:
+            logger.warning(f"Could not export Arrow sample for {file_path}: {e}")
+            return None
+
+    async def invalidate(self, file_path: Optional[str]) -> None:
+        """Drop the sidecar of a dataset file after its source changed"""
+        if not file_path:
+            return
+        try:
+            sidecar_local_path = self.local_sidecar_path(file_path)
+            if os.path.exists(sidecar_local_path):
+                os.remove(sidecar_local_path)
+            if not isinstance(self.storage.backend, LocalStorageBackend) and not os.path.isabs(file_path):
+                await self.storage.backend.delete_file(self.storage.get_sidecar_path(file_path, self.SIDECAR_KIND))
+            logger.info(f"Columnar sidecar invalidated for {file_path}")
+        except Exception as e:
+            logger.warning(f"Could not invalidate columnar sidecar for {file_path}: {e}")
+
+
+# Global instance
+columnar_cache = ColumnarCacheService()
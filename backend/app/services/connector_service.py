@@ -243,7 +243,7 @@ class ConnectorService:
             self.db.refresh(dataset)
             
             # Create MindsDB model for document chat
-            await self._create_document_chat_model(dataset, processed_data.get("text_content", ""))
+            await self._create_document_chat_model(dataset, processed_data.get("text_content"))
             
             logger.info(f"✅ Processed document: {original_filename} -> Dataset ID: {dataset.id}")
             
@@ -482,36 +482,27 @@ class ConnectorService:
     
     # Document processing methods
     async def _process_pdf_document(self, file_path: str) -> Dict[str, Any]:
-        """Process PDF document using PyMuPDF"""
+        """Process PDF document from its cached per-page text index (built on first use)"""
         try:
-            import fitz  # PyMuPDF
+            from app.services.pdf_processing import pdf_processing_service
             
-            doc = fitz.open(file_path)
-            text_content = ""
-            page_count = len(doc)
-            
-            # Extract text from all pages
-            for page_num in range(page_count):
-                page = doc.load_page(page_num)
-                text_content += page.get_text() + "\n"
-            
-            doc.close()
-            
-            word_count = len(text_content.split())
+            info = await pdf_processing_service.ensure_text_index(file_path)
+            # Full text stays in the index; document chat reads what it needs from there
+            preview = await asyncio.to_thread(pdf_processing_service.read_text, file_path, 503)
             
             return {
                 "success": True,
                 "method": "PyMuPDF",
-                "text_content": text_content,
-                "text_extracted": bool(text_content.strip()),
-                "page_count": page_count,
-                "word_count": word_count,
-                "preview": text_content[:500] + "..." if len(text_content) > 500 else text_content,
+                "text_extracted": info["pages_with_text"] > 0,
+                "page_count": info["page_count"],
+                "word_count": info["total_words"],
+                "preview": preview[:500] + "..." if len(preview) > 500 else preview,
                 "metadata": {
                     "document_type": "pdf",
-                    "pages": page_count,
-                    "words": word_count,
-                    "characters": len(text_content)
+                    "pages": info["page_count"],
+                    "words": info["total_words"],
+                    "characters": info["total_chars"],
+                    "text_index": os.path.basename(info["index_path"])
                 }
             }
             
@@ -718,11 +709,17 @@ class ConnectorService:
                 "error": f"ODT processing failed: {str(e)}"
             }
     
-    async def _create_document_chat_model(self, dataset: Dataset, text_content: str) -> Dict[str, Any]:
+    async def _create_document_chat_model(self, dataset: Dataset, text_content: Optional[str] = None) -> Dict[str, Any]:
         """Create MindsDB model for document chat"""
         try:
             model_name = f"doc_chat_{dataset.id}"
             
+            if text_content is None and dataset.type == DatasetType.PDF and dataset.file_path:
+                # PDF text comes from the cached page index rather than a fresh extraction
+                from app.services.pdf_processing import pdf_processing_service
+                await pdf_processing_service.ensure_text_index(dataset.file_path)
+                text_content = await asyncio.to_thread(pdf_processing_service.read_text, dataset.file_path, 2000)
+            
             # Create a simple chat model for the document
             result = self.mindsdb_service.create_gemini_model(
                 model_name=model_name,
@@ -735,7 +732,7 @@ class ConnectorService:
                 dataset.chat_model_name = model_name
                 dataset.ai_chat_enabled = True
                 dataset.chat_context = {
-                    "document_content": text_content[:2000],  # First 2000 chars for context
+                    "document_content": (text_content or "")[:2000],  # First 2000 chars for context
                     "model_name": model_name,
                     "created_at": datetime.utcnow().isoformat()
                 }
@@ -986,18 +983,47 @@ class ConnectorService:
         except Exception as e:
             return {"success": False, "error": f"API connection failed: {str(e)}"}
 
-    async def sync_connector_data(self, connector: DatabaseConnector) -> Dict[str, Any]:
-        """Sync connector data"""
+    async def sync_connector_data(self, connector: DatabaseConnector, full_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Sync the connector's datasets into local snapshots
+
+        Each dataset's table is pulled incrementally (watermark column, id or API
+        cursor) when possible, otherwise fully refreshed. Previews, schema analysis
+        and chat then read the snapshot instead of querying the source live.
+        """
         try:
-            # For now, just return a successful sync result
-            # This can be expanded to implement actual data synchronization
+            from app.services.connector_sync import connector_sync_engine
+            
+            datasets = self.db.query(Dataset).filter(
+                Dataset.connector_id == connector.id,
+                Dataset.is_deleted == False
+            ).all()
+            
+            result = await connector_sync_engine.sync_connector(connector, datasets, full_refresh=full_refresh)
+            if result.get("error"):
+                return {"success": False, "error": result["error"]}
+            
+            # Keep dataset sizes in line with their snapshots
+            tables = {table["dataset_id"]: table for table in result["tables"]}
+            for dataset in datasets:
+                table = tables.get(dataset.id)
+                if table and table.get("success"):
+                    dataset.row_count = table["snapshot_rows"]
+            self.db.commit()
+            
+            failed = result["tables_failed"]
             return {
-                "success": True,
-                "message": "Data sync completed successfully",
-                "records_synced": 0,
+                "success": failed == 0,
+                "message": (
+                    f"Synced {result['tables_synced']} of {len(datasets)} datasets"
+                    + (f" ({failed} failed)" if failed else "")
+                ),
+                "records_synced": result["rows_synced"],
                 "details": {
                     "connector_type": connector.connector_type,
-                    "sync_time": datetime.utcnow().isoformat()
+                    "sync_time": datetime.utcnow().isoformat(),
+                    "full_refresh": full_refresh,
+                    **result
                 }
             }
         except Exception as e:
@@ -1005,4 +1031,4 @@ class ConnectorService:
             return {
                 "success": False,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
@@ -0,0 +1,855 @@
+"""
+Connector Sync Engine
+Snapshots connector-backed datasets (MySQL, PostgreSQL, ClickHouse, MongoDB, REST
+APIs) into local Parquet files, so previews, schema analysis and chat read a
+memory-mapped snapshot instead of re-querying the source through MindsDB.
+
+Syncs are incremental where the source allows it:
+- SQL tables resume after the last seen value of a watermark column (updated_at
+  style columns, or a monotonic integer id) using keyset pagination
+- MongoDB collections resume after the last seen watermark field (default _id)
+- APIs resume from the stored pagination cursor or a "since" parameter
+
+The first load of an incremental table is a full scan, so rows whose watermark is
+NULL are part of the initial snapshot; later runs only see rows with a watermark.
+
+The sync state (watermark, cursor) is stored in the snapshot's Parquet metadata,
+so it is replaced atomically together with the data it describes.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import logging
+
+from app.services.columnar_cache import columnar_cache
+from app.services.storage import LocalStorageBackend, CONNECTOR_SNAPSHOT_PREFIX
+
+# Optional Arrow imports
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SQL_CONNECTORS = {"mysql", "postgresql", "redshift"}
+API_CONNECTORS = {"api", "web"}
+SYNCABLE_CONNECTORS = SQL_CONNECTORS | API_CONNECTORS | {"clickhouse", "mongodb"}
+
+# Columns picked as watermark when a dataset does not configure one
+WATERMARK_CANDIDATES = ("updated_at", "modified_at", "last_modified", "last_updated", "updated")
+
+STATE_METADATA_KEY = b"connector_sync_state"
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*(\.[A-Za-z_][A-Za-z0-9_$]*)?$")
+
+
+class SchemaChanged(Exception):
+    """Rows no longer fit the snapshot schema; the table needs a full refresh"""
+    pass
+
+
+def _encode_watermark(value: Any) -> Any:
+    """Make a watermark value JSON-serializable, keeping enough type information to restore it"""
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"decimal": str(value)}
+    if type(value).__name__ == "ObjectId":
+        return {"objectid": str(value)}
+    return value
+
+
+def _decode_watermark(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+        if "date" in value:
+            return date.fromisoformat(value["date"])
+        if "decimal" in value:
+            return Decimal(value["decimal"])
+        if "objectid" in value:
+            from bson import ObjectId
+            return ObjectId(value["objectid"])
+    return value
+
+
+def _normalize_value(value: Any) -> Any:
+    """Convert driver values to something Arrow can store"""
+    if value is None or isinstance(value, (str, int, float, bool, bytes, datetime, date, dt_time)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def _rows_to_table(rows: List[Dict[str, Any]], schema: Optional["pa.Schema"]) -> "pa.Table":
+    """Build an Arrow table from a batch of rows, conforming to schema when one is known"""
+    rows = [{key: _normalize_value(value) for key, value in row.items()} for row in rows]
+    if schema is None:
+        table = pa.Table.from_pylist(rows)
+        # Columns that are null throughout the first batch can hold anything later
+        fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema]
+        return table.cast(pa.schema(fields))
+
+    string_fields = {f.name for f in schema if pa.types.is_string(f.type)}
+    for row in rows:
+        for name in string_fields.intersection(row):
+            if row[name] is not None and not isinstance(row[name], str):
+                row[name] = str(row[name])
+    try:
+        return pa.Table.from_pylist(rows, schema=schema)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError, OverflowError) as e:
+        raise SchemaChanged(str(e))
+
+
+def _arrow_type(sql_type) -> "pa.DataType":
+    """Map a SQLAlchemy column type to an Arrow type"""
+    try:
+        python_type = sql_type.python_type
+    except (NotImplementedError, AttributeError):
+        return pa.string()
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type in (float, Decimal):
+        return pa.float64()
+    if python_type is datetime:
+        return pa.timestamp("us")
+    if python_type is date:
+        return pa.date32()
+    if python_type is dt_time:
+        return pa.time64("us")
+    if python_type is bytes:
+        return pa.binary()
+    return pa.string()
+
+
+class SyncSource:
+    """
+    A table-like source the engine pulls batches from
+
+    Subclasses set mode ("full", "append" or "upsert"), key_column and
+    watermark_column in prepare(), and yield (rows, state) pairs from fetch().
+    """
+
+    mode = "full"
+    key_column: Optional[str] = None
+    watermark_column: Optional[str] = None
+
+    def prepare(self, options: Dict[str, Any]) -> None:
+        """Resolve the sync mode; called in a worker thread before fetching"""
+        pass
+
+    def arrow_schema(self) -> Optional["pa.Schema"]:
+        """The source schema, when the source can describe it (otherwise inferred from rows)"""
+        return None
+
+    def fetch(self, state: Dict[str, Any], batch_size: int) -> Iterator[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        raise NotImplementedError
+
+    def _initial_load(self, batches: Iterator[List[Dict[str, Any]]]):
+        """
+        First load of an incremental source: every row of a full scan, with the
+        state pointing at the highest (watermark, key) seen. Rows without a
+        watermark are included but do not move it.
+        """
+        high = None
+        for rows in batches:
+            for row in rows:
+                value = row.get(self.watermark_column)
+                if value is None:
+                    continue
+                key = row.get(self.key_column) if self.mode == "upsert" else None
+                if high is None or value > high[0] or (key is not None and value == high[0] and key > high[1]):
+                    high = (value, key)
+            watermark, key = high or (None, None)
+            yield rows, {"watermark": _encode_watermark(watermark), "key": _encode_watermark(key)}
+
+    def _resolve_mode(self, options: Dict[str, Any], columns: List[str], integer_columns: List[str]) -> None:
+        self.key_column = options.get("key_column") or self.key_column
+        self.watermark_column = options.get("watermark_column")
+        if not self.watermark_column:
+            self.watermark_column = next((c for c in WATERMARK_CANDIDATES if c in columns), None)
+        if not self.watermark_column and self.key_column in integer_columns:
+            # Monotonic ids: new rows only
+            self.watermark_column = self.key_column
+
+        if options.get("mode") == "full" or not self.watermark_column:
+            self.mode = "full"
+        elif not self.key_column or self.key_column == self.watermark_column:
+            self.mode = "append"
+        else:
+            self.mode = "upsert"
+
+
+class SqlTableSource(SyncSource):
+    """Table (or query, always fully refreshed) in a SQLAlchemy-supported database"""
+
+    def __init__(self, engine, table_name: str):
+        self.engine = engine
+        self.table_name = table_name
+        self.table = None
+
+    def prepare(self, options: Dict[str, Any]) -> None:
+        if not IDENTIFIER_PATTERN.match(self.table_name):
+            self.mode = "full"
+            return
+
+        from sqlalchemy import MetaData, Table, Integer
+        schema, _, name = self.table_name.rpartition(".")
+        self.table = Table(name, MetaData(), schema=schema or None, autoload_with=self.engine)
+        primary_key = [c.name for c in self.table.primary_key.columns]
+        self.key_column = primary_key[0] if len(primary_key) == 1 else None
+        columns = [c.name for c in self.table.columns]
+        integer_columns = [c.name for c in self.table.columns if isinstance(c.type, Integer)]
+        self._resolve_mode(options, columns, integer_columns)
+
+    def arrow_schema(self) -> Optional["pa.Schema"]:
+        if self.table is None:
+            return None
+        return pa.schema([pa.field(c.name, _arrow_type(c.type)) for c in self.table.columns])
+
+    def _scan(self, batch_size: int):
+        from sqlalchemy import select, text
+
+        query = select(self.table) if self.table is not None else text(self.table_name)
+        with self.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            while True:
+                rows = result.mappings().fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+
+    def fetch(self, state: Dict[str, Any], batch_size: int):
+        from sqlalchemy import select, and_, or_
+
+        if self.mode == "full":
+            for rows in self._scan(batch_size):
+                yield rows, {}
+            return
+        if not state:
+            yield from self._initial_load(self._scan(batch_size))
+            return
+
+        watermark = self.table.c[self.watermark_column]
+        key = self.table.c[self.key_column] if self.mode == "upsert" else None
+        last_watermark = _decode_watermark(state.get("watermark"))
+        last_key = _decode_watermark(state.get("key"))
+
+        while True:
+            # Rows without a watermark value cannot be tracked incrementally
+            query = select(self.table).where(watermark.isnot(None))
+            if last_watermark is not None:
+                if key is not None and last_key is not None:
+                    # Keyset pagination on (watermark, key) so rows sharing a watermark are not skipped
+                    query = query.where(or_(watermark > last_watermark, and_(watermark == last_watermark, key > last_key)))
+                else:
+                    query = query.where(watermark > last_watermark)
+            order = [watermark, key] if key is not None else [watermark]
+            query = query.order_by(*order).limit(batch_size)
+
+            with self.engine.connect() as connection:
+                rows = [dict(row) for row in connection.execute(query).mappings()]
+            if not rows:
+                break
+            last_watermark = rows[-1][self.watermark_column]
+            last_key = rows[-1][self.key_column] if key is not None else None
+            yield rows, {"watermark": _encode_watermark(last_watermark), "key": _encode_watermark(last_key)}
+            if len(rows) < batch_size:
+                break
+
+
+class ClickHouseTableSource(SyncSource):
+    """ClickHouse table read over the HTTP interface"""
+
+    def __init__(self, session, url: str, database: str, table_name: str, auth=None, timeout: float = 30):
+        self.session = session
+        self.url = url
+        self.database = database
+        self.table_name = table_name
+        self.auth = auth
+        self.timeout = timeout
+        self.columns: List[Dict[str, str]] = []
+
+    def _query(self, sql: str) -> List[Dict[str, Any]]:
+        response = self.session.post(
+            self.url,
+            data=f"{sql} FORMAT JSONEachRow".encode(),
+            params={"database": self.database, "output_format_json_quote_64bit_integers": 0},
+            auth=self.auth,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+    @staticmethod
+    def _literal(value: Any) -> str:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return repr(value)
+        return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+    def prepare(self, options: Dict[str, Any]) -> None:
+        if not IDENTIFIER_PATTERN.match(self.table_name):
+            raise ValueError(f"Invalid ClickHouse table name: {self.table_name}")
+        self.columns = self._query(f"DESCRIBE TABLE {self.table_name}")
+        names = [c["name"] for c in self.columns]
+        integer_columns = [c["name"] for c in self.columns if re.match(r"^U?Int\d+$", c["type"])]
+        self.key_column = "id" if "id" in names else None
+        self._resolve_mode(options, names, integer_columns)
+
+    def _stream(self, sql: str, batch_size: int):
+        """Stream a full-table result line by line instead of paging with OFFSET"""
+        with self.session.post(
+            self.url,
+            data=f"{sql} FORMAT JSONEachRow".encode(),
+            params={"database": self.database, "output_format_json_quote_64bit_integers": 0},
+            auth=self.auth,
+            timeout=self.timeout,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            rows = []
+            for line in response.iter_lines():
+                if line:
+                    rows.append(json.loads(line))
+                if len(rows) >= batch_size:
+                    yield rows, {}
+                    rows = []
+            if rows:
+                yield rows, {}
+
+    def fetch(self, state: Dict[str, Any], batch_size: int):
+        if self.mode == "full":
+            yield from self._stream(f"SELECT * FROM {self.table_name}", batch_size)
+            return
+        if not state:
+            rows = (rows for rows, _ in self._stream(f"SELECT * FROM {self.table_name}", batch_size))
+            yield from self._initial_load(rows)
+            return
+
+        wm, key = self.watermark_column, self.key_column
+        last_watermark = state.get("watermark")
+        last_key = state.get("key")
+        while True:
+            sql = f"SELECT * FROM {self.table_name}"
+            if last_watermark is not None:
+                if self.mode == "upsert" and last_key is not None:
+                    sql += (f" WHERE {wm} > {self._literal(last_watermark)} OR "
+                            f"({wm} = {self._literal(last_watermark)} AND {key} > {self._literal(last_key)})")
+                else:
+                    sql += f" WHERE {wm} > {self._literal(last_watermark)}"
+            order = f"{wm}, {key}" if self.mode == "upsert" else wm
+            sql += f" ORDER BY {order} LIMIT {batch_size}"
+
+            rows = self._query(sql)
+            if not rows:
+                break
+            last_watermark = rows[-1][wm]
+            last_key = rows[-1].get(key) if self.mode == "upsert" else None
+            yield rows, {"watermark": last_watermark, "key": last_key}
+            if len(rows) < batch_size:
+                break
+
+
+class MongoCollectionSource(SyncSource):
+    """MongoDB collection; _id is the key and (by default) the watermark"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def prepare(self, options: Dict[str, Any]) -> None:
+        self.key_column = "_id"
+        self.watermark_column = options.get("watermark_column") or "_id"
+        if options.get("mode") == "full":
+            self.mode = "full"
+        else:
+            self.mode = "append" if self.watermark_column == "_id" else "upsert"
+
+    def _scan(self, batch_size: int):
+        """Every document, paged by _id"""
+        last_key = None
+        while True:
+            query = {"_id": {"$gt": last_key}} if last_key is not None else {}
+            documents = list(self.collection.find(query).sort([("_id", 1)]).limit(batch_size))
+            if not documents:
+                break
+            last_key = documents[-1]["_id"]
+            yield documents
+            if len(documents) < batch_size:
+                break
+
+    def fetch(self, state: Dict[str, Any], batch_size: int):
+        if self.mode == "full":
+            for documents in self._scan(batch_size):
+                yield documents, {}
+            return
+        if not state:
+            yield from self._initial_load(self._scan(batch_size))
+            return
+
+        wm = self.watermark_column or "_id"
+        last_watermark = _decode_watermark(state.get("watermark"))
+        last_key = _decode_watermark(state.get("key"))
+
+        while True:
+            if last_watermark is not None:
+                if self.mode == "upsert" and last_key is not None:
+                    query = {"$or": [{wm: {"$gt": last_watermark}}, {wm: last_watermark, "_id": {"$gt": last_key}}]}
+                else:
+                    query = {wm: {"$gt": last_watermark}}
+            else:
+                # Documents without the watermark field cannot be tracked incrementally
+                query = {wm: {"$ne": None}}
+            sort = [(wm, 1), ("_id", 1)] if self.mode == "upsert" else [("_id", 1)]
+            documents = list(self.collection.find(query).sort(sort).limit(batch_size))
+            if not documents:
+                break
+            last_watermark = documents[-1].get(wm)
+            last_key = documents[-1]["_id"]
+            yield documents, {"watermark": _encode_watermark(last_watermark), "key": _encode_watermark(last_key)}
+            if len(documents) < batch_size:
+                break
+
+
+class ApiSource(SyncSource):
+    """
+    Paginated JSON API
+
+    Pagination options (dataset connection_params["sync"]["pagination"]):
+        type: "cursor", "page", "offset" or "none"
+        items_path: dotted path of the item list in the response (default: whole body)
+        cursor_param / next_cursor_path: request parameter and response path of the cursor
+        page_param / offset_param / limit_param: request parameters for the other styles
+        since_param: request parameter that filters items after the watermark
+    """
+
+    def __init__(self, session, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30):
+        self.session = session
+        self.url = url
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.pagination: Dict[str, Any] = {}
+
+    def prepare(self, options: Dict[str, Any]) -> None:
+        self.pagination = {"type": "none", **(options.get("pagination") or {})}
+        self.key_column = options.get("key_column")
+        self.watermark_column = options.get("watermark_column")
+        incremental_cursor = self.pagination["type"] == "cursor" and self.key_column
+        incremental_since = self.pagination.get("since_param") and self.watermark_column
+        if options.get("mode") == "full" or not (incremental_cursor or incremental_since):
+            self.mode = "full"
+        else:
+            self.mode = "upsert" if self.key_column else "append"
+
+    @staticmethod
+    def _lookup(body: Any, path: Optional[str]) -> Any:
+        for part in (path or "").split("."):
+            if part and isinstance(body, dict):
+                body = body.get(part)
+        return body
+
+    def fetch(self, state: Dict[str, Any], batch_size: int):
+        style = self.pagination["type"]
+        limit_param = self.pagination.get("limit_param", "limit")
+        cursor = state.get("cursor") if self.mode != "full" else None
+        watermark = state.get("watermark") if self.mode != "full" else None
+        page = 1
+        offset = 0
+
+        while True:
+            params: Dict[str, Any] = {limit_param: batch_size} if style != "none" else {}
+            if style == "cursor" and cursor:
+                params[self.pagination.get("cursor_param", "cursor")] = cursor
+            elif style == "page":
+                params[self.pagination.get("page_param", "page")] = page
+            elif style == "offset":
+                params[self.pagination.get("offset_param", "offset")] = offset
+            if self.pagination.get("since_param") and watermark is not None:
+                params[self.pagination["since_param"]] = watermark
+
+            response = self.session.get(self.url, params=params, headers=self.headers, timeout=self.timeout)
+            response.raise_for_status()
+            body = response.json()
+            items = self._lookup(body, self.pagination.get("items_path"))
+            if isinstance(items, dict):
+                items = [items]
+            items = [item if isinstance(item, dict) else {"value": item} for item in (items or [])]
+            next_cursor = self._lookup(body, self.pagination.get("next_cursor_path", "next_cursor")) if style == "cursor" else None
+
+            if items and self.watermark_column:
+                seen = [item.get(self.watermark_column) for item in items if item.get(self.watermark_column) is not None]
+                if seen:
+                    watermark = max([watermark, *seen] if watermark is not None else seen)
+            new_state = {"cursor": next_cursor or cursor, "watermark": watermark}
+            if items:
+                yield items, new_state
+
+            page += 1
+            offset += len(items)
+            if style == "none" or not items:
+                break
+            if style == "cursor":
+                if not next_cursor or next_cursor == cursor:
+                    break
+                cursor = next_cursor
+            elif len(items) < batch_size:
+                break
+
+
+class ConnectorSyncEngine:
+    """Incremental snapshot sync of connector-backed datasets into local Parquet files"""
+
+    ROW_GROUP_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        columnar=None,
+        source_factory=None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.columnar = columnar or columnar_cache
+        # (connector, table_name, shared) -> SyncSource; shared holds per-run clients
+        self.source_factory = source_factory or self._default_source_factory
+        self.workers = workers or int(os.getenv("CONNECTOR_SYNC_WORKERS", "4"))
+        self.batch_size = batch_size or int(os.getenv("CONNECTOR_SYNC_BATCH_SIZE", "10000"))
+        self.timeout = timeout or float(os.getenv("CONNECTOR_SYNC_TIMEOUT", "30"))
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self.stats = {
+            "runs": 0,
+            "tables_synced": 0,
+            "tables_failed": 0,
+            "full_refreshes": 0,
+            "rows_synced": 0,
+            "bytes_written": 0,
+            "seconds_total": 0.0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return ARROW_AVAILABLE
+
+    def snapshot_key(self, dataset) -> str:
+        return f"{CONNECTOR_SNAPSHOT_PREFIX}{dataset.connector_id}/{dataset.id}"
+
+    @staticmethod
+    def table_name_for_dataset(dataset) -> Optional[str]:
+        return dataset.mindsdb_table_name or dataset.source_url
+
+    # ------------------------------------------------------------------ sources
+
+    def _default_source_factory(self, connector, table_name: str, shared: Dict[str, Any]) -> SyncSource:
+        config = dict(connector.connection_config or {})
+        config.update(connector.credentials or {})
+        connector_type = connector.connector_type
+
+        if connector_type in SQL_CONNECTORS:
+            if "sql_engine" not in shared:
+                shared["sql_engine"] = self._create_sql_engine(connector_type, config)
+            return SqlTableSource(shared["sql_engine"], table_name)
+
+        if connector_type == "clickhouse":
+            import requests
+            if "http_session" not in shared:
+                shared["http_session"] = requests.Session()
+            scheme = "https" if config.get("secure") else "http"
+            url = f"{scheme}://{config.get('host', 'localhost')}:{config.get('port', 8123)}/"
+            auth = (config.get("user", "default"), config.get("password", "")) if config.get("password") else None
+            return ClickHouseTableSource(shared["http_session"], url, config.get("database", "default"), table_name, auth, self.timeout)
+
+        if connector_type == "mongodb":
+            if "mongo_client" not in shared:
+                from pymongo import MongoClient
+                shared["mongo_client"] = MongoClient(
+                    host=config.get("host", "localhost"),
+                    port=int(config.get("port", 27017)),
+                    username=config.get("username"),
+                    password=config.get("password"),
+                    authSource=config.get("authSource", "admin")
+                )
+            return MongoCollectionSource(shared["mongo_client"][config.get("database")][table_name])
+
+        if connector_type in API_CONNECTORS:
+            import requests
+            if "http_session" not in shared:
+                shared["http_session"] = requests.Session()
+            base_url = config.get("base_url", "")
+            if base_url and not base_url.startswith(("http://", "https://")):
+                base_url = f"https://{base_url}"
+            endpoint = config.get("endpoint", "")
+            if endpoint and not endpoint.startswith("/"):
+                endpoint = f"/{endpoint}"
+            return ApiSource(shared["http_session"], base_url.rstrip("/") + endpoint, config.get("headers", {}), config.get("timeout", self.timeout))
+
+        raise ValueError(f"Sync not supported for {connector_type} connectors")
+
+    def _create_sql_engine(self, connector_type: str, config: Dict[str, Any]):
+        from sqlalchemy import create_engine
+        from sqlalchemy.engine import URL
+
+        if connector_type == "mysql":
+            url = URL.create(
+                "mysql+pymysql", username=config.get("user"), password=config.get("password"),
+                host=config.get("host"), port=config.get("port", 3306), database=config.get("database")
+            )
+            connect_args = {"connect_timeout": int(self.timeout)}
+        else:
+            url = URL.create(
+                "postgresql+psycopg2", username=config.get("user"), password=config.get("password"),
+                host=config.get("host"), port=config.get("port", 5439 if connector_type == "redshift" else 5432),
+                database=config.get("database")
+            )
+            connect_args = {"connect_timeout": int(self.timeout), "sslmode": config.get("sslmode", "prefer")}
+        # One connection per table worker
+        return create_engine(url, pool_size=self.workers, max_overflow=0, pool_pre_ping=True, connect_args=connect_args)
+
+    @staticmethod
+    def _close_shared(shared: Dict[str, Any]) -> None:
+        for resource in shared.values():
+            try:
+                if hasattr(resource, "dispose"):
+                    resource.dispose()
+                elif hasattr(resource, "close"):
+                    resource.close()
+            except Exception as e:
+                logger.warning(f"Could not close sync resource: {e}")
+
+    # ---------------------------------------------------------------- snapshots
+
+    @staticmethod
+    def read_state(snapshot_path: str) -> Dict[str, Any]:
+        """Get the sync state stored in a snapshot's metadata ({} if there is no snapshot)"""
+        if not os.path.exists(snapshot_path):
+            return {}
+        try:
+            metadata = pq.read_schema(snapshot_path).metadata or {}
+            return json.loads(metadata.get(STATE_METADATA_KEY, b"{}"))
+        except Exception as e:
+            logger.warning(f"Could not read sync state of {snapshot_path}: {e}")
+            return {}
+
+    def _merge(self, snapshot_path: str, delta_path: str, state: Dict[str, Any], replace: bool, upsert_key: Optional[str]) -> int:
+        """
+        Write snapshot + delta into a new snapshot and swap it in; returns the row count
+
+        Existing rows are streamed row group by row group; in upsert mode rows whose key
+        appears in the delta are dropped, so only the delta is held in memory.
+        """
+        delta = pq.read_table(delta_path)
+        if upsert_key:
+            # A row updated during the run can appear twice; keep its latest version
+            positions = pa.array(range(delta.num_rows), type=pa.int64())
+            latest = delta.append_column("__row", positions).group_by(upsert_key).aggregate([("__row", "max")])
+            keep = latest.column("__row_max")
+            delta = delta.take(pc.take(keep, pc.sort_indices(keep)))
+
+        schema = delta.schema.with_metadata({STATE_METADATA_KEY: json.dumps(state, default=str).encode()})
+        tmp_path = f"{snapshot_path}.{uuid.uuid4().hex}.tmp"
+        num_rows = 0
+        try:
+            with pq.ParquetWriter(tmp_path, schema) as writer:
+                if not replace and os.path.exists(snapshot_path):
+                    existing = pq.ParquetFile(snapshot_path)
+                    delta_keys = delta.column(upsert_key) if upsert_key else None
+                    for index in range(existing.num_row_groups):
+                        group = existing.read_row_group(index)
+                        if delta_keys is not None:
+                            group = group.filter(pc.invert(pc.is_in(group.column(upsert_key), value_set=delta_keys)))
+                        if group.num_rows:
+                            writer.write_table(group.cast(schema), row_group_size=self.ROW_GROUP_SIZE)
+                            num_rows += group.num_rows
+                writer.write_table(delta.cast(schema), row_group_size=self.ROW_GROUP_SIZE)
+                num_rows += delta.num_rows
+            os.replace(tmp_path, snapshot_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return num_rows
+
+    def _sync_table(self, source: SyncSource, snapshot_path: str, options: Dict[str, Any], full_refresh: bool) -> Dict[str, Any]:
+        """Pull one table into its snapshot (runs in a worker thread)"""
+        started = time.perf_counter()
+        source.prepare(options)
+        previous = {} if full_refresh else self.read_state(snapshot_path)
+        incremental = (
+            source.mode != "full"
+            and previous.get("mode") == source.mode
+            and previous.get("watermark_column") == source.watermark_column
+        )
+
+        schema = source.arrow_schema()
+        if incremental:
+            snapshot_schema = pq.read_schema(snapshot_path).remove_metadata()
+            if schema is not None and schema.names != snapshot_schema.names:
+                raise SchemaChanged("source columns changed")
+            schema = snapshot_schema
+
+        batch_size = int(options.get("batch_size") or self.batch_size)
+        position = previous.get("position", {}) if incremental else {}
+        delta_path = f"{snapshot_path}.{uuid.uuid4().hex}.delta"
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        writer = None
+        rows = 0
+        batches = 0
+        snapshot_rows = None
+        try:
+            for batch_rows, position in source.fetch(position, batch_size):
+                table = _rows_to_table(batch_rows, schema)
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(delta_path, schema)
+                writer.write_table(table, row_group_size=self.ROW_GROUP_SIZE)
+                rows += table.num_rows
+                batches += 1
+            if writer is None and not incremental and schema is not None:
+                # Empty source: the snapshot becomes an empty table
+                writer = pq.ParquetWriter(delta_path, schema)
+            if writer is not None:
+                writer.close()
+                writer = None
+
+                state = {
+                    "mode": source.mode,
+                    "watermark_column": source.watermark_column,
+                    "key_column": source.key_column,
+                    "position": position,
+                    "synced_at": datetime.utcnow().isoformat()
+                }
+                snapshot_rows = self._merge(
+                    snapshot_path, delta_path, state,
+                    replace=not incremental,
+                    upsert_key=source.key_column if incremental and source.mode == "upsert" else None
+                )
+        finally:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(delta_path):
+                os.remove(delta_path)
+
+        if snapshot_rows is None:
+            snapshot_rows = pq.ParquetFile(snapshot_path).metadata.num_rows if os.path.exists(snapshot_path) else 0
+        seconds = time.perf_counter() - started
+        return {
+            "mode": source.mode,
+            "incremental": incremental,
+            "watermark_column": source.watermark_column,
+            "key_column": source.key_column,
+            "rows_fetched": rows,
+            "batches": batches,
+            "snapshot_rows": snapshot_rows,
+            "bytes": os.path.getsize(snapshot_path) if os.path.exists(snapshot_path) else 0,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None
+        }
+
+    # --------------------------------------------------------------------- runs
+
+    async def sync_dataset(self, connector, dataset, shared: Dict[str, Any], full_refresh: bool = False) -> Dict[str, Any]:
+        """Sync one connector dataset into its snapshot"""
+        table_name = self.table_name_for_dataset(dataset)
+        result: Dict[str, Any] = {"dataset_id": dataset.id, "table": table_name}
+        try:
+            key = self.snapshot_key(dataset)
+            # Remote backends keep the canonical snapshot; fetch it so the sync can continue from it
+            await self.columnar.ensure_local_sidecar(key)
+            snapshot_path = self.columnar.local_sidecar_path(key)
+            options = dict((dataset.connection_params or {}).get("sync") or {})
+
+            source = self.source_factory(connector, table_name, shared)
+            try:
+                result.update(await asyncio.to_thread(self._sync_table, source, snapshot_path, options, full_refresh))
+            except SchemaChanged as e:
+                logger.info(f"Schema of {table_name} changed ({e}); running a full refresh")
+                self.stats["full_refreshes"] += 1
+                source = self.source_factory(connector, table_name, shared)
+                result.update(await asyncio.to_thread(self._sync_table, source, snapshot_path, options, True))
+
+            storage = self.columnar.storage
+            if result["rows_fetched"] and not isinstance(storage.backend, LocalStorageBackend):
+                await storage.store_sidecar_file(key, self.columnar.SIDECAR_KIND, snapshot_path)
+
+            result["success"] = True
+            self.stats["tables_synced"] += 1
+            self.stats["rows_synced"] += result["rows_fetched"]
+            self.stats["bytes_written"] += result["bytes"] if result["rows_fetched"] else 0
+            logger.info(
+                f"🔄 Synced {table_name} ({result['mode']}): {result['rows_fetched']} rows in "
+                f"{result['seconds']}s, snapshot has {result['snapshot_rows']} rows"
+            )
+
+        except Exception as e:
+            logger.error(f"❌ Sync of {table_name} for connector {connector.id} failed: {e}")
+            self.stats["tables_failed"] += 1
+            result.update({"success": False, "error": str(e)})
+        return result
+
+    async def sync_connector(self, connector, datasets: List[Any], full_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Sync all datasets of a connector, up to `workers` tables at a time
+
+        Returns:
+            Dict with per-table results and run totals (rows, bytes, throughput)
+        """
+        if not self.enabled:
+            return {"success": False, "error": "pyarrow not installed", "tables": []}
+        if connector.connector_type not in SYNCABLE_CONNECTORS:
+            return {"success": False, "error": f"Sync not supported for {connector.connector_type} connectors", "tables": []}
+
+        lock = self._locks.setdefault(connector.id, asyncio.Lock())
+        async with lock:
+            started = time.perf_counter()
+            semaphore = asyncio.Semaphore(self.workers)
+            shared: Dict[str, Any] = {}
+
+            async def run(dataset):
+                async with semaphore:
+                    return await self.sync_dataset(connector, dataset, shared, full_refresh)
+
+            try:
+                tables = await asyncio.gather(*(run(dataset) for dataset in datasets))
+            finally:
+                self._close_shared(shared)
+
+            seconds = time.perf_counter() - started
+            rows = sum(table.get("rows_fetched", 0) for table in tables)
+            self.stats["runs"] += 1
+            self.stats["seconds_total"] += seconds
+            return {
+                "success": all(table["success"] for table in tables),
+                "tables": tables,
+                "tables_synced": sum(1 for table in tables if table["success"]),
+                "tables_failed": sum(1 for table in tables if not table["success"]),
+                "rows_synced": rows,
+                "bytes_written": sum(table.get("bytes", 0) for table in tables if table.get("rows_fetched")),
+                "seconds": round(seconds, 3),
+                "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None
+            }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            **self.stats,
+            "seconds_total": round(self.stats["seconds_total"], 3)
+        }
+
+
+# Global instance
+connector_sync_engine = ConnectorSyncEngine()
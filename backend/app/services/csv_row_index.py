@@ -0,0 +1,164 @@
+"""
+CSV Row Index Service
+Builds a sparse byte-offset index (one entry every N rows) for CSV files and
+stores it next to the file, so any preview page can be served by seeking directly
+to the nearest indexed row instead of scanning the file from the start.
+"""
+
+import io
+import asyncio
+import json
+import os
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from datetime import datetime
+import logging
+
+import pandas as pd
+
+from app.services.storage import storage_service, SIDECAR_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+
+def _iter_rows(f, start: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (start_offset, raw_bytes) of each CSV record from a binary file,
+    treating newlines inside quoted fields as part of the record
+    """
+    f.seek(start)
+    row_start = start
+    row_lines: List[bytes] = []
+    in_quotes = False
+    for line in f:
+        row_lines.append(line)
+        if line.count(b'"') % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            row = b"".join(row_lines)
+            if row.strip():
+                yield row_start, row
+            row_start += len(row)
+            row_lines = []
+    if row_lines:
+        # Unterminated quote at EOF: emit what remains as the last record
+        yield row_start, b"".join(row_lines)
+
+
+class CSVRowIndexService:
+    """Service for building and using sparse row-offset indexes of CSV files"""
+
+    SIDECAR_KIND = "row_index"
+    DEFAULT_INTERVAL = 1000
+
+    def __init__(self, storage=None, interval: int = DEFAULT_INTERVAL):
+        self.storage = storage or storage_service
+        self.interval = interval
+
+    def index_path_for(self, source_local_path: str) -> str:
+        """Get the local path of the index stored next to a CSV file"""
+        return f"{source_local_path}{SIDECAR_SUFFIXES[self.SIDECAR_KIND]}"
+
+    def build_index(self, source_local_path: str) -> Dict[str, Any]:
+        """
+        Scan a CSV file once and record the byte offset of every Nth row
+
+        Args:
+            source_local_path: Local path of the CSV file
+
+        Returns:
+            Dict with header span, offsets and exact row count
+        """
+        offsets: List[int] = []
+        total_rows = 0
+        with open(source_local_path, "rb") as f:
+            header = next(_iter_rows(f, 0), None)
+            header_end = header[0] + len(header[1]) if header else 0
+            for row_start, _ in _iter_rows(f, header_end):
+                if total_rows % self.interval == 0:
+                    offsets.append(row_start)
+                total_rows += 1
+
+        return {
+            "version": 1,
+            "interval": self.interval,
+            "header_end": header_end,
+            "offsets": offsets,
+            "total_rows": total_rows,
+            "source_size": os.path.getsize(source_local_path),
+            "built_at": datetime.utcnow().isoformat()
+        }
+
+    async def build_and_store(self, source_local_path: str, file_path: str) -> Dict[str, Any]:
+        """Build the index for a CSV file and store it next to the dataset file"""
+        try:
+            # The scan reads the whole file; keep it off the event loop
+            index = await asyncio.to_thread(self.build_index, source_local_path)
+            await self.storage.store_sidecar(file_path, self.SIDECAR_KIND, json.dumps(index).encode("utf-8"))
+            logger.info(f"CSV row index built for {file_path}: {index['total_rows']} rows, {len(index['offsets'])} entries")
+            return {"success": True, "total_rows": index["total_rows"], "entries": len(index["offsets"])}
+        except Exception as e:
+            logger.warning(f"Could not build CSV row index for {file_path}: {e}")
+            return {"success": False, "error": str(e)}
+
+    def load_index(self, source_local_path: str) -> Optional[Dict[str, Any]]:
+        """Load the index next to a CSV file, ignoring it if the file has changed since"""
+        index_path = self.index_path_for(source_local_path)
+        try:
+            if not os.path.exists(index_path) or not os.path.exists(source_local_path):
+                return None
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("source_size") != os.path.getsize(source_local_path):
+                logger.info(f"Ignoring stale CSV row index for {source_local_path}")
+                return None
+            return index
+        except Exception as e:
+            logger.warning(f"Could not load CSV row index for {source_local_path}: {e}")
+            return None
+
+    def read_rows(
+        self,
+        source_local_path: str,
+        index: Dict[str, Any],
+        offset: int,
+        limit: int
+    ) -> pd.DataFrame:
+        """
+        Read `limit` rows starting at row `offset` by seeking to the nearest indexed row
+
+        Args:
+            source_local_path: Local path of the CSV file
+            index: Index previously returned by load_index
+            offset: Index of the first data row to return
+            limit: Number of rows to return
+
+        Returns:
+            DataFrame with the requested rows
+        """
+        with open(source_local_path, "rb") as f:
+            header = f.read(index["header_end"])
+            if offset >= index["total_rows"] or limit <= 0:
+                return pd.read_csv(io.BytesIO(header), nrows=0)
+
+            entry = offset // index["interval"]
+            skip = offset - entry * index["interval"]
+
+            chunk = io.BytesIO()
+            chunk.write(header)
+            if not header.endswith(b"\n"):
+                chunk.write(b"\n")
+            taken = 0
+            for position, (_, row) in enumerate(_iter_rows(f, index["offsets"][entry])):
+                if position < skip:
+                    continue
+                chunk.write(row)
+                taken += 1
+                if taken >= limit:
+                    break
+
+        chunk.seek(0)
+        return pd.read_csv(chunk)
+
+
+# Global instance
+csv_row_index = CSVRowIndexService()
@@ -662,19 +662,10 @@ class DataSharingService:
                 # Use storage service to check file existence properly
                 from app.services.storage import storage_service
                 
-                file_exists = False
-                for f in existing_files:
-                    if f.file_path:
-                        # Check if file exists using storage service (works for both S3 and local)
-                        try:
-                            file_path = f.relative_path or f.file_path
-                            content = await storage_service.retrieve_dataset_file(file_path)
-                            if content is not None:
-                                file_exists = True
-                                break
-                        except Exception as e:
-                            logger.debug(f"File check failed for {f.file_path}: {e}")
-                            continue
+                # Metadata-only check (works for both S3 and local, briefly cached)
+                file_exists = await storage_service.any_file_exists([
+                    f.relative_path or f.file_path for f in existing_files if f.file_path
+                ])
                 
                 if not file_exists:
                     # Disable sharing if no files exist
@@ -687,12 +678,8 @@ class DataSharingService:
             elif dataset.file_path:
                 # Single file check - use proper path resolution
                 from app.services.storage import storage_service
-                try:
-                    # Use storage service to check file existence (works for both S3 and local)
-                    content = await storage_service.retrieve_dataset_file(dataset.file_path)
-                    file_exists = content is not None
-                except Exception:
-                    file_exists = False
+                # Metadata-only check (works for both S3 and local, briefly cached)
+                file_exists = await storage_service.file_exists(dataset.file_path)
                 
                 if not file_exists:
                     # Disable sharing if file doesn't exist
@@ -786,14 +773,10 @@ class DataSharingService:
                 file_exists = False
                 actual_file_path = None
                 from app.services.storage import storage_service
-                try:
-                    content = await storage_service.retrieve_dataset_file(dataset.file_path)
-                    file_exists = content is not None
-                    # For local storage, set actual file path for CSV preview
-                    if file_exists and hasattr(storage_service.backend, 'storage_dir'):
-                        actual_file_path = os.path.join(storage_service.backend.storage_dir, dataset.file_path)
-                except Exception:
-                    file_exists = False
+                file_exists = await storage_service.file_exists(dataset.file_path)
+                # For local storage, set actual file path for CSV preview
+                if file_exists and hasattr(storage_service.backend, 'storage_dir'):
+                    actual_file_path = os.path.join(storage_service.backend.storage_dir, dataset.file_path)
 
                 if file_exists and actual_file_path:
                     if dataset.type.value.lower() == 'csv':
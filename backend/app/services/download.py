@@ -5,14 +5,14 @@ Handles secure dataset downloads with permission checks, token generation, and p
 
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from fastapi.responses import StreamingResponse, FileResponse
 
 from app.models.dataset import Dataset, DatasetDownload
 from app.models.user import User
-from app.services.storage import storage_service
+from app.services.storage import storage_service, parse_range_header
 from app.services.data_sharing import DataSharingService
 from app.services.download_validator import DownloadValidator
 from app.services.error_handler import DownloadErrorHandler
@@ -281,8 +281,20 @@ class DownloadService:
                 )
                 raise self.error_handler.create_http_exception(error)
             
-            # For now, skip file existence check - let the streaming handle it
-            # The actual file existence will be validated when we try to stream it
+            # Metadata-only existence check (os.stat / S3 HEAD, briefly cached)
+            file_info = await storage_service.stat_file(file_path)
+            if file_info is None:
+                download_record.download_status = "failed"
+                download_record.error_message = "File not found in storage"
+                self.db.commit()
+                
+                error = self.error_handler.handle_file_not_found_error(
+                    dataset=dataset,
+                    file_path=file_path,
+                    download_record=download_record
+                )
+                raise self.error_handler.create_http_exception(error)
+            
             logger.info(f"Will attempt to stream file: {file_path}")
             
             # Use the original file path for all subsequent operations
@@ -304,17 +316,20 @@ class DownloadService:
             # Start download timing
             start_time = datetime.utcnow()
             
+            # Resolve the requested byte ranges up front so an unsatisfiable range surfaces as 416
+            ranges = None
+            if range_header:
+                ranges = self._parse_range_header(range_header, file_info["size"])
+            
             try:
-                # For now, always use simple file streaming (range requests not implemented yet)
-                response = await storage_service.get_file_stream(final_file_path)
-                
-                # Add basic headers
-                if range_header:
-                    logger.info(f"Range request received but not supported yet: {range_header}")
-                    # For now, ignore range header and serve full file
-                    pass
+                # Serve only the requested byte ranges when resuming, otherwise the whole file
+                if ranges:
+                    logger.info(f"Serving byte ranges {ranges} of dataset {dataset.id}")
+                    response = await storage_service.get_file_range_stream(final_file_path, ranges)
+                else:
+                    response = await storage_service.get_file_stream(final_file_path)
                 
-                # Indicate support for resumable downloads (even though not fully implemented)
+                # Indicate support for resumable downloads
                 response.headers["Accept-Ranges"] = "bytes"
                 
                 # Set original filename with proper extension
@@ -417,20 +432,20 @@ class DownloadService:
                 detail=error_dict
             )
     
-    def _parse_range_header(self, range_header: str) -> int:
-        """Parse HTTP Range header to get start byte for resumable downloads"""
+    def _parse_range_header(self, range_header: str, file_size: int) -> Optional[List[Tuple[int, int]]]:
+        """
+        Parse HTTP Range header into inclusive byte ranges for resumable downloads
+        
+        Returns None for a missing or malformed header so the full file is served;
+        raises a 416 HTTPException when no range overlaps the file.
+        """
         try:
-            if not range_header or not range_header.startswith("bytes="):
-                return 0
-            
-            # Format: "bytes=start-end" or "bytes=start-"
-            range_value = range_header.split("=")[1]
-            start_byte = int(range_value.split("-")[0])
-            return max(0, start_byte)  # Ensure non-negative
-            
+            return parse_range_header(range_header, file_size)
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to parse range header: {e}")
-            return 0
+            return None
     
     def get_download_progress(self, download_token: str) -> Dict[str, Any]:
         """
@@ -5,9 +5,10 @@ Enhanced with permanent storage capabilities
 """
 
 import os
+import shutil
 import hashlib
 import mimetypes
-from typing import Dict, List, Optional, Any, BinaryIO
+from typing import Dict, List, Optional, Any, BinaryIO, Union
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
 import logging
@@ -46,9 +47,17 @@ class FileHandlerService:
         self.upload_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
         os.makedirs(self.upload_dir, exist_ok=True)
     
-    def calculate_file_hash(self, file_content: bytes) -> str:
-        """Calculate SHA-256 hash of file content"""
-        return hashlib.sha256(file_content).hexdigest()
+    def calculate_file_hash(self, file_content: Union[bytes, BinaryIO], chunk_size: int = 1024 * 1024) -> str:
+        """Calculate SHA-256 hash of file content (bytes, or a binary file read in chunks)"""
+        if isinstance(file_content, (bytes, bytearray, memoryview)):
+            return hashlib.sha256(file_content).hexdigest()
+        
+        hasher = hashlib.sha256()
+        position = file_content.tell()
+        while chunk := file_content.read(chunk_size):
+            hasher.update(chunk)
+        file_content.seek(position)
+        return hasher.hexdigest()
     
     def get_file_mime_type(self, filename: str) -> Optional[str]:
         """Get MIME type for file"""
@@ -126,10 +135,11 @@ class FileHandlerService:
     
     def _save_uploaded_file_local(self, file: UploadFile, user: User, dataset: Dataset, file_type: str) -> FileUpload:
         """Save uploaded file to local storage (legacy method)"""
-        # Read file content
-        file_content = file.file.read()
-        file_size = len(file_content)
-        file_hash = self.calculate_file_hash(file_content)
+        # Size and hash the upload without loading it into memory
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+        file.file.seek(0)
+        file_hash = self.calculate_file_hash(file.file)
         
         # Generate unique filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -138,7 +148,7 @@ class FileHandlerService:
         
         # Save file to disk
         with open(file_path, "wb") as f:
-            f.write(file_content)
+            shutil.copyfileobj(file.file, f, 1024 * 1024)
         
         # Create tracking record
         file_upload = FileUpload(
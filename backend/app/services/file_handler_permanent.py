@@ -10,7 +10,7 @@ import mimetypes
 import tempfile
 import json
 import requests
-from typing import Dict, List, Optional, Any, BinaryIO
+from typing import Dict, List, Optional, Any, BinaryIO, Union
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
 import logging
@@ -44,9 +44,17 @@ class PermanentFileHandlerService:
             'parquet': ['application/octet-stream']  # Parquet files often have generic MIME type
         }
     
-    def calculate_file_hash(self, file_content: bytes) -> str:
-        """Calculate SHA-256 hash of file content"""
-        return hashlib.sha256(file_content).hexdigest()
+    def calculate_file_hash(self, file_content: Union[bytes, BinaryIO], chunk_size: int = 1024 * 1024) -> str:
+        """Calculate SHA-256 hash of file content (bytes, or a binary file read in chunks)"""
+        if isinstance(file_content, (bytes, bytearray, memoryview)):
+            return hashlib.sha256(file_content).hexdigest()
+        
+        hasher = hashlib.sha256()
+        position = file_content.tell()
+        while chunk := file_content.read(chunk_size):
+            hasher.update(chunk)
+        file_content.seek(position)
+        return hasher.hexdigest()
     
     def get_file_mime_type(self, filename: str) -> Optional[str]:
         """Get MIME type for file"""
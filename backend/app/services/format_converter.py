@@ -2,16 +2,31 @@
 Handles conversion between different file formats during download operations
 """
 
+import asyncio
 import json
 import tempfile
+import textwrap
 import os
-from typing import Dict, Any, Optional, Union, List
+from typing import Dict, Any, Optional, Union, List, Iterator
 from pathlib import Path
 from datetime import datetime
 import logging
 
+from app.services import json_stream
+
 logger = logging.getLogger(__name__)
 
+# Records per batch when streaming JSON into CSV / Parquet
+JSON_CONVERT_BATCH_SIZE = int(os.getenv("JSON_CONVERT_BATCH_SIZE", "10000"))
+
+
+def _arrow_value(value: Any) -> Any:
+    """Nested JSON values are stored as JSON text in Parquet"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
 class FormatConverter:
     """Service for converting files between different formats"""
     
@@ -19,7 +34,7 @@ class FormatConverter:
         self.supported_conversions = {
             'pdf': ['txt', 'json'],
             'csv': ['json', 'excel'],
-            'json': ['csv', 'txt'],
+            'json': ['csv', 'txt', 'parquet'],
             'excel': ['csv', 'json']
         }
     
@@ -142,8 +157,12 @@ class FormatConverter:
         try:
             import pandas as pd
             
-            # Read CSV file
-            df = pd.read_csv(source_path)
+            from app.services.columnar_cache import columnar_cache
+            
+            # Read from the columnar sidecar next to the file when present
+            df = columnar_cache.read_rows(source_path)
+            if df is None:
+                df = pd.read_csv(source_path)
             temp_dir = tempfile.mkdtemp()
             
             if target_format.lower() == 'json':
@@ -177,40 +196,25 @@ class FormatConverter:
             raise
     
     async def _convert_json(self, source_path: str, target_format: str, metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Convert JSON to other formats"""
+        """Convert JSON / NDJSON to other formats, streaming records in batches"""
         try:
             import pandas as pd
             
-            # Read JSON file
-            with open(source_path, 'r', encoding='utf-8') as f:
-                json_data = json.load(f)
-            
             temp_dir = tempfile.mkdtemp()
             
             if target_format.lower() == 'csv':
                 output_path = os.path.join(temp_dir, "converted.csv")
+                await asyncio.to_thread(self._write_json_csv, source_path, output_path)
                 
-                # Handle different JSON structures
-                if isinstance(json_data, list):
-                    df = pd.DataFrame(json_data)
-                elif isinstance(json_data, dict):
-                    if 'data' in json_data and isinstance(json_data['data'], list):
-                        df = pd.DataFrame(json_data['data'])
-                    else:
-                        df = pd.DataFrame([json_data])
-                else:
-                    raise ValueError("Unsupported JSON structure for CSV conversion")
-                
-                df.to_csv(output_path, index=False)
+            elif target_format.lower() == 'parquet':
+                output_path = os.path.join(temp_dir, "converted.parquet")
+                await asyncio.to_thread(self._write_json_parquet, source_path, output_path)
                 
             elif target_format.lower() == 'txt':
                 output_path = os.path.join(temp_dir, "converted.txt")
                 
                 # Convert JSON to readable text format
-                text_content = json.dumps(json_data, indent=2, ensure_ascii=False)
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(text_content)
+                await asyncio.to_thread(self._write_json_text, source_path, output_path)
             
             return output_path
             
@@ -220,6 +224,121 @@ class FormatConverter:
             logger.error(f"Failed to convert JSON: {e}")
             raise
     
+    @staticmethod
+    def _json_columns(source_path: str) -> Optional[List[Any]]:
+        """Union of record fields in first-seen order (None for records that aren't objects)"""
+        columns: Dict[Any, None] = {}
+        for record in json_stream.JSONRecordStream(source_path, sample_size=0):
+            if isinstance(record, dict):
+                columns.update(dict.fromkeys(record))
+        return list(columns) or None
+    
+    def _write_json_csv(self, source_path: str, output_path: str) -> None:
+        """Write the records as CSV batch by batch; a first pass collects the columns"""
+        import pandas as pd
+        
+        columns = self._json_columns(source_path)
+        wrote_header = False
+        for batch in json_stream.iter_batches(source_path, JSON_CONVERT_BATCH_SIZE):
+            df = pd.DataFrame(batch)
+            if columns is not None:
+                df = df.reindex(columns=columns)
+            df.to_csv(output_path, index=False, header=not wrote_header, mode='a' if wrote_header else 'w')
+            wrote_header = True
+        if not wrote_header:
+            raise ValueError("Unsupported JSON structure for CSV conversion")
+    
+    def _write_json_parquet(self, source_path: str, output_path: str) -> None:
+        """Write the records as Parquet batch by batch; a first pass infers one schema for all batches"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        def rows(batch):
+            return [
+                {key: _arrow_value(value) for key, value in (record if isinstance(record, dict) else {"value": record}).items()}
+                for record in batch
+            ]
+        
+        fields: Dict[str, Any] = {}
+        for batch in json_stream.iter_batches(source_path, JSON_CONVERT_BATCH_SIZE):
+            batch_rows = rows(batch)
+            # from_pylist only looks at the first row's keys; build columns from all of them
+            names = dict.fromkeys(name for row in batch_rows for name in row)
+            columns = {name: [row.get(name) for row in batch_rows] for name in names}
+            for field in pa.Table.from_pydict(columns).schema:
+                current = fields.get(field.name)
+                if current is None or pa.types.is_null(current):
+                    fields[field.name] = field.type
+                elif not pa.types.is_null(field.type) and current != field.type:
+                    try:
+                        fields[field.name] = pa.unify_schemas(
+                            [pa.schema([pa.field(field.name, current)]), pa.schema([field])],
+                            promote_options="permissive"
+                        ).field(field.name).type
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):
+                        fields[field.name] = pa.string()
+        if not fields:
+            raise ValueError("Unsupported JSON structure for Parquet conversion")
+        schema = pa.schema([
+            pa.field(name, pa.string() if pa.types.is_null(type_) else type_) for name, type_ in fields.items()
+        ])
+        
+        string_fields = {field.name for field in schema if pa.types.is_string(field.type)}
+        with pq.ParquetWriter(output_path, schema) as writer:
+            for batch in json_stream.iter_batches(source_path, JSON_CONVERT_BATCH_SIZE):
+                batch_rows = rows(batch)
+                for row in batch_rows:
+                    for name in string_fields.intersection(row):
+                        if row[name] is not None and not isinstance(row[name], str):
+                            row[name] = str(row[name])
+                writer.write_table(pa.Table.from_pylist(batch_rows, schema=schema))
+    
+    @staticmethod
+    def _write_json_text(source_path: str, output_path: str) -> None:
+        """Pretty-print the document; records and object members are written one at a time"""
+        stream = json_stream.JSONRecordStream(source_path, sample_size=0)
+        records = iter(stream)
+        first = next(records, None)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            if stream.layout == "object":
+                FormatConverter._write_json_object_text(source_path, f)
+                return
+            if stream.layout == "scalar":
+                json.dump(stream.document, f, indent=2, ensure_ascii=False)
+                return
+            if first is None:
+                f.write("[]")
+                return
+            f.write("[\n")
+            f.write(textwrap.indent(json.dumps(first, indent=2, ensure_ascii=False), "  "))
+            for record in records:
+                f.write(",\n")
+                f.write(textwrap.indent(json.dumps(record, indent=2, ensure_ascii=False), "  "))
+            f.write("\n]")
+    
+    @staticmethod
+    def _write_json_object_text(source_path: str, f) -> None:
+        """Write a top-level object as json.dump(..., indent=2) would, streaming its array members"""
+        def dumps(value: Any, depth: int) -> str:
+            return json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n" + "  " * depth)
+        
+        f.write("{")
+        wrote_member = False
+        for key, value in json_stream.iter_object_members(source_path):
+            f.write(",\n  " if wrote_member else "\n  ")
+            f.write(f"{json.dumps(key, ensure_ascii=False)}: ")
+            wrote_member = True
+            if not isinstance(value, Iterator):
+                f.write(dumps(value, 1))
+                continue
+            wrote_item = False
+            for item in value:
+                f.write(",\n    " if wrote_item else "[\n    ")
+                f.write(dumps(item, 2))
+                wrote_item = True
+            f.write("\n  ]" if wrote_item else "[]")
+        f.write("\n}" if wrote_member else "}")
+    
     async def _convert_excel(self, source_path: str, target_format: str, metadata: Optional[Dict[str, Any]] = None) -> str:
         """Convert Excel to other formats"""
         try:
@@ -0,0 +1,179 @@
+"""
+HTTP Client Pool Service
+Process-wide pool of keep-alive httpx clients, one per upstream origin, shared by
+the API proxy and gateway forwarding paths so repeated requests to the same API
+reuse open TCP/TLS connections (and HTTP/2 streams) instead of handshaking every time.
+"""
+
+import os
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+import logging
+
+import httpx
+from fastapi.responses import StreamingResponse
+
+# Optional HTTP/2 support (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Connection-scoped headers that must not be relayed to the client (RFC 7230 section 6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade"
+}
+
+def _cookieless_jar() -> CookieJar:
+    """
+    Cookie jar that never stores or sends cookies. Pooled clients are shared by every
+    connector and user talking to an origin, so a Set-Cookie from one upstream response
+    must not ride along on someone else's request; cookies passed explicitly per request
+    still go out.
+    """
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+# How much of a streamed body is kept for logging
+STREAM_LOG_PREFIX_BYTES = 200
+
+
+class HTTPClientPool:
+    """Registry of long-lived httpx.AsyncClient instances keyed by upstream origin"""
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None
+    ):
+        self.max_connections = max_connections or int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = max_keepalive_connections or int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "30"))
+        self.timeout = timeout or float(os.getenv("HTTP_POOL_TIMEOUT", "30"))
+        if http2 is None:
+            http2 = os.getenv("HTTP_POOL_HTTP2", "true").lower() == "true"
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested for upstream clients but 'h2' is not installed; using HTTP/1.1")
+
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._requests: Dict[str, int] = {}
+        self._created_at: Dict[str, float] = {}
+
+    @staticmethod
+    def origin_for(url: str) -> str:
+        """Normalize a URL to its scheme://host:port origin"""
+        parts = urlsplit(url)
+        scheme = (parts.scheme or "http").lower()
+        host = (parts.hostname or "").lower()
+        port = parts.port or (443 if scheme == "https" else 80)
+        return f"{scheme}://{host}:{port}"
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """Get the shared client for the origin of a URL, creating it on first use"""
+        origin = self.origin_for(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                cookies=_cookieless_jar(),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+            )
+            self._clients[origin] = client
+            self._created_at[origin] = time.time()
+            logger.info(f"🌐 Created pooled HTTP client for {origin} (http2={self.http2})")
+        self._requests[origin] = self._requests.get(origin, 0) + 1
+        return client
+
+    async def startup(self) -> None:
+        """App startup hook"""
+        logger.info(
+            f"🌐 HTTP client pool ready: max {self.max_connections} connections, "
+            f"{self.max_keepalive_connections} keep-alive per upstream, http2={self.http2}"
+        )
+
+    async def close_all(self) -> None:
+        """App shutdown hook: close every pooled client and its connections"""
+        for origin, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client for {origin}: {e}")
+        closed = len(self._clients)
+        self._clients.clear()
+        if closed:
+            logger.info(f"🌐 Closed {closed} pooled HTTP clients")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Pool configuration and per-upstream request counts"""
+        return {
+            "config": {
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "keepalive_expiry": self.keepalive_expiry,
+                "timeout": self.timeout,
+                "http2": self.http2
+            },
+            "upstreams": {
+                origin: {
+                    "requests": self._requests.get(origin, 0),
+                    "created_at": self._created_at.get(origin),
+                    "closed": client.is_closed
+                }
+                for origin, client in self._clients.items()
+            }
+        }
+
+
+async def open_upstream_stream(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request and return as soon as the upstream headers arrive, leaving the body unread"""
+    request = client.build_request(method, url, **kwargs)
+    return await client.send(request, stream=True)
+
+
+def relay_upstream_response(
+    upstream: httpx.Response,
+    label: str,
+    log_prefix_bytes: int = STREAM_LOG_PREFIX_BYTES
+) -> StreamingResponse:
+    """
+    Relay an upstream response to the client chunk by chunk
+
+    Bytes are passed through undecoded (Content-Encoding and Content-Length are
+    kept); only a bounded prefix is retained for the access log.
+    """
+    status_code = upstream.status_code
+
+    async def relay():
+        prefix = bytearray()
+        total = 0
+        try:
+            async for chunk in upstream.aiter_raw():
+                if len(prefix) < log_prefix_bytes:
+                    prefix.extend(chunk[:log_prefix_bytes - len(prefix)])
+                total += len(chunk)
+                yield chunk
+        finally:
+            await upstream.aclose()
+            logger.info(f"📤 Streamed {total} bytes from {label} (status {status_code}), prefix: {bytes(prefix)!r}")
+
+    headers = {k: v for k, v in upstream.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+    return StreamingResponse(relay(), status_code=status_code, headers=headers)
+
+
+# Global instance
+http_client_pool = HTTPClientPool()
@@ -1,23 +1,171 @@
 """
 Image Processing Service for AI Share Platform
 Handles image processing tasks for file uploads and analysis
+
+Preview renditions (thumbnail, medium JPEG, WebP) are generated once at upload
+time and stored through StorageService under the source image's content hash,
+so previews never decode the original again.
 """
 
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
-from PIL import Image
+from typing import Optional, Dict, Any, List, Tuple
+from PIL import Image, ImageOps, features
 import io
 import base64
 
+from app.services.storage import storage_service, RENDITION_PREFIX
+
 logger = logging.getLogger(__name__)
 
+# Preview renditions: bounding box, encoder settings and file extension
+RENDITIONS = {
+    "thumbnail": {"size": (320, 320), "format": "JPEG", "quality": 75, "extension": "jpg", "content_type": "image/jpeg"},
+    "medium": {"size": (1280, 1280), "format": "JPEG", "quality": 82, "extension": "jpg", "content_type": "image/jpeg"},
+    "webp": {"size": (1280, 1280), "format": "WEBP", "quality": 80, "extension": "webp", "content_type": "image/webp"},
+}
+
 
 class ImageProcessingService:
     """Service for handling image processing tasks"""
     
-    def __init__(self):
-        self.supported_formats = ['JPEG', 'PNG', 'GIF', 'BMP', 'WEBP']
+    def __init__(self, db=None):
+        self.db = db
+        self.supported_formats = ['JPEG', 'PNG', 'GIF', 'BMP', 'WEBP', 'TIFF']
         self.max_size = (1920, 1080)  # Max dimensions
+        self.storage = storage_service
+        self.stats = {
+            "renditions_generated": 0,
+            "renditions_failed": 0,
+            "generation_seconds_total": 0.0
+        }
+    
+    def _open_for_size(self, source, size: Tuple[int, int]) -> Image.Image:
+        """
+        Open an image set up to decode no more pixels than needed for the target size
+        
+        JPEGs are decoded with DCT scaling via draft(); pyramidal or multi-page TIFFs
+        use the smallest level that still covers the target instead of the full
+        resolution page.
+        """
+        image = Image.open(source)
+        
+        if image.format == "TIFF" and getattr(image, "n_frames", 1) > 1:
+            base_width, base_height = image.size
+            best = None
+            for frame in range(image.n_frames):
+                image.seek(frame)
+                width, height = image.size
+                same_aspect = abs(width * base_height - height * base_width) <= 0.01 * base_width * base_height
+                covers = width >= min(size[0], base_width) or height >= min(size[1], base_height)
+                if same_aspect and covers and (best is None or width < best[1]):
+                    best = (frame, width)
+            image.seek(best[0] if best else 0)
+        
+        # No-op for formats without reduced-size decoding
+        image.draft("RGB", size)
+        return image
+    
+    @staticmethod
+    def _flatten_to_rgb(image: Image.Image) -> Image.Image:
+        """Composite transparent images onto white for JPEG output"""
+        if image.mode in ('RGBA', 'LA', 'P'):
+            rgb_image = Image.new('RGB', image.size, (255, 255, 255))
+            if image.mode == 'P':
+                image = image.convert('RGBA')
+            rgb_image.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+            return rgb_image
+        if image.mode != 'RGB':
+            return image.convert('RGB')
+        return image
+    
+    def _encode(self, image: Image.Image, spec: Dict[str, Any]) -> bytes:
+        output = io.BytesIO()
+        if spec["format"] == "JPEG":
+            self._flatten_to_rgb(image).save(output, format="JPEG", quality=spec["quality"], optimize=True, progressive=True)
+        else:
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if image.mode in ("LA", "P", "PA") else "RGB")
+            image.save(output, format=spec["format"], quality=spec["quality"], method=4)
+        return output.getvalue()
+    
+    def generate_renditions(self, source) -> Dict[str, Dict[str, Any]]:
+        """
+        Decode an image once (at reduced size where possible) and encode all renditions
+        
+        Args:
+            source: Path or file object of the original image
+            
+        Returns:
+            Dict of rendition name -> {"content", "width", "height", "content_type"}
+        """
+        specs = {
+            name: spec for name, spec in RENDITIONS.items()
+            if spec["format"] != "WEBP" or features.check("webp")
+        }
+        largest = max((spec["size"] for spec in specs.values()), key=lambda size: size[0] * size[1])
+        
+        with self._open_for_size(source, largest) as image:
+            image.thumbnail(largest, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            image = ImageOps.exif_transpose(image)
+            
+            renditions = {}
+            # Largest first, so smaller renditions are resized from an already reduced image
+            for name, spec in sorted(specs.items(), key=lambda item: -item[1]["size"][0] * item[1]["size"][1]):
+                rendition = image.copy()
+                rendition.thumbnail(spec["size"], Image.Resampling.LANCZOS)
+                renditions[name] = {
+                    "content": self._encode(rendition, spec),
+                    "width": rendition.width,
+                    "height": rendition.height,
+                    "content_type": spec["content_type"]
+                }
+            return renditions
+    
+    def rendition_key(self, content_hash: str, name: str) -> str:
+        """Storage path of a rendition, keyed by the source image's content hash"""
+        return f"{RENDITION_PREFIX}{content_hash}/{name}.{RENDITIONS[name]['extension']}"
+    
+    async def create_renditions(self, source_path: str, content_hash: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate and store the preview renditions of an image
+        
+        Returns:
+            Manifest of rendition name -> {"path", "width", "height", "content_type", "size"},
+            suitable for storing in the file's metadata
+        """
+        import time
+        started = time.perf_counter()
+        try:
+            renditions = await asyncio.to_thread(self.generate_renditions, source_path)
+            manifest = {}
+            for name, rendition in renditions.items():
+                key = self.rendition_key(content_hash, name)
+                await self.storage.backend.store_file(
+                    rendition["content"], key, {"content_type": rendition["content_type"], "rendition": name}
+                )
+                self.storage.stat_cache.invalidate(key)
+                manifest[name] = {
+                    "path": key,
+                    "width": rendition["width"],
+                    "height": rendition["height"],
+                    "content_type": rendition["content_type"],
+                    "size": len(rendition["content"])
+                }
+            self.stats["renditions_generated"] += len(manifest)
+            return manifest
+        except Exception as e:
+            self.stats["renditions_failed"] += 1
+            logger.warning(f"Could not generate renditions for {source_path}: {e}")
+            return {}
+        finally:
+            self.stats["generation_seconds_total"] += time.perf_counter() - started
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "generation_seconds_total": round(self.stats["generation_seconds_total"], 3)
+        }
     
     def process_image(self, image_data: bytes, filename: str) -> Dict[str, Any]:
         """
@@ -44,9 +192,10 @@ class ImageProcessingService:
                 'height': image.height
             }
             
-            # Resize if too large
+            # Resize if too large (JPEGs decode directly at a reduced scale)
             if image.width > self.max_size[0] or image.height > self.max_size[1]:
-                image.thumbnail(self.max_size, Image.Resampling.LANCZOS)
+                image.draft("RGB", self.max_size)
+                image.thumbnail(self.max_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
                 info['resized'] = True
                 info['new_size'] = image.size
             
@@ -77,6 +226,8 @@ class ImageProcessingService:
         """
         Generate a base64 preview of an image
         
+        Prefer the stored renditions (served as binary) where the image has them.
+        
         Args:
             image_data: Raw image bytes
             max_size: Maximum dimensions for preview
@@ -85,18 +236,13 @@ class ImageProcessingService:
             Base64 encoded preview image
         """
         try:
-            image = Image.open(io.BytesIO(image_data))
+            image = self._open_for_size(io.BytesIO(image_data), max_size)
             
             # Create thumbnail
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            image.thumbnail(max_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
             
             # Convert to RGB if necessary
-            if image.mode in ('RGBA', 'LA', 'P'):
-                rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                rgb_image.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = rgb_image
+            image = self._flatten_to_rgb(image)
             
             # Save to base64
             output = io.BytesIO()
@@ -114,11 +260,17 @@ class ImageProcessingService:
         try:
             # Try to determine format from filename
             ext = filename.lower().split('.')[-1] if '.' in filename else ''
-            supported_extensions = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp']
+            supported_extensions = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 'tif', 'tiff']
             return ext in supported_extensions
         except:
             return False
     
+    def is_supported_image(self, filename: str, mime_type: Optional[str] = None) -> bool:
+        """Check if a file is a supported image by MIME type or extension"""
+        if mime_type and mime_type.startswith('image/') and mime_type != 'image/svg+xml':
+            return True
+        return self.is_supported_format(filename)
+    
     def get_image_metadata(self, image_data: bytes) -> Dict[str, Any]:
         """Extract metadata from image"""
         try:
@@ -141,4 +293,8 @@ class ImageProcessingService:
             
         except Exception as e:
             logger.error(f"Failed to extract image metadata: {e}")
-            return {}
\ No newline at end of file
+            return {}
+
+
+# Global instance
+image_processing_service = ImageProcessingService()
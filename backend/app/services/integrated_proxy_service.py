@@ -7,21 +7,22 @@ import asyncio
 import logging
 import json
 import urllib.parse
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 from fastapi import HTTPException, Request, Response, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import httpx
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-import mysql.connector
-import psycopg2
 import pymongo
 from clickhouse_driver import Client as ClickHouseClient
 
 from app.core.database import get_db
 from app.models.proxy_connector import ProxyConnector, SharedProxyLink
 from app.services.proxy_service import ProxyService
+from app.services.proxy_connection_pool import proxy_connection_pools
+from app.services.http_client_pool import http_client_pool, open_upstream_stream, relay_upstream_response
+from app.services.api_response_cache import api_response_cache
 from app.core.app_config import get_app_config
 
 logger = logging.getLogger(__name__)
@@ -80,6 +81,7 @@ class IntegratedProxyService:
                 task.cancel()
                 
         self.proxy_tasks.clear()
+        await proxy_connection_pools.close_all()
         logger.info("✅ Integrated Proxy Service stopped")
         
     async def handle_proxy_request(
@@ -241,6 +243,8 @@ class IntegratedProxyService:
             # Execute based on connector type
             if proxy_connector.connector_type == "api":
                 result = await self._handle_api_proxy(proxy_connector, request, operation_data, db)
+                if isinstance(result, StreamingResponse):
+                    return result
             else:
                 # Default to database query
                 result = await self._handle_mysql_proxy(proxy_connector, operation_data, db)
@@ -255,8 +259,8 @@ class IntegratedProxyService:
             logger.error(f"Shared link access failed: {e}")
             raise HTTPException(status_code=500, detail=str(e))
     
-    async def _handle_api_proxy(self, proxy_connector: ProxyConnector, request: Request, operation_data: Dict, db: Session) -> Dict:
-        """Handle API proxy operations"""
+    async def _handle_api_proxy(self, proxy_connector: ProxyConnector, request: Request, operation_data: Dict, db: Session) -> Union[Dict, StreamingResponse]:
+        """Handle API proxy operations (GET with stream=true relays the upstream body as-is)"""
         
         try:
             # Get connection configuration
@@ -325,24 +329,41 @@ class IntegratedProxyService:
             logger.info(f"API Proxy: external_url={external_url}, default_endpoint={default_endpoint}, final_endpoint={endpoint}, full_url={full_url}")
             
             # Make HTTP request to external API
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                method = operation_data.get('method', request.method)
+            client = http_client_pool.get_client(full_url)
+            method = operation_data.get('method', request.method)
+            
+            if method.upper() == "GET":
+                # Forward query parameters
+                params = operation_data.get('params', {})
+                # Remove internal parameters
+                params.pop('token', None)
+                params.pop('endpoint', None)
+                stream_requested = str(params.pop('stream', '')).lower() in ("1", "true", "yes")
                 
-                if method.upper() == "GET":
-                    # Forward query parameters
-                    params = operation_data.get('params', {})
-                    # Remove internal parameters
-                    params.pop('token', None)
-                    params.pop('endpoint', None)
-                    
-                    response = await client.get(full_url, headers=headers, params=params)
+                if stream_requested:
+                    # Relay large payloads as-is instead of buffering them into the envelope
+                    upstream = await open_upstream_stream(client, "GET", full_url, headers=headers, params=params)
+                    return relay_upstream_response(upstream, f"{proxy_connector.name} {full_url}")
+                
+                async def fetch_upstream(conditional_headers: Dict[str, str]):
+                    return await client.get(full_url, headers={**headers, **conditional_headers}, params=params)
+                
+                # Shared connectors serve many identical GETs; answer them from the cache
+                response = await api_response_cache.fetch(
+                    api_response_cache.build_key(
+                        proxy_connector.id, connection_config, full_url, params,
+                        credentials=proxy_connector.real_credentials
+                    ),
+                    api_response_cache.ttl_for(connection_config),
+                    fetch_upstream
+                )
+            else:
+                # Forward POST body
+                data = operation_data.get('data')
+                if data:
+                    response = await client.post(full_url, headers=headers, json=data)
                 else:
-                    # Forward POST body
-                    data = operation_data.get('data')
-                    if data:
-                        response = await client.post(full_url, headers=headers, json=data)
-                    else:
-                        response = await client.post(full_url, headers=headers)
+                    response = await client.post(full_url, headers=headers)
             
             # Return response data
             try:
@@ -374,59 +395,11 @@ class IntegratedProxyService:
             }
 
     async def _handle_mysql_proxy(self, proxy_connector: ProxyConnector, operation_data: Dict, db: Session) -> Dict:
-        """Handle MySQL proxy operations"""
+        """Handle MySQL proxy operations on a pooled connection"""
         
         try:
-            # Decrypt connection details
-            real_config = json.loads(proxy_connector.real_connection_config)
-            real_credentials = json.loads(proxy_connector.real_credentials)
-            
-            # Apply SSL configuration for development
-            from app.core.config import settings
-            
-            host = real_config.get('host', 'localhost')
-            port = real_config.get('port', 3306)
-            
-            # Get SSL-aware configuration
-            ssl_config = settings.get_ssl_config_for_connector(
-                'mysql', host, port, real_config
-            )
-            
-            # Create MySQL connection
-            config = {
-                'host': host,
-                'port': port,
-                'user': real_credentials.get('username'),
-                'password': real_credentials.get('password'),
-                'database': real_config.get('database'),
-                'connect_timeout': self.app_config.integrations.CONNECTOR_CONNECTION_TIMEOUT,
-                'ssl_disabled': ssl_config.get('ssl_disabled', False)
-            }
-            
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor(dictionary=True)
-            
-            # Execute query
             query = operation_data.get('query', 'SELECT 1')
-            cursor.execute(query)
-            
-            if query.strip().upper().startswith('SELECT'):
-                results = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-            else:
-                results = []
-                columns = []
-                connection.commit()
-            
-            cursor.close()
-            connection.close()
-            
-            return {
-                "status": "success",
-                "data": results,
-                "columns": columns,
-                "row_count": len(results)
-            }
+            return await proxy_connection_pools.execute_query(proxy_connector, 'mysql', query)
             
         except Exception as e:
             logger.error(f"MySQL proxy operation failed: {e}")
@@ -436,57 +409,11 @@ class IntegratedProxyService:
             }
     
     async def _handle_postgresql_proxy(self, proxy_connector: ProxyConnector, operation_data: Dict, db: Session) -> Dict:
-        """Handle PostgreSQL proxy operations"""
+        """Handle PostgreSQL proxy operations on a pooled connection"""
         
         try:
-            # Decrypt connection details
-            real_config = json.loads(proxy_connector.real_connection_config)
-            real_credentials = json.loads(proxy_connector.real_credentials)
-            
-            # Apply SSL configuration for development
-            from app.core.config import settings
-            
-            host = real_config.get('host', 'localhost')
-            port = real_config.get('port', 5432)
-            
-            # Get SSL-aware configuration
-            ssl_config = settings.get_ssl_config_for_connector(
-                'postgresql', host, port, real_config
-            )
-            
-            # Create PostgreSQL connection
-            connection = psycopg2.connect(
-                host=host,
-                port=port,
-                user=real_credentials.get('username'),
-                password=real_credentials.get('password'),
-                database=real_config.get('database'),
-                sslmode=ssl_config.get('sslmode', 'prefer')
-            )
-            
-            cursor = connection.cursor()
-            
-            # Execute query
             query = operation_data.get('query', 'SELECT 1')
-            cursor.execute(query)
-            
-            if query.strip().upper().startswith('SELECT'):
-                results = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-            else:
-                results = []
-                columns = []
-                connection.commit()
-            
-            cursor.close()
-            connection.close()
-            
-            return {
-                "status": "success",
-                "data": results,
-                "columns": columns,
-                "row_count": len(results)
-            }
+            return await proxy_connection_pools.execute_query(proxy_connector, 'postgresql', query)
             
         except Exception as e:
             logger.error(f"PostgreSQL proxy operation failed: {e}")
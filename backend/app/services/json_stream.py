@@ -0,0 +1,405 @@
+"""
+Streaming JSON Reader
+Reads JSON and NDJSON files incrementally so large datasets can be sampled,
+counted, described and converted without loading the whole document.
+
+Supported layouts:
+- array: a top-level array, streamed item by item
+- ndjson: one JSON value per line (or any sequence of concatenated values)
+- object: a top-level object; small ones are decoded whole, large ones are
+  walked key by key with array values streamed. Items of a "data" array are
+  the records, as in the documents FormatConverter writes.
+- scalar: a single top-level string / number / literal
+
+Values are decoded with the standard library decoder from a sliding text
+buffer, so memory is bounded by the chunk size plus the largest single record.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+# Name of the array holding the records of an object-layout document
+RECORDS_KEY = "data"
+
+DEFAULT_CHUNK_SIZE = int(os.getenv("JSON_STREAM_CHUNK_KB", "1024")) * 1024
+# Top-level objects up to this size are decoded whole; larger ones are streamed
+MAX_OBJECT_SIZE = int(os.getenv("JSON_STREAM_MAX_OBJECT_MB", "16")) * 1024 * 1024
+DEFAULT_SAMPLE_SIZE = int(os.getenv("JSON_SCHEMA_SAMPLE_SIZE", "1000"))
+
+
+class _ValueTooLarge(Exception):
+    """A value did not fit in the size bound given to _JSONCursor.value"""
+
+
+class _JSONCursor:
+    """Position in a text stream with a sliding buffer of unconsumed input"""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos >= self.chunk_size:
+            # Drop consumed input so the buffer stays about one chunk plus the current value
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input), without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def value(self, max_chars: Optional[int] = None) -> Any:
+        """Decode the next complete value"""
+        if not self.peek():
+            raise self.error("Expecting value")
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+                # A number ending the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof or self.buffer[self.pos] in '{["':
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if max_chars is not None and len(self.buffer) - self.pos > max_chars:
+                raise _ValueTooLarge()
+            # Grow reads geometrically so a huge value is re-scanned only a few times
+            self._fill(read_size)
+            read_size *= 2
+
+    def array_items(self) -> Iterator[Any]:
+        """Decode the items of the array starting at the cursor one at a time"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                self.pos -= 1
+                raise self.error("Expecting ',' delimiter")
+
+    def object_keys(self) -> Iterator[str]:
+        """
+        Walk the object starting at the cursor, yielding each key with the cursor on
+        its value; the caller must consume the value before asking for the next key
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self.error("Expecting property name enclosed in double quotes")
+            key = self.value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                self.pos -= 1
+                raise self.error("Expecting ',' delimiter")
+
+
+def count_elements(obj: Any) -> int:
+    """Number of containers entries and leaves in a JSON value (as counted by schema analysis)"""
+    if isinstance(obj, dict):
+        return sum(count_elements(v) for v in obj.values()) + len(obj)
+    if isinstance(obj, list):
+        return sum(count_elements(item) for item in obj) + len(obj)
+    return 1
+
+
+class JSONRecordStream:
+    """
+    Iterate the records of a JSON / NDJSON file with bounded memory
+
+    After (or during) iteration, layout, document, top_level_keys, array_lengths
+    and element_count describe what was read. For object layouts, document holds
+    the top-level object with streamed arrays cut to their first sample_size items.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        count_elements: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_object_size: int = MAX_OBJECT_SIZE
+    ):
+        self.path = path
+        self.sample_size = sample_size
+        self.count_elements = count_elements
+        self.chunk_size = chunk_size
+        self.max_object_size = max_object_size
+
+        self.layout: Optional[str] = None
+        self.document: Any = None
+        self.top_level_keys: List[str] = []
+        self.records_key: Optional[str] = None
+        self.array_lengths: Dict[str, int] = {}
+        self.element_count = 0
+
+    def _count(self, value: Any) -> None:
+        if self.count_elements:
+            self.element_count += count_elements(value)
+
+    def __iter__(self) -> Iterator[Any]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            cursor = _JSONCursor(f, self.chunk_size)
+            first = cursor.peek()
+
+            if first == "[":
+                self.layout = "array"
+                count = 0
+                for item in cursor.array_items():
+                    count += 1
+                    self._count(item)
+                    yield item
+                self.element_count += count if self.count_elements else 0
+                if cursor.peek():
+                    raise cursor.error("Extra data")
+                return
+
+            try:
+                value = cursor.value(self.max_object_size if first == "{" else None)
+            except _ValueTooLarge:
+                f.seek(0)
+                yield from self._stream_object(_JSONCursor(f, self.chunk_size))
+                return
+
+            if cursor.peek():
+                self.layout = "ndjson"
+                count = 1
+                self._count(value)
+                yield value
+                while cursor.peek():
+                    value = cursor.value()
+                    count += 1
+                    self._count(value)
+                    yield value
+                self.element_count += count if self.count_elements else 0
+                return
+
+            self.document = value
+            self._count(value)
+            if isinstance(value, dict):
+                self.layout = "object"
+                self.top_level_keys = list(value.keys())
+                if isinstance(value.get(RECORDS_KEY), list):
+                    self.records_key = RECORDS_KEY
+                    yield from value[RECORDS_KEY]
+                else:
+                    yield value
+            else:
+                self.layout = "scalar"
+                yield value
+
+    def _stream_object(self, cursor: _JSONCursor) -> Iterator[Any]:
+        """Walk a large top-level object, streaming its array values"""
+        self.layout = "object"
+        self.document = {}
+        for key in cursor.object_keys():
+            self.top_level_keys.append(key)
+            if cursor.peek() != "[":
+                value = cursor.value()
+                self.document[key] = value
+                self._count(value)
+                continue
+
+            is_records = key == RECORDS_KEY
+            if is_records:
+                self.records_key = key
+            sample = self.document[key] = []
+            count = 0
+            for item in cursor.array_items():
+                count += 1
+                self._count(item)
+                if count <= self.sample_size:
+                    sample.append(item)
+                if is_records:
+                    yield item
+            self.array_lengths[key] = count
+            self.element_count += count if self.count_elements else 0
+        self.element_count += len(self.top_level_keys) if self.count_elements else 0
+        if cursor.peek():
+            raise cursor.error("Extra data")
+        if self.records_key is None:
+            yield self.document
+
+
+def iter_object_members(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Walk a top-level object key by key, yielding (key, value) pairs
+
+    Array values are yielded as iterators over their items, valid until the next
+    pair is requested; other values are decoded whole.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        cursor = _JSONCursor(f, chunk_size)
+        for key in cursor.object_keys():
+            if cursor.peek() != "[":
+                yield key, cursor.value()
+                continue
+            items = cursor.array_items()
+            yield key, items
+            for _ in items:  # Skip whatever the caller left unread
+                pass
+        if cursor.peek():
+            raise cursor.error("Extra data")
+
+
+def describe_structure(obj: Any, depth: int = 0, max_depth: int = 5) -> Dict[str, Any]:
+    """Recursively describe the shape of a JSON value"""
+    if depth > max_depth:
+        return {"type": "truncated", "reason": "max_depth_reached"}
+    if isinstance(obj, dict):
+        return {
+            "type": "object",
+            "properties": {key: describe_structure(value, depth + 1, max_depth) for key, value in obj.items()}
+        }
+    if isinstance(obj, list):
+        if obj:
+            return {"type": "array", "length": len(obj), "item_type": describe_structure(obj[0], depth + 1, max_depth)}
+        return {"type": "array", "length": 0, "item_type": None}
+    return {"type": type(obj).__name__, "value": str(obj)[:100]}
+
+
+def infer_field_types(records: List[Any]) -> Dict[str, List[str]]:
+    """Python type names seen per field across a sample of object records, fields in first-seen order"""
+    field_types: Dict[str, List[str]] = {}
+    for record in records:
+        if isinstance(record, dict):
+            for key, value in record.items():
+                types = field_types.setdefault(key, [])
+                type_name = type(value).__name__
+                if type_name not in types:
+                    types.append(type_name)
+    return field_types
+
+
+def read_head(path: str, chars: int = 500) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read(chars)
+
+
+def scan(
+    path: str,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    count_all_elements: bool = False,
+    **stream_options
+) -> Dict[str, Any]:
+    """
+    Describe a JSON / NDJSON file in one streaming pass
+
+    Returns:
+        layout, structure_type (as json.load would give), items_count (records, or
+        None for a plain object / scalar), the first sample_size records, top-level
+        keys, the document (object layouts), a structure description, per-field
+        types from the sample and, if requested, the total element count
+    """
+    stream = JSONRecordStream(path, sample_size=sample_size, count_elements=count_all_elements, **stream_options)
+    sample = []
+    count = 0
+    for record in stream:
+        count += 1
+        if count <= sample_size:
+            sample.append(record)
+
+    has_records = stream.layout in ("array", "ndjson") or stream.records_key is not None
+    if stream.layout in ("array", "ndjson"):
+        structure = {
+            "type": "array",
+            "length": count,
+            "item_type": describe_structure(sample[0], 1) if sample else None
+        }
+    else:
+        structure = describe_structure(stream.document)
+        for key, length in stream.array_lengths.items():
+            structure["properties"][key]["length"] = length
+
+    return {
+        "layout": stream.layout,
+        "structure_type": "list" if stream.layout in ("array", "ndjson") else type(stream.document).__name__,
+        "items_count": count if has_records else None,
+        "sample": sample,
+        "top_level_keys": stream.top_level_keys,
+        "records_key": stream.records_key,
+        "document": stream.document,
+        "structure": structure,
+        "field_types": infer_field_types(sample),
+        "element_count": stream.element_count if count_all_elements else None
+    }
+
+
+def read_page(path: str, start: int, count: int, **stream_options) -> Dict[str, Any]:
+    """
+    Records [start, start + count) and the total record count, in one streaming pass
+
+    For object layouts, document holds the object with large arrays cut to count items.
+    """
+    stream = JSONRecordStream(path, sample_size=count, **stream_options)
+    items = []
+    total = 0
+    for record in stream:
+        if start <= total < start + count:
+            items.append(record)
+        total += 1
+    return {
+        "layout": stream.layout,
+        "structure_type": "list" if stream.layout in ("array", "ndjson") else type(stream.document).__name__,
+        "items": items,
+        "total": total,
+        "document": stream.document
+    }
+
+
+def iter_batches(path: str, batch_size: int = 10000, **stream_options) -> Iterator[List[Any]]:
+    """Records of a JSON / NDJSON file in lists of up to batch_size"""
+    batch = []
+    for record in JSONRecordStream(path, sample_size=0, **stream_options):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -3,8 +3,8 @@ Metadata Service for Enhanced Dataset Management
 Handles dataset schema analysis, data quality metrics, and statistical analysis
 """
 
+import asyncio
 import pandas as pd
-import json
 import numpy as np
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Union
@@ -13,6 +13,8 @@ import logging
 from sqlalchemy.orm import Session
 
 from app.models.dataset import Dataset
+from app.services.columnar_cache import columnar_cache
+from app.services import json_stream
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +60,11 @@ class MetadataService:
                 return self._get_basic_schema_info(dataset)
             
             file_path = Path(dataset.file_path)
+            
+            # Tabular datasets can be analyzed from the columnar sidecar alone
+            if dataset.type.value.lower() == 'csv' and await self._has_columnar_sidecar(dataset):
+                return await self._analyze_csv_schema(file_path, dataset)
+            
             if not file_path.exists():
                 logger.warning(f"File not found: {dataset.file_path}")
                 return self._get_basic_schema_info(dataset)
@@ -81,8 +88,7 @@ class MetadataService:
     async def _analyze_csv_schema(self, file_path: Path, dataset: Dataset) -> Dict[str, Any]:
         """Analyze CSV file schema and structure"""
         try:
-            # Read CSV with pandas
-            df = pd.read_csv(file_path, nrows=1000)  # Sample first 1000 rows for analysis
+            df = self._read_tabular_sample(file_path, dataset, nrows=1000)  # Sample first 1000 rows for analysis
             
             schema_info = {
                 "file_type": "csv",
@@ -141,54 +147,29 @@ class MetadataService:
             return convert_numpy_types(self._get_basic_schema_info(dataset))
     
     async def _analyze_json_schema(self, file_path: Path, dataset: Dataset) -> Dict[str, Any]:
-        """Analyze JSON file schema and structure"""
+        """Analyze JSON / NDJSON file schema and structure in one streaming pass"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            def analyze_json_structure(obj, depth=0, max_depth=5):
-                """Recursively analyze JSON structure"""
-                if depth > max_depth:
-                    return {"type": "truncated", "reason": "max_depth_reached"}
-                
-                if isinstance(obj, dict):
-                    structure = {"type": "object", "properties": {}}
-                    for key, value in obj.items():
-                        structure["properties"][key] = analyze_json_structure(value, depth + 1, max_depth)
-                    return structure
-                elif isinstance(obj, list):
-                    if obj:
-                        return {
-                            "type": "array",
-                            "length": len(obj),
-                            "item_type": analyze_json_structure(obj[0], depth + 1, max_depth)
-                        }
-                    return {"type": "array", "length": 0, "item_type": None}
-                else:
-                    return {"type": type(obj).__name__, "value": str(obj)[:100]}
-            
-            structure = analyze_json_structure(data)
+            info = await asyncio.to_thread(json_stream.scan, str(file_path), count_all_elements=True)
+            head = await asyncio.to_thread(json_stream.read_head, str(file_path), 501)
             
             schema_info = {
                 "file_type": "json",
-                "structure": structure,
-                "top_level_type": type(data).__name__,
+                "layout": info["layout"],
+                "structure": info["structure"],
+                "top_level_type": info["structure_type"],
                 "encoding": "utf-8",
                 "total_size_bytes": file_path.stat().st_size,
-                "sample_data": str(data)[:500] + "..." if len(str(data)) > 500 else str(data),
+                "sample_data": head[:500] + "..." if len(head) > 500 else head,
                 "analysis_timestamp": datetime.utcnow().isoformat()
             }
             
-            # Count elements
-            def count_elements(obj):
-                if isinstance(obj, dict):
-                    return sum(count_elements(v) for v in obj.values()) + len(obj)
-                elif isinstance(obj, list):
-                    return sum(count_elements(item) for item in obj) + len(obj)
-                else:
-                    return 1
+            # Record schema is inferred from a bounded sample
+            if info["items_count"] is not None:
+                schema_info["items_count"] = info["items_count"]
+                schema_info["field_types"] = info["field_types"]
+                schema_info["schema_sample_size"] = len(info["sample"])
             
-            schema_info["element_count"] = count_elements(data)
+            schema_info["element_count"] = info["element_count"]
             
             return convert_numpy_types(schema_info)
             
@@ -243,30 +224,27 @@ class MetadataService:
             
             # Try to extract basic PDF info
             try:
-                import fitz  # PyMuPDF
-                doc = fitz.open(file_path)
+                from app.services.pdf_processing import pdf_processing_service
+                
+                # Served from the cached per-page text index (built on first use)
+                info = await pdf_processing_service.ensure_text_index(str(file_path))
                 
                 schema_info.update({
-                    "page_count": len(doc),
-                    "has_text": False,
-                    "has_images": False,
-                    "metadata": doc.metadata
+                    "page_count": info["page_count"],
+                    "has_text": info["pages_with_text"] > 0,
+                    "has_images": info["total_images"] > 0,
+                    "metadata": info["pdf_metadata"],
+                    "word_count": info["total_words"],
+                    "char_count": info["total_chars"]
                 })
                 
-                # Check first few pages for content
-                text_content = ""
-                for page_num in range(min(3, len(doc))):
-                    page = doc.load_page(page_num)
-                    text = page.get_text()
-                    if text.strip():
-                        schema_info["has_text"] = True
-                        text_content += text[:200]  # Sample text
+                # Sample text from the first few pages
+                first_pages = await asyncio.to_thread(pdf_processing_service.read_pages, str(file_path), 0, 3, 200)
+                text_content = "".join(page["text"] for page in first_pages if page["text"].strip())
                 
                 if text_content:
                     schema_info["sample_text"] = text_content
                 
-                doc.close()
-                
             except ImportError:
                 logger.warning("PyMuPDF not available for PDF analysis")
                 schema_info["note"] = "Limited PDF analysis - PyMuPDF not available"
@@ -277,6 +255,19 @@ class MetadataService:
             logger.error(f"❌ PDF schema analysis failed: {e}")
             return convert_numpy_types(self._get_basic_schema_info(dataset))
     
+    async def _has_columnar_sidecar(self, dataset: Dataset) -> bool:
+        """Check whether a columnar sidecar can serve this dataset's tabular reads"""
+        return await columnar_cache.ensure_local_sidecar(columnar_cache.storage_key_for_dataset(dataset))
+    
+    def _read_tabular_sample(self, file_path: Path, dataset: Dataset, nrows: int) -> pd.DataFrame:
+        """Read the first rows of a tabular dataset, preferring the columnar sidecar"""
+        df = columnar_cache.read_rows(columnar_cache.storage_key_for_dataset(dataset), limit=nrows)
+        if df is not None:
+            return df
+        if dataset.type.value.lower() == 'csv':
+            return pd.read_csv(file_path, nrows=nrows)
+        return pd.read_excel(file_path, nrows=nrows)
+    
     def _get_basic_schema_info(self, dataset: Dataset) -> Dict[str, Any]:
         """Get basic schema info from dataset metadata"""
         return {
@@ -304,14 +295,11 @@ class MetadataService:
                 return self._get_basic_quality_metrics(dataset)
             
             file_path = Path(dataset.file_path)
-            if not file_path.exists():
+            if not file_path.exists() and not await self._has_columnar_sidecar(dataset):
                 return self._get_basic_quality_metrics(dataset)
             
             # Read data for quality analysis
-            if dataset.type.value.lower() == 'csv':
-                df = pd.read_csv(file_path, nrows=5000)  # Sample for quality analysis
-            else:
-                df = pd.read_excel(file_path, nrows=5000)
+            df = self._read_tabular_sample(file_path, dataset, nrows=5000)  # Sample for quality analysis
             
             total_cells = df.size
             total_rows = len(df)
@@ -406,14 +394,11 @@ class MetadataService:
                 return self._get_basic_column_stats(dataset)
             
             file_path = Path(dataset.file_path)
-            if not file_path.exists():
+            if not file_path.exists() and not await self._has_columnar_sidecar(dataset):
                 return self._get_basic_column_stats(dataset)
             
             # Read data for statistical analysis
-            if dataset.type.value.lower() == 'csv':
-                df = pd.read_csv(file_path, nrows=10000)  # Sample for stats
-            else:
-                df = pd.read_excel(file_path, nrows=10000)
+            df = self._read_tabular_sample(file_path, dataset, nrows=10000)  # Sample for stats
             
             column_stats = {}
             
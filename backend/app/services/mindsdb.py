@@ -1,4 +1,3 @@
-import mindsdb_sdk
 import google.generativeai as genai
 from typing import Dict, List, Optional, Any
 from app.core.config import settings
@@ -12,6 +11,11 @@ import requests
 import pandas as pd
 import io
 
+from app.services.columnar_cache import columnar_cache
+from app.services.mindsdb_pool import MindsDBConnectionPool
+from app.services.mindsdb_registry import mindsdb_registry
+from app.services.query_result_cache import UNSCOPED, is_cacheable, query_result_cache
+
 # Import for type hints
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -54,7 +58,9 @@ class MindsDBService:
         # Configure Gemini directly as backup
         genai.configure(api_key=self.api_key)
         
-        # Connection state
+        # Connection state: queries borrow SDK connections from a bounded pool,
+        # which replaces connections that fail instead of keeping one broken session
+        self.pool = MindsDBConnectionPool(self.base_url)
         self.connection = None
         self._connected = False
 
@@ -65,14 +71,10 @@ class MindsDBService:
             
         try:
             logger.info(f"🔗 Connecting to MindsDB SDK at {self.base_url}")
-            self.connection = mindsdb_sdk.connect(self.base_url)
-            
-            # Ensure we're using the mindsdb project
-            try:
-                self.connection.query("USE mindsdb")
-                logger.info(f"✅ Using mindsdb project")
-            except Exception as e:
-                logger.warning(f"⚠️ Could not set mindsdb project: {e}")
+            # Open the first pooled connection; queries run in the mindsdb project by default
+            with self.pool.connection():
+                pass
+            self.connection = self.pool
             
             self._connected = True
             logger.info(f"✅ Connected to MindsDB SDK at {self.base_url}")
@@ -86,7 +88,7 @@ class MindsDBService:
         """Perform health check of MindsDB service."""
         try:
             if not self._ensure_connection():
-                return {"status": "error", "connection": "failed"}
+                return {"status": "error", "connection": "failed", "pool": self.pool.get_metrics()}
 
             # Try to execute a simple query to test connection
             try:
@@ -100,6 +102,7 @@ class MindsDBService:
                         "status": "healthy",
                         "connection": "connected",
                         "engine_status": "accessible",
+                        "pool": self.pool.get_metrics(),
                         "timestamp": datetime.utcnow().isoformat()
                     }
                 else:
@@ -112,6 +115,7 @@ class MindsDBService:
                     "connection": "connected",
                     "engine_status": "unknown",
                     "warning": str(e),
+                    "pool": self.pool.get_metrics(),
                     "timestamp": datetime.utcnow().isoformat()
                 }
             
@@ -121,11 +125,38 @@ class MindsDBService:
                 "status": "error",
                 "connection": "failed",
                 "error": str(e),
+                "pool": self.pool.get_metrics(),
                 "timestamp": datetime.utcnow().isoformat()
             }
 
-    def execute_query(self, query: str) -> Dict[str, Any]:
-        """Execute a SQL query on MindsDB and return results"""
+    def execute_query(
+        self,
+        query: str,
+        *,
+        cache_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a SQL query on MindsDB and return results
+
+        Read-only queries are answered from the query result cache when possible;
+        cache_context (see query_result_cache.context_for_dataset) ties the entry
+        to a dataset's scope, version and source TTL.
+        """
+        cache_key, ttl = query_result_cache.lookup(query, cache_context)
+        if cache_key is not None:
+            cached = query_result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        elif not is_cacheable(query):
+            # A write may change what reads of the same scope return
+            query_result_cache.invalidate_scope((cache_context or {}).get("scope", UNSCOPED))
+
+        result = self._execute_query(query)
+        if cache_key is not None and result.get("status") == "success":
+            query_result_cache.set(cache_key, result, ttl)
+        return result
+
+    def _execute_query(self, query: str) -> Dict[str, Any]:
         try:
             if not self._ensure_connection():
                 return {"status": "error", "error": "MindsDB connection not available"}
@@ -178,23 +209,14 @@ class MindsDBService:
             if not self._ensure_connection():
                 return {"message": "SDK connection not available", "status": "error"}
 
-            # Check if engine already exists first
-            try:
-                engines_query = "SHOW ML_ENGINES"
-                result = self.connection.query(engines_query)
-                engines_df = result.fetch()
-                
-                if not engines_df.empty:
-                    for _, engine in engines_df.iterrows():
-                        if engine.get('NAME') == self.engine_name:
-                            logger.info(f"✅ Engine {self.engine_name} already exists")
-                            return {
-                                "message": f"Engine {self.engine_name} ready",
-                                "status": "exists",
-                                "engine_name": self.engine_name
-                            }
-            except Exception as e:
-                logger.warning(f"⚠️ Could not check existing engines: {e}")
+            # Check if engine already exists first (answered from the registry once loaded)
+            if mindsdb_registry.has_engine(self.engine_name, self.connection):
+                logger.debug(f"✅ Engine {self.engine_name} already exists")
+                return {
+                    "message": f"Engine {self.engine_name} ready",
+                    "status": "exists",
+                    "engine_name": self.engine_name
+                }
 
             # Try to use OpenAI as fallback since Gemini engine creation seems to have issues
             logger.warning(f"⚠️ Gemini engine creation having issues, trying OpenAI as fallback")
@@ -218,26 +240,25 @@ class MindsDBService:
                 try:
                     logger.info(f"🔧 Creating OpenAI fallback engine: {openai_engine_name}")
                     self.connection.query(create_openai_engine_sql)
-                    
-                    # Wait and verify
-                    import time
-                    time.sleep(3)
-                    
-                    result = self.connection.query("SHOW ML_ENGINES")
-                    engines_df = result.fetch()
-                    
-                    for _, engine in engines_df.iterrows():
-                        if engine.get('NAME') == openai_engine_name:
-                            logger.info(f"✅ OpenAI fallback engine created successfully")
-                            # Update the engine name for this session
-                            self.engine_name = openai_engine_name
-                            return {
-                                "message": f"OpenAI fallback engine {openai_engine_name} created",
-                                "status": "created",
-                                "engine_name": openai_engine_name
-                            }
-                            
+                    mindsdb_registry.mark_engine(openai_engine_name)
+                    logger.info(f"✅ OpenAI fallback engine created successfully")
+                    # Update the engine name for this session
+                    self.engine_name = openai_engine_name
+                    return {
+                        "message": f"OpenAI fallback engine {openai_engine_name} created",
+                        "status": "created",
+                        "engine_name": openai_engine_name
+                    }
+
                 except Exception as openai_error:
+                    if "already exists" in str(openai_error).lower():
+                        mindsdb_registry.mark_engine(openai_engine_name)
+                        self.engine_name = openai_engine_name
+                        return {
+                            "message": f"Engine {openai_engine_name} ready",
+                            "status": "exists",
+                            "engine_name": openai_engine_name
+                        }
                     logger.warning(f"⚠️ OpenAI fallback also failed: {openai_error}")
             
             # If all else fails, try the original Gemini approach one more time
@@ -252,7 +273,8 @@ class MindsDBService:
             try:
                 logger.info(f"🔧 Creating engine with SQL: {create_engine_sql}")
                 self.connection.query(create_engine_sql)
-                
+                mindsdb_registry.mark_engine(self.engine_name)
+
                 # Just return success even if we can't verify it
                 # The model creation will test if it actually works
                 logger.info(f"✅ Engine creation command executed")
@@ -265,6 +287,7 @@ class MindsDBService:
             except Exception as e:
                 if "already exists" in str(e).lower():
                     logger.info(f"✅ Engine {self.engine_name} already exists")
+                    mindsdb_registry.mark_engine(self.engine_name)
                     return {
                         "message": f"Engine {self.engine_name} ready",
                         "status": "exists",
@@ -272,8 +295,9 @@ class MindsDBService:
                     }
                 else:
                     raise e
-                    
+
         except Exception as e:
+            mindsdb_registry.invalidate()
             logger.error(f"❌ Failed to create/verify engine {self.engine_name}: {e}")
             return {
                 "message": f"Engine creation failed: {str(e)}",
@@ -292,30 +316,23 @@ class MindsDBService:
             if not self._ensure_connection():
                 return {"message": "SDK connection not available", "status": "error"}
 
-            # Ensure engine exists first
+            # Check if model already exists (answered from the registry once loaded);
+            # an existing model implies its engine exists too
+            model_status = mindsdb_registry.model_status(model_name, self.connection)
+            if model_status is not None:
+                logger.debug(f"✅ Model {model_name} already exists (Status: {model_status})")
+                return {
+                    "message": f"Model {model_name} ready",
+                    "status": "exists",
+                    "model_name": model_name,
+                    "model_status": model_status
+                }
+
+            # Ensure engine exists
             engine_result = self.create_gemini_engine()
             if engine_result.get("status") == "error":
                 return {"message": "Engine creation failed", "status": "error"}
 
-            # Check if model already exists
-            try:
-                models_query = "SHOW MODELS"
-                result = self.connection.query(models_query)
-                models_df = result.fetch()
-                
-                if not models_df.empty:
-                    for _, model in models_df.iterrows():
-                        if model.get('NAME') == model_name:
-                            model_status = model.get('STATUS', 'Unknown')
-                            logger.info(f"✅ Model {model_name} already exists (Status: {model_status})")
-                            return {
-                                "message": f"Model {model_name} ready",
-                                "status": "exists",
-                                "model_name": model_name
-                            }
-            except Exception as e:
-                logger.warning(f"⚠️ Could not check existing models: {e}")
-
             # Set default column name
             if not column_name:
                 column_name = "question"
@@ -348,27 +365,14 @@ class MindsDBService:
             try:
                 logger.info(f"🤖 Creating model with SQL: {model_sql}")
                 self.connection.query(model_sql)
-                
-                # Wait for model to initialize
-                import time
+                mindsdb_registry.mark_model(model_name, "generating")
+
+                # Poll the model's status with backoff until it is ready
                 logger.info(f"⏳ Waiting for model {model_name} to initialize...")
-                time.sleep(8)  # Increased wait time
-                
-                # Verify model was created and check its status
-                result = self.connection.query("SHOW MODELS")
-                models_df = result.fetch()
-                
-                model_found = False
-                model_status = "Unknown"
-                if not models_df.empty:
-                    for _, model in models_df.iterrows():
-                        if model.get('NAME') == model_name:
-                            model_found = True
-                            model_status = model.get('STATUS', 'Unknown')
-                            logger.info(f"✅ Model {model_name} found with status: {model_status}")
-                            break
-                
-                if model_found:
+                model_status = mindsdb_registry.wait_until_ready(model_name, self.connection)
+
+                if model_status != "unknown":
+                    logger.info(f"✅ Model {model_name} found with status: {model_status}")
                     return {
                         "message": f"Model {model_name} created successfully (Status: {model_status})",
                         "status": "created",
@@ -395,6 +399,7 @@ class MindsDBService:
             except Exception as e:
                 if "already exists" in str(e).lower():
                     logger.info(f"✅ Model {model_name} already exists")
+                    mindsdb_registry.mark_model(model_name, "unknown")
                     return {
                         "message": f"Model {model_name} ready",
                         "status": "exists",
@@ -402,8 +407,9 @@ class MindsDBService:
                     }
                 else:
                     raise e
-            
+
         except Exception as e:
+            mindsdb_registry.invalidate()
             logger.error(f"❌ Failed to create model {model_name}: {e}")
             return {
                 "message": f"Model creation failed: {str(e)}",
@@ -428,10 +434,6 @@ class MindsDBService:
                         logger.warning(f"⚠️ MindsDB model creation failed: {model_result.get('message')}")
                         raise Exception(f"Model creation failed: {model_result.get('message')}")
                     
-                    # Wait a moment for the model to be ready
-                    import time
-                    time.sleep(2)
-                    
                     # Query the model using MindsDB
                     query = f"""
                     SELECT response 
@@ -494,6 +496,8 @@ class MindsDBService:
                             raise Exception(f"MindsDB fetch failed: {fetch_error}")
                 
                 except Exception as mindsdb_error:
+                    # The model may have been dropped or failed; re-check it next time
+                    mindsdb_registry.invalidate()
                     logger.warning(f"⚠️ MindsDB chat failed: {mindsdb_error}")
                     # Fall through to direct API approach
             
@@ -582,30 +586,45 @@ class MindsDBService:
                 "message": f"Failed to create dataset connection: {str(e)}"
             }
 
-    def query_dataset(self, dataset_name: str, query: str) -> Dict[str, Any]:
-        """Execute a query against a dataset in MindsDB."""
+    def query_dataset(
+        self,
+        dataset_name: str,
+        query: str,
+        *,
+        cache_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Execute a query against a dataset in MindsDB (cached like execute_query)."""
         try:
-            if not self._ensure_connection():
-                return {"status": "error", "message": "MindsDB connection not available"}
-
             safe_dataset_name = dataset_name.replace(" ", "_").replace("-", "_")
             safe_dataset_name = "".join(c for c in safe_dataset_name if c.isalnum() or c == "_")
             
             # Replace dataset placeholders in query
             formatted_query = query.replace("{dataset}", f"{safe_dataset_name}_datasource")
             
+            cache_key, ttl = query_result_cache.lookup(formatted_query, cache_context)
+            if cache_key is not None:
+                cached = query_result_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+            if not self._ensure_connection():
+                return {"status": "error", "message": "MindsDB connection not available"}
+
             logger.info(f"🔍 Executing dataset query: {formatted_query}")
             result = self.connection.query(formatted_query)
             
             if result and hasattr(result, 'fetch'):
                 df = result.fetch()
                 if df is not None and hasattr(df, 'empty'):
-                    return {
+                    response = {
                         "status": "success",
                         "rows": df.to_dict('records') if not df.empty else [],
                         "columns": list(df.columns) if not df.empty else [],
                         "row_count": len(df)
                     }
+                    if cache_key is not None:
+                        query_result_cache.set(cache_key, response, ttl)
+                    return response
             
             return {
                 "status": "success",
@@ -1821,6 +1840,7 @@ Please provide a comprehensive answer about this dataset:"""
                     """
                     
                     self.connection.query(update_query)
+                    mindsdb_registry.mark_model(model_name, "generating")
                     logger.info(f"✅ Updated chat model {model_name} with dataset-specific prompt")
                     
                 except Exception as update_error:
@@ -1951,6 +1971,9 @@ Please provide a comprehensive answer about this dataset:"""
                 logger.warning(f"⚠️ Could not check for additional dataset models: {e}")
                 errors.append(f"Additional model check failed: {str(e)}")
             
+            for model_name in deleted_models:
+                mindsdb_registry.forget_model(model_name)
+
             result = {
                 "success": len(deleted_models) > 0 or len(errors) == 0,
                 "deleted_models": deleted_models,
@@ -2192,12 +2215,14 @@ Please provide a comprehensive answer about this dataset:"""
                 if dataset_files:
                     primary_file = dataset_files[0]
                     file_path = primary_file.file_path
+                    storage_key = primary_file.relative_path or primary_file.file_path
                 else:
                     logger.warning(f"No files found for multi-file dataset {dataset.id}")
                     return None
             else:
                 # For single file datasets
                 file_path = dataset.file_path
+                storage_key = columnar_cache.storage_key_for_dataset(dataset)
                 if not file_path and dataset.source_url and not dataset.source_url.startswith('http'):
                     # Try to construct file path from source_url
                     import os
@@ -2211,6 +2236,11 @@ Please provide a comprehensive answer about this dataset:"""
                             file_path = path
                             break
             
+            # Prefer the memory-mapped columnar sidecar, sampled without parsing the source
+            df = columnar_cache.read_sample(storage_key, max_rows=10000)
+            if df is not None:
+                return df
+            
             if not file_path or not os.path.exists(file_path):
                 logger.warning(f"File not found for dataset {dataset.id}: {file_path}")
                 return None
@@ -0,0 +1,238 @@
+"""
+Async MindsDB Facade
+Runs the blocking MindsDB SDK and Gemini calls of MindsDBService on a dedicated,
+bounded thread pool, so async endpoints never block the event loop while a
+query or LLM call is in progress.
+
+Every call has a timeout, the number of queued plus running calls is capped, and
+calls made with the request are cancelled when the client disconnects: queued
+calls never start, running ones stop at their next wait (see cancellable_sleep).
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cancellation flag of the facade call running on the current worker thread
+_current_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "mindsdb_call_cancel_event", default=None
+)
+
+
+class MindsDBCallError(Exception):
+    """A MindsDB call that did not run to completion; status_code is the HTTP status to report"""
+    status_code = 503
+
+
+class MindsDBBusyError(MindsDBCallError):
+    """Too many MindsDB calls are already queued"""
+    status_code = 503
+
+
+class MindsDBTimeoutError(MindsDBCallError):
+    """A MindsDB call exceeded its timeout"""
+    status_code = 504
+
+
+class MindsDBCallCancelled(MindsDBCallError):
+    """A MindsDB call was cancelled because the client went away"""
+    status_code = 499
+
+
+def cancellable_sleep(seconds: float) -> None:
+    """
+    time.sleep for MindsDBService code: ends early by raising MindsDBCallCancelled
+    when the facade call running it times out or is cancelled
+    """
+    event = _current_cancel_event.get()
+    if event is None:
+        time.sleep(seconds)
+    elif event.wait(seconds):
+        raise MindsDBCallCancelled("MindsDB call cancelled")
+
+
+class AsyncMindsDBService:
+    """Async facade over MindsDBService backed by a bounded thread pool"""
+
+    # Calls expected to be quick get a tighter timeout than the default
+    METHOD_TIMEOUTS = {
+        "health_check": 10.0,
+        "execute_query": 60.0,
+    }
+
+    def __init__(
+        self,
+        service=None,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: Optional[float] = None,
+        disconnect_poll_interval: float = 0.5
+    ):
+        self._service = service
+        self.max_workers = max_workers or int(os.getenv("MINDSDB_EXECUTOR_WORKERS", "8"))
+        self.max_pending = max_pending or int(os.getenv("MINDSDB_EXECUTOR_MAX_PENDING", "64"))
+        self.timeout = timeout or float(os.getenv("MINDSDB_CALL_TIMEOUT", "120"))
+        self.disconnect_poll_interval = disconnect_poll_interval
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "run_seconds_total": 0.0
+        }
+
+    @property
+    def service(self):
+        """The wrapped MindsDBService (the shared instance unless one was given)"""
+        if self._service is None:
+            from app.services.mindsdb import mindsdb_service
+            self._service = mindsdb_service
+        return self._service
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mindsdb")
+        return self._executor
+
+    async def _wait_for_disconnect(self, request) -> None:
+        while not await request.is_disconnected():
+            await asyncio.sleep(self.disconnect_poll_interval)
+
+    async def call(self, method: str, *args, timeout: Optional[float] = None, request=None, **kwargs) -> Any:
+        """
+        Run a MindsDBService method on the MindsDB thread pool
+
+        Args:
+            method: Name of the MindsDBService method
+            timeout: Seconds to wait for the result (default: the method's timeout, capped at MINDSDB_CALL_TIMEOUT)
+            request: Incoming request; the call is cancelled if its client disconnects
+
+        Raises:
+            MindsDBBusyError, MindsDBTimeoutError, MindsDBCallCancelled, or whatever the method raised
+        """
+        func = getattr(self.service, method)
+        timeout = timeout or min(self.METHOD_TIMEOUTS.get(method, self.timeout), self.timeout)
+
+        with self._lock:
+            if self._queued + self._running >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise MindsDBBusyError(f"MindsDB is busy ({self.max_pending} calls in progress), try again shortly")
+            self._queued += 1
+            self.stats["submitted"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._queued)
+
+        cancel_event = threading.Event()
+        submitted_at = time.perf_counter()
+
+        def run():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self.stats["wait_seconds_total"] += started_at - submitted_at
+            token = _current_cancel_event.set(cancel_event)
+            try:
+                if cancel_event.is_set():
+                    raise MindsDBCallCancelled(f"MindsDB {method} cancelled before it started")
+                return func(*args, **kwargs)
+            finally:
+                _current_cancel_event.reset(token)
+                with self._lock:
+                    self._running -= 1
+                    self.stats["run_seconds_total"] += time.perf_counter() - started_at
+
+        future = self._get_executor().submit(contextvars.copy_context().run, run)
+        result_future = asyncio.wrap_future(future)
+        # The result of an abandoned call is never awaited; retrieve it so it isn't logged
+        result_future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        waiters = {result_future}
+        watcher = None
+        if request is not None:
+            watcher = asyncio.ensure_future(self._wait_for_disconnect(request))
+            waiters.add(watcher)
+
+        try:
+            done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if result_future in done:
+                try:
+                    result = result_future.result()
+                except Exception:
+                    self.stats["failed"] += 1
+                    raise
+                self.stats["completed"] += 1
+                return result
+            if watcher is not None and watcher in done:
+                self.stats["cancelled"] += 1
+                logger.info(f"🔌 Client disconnected, cancelling MindsDB {method}")
+                raise MindsDBCallCancelled(f"Client disconnected during MindsDB {method}")
+            self.stats["timeouts"] += 1
+            logger.warning(f"⏱️ MindsDB {method} timed out after {timeout}s")
+            raise MindsDBTimeoutError(f"MindsDB {method} timed out after {timeout:g}s")
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+        finally:
+            if not future.done():
+                cancel_event.set()
+                if future.cancel():
+                    # Never started, so run() will not settle the queue count
+                    with self._lock:
+                        self._queued -= 1
+            if watcher is not None:
+                watcher.cancel()
+
+    async def chat_with_dataset(self, request=None, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        return await self.call("chat_with_dataset", request=request, timeout=timeout, **kwargs)
+
+    async def ai_chat(self, message: str, model_name: Optional[str] = None, request=None) -> Dict[str, Any]:
+        return await self.call("ai_chat", message, model_name, request=request)
+
+    async def execute_query(
+        self, query: str, request=None, *, cache_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        kwargs = {"cache_context": cache_context} if cache_context is not None else {}
+        return await self.call("execute_query", query, request=request, **kwargs)
+
+    async def health_check(self) -> Dict[str, Any]:
+        return await self.call("health_check")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        finished = self.stats["completed"] + self.stats["failed"]
+        started = self.stats["submitted"] - self._queued
+        return {
+            **self.stats,
+            "wait_seconds_total": round(self.stats["wait_seconds_total"], 3),
+            "run_seconds_total": round(self.stats["run_seconds_total"], 3),
+            "avg_wait_seconds": round(self.stats["wait_seconds_total"] / started, 3) if started > 0 else 0.0,
+            "avg_run_seconds": round(self.stats["run_seconds_total"] / finished, 3) if finished else 0.0,
+            "queued": self._queued,
+            "running": self._running,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending
+        }
+
+    def shutdown(self) -> None:
+        """Stop the thread pool; queued calls are dropped"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+mindsdb_async = AsyncMindsDBService()
@@ -0,0 +1,234 @@
+"""
+MindsDB Connection Pool
+Bounded pool of MindsDB SDK connections shared by all threads running
+MindsDBService code. An SDK connection is an HTTP session; pooling them lets
+concurrent queries run on separate sessions instead of serializing on one, and
+replaces sessions that went bad instead of keeping a broken one until restart.
+
+The pool is a drop-in for the single connection MindsDBService used to hold:
+query(sql) returns an object whose fetch() borrows a connection for the round
+trip. Idle connections are pinged before reuse when they have not been checked
+recently, and a query that fails with a connection error is retried once on a
+fresh connection.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from app.services.mindsdb_async import MindsDBCallError
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the connection, not the query, is at fault
+CONNECTION_ERRORS = (requests.ConnectionError, ConnectionError)
+
+
+class MindsDBPoolTimeout(MindsDBCallError):
+    """No MindsDB connection became free within the checkout timeout"""
+    status_code = 503
+
+
+class _PooledConnection:
+    """An SDK connection with the timestamps the pool needs"""
+
+    __slots__ = ("conn", "created_at", "last_used", "last_checked")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        self.last_checked = now
+
+
+class PooledQuery:
+    """Deferred query, like the SDK's Query: the SQL runs on fetch()"""
+
+    def __init__(self, pool: "MindsDBConnectionPool", sql: str):
+        self.pool = pool
+        self.sql = sql
+
+    def fetch(self):
+        return self.pool.fetch(self.sql)
+
+
+class MindsDBConnectionPool:
+    """Thread-safe, bounded pool of MindsDB SDK connections"""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        connect: Optional[Callable[[], Any]] = None,
+        max_size: Optional[int] = None,
+        checkout_timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        health_check_interval: Optional[float] = None
+    ):
+        self.url = url
+        self._connect = connect or self._sdk_connect
+        self.max_size = max_size or int(os.getenv("MINDSDB_POOL_SIZE", "8"))
+        self.checkout_timeout = checkout_timeout or float(os.getenv("MINDSDB_POOL_CHECKOUT_TIMEOUT", "30"))
+        self.idle_timeout = idle_timeout or float(os.getenv("MINDSDB_POOL_IDLE_TIMEOUT", "300"))
+        self.health_check_interval = (
+            health_check_interval if health_check_interval is not None
+            else float(os.getenv("MINDSDB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+        )
+
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._open = 0
+        self.stats = {
+            "created": 0,
+            "reused": 0,
+            "evicted": 0,
+            "discarded": 0,
+            "health_check_failures": 0,
+            "retries": 0,
+            "waits": 0,
+            "wait_time_ms": 0.0,
+            "timeouts": 0,
+            "errors": 0
+        }
+
+    def _sdk_connect(self):
+        import mindsdb_sdk
+        return mindsdb_sdk.connect(self.url)
+
+    @staticmethod
+    def _ping(conn) -> None:
+        conn.query("SELECT 1").fetch()
+
+    def _close(self, pooled: _PooledConnection) -> None:
+        with self._lock:
+            self._open -= 1
+        try:
+            session = getattr(getattr(pooled.conn, "api", None), "session", None)
+            if session is not None:
+                session.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled MindsDB connection: {e}")
+
+    def _pop_idle(self) -> Optional[_PooledConnection]:
+        with self._lock:
+            return self._idle.pop() if self._idle else None
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            pooled = self._pop_idle()
+            if pooled is None:
+                break
+            now = time.monotonic()
+            if now - pooled.last_used > self.idle_timeout:
+                self.stats["evicted"] += 1
+                self._close(pooled)
+                continue
+            if now - pooled.last_checked > self.health_check_interval:
+                try:
+                    self._ping(pooled.conn)
+                    pooled.last_checked = now
+                except Exception as e:
+                    logger.info(f"🔌 Dropping unhealthy MindsDB connection: {e}")
+                    self.stats["health_check_failures"] += 1
+                    self._close(pooled)
+                    continue
+            self.stats["reused"] += 1
+            return pooled
+
+        conn = self._connect()
+        with self._lock:
+            self._open += 1
+        self.stats["created"] += 1
+        return _PooledConnection(conn)
+
+    def _discard_idle(self) -> None:
+        """Close every idle connection, e.g. after the server dropped one"""
+        while True:
+            pooled = self._pop_idle()
+            if pooled is None:
+                return
+            self.stats["discarded"] += 1
+            self._close(pooled)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection; it is returned on success or on a query error and
+        replaced when the connection itself failed
+
+        Raises:
+            MindsDBPoolTimeout: if all max_size connections stay busy for checkout_timeout
+        """
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            self.stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.checkout_timeout):
+                self.stats["timeouts"] += 1
+                raise MindsDBPoolTimeout(f"No MindsDB connection free after {self.checkout_timeout:g}s")
+        try:
+            self.stats["wait_time_ms"] += (time.monotonic() - started) * 1000
+            pooled = self._checkout()
+            try:
+                yield pooled.conn
+            except CONNECTION_ERRORS:
+                # Other idle sessions likely point at the same dead server connection
+                self.stats["errors"] += 1
+                self.stats["discarded"] += 1
+                self._close(pooled)
+                self._discard_idle()
+                raise
+            except BaseException:
+                # SQL errors come back over a healthy connection; keep it
+                self.stats["errors"] += 1
+                pooled.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(pooled)
+                raise
+            else:
+                pooled.last_used = pooled.last_checked = time.monotonic()
+                with self._lock:
+                    self._idle.append(pooled)
+        finally:
+            self._slots.release()
+
+    def fetch(self, sql: str):
+        """Run a query on a pooled connection, retrying once on a fresh one if the connection failed"""
+        try:
+            with self.connection() as conn:
+                return conn.query(sql).fetch()
+        except CONNECTION_ERRORS as e:
+            logger.warning(f"🔁 MindsDB connection failed ({e}), retrying on a new connection")
+            self.stats["retries"] += 1
+            with self.connection() as conn:
+                return conn.query(sql).fetch()
+
+    def query(self, sql: str) -> PooledQuery:
+        return PooledQuery(self, sql)
+
+    def close(self) -> None:
+        """Close every idle connection"""
+        while True:
+            pooled = self._pop_idle()
+            if pooled is None:
+                return
+            self._close(pooled)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            idle = len(self._idle)
+            open_connections = self._open
+        return {
+            "max_size": self.max_size,
+            "open": open_connections,
+            "idle": idle,
+            "in_use": open_connections - idle,
+            **self.stats,
+            "wait_time_ms": round(self.stats["wait_time_ms"], 2)
+        }
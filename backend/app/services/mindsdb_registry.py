@@ -0,0 +1,155 @@
+"""
+MindsDB Object Registry
+In-process record of the ML engines and models that exist in MindsDB and their
+status, so chat and model setup don't run SHOW ML_ENGINES / SHOW MODELS before
+every query.
+
+The registry is loaded with one listing of each, refreshed after a TTL or when
+a DDL statement fails, and updated directly by the DDL this process runs.
+Model readiness after CREATE MODEL is polled with exponential backoff.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.services.mindsdb_async import cancellable_sleep
+
+logger = logging.getLogger(__name__)
+
+# Model statuses reported by MindsDB (lower-cased)
+READY_STATUSES = {"complete"}
+FAILED_STATUSES = {"error", "failed"}
+
+
+def _rows_by_name(df) -> Dict[str, Dict[str, Any]]:
+    """Index a SHOW ... result by its NAME column, without iterating rows"""
+    if df is None or df.empty:
+        return {}
+    df = df.rename(columns=str.upper)
+    if "NAME" not in df.columns:
+        return {}
+    records = df.to_dict("records")
+    return {str(record["NAME"]): record for record in records}
+
+
+class MindsDBObjectRegistry:
+    """Known MindsDB engines and models, refreshed on a TTL"""
+
+    def __init__(self, ttl: Optional[float] = None, ready_timeout: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("MINDSDB_REGISTRY_TTL", "300"))
+        self.ready_timeout = ready_timeout or float(os.getenv("MINDSDB_MODEL_READY_TIMEOUT", "30"))
+        self._lock = threading.RLock()
+        self._engines: Dict[str, Dict[str, Any]] = {}
+        self._models: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "invalidations": 0,
+            "readiness_polls": 0
+        }
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def refresh(self, connection) -> None:
+        """Reload engines and models with one SHOW query each"""
+        engines = _rows_by_name(connection.query("SHOW ML_ENGINES").fetch())
+        models = {
+            name: str(record.get("STATUS") or "unknown").lower()
+            for name, record in _rows_by_name(connection.query("SHOW MODELS").fetch()).items()
+        }
+        with self._lock:
+            self._engines = engines
+            self._models = models
+            self._loaded_at = time.monotonic()
+            self.stats["refreshes"] += 1
+        logger.info(f"📇 MindsDB registry refreshed: {len(engines)} engines, {len(models)} models")
+
+    def _ensure_loaded(self, connection) -> None:
+        if not self._is_fresh():
+            try:
+                self.refresh(connection)
+            except Exception as e:
+                # Keep serving what we knew; DDL failures will invalidate it
+                logger.warning(f"⚠️ Could not refresh MindsDB registry: {e}")
+
+    def has_engine(self, name: str, connection) -> bool:
+        self._ensure_loaded(connection)
+        with self._lock:
+            found = name in self._engines
+            self.stats["hits" if found else "misses"] += 1
+            return found
+
+    def model_status(self, name: str, connection) -> Optional[str]:
+        """Status of a model (lower-cased), or None if it does not exist"""
+        self._ensure_loaded(connection)
+        with self._lock:
+            status = self._models.get(name)
+            self.stats["hits" if status is not None else "misses"] += 1
+            return status
+
+    def mark_engine(self, name: str) -> None:
+        with self._lock:
+            self._engines.setdefault(name, {"NAME": name})
+
+    def mark_model(self, name: str, status: str) -> None:
+        with self._lock:
+            self._models[name] = status.lower()
+
+    def forget_model(self, name: str) -> None:
+        with self._lock:
+            self._models.pop(name, None)
+
+    def invalidate(self) -> None:
+        """Force a reload on next use, e.g. after a DDL statement failed"""
+        with self._lock:
+            self._loaded_at = None
+            self.stats["invalidations"] += 1
+
+    def wait_until_ready(self, name: str, connection, timeout: Optional[float] = None,
+                         initial_delay: float = 0.25, max_delay: float = 4.0) -> str:
+        """
+        Poll a single model's status with exponential backoff until it is ready or failed
+
+        Returns:
+            The last status seen ("unknown" if the model never showed up)
+        """
+        deadline = time.monotonic() + (timeout or self.ready_timeout)
+        delay = initial_delay
+        status = "unknown"
+        while True:
+            self.stats["readiness_polls"] += 1
+            try:
+                record = _rows_by_name(connection.query(f"SHOW MODELS WHERE name = '{name}'").fetch()).get(name)
+                if record is not None:
+                    status = str(record.get("STATUS") or "unknown").lower()
+                    self.mark_model(name, status)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not poll status of model {name}: {e}")
+            if status in READY_STATUSES or status in FAILED_STATUSES:
+                return status
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"⏳ Model {name} not ready after polling (status: {status})")
+                return status
+            cancellable_sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "engines": len(self._engines),
+                "models": len(self._models),
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+                "ttl": self.ttl
+            }
+
+
+# Global instance
+mindsdb_registry = MindsDBObjectRegistry()
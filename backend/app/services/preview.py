@@ -3,8 +3,8 @@ Preview Service for Enhanced Dataset Management
 Handles dataset content preview generation without loading full files
 """
 
+import asyncio
 import pandas as pd
-import json
 import numpy as np
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Union
@@ -13,6 +13,9 @@ import logging
 from sqlalchemy.orm import Session
 
 from app.models.dataset import Dataset
+from app.services.columnar_cache import columnar_cache
+from app.services.csv_row_index import csv_row_index
+from app.services import json_stream
 
 logger = logging.getLogger(__name__)
 
@@ -89,13 +92,19 @@ class PreviewService:
             elif dataset.file_path:
                 file_path = Path(dataset.file_path)
                 
+            # Tabular datasets with a columnar sidecar don't need the source file at all
+            if dataset.type.value.lower() == 'csv' and await columnar_cache.ensure_local_sidecar(
+                columnar_cache.storage_key_for_dataset(dataset)
+            ):
+                return await self._generate_csv_preview(file_path, dataset, rows, include_stats, page)
+            
             # If we found a valid file path, try to generate preview
             if file_path and file_path.exists():
                 logger.info(f"📁 Generating preview from file: {file_path}")
                 
                 # Generate preview based on file type
                 if dataset.type.value.lower() == 'csv':
-                    return await self._generate_csv_preview(file_path, dataset, rows, include_stats)
+                    return await self._generate_csv_preview(file_path, dataset, rows, include_stats, page)
                 elif dataset.type.value.lower() == 'json':
                     return await self._generate_json_preview(file_path, dataset, rows, include_stats)
                 elif dataset.type.value.lower() in ['excel', 'xlsx', 'xls']:
@@ -127,7 +136,25 @@ class PreviewService:
             # Calculate skip rows for pagination
             skip_rows = (page - 1) * rows if page > 1 else 0
             
+            # Serve from the columnar sidecar when available (exact row count, no re-parse)
+            storage_key = columnar_cache.storage_key_for_dataset(dataset)
+            if await columnar_cache.ensure_local_sidecar(storage_key):
+                df = columnar_cache.read_rows(storage_key, offset=skip_rows, limit=rows)
+                if df is not None:
+                    return self._build_csv_preview(
+                        df, dataset, rows, include_stats, page, columnar_cache.num_rows(storage_key), source="columnar_sidecar"
+                    )
+            
+            # Seek straight to the requested page using the row-offset index next to the file
+            row_index = csv_row_index.load_index(str(file_path))
+            if row_index:
+                df = csv_row_index.read_rows(str(file_path), row_index, offset=skip_rows, limit=rows)
+                return self._build_csv_preview(
+                    df, dataset, rows, include_stats, page, row_index["total_rows"], source="row_index"
+                )
+            
             # For stats and total count, we need to read the file once
+            total_rows = None
             if include_stats or page > 1:
                 # Get total row count for pagination info
                 total_rows = dataset.row_count
@@ -144,45 +171,59 @@ class PreviewService:
                 # First page, no need to skip
                 df = pd.read_csv(file_path, nrows=rows)
             
-            preview_data = {
-                "type": "tabular",
-                "format": "csv",
-                "headers": df.columns.tolist(),
-                "rows": df.to_dict('records'),
-                "total_rows_in_preview": len(df),
-                "estimated_total_rows": dataset.row_count or total_rows or "unknown",
-                "total_columns": len(df.columns),
-                "is_sample": True,
-                "sample_info": {
-                    "method": "pagination" if page > 1 else "head",
-                    "rows_requested": rows,
-                    "rows_returned": len(df),
-                    "page": page,
-                    "total_pages": int(total_rows / rows) + 1 if isinstance(total_rows, int) and total_rows > 0 else 1
-                },
-                "column_types": {col: str(df[col].dtype) for col in df.columns},
-                "generated_at": datetime.utcnow().isoformat()
-            }
-            
-            if include_stats:
-                preview_data["basic_stats"] = self._calculate_preview_stats(df)
-            
-            # Add data quality indicators
-            preview_data["quality_indicators"] = {
-                "has_null_values": df.isnull().any().any(),
-                "null_columns": df.columns[df.isnull().any()].tolist(),
-                "completeness_by_column": {
-                    col: round(1 - (df[col].isnull().sum() / len(df)), 3)
-                    for col in df.columns
-                }
-            }
-            
-            return convert_numpy_types(preview_data)
+            return self._build_csv_preview(df, dataset, rows, include_stats, page, total_rows)
             
         except Exception as e:
             logger.error(f"❌ CSV preview generation failed: {e}")
             return convert_numpy_types(self._get_error_preview(dataset, str(e)))
     
+    def _build_csv_preview(
+        self,
+        df: pd.DataFrame,
+        dataset: Dataset,
+        rows: int,
+        include_stats: bool,
+        page: int,
+        total_rows: Optional[int],
+        source: str = "file"
+    ) -> Dict[str, Any]:
+        """Build the CSV preview payload for one page of rows"""
+        preview_data = {
+            "type": "tabular",
+            "format": "csv",
+            "headers": df.columns.tolist(),
+            "rows": df.to_dict('records'),
+            "total_rows_in_preview": len(df),
+            "estimated_total_rows": dataset.row_count or total_rows or "unknown",
+            "total_columns": len(df.columns),
+            "is_sample": True,
+            "sample_info": {
+                "method": "pagination" if page > 1 else "head",
+                "rows_requested": rows,
+                "rows_returned": len(df),
+                "page": page,
+                "total_pages": (total_rows + rows - 1) // rows if isinstance(total_rows, int) and total_rows > 0 and rows > 0 else 1
+            },
+            "column_types": {col: str(df[col].dtype) for col in df.columns},
+            "source": source,
+            "generated_at": datetime.utcnow().isoformat()
+        }
+        
+        if include_stats:
+            preview_data["basic_stats"] = self._calculate_preview_stats(df)
+        
+        # Add data quality indicators
+        preview_data["quality_indicators"] = {
+            "has_null_values": df.isnull().any().any(),
+            "null_columns": df.columns[df.isnull().any()].tolist(),
+            "completeness_by_column": {
+                col: round(1 - (df[col].isnull().sum() / len(df)), 3) if len(df) else 0
+                for col in df.columns
+            }
+        }
+        
+        return convert_numpy_types(preview_data)
+    
     async def _generate_json_preview(
         self, 
         file_path: Path, 
@@ -191,29 +232,29 @@ class PreviewService:
         include_stats: bool,
         page: int = 1
     ) -> Dict[str, Any]:
-        """Generate preview for JSON files"""
+        """Generate preview for JSON / NDJSON files, streaming to the requested page"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            start_idx = (page - 1) * rows if page > 1 else 0
+            stream_page = await asyncio.to_thread(json_stream.read_page, str(file_path), start_idx, rows)
+            data = stream_page["document"]
             
             preview_data = {
                 "type": "json",
                 "format": "json",
-                "structure_type": type(data).__name__,
+                "structure_type": stream_page["structure_type"],
                 "generated_at": datetime.utcnow().isoformat()
             }
             
-            if isinstance(data, list):
+            if stream_page["structure_type"] == "list":
                 # Array of objects with pagination support
-                start_idx = (page - 1) * rows if page > 1 else 0
-                end_idx = start_idx + rows
-                preview_items = data[start_idx:end_idx] if len(data) > start_idx else []
-                total_pages = (len(data) + rows - 1) // rows  # Ceiling division
+                preview_items = stream_page["items"]
+                total_items = stream_page["total"]
                 preview_data.update({
+                    "layout": stream_page["layout"],
                     "items": preview_items,
                     "total_items_in_preview": len(preview_items),
-                    "estimated_total_items": len(data),
-                    "is_sample": len(data) > rows,
+                    "estimated_total_items": total_items,
+                    "is_sample": total_items > rows,
                     "sample_info": {
                         "method": "slice",
                         "items_requested": rows,
@@ -433,19 +474,21 @@ class PreviewService:
             }
             
             try:
-                import fitz  # PyMuPDF
-                doc = fitz.open(file_path)
+                from app.services.pdf_processing import pdf_processing_service
+                
+                # Page text comes from the cached per-page index; only the requested pages are read
+                info = await pdf_processing_service.ensure_text_index(str(file_path))
+                total_pages = info["page_count"]
                 
                 preview_data.update({
-                    "page_count": len(doc),
+                    "page_count": total_pages,
                     "pages": []
                 })
                 
                 # Extract text from pages with pagination support
-                total_pages = len(doc)
                 start_page = (page - 1) * rows if page > 1 else 0
                 end_page = min(start_page + rows, total_pages)
-                pages_to_preview = end_page - start_page
+                pages_to_preview = max(end_page - start_page, 0)
                 
                 # Add pagination info
                 preview_data["pagination"] = {
@@ -455,21 +498,19 @@ class PreviewService:
                     "total_document_pages": total_pages
                 }
                 
-                for page_num in range(start_page, end_page):
-                    page = doc.load_page(page_num)
-                    text = page.get_text()
+                pages = await asyncio.to_thread(pdf_processing_service.read_pages, str(file_path), start_page, end_page) if pages_to_preview else []
+                for indexed_page in pages:
+                    text = indexed_page["text"]
                     
                     page_preview = {
-                        "page_number": page_num + 1,
+                        "page_number": indexed_page["page_number"],
                         "text_content": text[:500] + "..." if len(text) > 500 else text,
                         "has_text": bool(text.strip()),
-                        "char_count": len(text)
+                        "char_count": indexed_page["char_count"]
                     }
                     
                     preview_data["pages"].append(page_preview)
                 
-                doc.close()
-                
                 # Summary
                 total_text = sum(len(page.get("text_content", "")) for page in preview_data["pages"])
                 preview_data["summary"] = {
@@ -0,0 +1,456 @@
+"""
+Proxy Connection Pool Service
+Keeps a bounded pool of upstream database connections per ProxyConnector so proxied
+queries reuse warm connections instead of opening one per request. The drivers are
+blocking, so connecting, pinging and querying run on a dedicated thread pool and
+never stall the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Callable, Tuple, List
+import functools
+import logging
+
+# Optional driver imports
+try:
+    import mysql.connector
+    MYSQL_AVAILABLE = True
+except ImportError:
+    MYSQL_AVAILABLE = False
+
+try:
+    import psycopg2
+    POSTGRESQL_AVAILABLE = True
+except ImportError:
+    POSTGRESQL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection can no longer be trusted; anything else (a bad query,
+# a constraint violation) has already been rolled back and the connection is reusable
+BASE_CONNECTION_ERRORS: Tuple[type, ...] = (ConnectionError, OSError)
+DRIVER_CONNECTION_ERRORS: Dict[str, Tuple[type, ...]] = {
+    "mysql": (
+        (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)
+        if MYSQL_AVAILABLE else ()
+    ),
+    "postgresql": (psycopg2.OperationalError, psycopg2.InterfaceError) if POSTGRESQL_AVAILABLE else (),
+}
+
+
+class _PooledConnection:
+    """A driver connection with the timestamps the pool needs"""
+
+    __slots__ = ("conn", "created_at", "last_used", "last_checked")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        self.last_checked = now
+
+
+class ConnectionPool:
+    """
+    Bounded pool of blocking database connections
+
+    Idle connections are reused most-recently-used first, closed once they have
+    been idle longer than idle_timeout, and pinged before reuse when they have not
+    been checked for health_check_interval seconds. At most max_size connections
+    are open at once; further callers wait for one to be released. A connection is
+    discarded when its borrower fails with one of connection_errors (or is cancelled
+    mid-call); other errors return it to the pool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Any],
+        ping: Callable[[Any], None],
+        executor: ThreadPoolExecutor,
+        max_size: int = 5,
+        idle_timeout: float = 300.0,
+        health_check_interval: float = 30.0,
+        connection_errors: Tuple[type, ...] = ()
+    ):
+        self.name = name
+        self._connect = connect
+        self._ping = ping
+        self._executor = executor
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.connection_errors = BASE_CONNECTION_ERRORS + tuple(connection_errors)
+
+        self._idle: deque = deque()
+        self._closed = False
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._open = 0
+        self.last_used = time.monotonic()
+        self.stats = {
+            "created": 0,
+            "reused": 0,
+            "evicted": 0,
+            "discarded": 0,
+            "health_check_failures": 0,
+            "waits": 0,
+            "wait_time_ms": 0.0,
+            "errors": 0
+        }
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def _close(self, pooled: _PooledConnection) -> None:
+        self._open -= 1
+        try:
+            await self._run(pooled.conn.close)
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection for {self.name}: {e}")
+
+    async def _checkout(self) -> _PooledConnection:
+        while self._idle:
+            pooled = self._idle.pop()
+            now = time.monotonic()
+            if now - pooled.last_used > self.idle_timeout:
+                self.stats["evicted"] += 1
+                await self._close(pooled)
+                continue
+            if now - pooled.last_checked > self.health_check_interval:
+                try:
+                    await self._run(self._ping, pooled.conn)
+                    pooled.last_checked = now
+                except Exception as e:
+                    logger.info(f"Dropping unhealthy pooled connection for {self.name}: {e}")
+                    self.stats["health_check_failures"] += 1
+                    await self._close(pooled)
+                    continue
+            self.stats["reused"] += 1
+            return pooled
+
+        conn = await self._run(self._connect)
+        self._open += 1
+        self.stats["created"] += 1
+        return _PooledConnection(conn)
+
+    def _is_broken(self, error: BaseException) -> bool:
+        # Cancellation leaves the driver call running on its thread, so the connection is still busy
+        return not isinstance(error, Exception) or isinstance(error, self.connection_errors)
+
+    async def _release(self, pooled: _PooledConnection) -> None:
+        if self._closed:
+            # Borrowed from a pool that has since been retired
+            await self._close(pooled)
+            return
+        pooled.last_used = self.last_used = time.monotonic()
+        self._idle.append(pooled)
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a connection; it is discarded on connection errors and returned otherwise"""
+        started = time.monotonic()
+        if self._semaphore.locked():
+            self.stats["waits"] += 1
+        async with self._semaphore:
+            self.stats["wait_time_ms"] += (time.monotonic() - started) * 1000
+            pooled = await self._checkout()
+            try:
+                yield pooled.conn
+            except BaseException as e:
+                self.stats["errors"] += 1
+                if self._is_broken(e):
+                    self.stats["discarded"] += 1
+                    await self._close(pooled)
+                else:
+                    await self._release(pooled)
+                raise
+            else:
+                await self._release(pooled)
+
+    async def evict_idle(self) -> int:
+        """Close connections that have been idle longer than idle_timeout"""
+        now = time.monotonic()
+        expired = [pooled for pooled in self._idle if now - pooled.last_used > self.idle_timeout]
+        for pooled in expired:
+            self._idle.remove(pooled)
+            self.stats["evicted"] += 1
+            await self._close(pooled)
+        return len(expired)
+
+    async def close(self) -> None:
+        """Close every idle connection; borrowed ones are closed when they are released"""
+        self._closed = True
+        while self._idle:
+            await self._close(self._idle.pop())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "max_size": self.max_size,
+            "open": self._open,
+            "idle": len(self._idle),
+            "in_use": self._open - len(self._idle),
+            **self.stats,
+            "wait_time_ms": round(self.stats["wait_time_ms"], 2)
+        }
+
+
+def _load_json(value) -> Dict[str, Any]:
+    if isinstance(value, str):
+        return json.loads(value)
+    return value or {}
+
+
+def _mysql_connect_kwargs(real_config: Dict[str, Any], real_credentials: Dict[str, Any]) -> Dict[str, Any]:
+    from app.core.config import settings
+    from app.core.app_config import get_app_config
+
+    host = real_config.get('host', 'localhost')
+    port = real_config.get('port', 3306)
+    ssl_config = settings.get_ssl_config_for_connector('mysql', host, port, real_config)
+    return {
+        'host': host,
+        'port': port,
+        'user': real_credentials.get('username'),
+        'password': real_credentials.get('password'),
+        'database': real_config.get('database'),
+        'connect_timeout': get_app_config().integrations.CONNECTOR_CONNECTION_TIMEOUT,
+        'ssl_disabled': ssl_config.get('ssl_disabled', False)
+    }
+
+
+def _postgresql_connect_kwargs(real_config: Dict[str, Any], real_credentials: Dict[str, Any]) -> Dict[str, Any]:
+    from app.core.config import settings
+    from app.core.app_config import get_app_config
+
+    host = real_config.get('host', 'localhost')
+    port = real_config.get('port', 5432)
+    ssl_config = settings.get_ssl_config_for_connector('postgresql', host, port, real_config)
+    return {
+        'host': host,
+        'port': port,
+        'user': real_credentials.get('username'),
+        'password': real_credentials.get('password'),
+        'database': real_config.get('database'),
+        'connect_timeout': get_app_config().integrations.CONNECTOR_CONNECTION_TIMEOUT,
+        'sslmode': ssl_config.get('sslmode', 'prefer')
+    }
+
+
+def _mysql_connect(kwargs: Dict[str, Any]):
+    if not MYSQL_AVAILABLE:
+        raise RuntimeError("mysql-connector-python not installed")
+    return mysql.connector.connect(**kwargs)
+
+
+def _postgresql_connect(kwargs: Dict[str, Any]):
+    if not POSTGRESQL_AVAILABLE:
+        raise RuntimeError("psycopg2 not installed")
+    return psycopg2.connect(**kwargs)
+
+
+def _mysql_ping(conn) -> None:
+    conn.ping(reconnect=False)
+
+
+def _postgresql_ping(conn) -> None:
+    if conn.closed:
+        raise ConnectionError("connection closed")
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    conn.rollback()
+
+
+def _execute_query(conn, query: str, dictionary: bool) -> Tuple[List[Any], List[str]]:
+    """Run one query on a borrowed connection and leave it outside any transaction"""
+    cursor = conn.cursor(dictionary=True) if dictionary else conn.cursor()
+    try:
+        cursor.execute(query)
+        if query.strip().upper().startswith('SELECT'):
+            results = cursor.fetchall()
+            columns = [desc[0] for desc in cursor.description]
+            # End the read transaction so the next borrower sees fresh data
+            conn.rollback()
+        else:
+            results = []
+            columns = []
+            conn.commit()
+        return results, columns
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+class ProxyConnectionPoolRegistry:
+    """Registry of connection pools, one per ProxyConnector and driver"""
+
+    DRIVERS = {
+        "mysql": (_mysql_connect_kwargs, _mysql_connect, _mysql_ping, True),
+        "postgresql": (_postgresql_connect_kwargs, _postgresql_connect, _postgresql_ping, False),
+    }
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        health_check_interval: Optional[float] = None,
+        max_workers: Optional[int] = None
+    ):
+        self.max_size = max_size or int(os.getenv("PROXY_POOL_MAX_SIZE", "5"))
+        self.idle_timeout = idle_timeout or float(os.getenv("PROXY_POOL_IDLE_TIMEOUT", "300"))
+        self.health_check_interval = health_check_interval or float(os.getenv("PROXY_POOL_HEALTH_CHECK_INTERVAL", "30"))
+        self.max_workers = max_workers or int(os.getenv("PROXY_POOL_MAX_WORKERS", "32"))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="proxy-db")
+        self._pools: Dict[Tuple[Any, str], Tuple[str, ConnectionPool]] = {}
+        self._pools_lock = asyncio.Lock()
+        self._reaper: Optional[asyncio.Task] = None
+
+    def _fingerprint(self, proxy_connector) -> str:
+        """Hash of the upstream config, so edited connectors get a fresh pool"""
+        raw = f"{proxy_connector.real_connection_config}|{proxy_connector.real_credentials}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            try:
+                self._reaper = asyncio.get_running_loop().create_task(self._reap())
+            except RuntimeError:
+                pass
+
+    async def _reap(self) -> None:
+        interval = max(self.idle_timeout / 2, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.warning(f"Proxy pool eviction failed: {e}")
+
+    async def get_pool(self, proxy_connector, driver: str) -> ConnectionPool:
+        """Get or create the pool for a connector, replacing it if its config changed"""
+        if driver not in self.DRIVERS:
+            raise ValueError(f"Unsupported pooled driver: {driver}")
+
+        key = (proxy_connector.id, driver)
+        fingerprint = self._fingerprint(proxy_connector)
+        entry = self._pools.get(key)
+        if entry and entry[0] == fingerprint:
+            return entry[1]
+
+        # Concurrent requests for a new or edited connector must agree on one pool
+        async with self._pools_lock:
+            entry = self._pools.get(key)
+            if entry and entry[0] == fingerprint:
+                return entry[1]
+
+            kwargs_for, connect, ping, _ = self.DRIVERS[driver]
+            connect_kwargs = kwargs_for(
+                _load_json(proxy_connector.real_connection_config),
+                _load_json(proxy_connector.real_credentials)
+            )
+            pool = ConnectionPool(
+                name=f"{driver}:{proxy_connector.name}",
+                connect=functools.partial(connect, connect_kwargs),
+                ping=ping,
+                executor=self._executor,
+                max_size=self.max_size,
+                idle_timeout=self.idle_timeout,
+                health_check_interval=self.health_check_interval,
+                connection_errors=DRIVER_CONNECTION_ERRORS.get(driver, ())
+            )
+            self._pools[key] = (fingerprint, pool)
+
+            if entry:
+                logger.info(f"🔄 Connection config changed for proxy connector {proxy_connector.id}, recycling {driver} pool")
+                # Borrowed connections of the retired pool are closed as they come back
+                await entry[1].close()
+
+        self._ensure_reaper()
+        logger.info(f"🏊 Created {driver} connection pool for proxy connector {proxy_connector.name} (max {self.max_size})")
+        return pool
+
+    async def execute_query(self, proxy_connector, driver: str, query: str) -> Dict[str, Any]:
+        """
+        Run a query through the connector's pool
+
+        Args:
+            proxy_connector: ProxyConnector holding the upstream config and credentials
+            driver: "mysql" or "postgresql"
+            query: SQL to run
+
+        Returns:
+            Dict with data, columns and row_count
+        """
+        pool = await self.get_pool(proxy_connector, driver)
+        dictionary = self.DRIVERS[driver][3]
+        async with pool.connection() as conn:
+            loop = asyncio.get_running_loop()
+            results, columns = await loop.run_in_executor(
+                self._executor, functools.partial(_execute_query, conn, query, dictionary)
+            )
+        return {
+            "status": "success",
+            "data": results,
+            "columns": columns,
+            "row_count": len(results)
+        }
+
+    async def evict_idle(self) -> int:
+        """Close idle connections past their timeout and drop pools left empty"""
+        evicted = 0
+        for key, entry in list(self._pools.items()):
+            pool = entry[1]
+            evicted += await pool.evict_idle()
+            # The pool may have been replaced while evicting
+            if (self._pools.get(key) is entry and pool.get_metrics()["open"] == 0
+                    and time.monotonic() - pool.last_used > self.idle_timeout):
+                del self._pools[key]
+        if evicted:
+            logger.info(f"🧹 Evicted {evicted} idle proxy database connections")
+        return evicted
+
+    async def close_all(self) -> None:
+        """Close every pool and stop the eviction task"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        pools = [pool for _, pool in self._pools.values()]
+        self._pools.clear()
+        for pool in pools:
+            await pool.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-pool and aggregate metrics for health endpoints"""
+        pools = {}
+        totals = {"pools": 0, "open": 0, "idle": 0, "in_use": 0, "created": 0, "reused": 0}
+        for (connector_id, driver), (_, pool) in self._pools.items():
+            metrics = pool.get_metrics()
+            pools[f"{driver}:{connector_id}"] = {"name": pool.name, **metrics}
+            totals["pools"] += 1
+            for field in ("open", "idle", "in_use", "created", "reused"):
+                totals[field] += metrics[field]
+        return {
+            "config": {
+                "max_size": self.max_size,
+                "idle_timeout": self.idle_timeout,
+                "health_check_interval": self.health_check_interval,
+                "max_workers": self.max_workers
+            },
+            "totals": totals,
+            "pools": pools
+        }
+
+
+# Global instance
+proxy_connection_pools = ProxyConnectionPoolRegistry()
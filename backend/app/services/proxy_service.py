@@ -19,6 +19,8 @@ from app.models.proxy_connector import ProxyConnector, SharedProxyLink, ProxyAcc
 from app.models.user import User
 from app.core.database import get_db
 from app.services.mindsdb import MindsDBService
+from app.services.http_client_pool import http_client_pool
+from app.services.api_response_cache import api_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -298,7 +300,8 @@ class APIGatewayService:
         start_time = datetime.utcnow()
         try:
             result = await self._execute_gateway_api_request(
-                real_config, real_credentials, method, request_path, headers, params, data
+                real_config, real_credentials, method, request_path, headers, params, data,
+                connector_id=gateway_connector.id
             )
             
             status_code = result.get("status_code", 200)
@@ -364,9 +367,10 @@ class APIGatewayService:
         request_path: str,
         headers: Dict[str, str],
         params: Dict[str, Any],
-        data: Optional[Dict[str, Any]]
+        data: Optional[Dict[str, Any]],
+        connector_id: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Execute API request through gateway"""
+        """Execute API request through gateway (GETs are served through the response cache)"""
         
         base_url = config.get("base_url")
         if not base_url:
@@ -403,41 +407,54 @@ class APIGatewayService:
         
         # Execute request
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.request(
+            client = http_client_pool.get_client(full_url)
+            
+            async def fetch_upstream(conditional_headers: Dict[str, str]):
+                return await client.request(
                     method=method.upper(),
                     url=full_url,
-                    headers=request_headers,
+                    headers={**request_headers, **conditional_headers},
                     params=params,
                     json=data if data and method.upper() in ["POST", "PUT", "PATCH"] else None,
                     timeout=30.0
                 )
-                
-                # Handle response content
-                content_type = response.headers.get("content-type", "").lower()
-                
-                if "application/json" in content_type:
-                    try:
-                        response_data = response.json()
-                    except Exception:
-                        response_data = response.text
-                elif "text/" in content_type:
+            
+            if method.upper() == "GET" and connector_id is not None:
+                response = await api_response_cache.fetch(
+                    api_response_cache.build_key(
+                        connector_id, config, full_url, params, vary=headers, credentials=credentials
+                    ),
+                    api_response_cache.ttl_for(config),
+                    fetch_upstream
+                )
+            else:
+                response = await fetch_upstream({})
+            
+            # Handle response content
+            content_type = response.headers.get("content-type", "").lower()
+            
+            if "application/json" in content_type:
+                try:
+                    response_data = response.json()
+                except Exception:
                     response_data = response.text
-                else:
-                    response_data = f"<binary data: {len(response.content)} bytes>"
-                
-                return {
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                    "data": response_data,
-                    "success": 200 <= response.status_code < 300,
-                    "gateway_info": {
-                        "request_url": full_url,
-                        "method": method.upper(),
-                        "response_size": len(response.content)
-                    }
+            elif "text/" in content_type:
+                response_data = response.text
+            else:
+                response_data = f"<binary data: {len(response.content)} bytes>"
+            
+            return {
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "data": response_data,
+                "success": 200 <= response.status_code < 300,
+                "gateway_info": {
+                    "request_url": full_url,
+                    "method": method.upper(),
+                    "response_size": len(response.content)
                 }
-                
+            }
+            
         except httpx.TimeoutException:
             raise HTTPException(
                 status_code=status.HTTP_408_REQUEST_TIMEOUT,
@@ -794,36 +811,36 @@ class ProxyService(APIGatewayService):
         
         # Make request with proper error handling
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.request(
-                    method=method,
-                    url=f"{base_url.rstrip('/')}/{endpoint.lstrip('/')}",
-                    headers=headers,
-                    params=params,
-                    json=data if data and method in ["POST", "PUT", "PATCH"] else None,
-                    timeout=30.0
-                )
-                
-                # Handle response content type
-                content_type = response.headers.get("content-type", "").lower()
-                
-                if "application/json" in content_type:
-                    try:
-                        response_data = response.json()
-                    except Exception:
-                        response_data = response.text
-                elif "text/" in content_type:
+            client = http_client_pool.get_client(base_url)
+            response = await client.request(
+                method=method,
+                url=f"{base_url.rstrip('/')}/{endpoint.lstrip('/')}",
+                headers=headers,
+                params=params,
+                json=data if data and method in ["POST", "PUT", "PATCH"] else None,
+                timeout=30.0
+            )
+            
+            # Handle response content type
+            content_type = response.headers.get("content-type", "").lower()
+            
+            if "application/json" in content_type:
+                try:
+                    response_data = response.json()
+                except Exception:
                     response_data = response.text
-                else:
-                    response_data = response.content.hex()
-                
-                return {
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                    "data": response_data,
-                    "success": 200 <= response.status_code < 300
-                }
-                
+            elif "text/" in content_type:
+                response_data = response.text
+            else:
+                response_data = response.content.hex()
+            
+            return {
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "data": response_data,
+                "success": 200 <= response.status_code < 300
+            }
+            
         except httpx.TimeoutException:
             raise HTTPException(
                 status_code=status.HTTP_408_REQUEST_TIMEOUT,
@@ -856,17 +873,20 @@ class ProxyService(APIGatewayService):
                 detail="Query is required for database operations"
             )
         
-        # Build connection parameters
-        connection_params = {**config, **credentials}
-        
-        # Execute query through MindsDB
+        # Execute query through MindsDB, where the connector's database is registered
+        # as an integration; config and credentials stay out of the query cache key
         try:
-            result = self.mindsdb_service.execute_query(query, connection_params)
+            result = self.mindsdb_service.execute_query(query)
+            if result.get("status") != "success":
+                return {
+                    "status": "error",
+                    "error": result.get("error", "Query failed")
+                }
             return {
                 "status": "success",
-                "data": result.get("data", []),
+                "data": result.get("rows", []),
                 "columns": result.get("columns", []),
-                "row_count": len(result.get("data", []))
+                "row_count": len(result.get("rows", []))
             }
         except Exception as e:
             logger.error(f"Database query failed: {e}")
@@ -891,14 +911,14 @@ class ProxyService(APIGatewayService):
             )
         
         # Fetch content from target URL
-        async with httpx.AsyncClient() as client:
-            response = await client.get(target_url, timeout=30.0)
-            
-            return {
-                "status_code": response.status_code,
-                "content_type": response.headers.get("content-type"),
-                "content": response.text if response.headers.get("content-type", "").startswith("text/") else response.content.hex()
-            }
+        client = http_client_pool.get_client(target_url)
+        response = await client.get(target_url, timeout=30.0)
+        
+        return {
+            "status_code": response.status_code,
+            "content_type": response.headers.get("content-type"),
+            "content": response.text if response.headers.get("content-type", "").startswith("text/") else response.content.hex()
+        }
     
     async def _log_proxy_access(
         self,
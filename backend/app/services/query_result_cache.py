@@ -0,0 +1,215 @@
+"""
+Query Result Cache Service
+Caches the converted results of read-only MindsDB queries so dashboards that
+repeat the same SQL are answered without a round trip to MindsDB or another
+DataFrame-to-records conversion.
+
+Entries are keyed by normalized SQL plus the scope (dataset) and version the
+query ran against, expire after a TTL chosen by the dataset's source type, and
+live in an LRU bounded by total pickled size. Editing or reuploading a dataset
+invalidates its scope; any write statement run through the service drops the
+unscoped entries.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Scope of queries not tied to a dataset
+UNSCOPED = "sql"
+
+# Statements whose results may be cached
+_READ_ONLY = re.compile(r"^\s*(\(\s*)*(select|with)\b", re.IGNORECASE)
+# Quoted literals/identifiers, runs of whitespace, and trailing semicolons
+_SQL_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`)|(\s+)|;+\s*$")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and drop trailing semicolons, leaving quoted text untouched"""
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+        return " " if match.group(2) else ""
+    return _SQL_TOKENS.sub(replace, sql.strip()).strip()
+
+
+def is_cacheable(sql: str) -> bool:
+    """Only SELECT / WITH queries are cached; everything else may change state"""
+    return bool(_READ_ONLY.match(sql))
+
+
+class _CacheEntry:
+    __slots__ = ("payload", "expires_at", "size")
+
+    def __init__(self, payload: bytes, ttl: float):
+        self.payload = payload
+        self.expires_at = time.monotonic() + ttl
+        self.size = len(payload)
+
+
+class QueryResultCache:
+    """Byte-bounded LRU cache of MindsDB query results with per-source TTLs"""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_entry_bytes: Optional[int] = None,
+        ttls: Optional[Dict[str, float]] = None
+    ):
+        self.max_bytes = max_bytes or int(os.getenv("QUERY_CACHE_MAX_MB", "64")) * 1024 * 1024
+        self.max_entry_bytes = max_entry_bytes or int(os.getenv("QUERY_CACHE_MAX_ENTRY_MB", "4")) * 1024 * 1024
+        self.ttls = ttls or {
+            "file": float(os.getenv("QUERY_CACHE_FILE_TTL", "3600")),
+            "connector": float(os.getenv("QUERY_CACHE_CONNECTOR_TTL", "120")),
+            "web": float(os.getenv("QUERY_CACHE_WEB_TTL", "30")),
+            UNSCOPED: float(os.getenv("QUERY_CACHE_DEFAULT_TTL", "60"))
+        }
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "bypassed": 0
+        }
+
+    @staticmethod
+    def source_type(dataset) -> str:
+        """Freshness class of a dataset: live web APIs, database connectors or uploaded files"""
+        dataset_type = getattr(getattr(dataset, "type", None), "value", getattr(dataset, "type", None))
+        if dataset_type == "api":
+            return "web"
+        if dataset_type in ("database", "s3_bucket") or getattr(dataset, "connector_id", None):
+            return "connector"
+        return "file"
+
+    def context_for_dataset(self, dataset) -> Dict[str, Any]:
+        """
+        Cache context for queries against a dataset
+
+        Read it on the request side (the ORM object may not be usable on MindsDB
+        worker threads) and pass it to MindsDBService.execute_query / query_dataset.
+        """
+        updated_at = getattr(dataset, "updated_at", None)
+        version = json.dumps(
+            [updated_at.isoformat() if updated_at else None, getattr(dataset, "file_path", None)],
+            separators=(",", ":")
+        )
+        source_type = self.source_type(dataset)
+        return {
+            "scope": f"dataset:{dataset.id}",
+            "version": version,
+            "ttl": self.ttls.get(source_type, self.ttls[UNSCOPED])
+        }
+
+    @staticmethod
+    def build_key(sql: str, scope: str = UNSCOPED, version: Optional[str] = None) -> str:
+        raw = json.dumps([version, normalize_sql(sql)], separators=(",", ":"))
+        return f"{scope}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def get(self, key: str) -> Optional[Any]:
+        """A fresh copy of the cached result, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            payload = entry.payload
+        return pickle.loads(payload)
+
+    def set(self, key: str, result: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remove(key)
+            if len(payload) > self.max_entry_bytes:
+                self.stats["bypassed"] += 1
+                return
+            entry = _CacheEntry(payload, ttl)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self.stats["stores"] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.stats["evictions"] += 1
+
+    def lookup(self, sql: str, context: Optional[Dict[str, Any]] = None):
+        """
+        Resolve the cache key and TTL of a query
+
+        Returns:
+            (key, ttl), or (None, 0) when the query must not be cached
+        """
+        if not is_cacheable(sql):
+            self.stats["bypassed"] += 1
+            return None, 0
+        context = context or {}
+        ttl = context.get("ttl", self.ttls[UNSCOPED])
+        if ttl <= 0:
+            self.stats["bypassed"] += 1
+            return None, 0
+        return self.build_key(sql, context.get("scope", UNSCOPED), context.get("version")), ttl
+
+    def invalidate_scope(self, scope: str) -> int:
+        """Drop every cached result of a scope"""
+        prefix = f"{scope}:"
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            self.stats["invalidations"] += 1
+        if keys:
+            logger.info(f"🗑️ Invalidated {len(keys)} cached query results for {scope}")
+        return len(keys)
+
+    def invalidate_dataset(self, dataset_id: Any) -> int:
+        return self.invalidate_scope(f"dataset:{dataset_id}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttls": dict(self.ttls),
+                "hit_ratio": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+                **self.stats
+            }
+
+
+# Global instance
+query_result_cache = QueryResultCache()
@@ -8,13 +8,23 @@ import hashlib
 import uuid
 import secrets
 import mimetypes
-from typing import Dict, Any, Optional, BinaryIO, AsyncGenerator
-from datetime import datetime, timedelta
+import shutil
+from stat import S_ISREG
+from typing import Dict, Any, Optional, BinaryIO, AsyncGenerator, List, Tuple, Mapping
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
 import logging
 from fastapi import UploadFile, HTTPException, status
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import Response, StreamingResponse, FileResponse
+from starlette.datastructures import Headers
 import aiofiles
 import asyncio
+import functools
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 # Optional S3 imports
 try:
@@ -26,21 +36,384 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Derived artefacts stored next to a dataset file, keyed by kind.
+# A sidecar lives at "<dataset file path><suffix>" in the same backend.
+SIDECAR_SUFFIXES = {
+    "columnar": ".columnar.parquet",
+    "row_index": ".rowindex.json",
+    "pdf_text": ".pdftext.parquet",
+}
+
+# Size of the reads used to stream uploads from the request to storage
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Objects per listing page / batch delete (S3 DeleteObjects accepts at most 1000 keys)
+LIST_PAGE_SIZE = 1000
+
+# Objects staged by resumable upload sessions; they expire with their session, so
+# the orphan sweep leaves them alone
+UPLOAD_STAGING_PREFIX = "upload-sessions/"
+
+# Local snapshots of connector-backed datasets (<prefix><connector_id>/<dataset_id>)
+CONNECTOR_SNAPSHOT_PREFIX = "connector-snapshots/"
+
+# Image preview renditions (<prefix><source sha256>/<name>.<ext>)
+RENDITION_PREFIX = "renditions/"
+
+
+class StatCache:
+    """
+    Short-TTL cache of file metadata lookups, keyed by storage path
+    
+    Misses (None) are cached for a shorter time than hits so a file that appears
+    shortly after a failed check is picked up quickly.
+    """
+    
+    def __init__(self, ttl: Optional[float] = None, negative_ttl: Optional[float] = None, max_entries: int = 10000):
+        self.ttl = ttl if ttl is not None else float(os.getenv("STORAGE_STAT_CACHE_TTL", "30"))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else float(os.getenv("STORAGE_STAT_CACHE_NEGATIVE_TTL", "5"))
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+    
+    def get(self, file_path: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return (found, info) for a cached lookup"""
+        entry = self._entries.get(file_path)
+        if entry is None or entry[0] <= time.monotonic():
+            self.stats["misses"] += 1
+            return False, None
+        self._entries.move_to_end(file_path)
+        self.stats["hits"] += 1
+        return True, entry[1]
+    
+    def put(self, file_path: str, info: Optional[Dict[str, Any]]) -> None:
+        ttl = self.ttl if info is not None else self.negative_ttl
+        if ttl <= 0:
+            return
+        self._entries[file_path] = (time.monotonic() + ttl, info)
+        self._entries.move_to_end(file_path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, file_path: str) -> None:
+        self._entries.pop(file_path, None)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "ttl": self.ttl, "negative_ttl": self.negative_ttl, **self.stats}
+
+def parse_range_header(range_header: Optional[str], file_size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parse an HTTP Range header into a list of inclusive (start, end) byte ranges
+    
+    Returns None when the header is absent or malformed (serve the full file).
+    Raises HTTPException 416 when no requested range overlaps the file.
+    Overlapping or adjacent ranges are coalesced.
+    """
+    if not range_header or not range_header.strip().lower().startswith("bytes="):
+        return None
+    
+    ranges = []
+    try:
+        for part in range_header.split("=", 1)[1].split(","):
+            part = part.strip()
+            if not part:
+                continue
+            start_str, end_str = part.split("-", 1)
+            if not start_str:
+                # Suffix range: last N bytes
+                length = int(end_str)
+                if length <= 0:
+                    continue
+                start, end = max(0, file_size - length), file_size - 1
+            else:
+                start = int(start_str)
+                end = int(end_str) if end_str else file_size - 1
+                if end < start:
+                    return None
+                end = min(end, file_size - 1)
+            if start < file_size:
+                ranges.append((start, end))
+    except ValueError:
+        return None
+    
+    if not ranges:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail={"error_code": "RANGE_NOT_SATISFIABLE", "message": "Requested range not satisfiable"},
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def is_not_modified(
+    request_headers: Optional[Mapping[str, str]],
+    etag: Optional[str],
+    last_modified: Optional[datetime]
+) -> bool:
+    """
+    Evaluate a conditional GET against a file's validators
+    
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2);
+    ETags are compared weakly, as required for If-None-Match.
+    """
+    if not request_headers:
+        return False
+    
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        if not etag:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+    
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(etag: Optional[str], last_modified: Optional[datetime]) -> Response:
+    """Empty 304 response repeating the file's validators"""
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = formatdate(last_modified.timestamp(), usegmt=True)
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+class LocalFileResponse(FileResponse):
+    """
+    FileResponse for local storage files
+    
+    When the ASGI server supports the pathsend extension, only the path is handed
+    over and the server sends the file itself (sendfile), so the bytes never pass
+    through Python. Otherwise the file is streamed from a worker thread in large
+    chunks.
+    """
+    
+    chunk_size = UPLOAD_CHUNK_SIZE
+    
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            "http.response.pathsend" in scope.get("extensions", {})
+            and scope["method"].upper() == "GET"
+            and self.stat_result is not None
+            and "range" not in Headers(scope=scope)
+        ):
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            if self.background is not None:
+                await self.background()
+            return
+        await super().__call__(scope, receive, send)
+
+
 class BaseStorageBackend:
     """Base class for storage backends"""
     
     async def store_file(self, file_content: bytes, file_path: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError
     
+    async def store_stream(self, read_chunk, file_path: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a file from an async chunk reader
+        
+        Args:
+            read_chunk: Async callable returning the next chunk (b"" when done)
+            file_path: Storage path of the file
+            metadata: File metadata
+        
+        The default buffers the chunks; backends override it to stream.
+        """
+        chunks = []
+        while chunk := await read_chunk():
+            chunks.append(chunk)
+        return await self.store_file(b"".join(chunks), file_path, metadata)
+    
     async def retrieve_file(self, file_path: str) -> Optional[bytes]:
         raise NotImplementedError
     
     async def delete_file(self, file_path: str) -> bool:
         raise NotImplementedError
     
-    async def get_file_stream(self, file_path: str) -> StreamingResponse:
+    async def get_file_stream(
+        self,
+        file_path: str,
+        request_headers: Optional[Mapping[str, str]] = None,
+        etag: Optional[str] = None
+    ) -> Response:
+        """
+        Get a response serving a stored file
+        
+        Args:
+            file_path: Storage path of the file
+            request_headers: Request headers; conditional requests are answered with 304
+            etag: Strong ETag to use instead of the backend's own validator
+        """
+        raise NotImplementedError
+    
+    async def stat(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get size, content type, last modified time and ETag of a stored file (None if missing)"""
+        raise NotImplementedError
+    
+    async def head(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Metadata-only lookup of a stored file, without reading its content"""
+        return await self.stat(file_path)
+    
+    async def exists(self, file_path: str) -> bool:
+        """Check whether a stored file exists, without reading its content"""
+        return await self.stat(file_path) is not None
+    
+    def iter_file_range(self, file_path: str, start: int, end: int) -> AsyncGenerator[bytes, None]:
+        """Stream the inclusive byte range [start, end] of a stored file"""
+        raise NotImplementedError
+    
+    def list_files(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        page_size: int = LIST_PAGE_SIZE
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """
+        List stored files in pages of {"path", "size", "last_modified"} dicts
+        
+        Files are listed in a stable order so a listing can be resumed after the
+        last path seen via start_after.
+        """
         raise NotImplementedError
     
+    async def delete_files(self, file_paths: List[str]) -> Dict[str, Any]:
+        """
+        Delete several files
+        
+        Returns:
+            {"deleted": [paths], "errors": [{"path", "error"}]}
+        """
+        result = {"deleted": [], "errors": []}
+        for file_path in file_paths:
+            if await self.delete_file(file_path):
+                result["deleted"].append(file_path)
+            else:
+                result["errors"].append({"path": file_path, "error": "delete failed"})
+        return result
+
+    async def move_file(self, source_path: str, destination_path: str) -> None:
+        """Move a stored file to another path within the backend"""
+        raise NotImplementedError
+
+    async def create_multipart_upload(self, file_path: str, metadata: Dict[str, Any]) -> str:
+        """
+        Start a multipart upload whose parts can arrive in any order
+
+        Returns:
+            Upload id to pass to the other multipart calls
+        """
+        raise NotImplementedError
+
+    async def upload_part(self, file_path: str, upload_id: str, part_number: int, body: bytes) -> Dict[str, Any]:
+        """
+        Store one part (numbered from 1) of a multipart upload; re-uploading a part replaces it
+
+        Returns:
+            {"PartNumber", "ETag", "Size"}
+        """
+        raise NotImplementedError
+
+    async def list_parts(self, file_path: str, upload_id: str) -> List[Dict[str, Any]]:
+        """List the parts received so far, as {"PartNumber", "ETag", "Size"} sorted by number"""
+        raise NotImplementedError
+
+    async def complete_multipart_upload(
+        self, file_path: str, upload_id: str, parts: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Assemble the given parts, in part number order, into the file at file_path"""
+        raise NotImplementedError
+
+    async def abort_multipart_upload(self, file_path: str, upload_id: str) -> None:
+        """Discard a multipart upload and all of its parts"""
+        raise NotImplementedError
+
+    async def get_file_range_stream(self, file_path: str, ranges: List[Tuple[int, int]]) -> StreamingResponse:
+        """Get a 206 Partial Content response for one or more byte ranges"""
+        info = await self.stat(file_path)
+        if info is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"error_code": "FILE_NOT_FOUND", "message": "File not found"}
+            )
+        
+        file_size = info["size"]
+        content_type = info["content_type"]
+        filename = os.path.basename(file_path)
+        
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            response = StreamingResponse(
+                self.iter_file_range(file_path, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=content_type
+            )
+            response.headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+            response.headers["Content-Length"] = str(end - start + 1)
+        else:
+            boundary = secrets.token_hex(16)
+            part_headers = [
+                (
+                    f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n"
+                ).encode()
+                for start, end in ranges
+            ]
+            closing = f"--{boundary}--\r\n".encode()
+            content_length = sum(
+                len(header) + (end - start + 1) + 2
+                for header, (start, end) in zip(part_headers, ranges)
+            ) + len(closing)
+            
+            async def multipart_stream():
+                for header, (start, end) in zip(part_headers, ranges):
+                    yield header
+                    async for chunk in self.iter_file_range(file_path, start, end):
+                        yield chunk
+                    yield b"\r\n"
+                yield closing
+            
+            response = StreamingResponse(
+                multipart_stream(),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=f"multipart/byteranges; boundary={boundary}"
+            )
+            response.headers["Content-Length"] = str(content_length)
+        
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response.headers["Accept-Ranges"] = "bytes"
+        return response
+    
     def get_file_url(self, file_path: str, expires_in: int = 3600) -> Optional[str]:
         """Get a temporary URL for file access (local files served via API)"""
         try:
@@ -87,6 +460,36 @@ class LocalStorageBackend(BaseStorageBackend):
             logger.error(f"Local storage failed: {str(e)}")
             raise
     
+    async def store_stream(self, read_chunk, file_path: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Stream a file to the local filesystem chunk by chunk"""
+        full_path = os.path.join(self.storage_dir, file_path)
+        tmp_path = f"{full_path}.part"
+        try:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            
+            file_size = 0
+            async with aiofiles.open(tmp_path, "wb") as f:
+                while chunk := await read_chunk():
+                    await f.write(chunk)
+                    file_size += len(chunk)
+            os.replace(tmp_path, full_path)
+            
+            logger.info(f"File streamed to local storage: {file_path}")
+            
+            return {
+                "success": True,
+                "backend": "local",
+                "file_path": file_path,
+                "full_path": full_path,
+                "file_size": file_size
+            }
+            
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            logger.error(f"Local storage failed: {str(e)}")
+            raise
+    
     async def retrieve_file(self, file_path: str) -> Optional[bytes]:
         """Retrieve file from local filesystem"""
         try:
@@ -118,34 +521,222 @@ class LocalStorageBackend(BaseStorageBackend):
             logger.error(f"Local file deletion failed: {str(e)}")
             return False
     
-    async def get_file_stream(self, file_path: str) -> StreamingResponse:
-        """Get file as streaming response from local filesystem"""
+    async def get_file_stream(
+        self,
+        file_path: str,
+        request_headers: Optional[Mapping[str, str]] = None,
+        etag: Optional[str] = None
+    ) -> Response:
+        """Serve a local file with ETag / Last-Modified, answering conditional requests with 304"""
         full_path = os.path.join(self.storage_dir, file_path)
         
-        if not os.path.exists(full_path):
+        try:
+            stat_result = os.stat(full_path)
+        except OSError:
+            stat_result = None
+        if stat_result is None or not S_ISREG(stat_result.st_mode):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail={"error_code": "FILE_NOT_FOUND", "message": "File not found"}
             )
         
-        # Get file info
-        file_size = os.path.getsize(full_path)
-        filename = os.path.basename(full_path)
+        etag = etag or self._stat_etag(stat_result)
+        last_modified = datetime.utcfromtimestamp(stat_result.st_mtime)
+        if is_not_modified(request_headers, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        content_type, _ = mimetypes.guess_type(full_path)
+        return LocalFileResponse(
+            full_path,
+            stat_result=stat_result,
+            media_type=content_type or "application/octet-stream",
+            filename=os.path.basename(full_path),
+            headers={"ETag": etag}
+        )
+    
+    @staticmethod
+    def _stat_etag(stat_result: os.stat_result) -> str:
+        return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    
+    async def stat(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get size and content type of a local file"""
+        full_path = os.path.join(self.storage_dir, file_path)
+        try:
+            stat_result = os.stat(full_path)
+        except OSError:
+            return None
+        if not os.path.isfile(full_path):
+            return None
         content_type, _ = mimetypes.guess_type(full_path)
-        if not content_type:
-            content_type = "application/octet-stream"
+        return {
+            "size": stat_result.st_size,
+            "content_type": content_type or "application/octet-stream",
+            "last_modified": datetime.utcfromtimestamp(stat_result.st_mtime),
+            "etag": self._stat_etag(stat_result)
+        }
+    
+    async def iter_file_range(self, file_path: str, start: int, end: int) -> AsyncGenerator[bytes, None]:
+        """Stream a byte range of a local file by seeking to its start"""
+        full_path = os.path.join(self.storage_dir, file_path)
+        remaining = end - start + 1
+        async with aiofiles.open(full_path, "rb") as f:
+            await f.seek(start)
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    
+    def _scan_pages(self, prefix: str, start_after: Optional[str], page_size: int):
+        """
+        Depth-first os.scandir walk in sorted name order, yielding pages of files
         
-        # Stream file
-        async def file_stream():
-            async with aiofiles.open(full_path, "rb") as f:
-                while chunk := await f.read(self.chunk_size):
-                    yield chunk
+        Paths are compared component-wise, which is the order the walk produces,
+        so subtrees entirely before start_after are skipped without being read.
+        """
+        cursor = tuple(start_after.split("/")) if start_after else None
+        page = []
         
-        response = StreamingResponse(file_stream(), media_type=content_type)
-        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
-        response.headers["Content-Length"] = str(file_size)
+        def walk(directory: str, parts: Tuple[str, ...]):
+            nonlocal page
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except FileNotFoundError:
+                return
+            for entry in entries:
+                entry_parts = parts + (entry.name,)
+                if cursor is not None and entry_parts < cursor[:len(entry_parts)]:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    yield from walk(entry.path, entry_parts)
+                elif entry.is_file(follow_symlinks=False):
+                    if cursor is not None and entry_parts <= cursor:
+                        continue
+                    path = "/".join(entry_parts)
+                    if not path.startswith(prefix):
+                        continue
+                    stat_result = entry.stat(follow_symlinks=False)
+                    page.append({
+                        "path": path,
+                        "size": stat_result.st_size,
+                        "last_modified": datetime.utcfromtimestamp(stat_result.st_mtime)
+                    })
+                    if len(page) >= page_size:
+                        yield page
+                        page = []
         
-        return response
+        # Only descend into the directory holding the prefix
+        base = os.path.dirname(prefix)
+        yield from walk(os.path.join(self.storage_dir, base), tuple(base.split("/")) if base else ())
+        if page:
+            yield page
+    
+    async def list_files(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        page_size: int = LIST_PAGE_SIZE
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """List local files in pages without blocking the event loop"""
+        pages = self._scan_pages(prefix, start_after, page_size)
+        while True:
+            page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                break
+            yield page
+    
+    async def delete_files(self, file_paths: List[str]) -> Dict[str, Any]:
+        """Delete several local files in one worker thread"""
+        def remove_all():
+            result = {"deleted": [], "errors": []}
+            for file_path in file_paths:
+                try:
+                    os.remove(os.path.join(self.storage_dir, file_path))
+                    result["deleted"].append(file_path)
+                except FileNotFoundError:
+                    result["deleted"].append(file_path)
+                except OSError as e:
+                    result["errors"].append({"path": file_path, "error": str(e)})
+            return result
+        
+        return await asyncio.to_thread(remove_all)
+
+    async def move_file(self, source_path: str, destination_path: str) -> None:
+        """Move a local file (a rename within the storage directory)"""
+        destination = os.path.join(self.storage_dir, destination_path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        await asyncio.to_thread(os.replace, os.path.join(self.storage_dir, source_path), destination)
+
+    def _parts_dir(self, file_path: str, upload_id: str) -> str:
+        # Parts sit next to the target until the upload is completed or aborted
+        return os.path.join(self.storage_dir, f"{file_path}.{upload_id}.parts")
+
+    async def create_multipart_upload(self, file_path: str, metadata: Dict[str, Any]) -> str:
+        """Start a multipart upload as a directory of part files"""
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._parts_dir(file_path, upload_id))
+        return upload_id
+
+    async def upload_part(self, file_path: str, upload_id: str, part_number: int, body: bytes) -> Dict[str, Any]:
+        """Write a part file atomically, so a retried part never leaves a torn copy"""
+        parts_dir = self._parts_dir(file_path, upload_id)
+        if not os.path.isdir(parts_dir):
+            raise FileNotFoundError(f"Unknown multipart upload {upload_id}")
+        part_path = os.path.join(parts_dir, f"{part_number:05d}")
+        tmp_path = f"{part_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(body)
+            os.replace(tmp_path, part_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return {"PartNumber": part_number, "ETag": f'"{hashlib.md5(body).hexdigest()}"', "Size": len(body)}
+
+    async def list_parts(self, file_path: str, upload_id: str) -> List[Dict[str, Any]]:
+        """List part files by name; ETags are not recomputed, parts are verified on upload"""
+        parts_dir = self._parts_dir(file_path, upload_id)
+        if not os.path.isdir(parts_dir):
+            raise FileNotFoundError(f"Unknown multipart upload {upload_id}")
+        parts = []
+        with os.scandir(parts_dir) as it:
+            for entry in it:
+                if entry.name.isdigit() and entry.is_file():
+                    parts.append({"PartNumber": int(entry.name), "ETag": None, "Size": entry.stat().st_size})
+        return sorted(parts, key=lambda part: part["PartNumber"])
+
+    async def complete_multipart_upload(
+        self, file_path: str, upload_id: str, parts: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Concatenate the part files into the target and remove them"""
+        parts_dir = self._parts_dir(file_path, upload_id)
+        full_path = os.path.join(self.storage_dir, file_path)
+        tmp_path = f"{full_path}.part"
+
+        def assemble() -> int:
+            with open(tmp_path, "wb") as out:
+                for part in sorted(parts, key=lambda part: part["PartNumber"]):
+                    with open(os.path.join(parts_dir, f"{part['PartNumber']:05d}"), "rb") as f:
+                        shutil.copyfileobj(f, out, self.chunk_size)
+                size = out.tell()
+            os.replace(tmp_path, full_path)
+            shutil.rmtree(parts_dir, ignore_errors=True)
+            return size
+
+        try:
+            file_size = await asyncio.to_thread(assemble)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Multipart upload completed locally for {file_path}: {len(parts)} parts, {file_size} bytes")
+        return {"success": True, "backend": "local", "file_path": file_path, "full_path": full_path, "file_size": file_size}
+
+    async def abort_multipart_upload(self, file_path: str, upload_id: str) -> None:
+        await asyncio.to_thread(shutil.rmtree, self._parts_dir(file_path, upload_id), True)
     
     def get_file_url(self, file_path: str, expires_in: int = 3600) -> Optional[str]:
         """Generate URL for local file access via API endpoint"""
@@ -160,11 +751,22 @@ class LocalStorageBackend(BaseStorageBackend):
             return None
 
 class S3StorageBackend(BaseStorageBackend):
-    """S3-compatible storage backend"""
+    """S3-compatible storage backend
+    
+    boto3 is synchronous, so every S3 call runs on a dedicated thread pool sized
+    to the client's connection pool; the event loop never blocks on network I/O.
+    Large objects are uploaded with parallel multipart uploads and fetched with
+    parallel ranged GETs.
+    """
     
     def __init__(self, bucket_name: str, access_key: str, secret_key: str, 
                  endpoint_url: Optional[str] = None, region: str = "us-east-1",
-                 use_ssl: bool = True, addressing_style: str = "path"):
+                 use_ssl: bool = True, addressing_style: str = "path",
+                 max_pool_connections: int = 10,
+                 multipart_threshold: int = 64 * 1024 * 1024,
+                 multipart_chunk_size: int = 8 * 1024 * 1024,
+                 stream_chunk_size: int = 1024 * 1024,
+                 max_concurrency: int = 4):
         if not S3_AVAILABLE:
             raise ImportError("boto3 is required for S3 storage backend")
         
@@ -173,6 +775,18 @@ class S3StorageBackend(BaseStorageBackend):
         self.endpoint_url = endpoint_url
         self.use_ssl = use_ssl
         self.addressing_style = addressing_style
+        self.max_pool_connections = max_pool_connections
+        self.multipart_threshold = multipart_threshold
+        # S3 rejects multipart parts smaller than 5 MB (except the last one)
+        self.multipart_chunk_size = max(multipart_chunk_size, 5 * 1024 * 1024)
+        self.stream_chunk_size = stream_chunk_size
+        self.max_concurrency = max(1, min(max_concurrency, max_pool_connections))
+        
+        # Bounded pool of worker threads; one per pooled HTTP connection
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_pool_connections,
+            thread_name_prefix="s3-storage"
+        )
         
         # Configure S3 client with advanced options
         session = boto3.Session(
@@ -188,7 +802,8 @@ class S3StorageBackend(BaseStorageBackend):
                     'addressing_style': addressing_style
                 },
                 signature_version='s3v4',
-                retries={'max_attempts': 3}
+                retries={'max_attempts': 3},
+                max_pool_connections=max_pool_connections
             )
         }
         
@@ -218,16 +833,35 @@ class S3StorageBackend(BaseStorageBackend):
                 logger.error(f"S3 bucket access error: {e}")
                 raise
     
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking boto3 call on the S3 thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
     async def store_file(self, file_content: bytes, file_path: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Store file in S3-compatible storage"""
         try:
-            # Upload to S3
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=file_path,
-                Body=file_content,
-                Metadata={k: str(v) for k, v in metadata.items()}  # S3 metadata must be strings
-            )
+            s3_metadata = {k: str(v) for k, v in metadata.items()}  # S3 metadata must be strings
+            
+            if len(file_content) > self.multipart_threshold:
+                view = memoryview(file_content)
+                parts = (
+                    view[offset:offset + self.multipart_chunk_size]
+                    for offset in range(0, len(file_content), self.multipart_chunk_size)
+                )
+                
+                async def read_part() -> bytes:
+                    return bytes(next(parts, b""))
+                
+                await self._multipart_upload(file_path, read_part, s3_metadata)
+            else:
+                await self._run(
+                    self.s3_client.put_object,
+                    Bucket=self.bucket_name,
+                    Key=file_path,
+                    Body=file_content,
+                    Metadata=s3_metadata
+                )
             
             logger.info(f"File stored in S3: {file_path}")
             
@@ -243,11 +877,172 @@ class S3StorageBackend(BaseStorageBackend):
             logger.error(f"S3 storage failed: {str(e)}")
             raise
     
+    async def store_stream(self, read_chunk, file_path: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Stream a file to S3-compatible storage
+        
+        Up to multipart_threshold bytes are buffered; smaller files go up in a single
+        PUT, larger ones switch to a multipart upload fed part by part, so at most
+        max_concurrency parts are held in memory.
+        """
+        try:
+            s3_metadata = {k: str(v) for k, v in metadata.items()}
+            
+            buffer = bytearray()
+            exhausted = False
+            while len(buffer) <= self.multipart_threshold:
+                chunk = await read_chunk()
+                if not chunk:
+                    exhausted = True
+                    break
+                buffer.extend(chunk)
+            
+            if exhausted:
+                await self._run(
+                    self.s3_client.put_object,
+                    Bucket=self.bucket_name,
+                    Key=file_path,
+                    Body=bytes(buffer),
+                    Metadata=s3_metadata
+                )
+                file_size = len(buffer)
+            else:
+                async def read_part() -> bytes:
+                    nonlocal exhausted
+                    while not exhausted and len(buffer) < self.multipart_chunk_size:
+                        chunk = await read_chunk()
+                        if not chunk:
+                            exhausted = True
+                            break
+                        buffer.extend(chunk)
+                    part = bytes(buffer[:self.multipart_chunk_size])
+                    del buffer[:self.multipart_chunk_size]
+                    return part
+                
+                file_size = await self._multipart_upload(file_path, read_part, s3_metadata)
+            
+            logger.info(f"File streamed to S3: {file_path}")
+            
+            return {
+                "success": True,
+                "backend": "s3",
+                "bucket": self.bucket_name,
+                "file_path": file_path,
+                "file_size": file_size
+            }
+            
+        except Exception as e:
+            logger.error(f"S3 storage failed: {str(e)}")
+            raise
+    
+    async def _multipart_upload(self, file_path: str, read_part, metadata: Dict[str, str]) -> int:
+        """
+        Upload an object in parts, keeping at most max_concurrency parts in flight
+        
+        Args:
+            file_path: Object key
+            read_part: Async callable returning the next part's bytes (b"" when done)
+            metadata: S3 object metadata
+            
+        Returns:
+            Total number of bytes uploaded
+        """
+        upload = await self._run(
+            self.s3_client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=file_path,
+            Metadata=metadata
+        )
+        upload_id = upload['UploadId']
+        
+        async def upload_part(part_number: int, body: bytes) -> Dict[str, Any]:
+            response = await self._run(
+                self.s3_client.upload_part,
+                Bucket=self.bucket_name,
+                Key=file_path,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body
+            )
+            return {"ETag": response['ETag'], "PartNumber": part_number}
+        
+        completed_parts = []
+        pending = set()
+        total_size = 0
+        part_number = 0
+        try:
+            while True:
+                body = await read_part()
+                if not body:
+                    break
+                part_number += 1
+                total_size += len(body)
+                pending.add(asyncio.ensure_future(upload_part(part_number, body)))
+                
+                if len(pending) >= self.max_concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    completed_parts.extend(task.result() for task in done)
+            
+            if pending:
+                completed_parts.extend(await asyncio.gather(*pending))
+                pending = set()
+            
+            completed_parts.sort(key=lambda part: part["PartNumber"])
+            await self._run(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=file_path,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": completed_parts}
+            )
+            logger.info(f"Multipart upload completed for {file_path}: {part_number} parts, {total_size} bytes")
+            return total_size
+            
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            try:
+                await self._run(
+                    self.s3_client.abort_multipart_upload,
+                    Bucket=self.bucket_name,
+                    Key=file_path,
+                    UploadId=upload_id
+                )
+            except Exception as abort_error:
+                logger.error(f"Failed to abort multipart upload for {file_path}: {abort_error}")
+            raise
+    
     async def retrieve_file(self, file_path: str) -> Optional[bytes]:
         """Retrieve file from S3-compatible storage"""
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=file_path)
-            return response['Body'].read()
+            info = await self.stat(file_path)
+            if info is None:
+                return None
+            
+            file_size = info["size"]
+            if file_size <= self.multipart_threshold:
+                response = await self._run(self.s3_client.get_object, Bucket=self.bucket_name, Key=file_path)
+                return await self._run(response['Body'].read)
+            
+            # Large objects: fetch ranges in parallel into a preallocated buffer
+            buffer = bytearray(file_size)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            
+            async def fetch(start: int, end: int):
+                async with semaphore:
+                    response = await self._run(
+                        self.s3_client.get_object,
+                        Bucket=self.bucket_name,
+                        Key=file_path,
+                        Range=f"bytes={start}-{end}"
+                    )
+                    buffer[start:end + 1] = await self._run(response['Body'].read)
+            
+            await asyncio.gather(*(
+                fetch(start, min(start + self.multipart_chunk_size, file_size) - 1)
+                for start in range(0, file_size, self.multipart_chunk_size)
+            ))
+            return bytes(buffer)
             
         except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey':
@@ -261,7 +1056,7 @@ class S3StorageBackend(BaseStorageBackend):
     async def delete_file(self, file_path: str) -> bool:
         """Delete file from S3-compatible storage"""
         try:
-            self.s3_client.delete_object(Bucket=self.bucket_name, Key=file_path)
+            await self._run(self.s3_client.delete_object, Bucket=self.bucket_name, Key=file_path)
             logger.info(f"File deleted from S3: {file_path}")
             return True
             
@@ -269,37 +1064,175 @@ class S3StorageBackend(BaseStorageBackend):
             logger.error(f"S3 file deletion failed: {str(e)}")
             return False
     
-    async def get_file_stream(self, file_path: str) -> StreamingResponse:
+    async def list_files(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        page_size: int = LIST_PAGE_SIZE
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """List objects with paginated list_objects_v2 calls (keys in UTF-8 binary order)"""
+        kwargs = {"Bucket": self.bucket_name, "Prefix": prefix, "MaxKeys": min(page_size, 1000)}
+        if start_after:
+            kwargs["StartAfter"] = start_after
+        while True:
+            response = await self._run(self.s3_client.list_objects_v2, **kwargs)
+            page = [
+                {"path": obj["Key"], "size": obj["Size"], "last_modified": obj.get("LastModified")}
+                for obj in response.get("Contents", [])
+            ]
+            if page:
+                yield page
+            if not response.get("IsTruncated"):
+                break
+            kwargs.pop("StartAfter", None)
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+    
+    async def delete_files(self, file_paths: List[str]) -> Dict[str, Any]:
+        """Delete objects with DeleteObjects, up to 1000 keys per request"""
+        result = {"deleted": [], "errors": []}
+        for i in range(0, len(file_paths), LIST_PAGE_SIZE):
+            batch = file_paths[i:i + LIST_PAGE_SIZE]
+            try:
+                response = await self._run(
+                    self.s3_client.delete_objects,
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+                )
+            except Exception as e:
+                result["errors"].extend({"path": key, "error": str(e)} for key in batch)
+                continue
+            failed = {error["Key"]: error.get("Message", error.get("Code")) for error in response.get("Errors", [])}
+            result["deleted"].extend(key for key in batch if key not in failed)
+            result["errors"].extend({"path": key, "error": message} for key, message in failed.items())
+        return result
+
+    async def move_file(self, source_path: str, destination_path: str) -> None:
+        """Server-side copy (multipart copy for large objects), then delete the source"""
+        await self._run(
+            self.s3_client.copy,
+            CopySource={"Bucket": self.bucket_name, "Key": source_path},
+            Bucket=self.bucket_name,
+            Key=destination_path
+        )
+        await self._run(self.s3_client.delete_object, Bucket=self.bucket_name, Key=source_path)
+
+    async def create_multipart_upload(self, file_path: str, metadata: Dict[str, Any]) -> str:
+        upload = await self._run(
+            self.s3_client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=file_path,
+            Metadata={k: str(v) for k, v in metadata.items()}
+        )
+        return upload['UploadId']
+
+    async def upload_part(self, file_path: str, upload_id: str, part_number: int, body: bytes) -> Dict[str, Any]:
+        response = await self._run(
+            self.s3_client.upload_part,
+            Bucket=self.bucket_name,
+            Key=file_path,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        return {"PartNumber": part_number, "ETag": response['ETag'], "Size": len(body)}
+
+    async def list_parts(self, file_path: str, upload_id: str) -> List[Dict[str, Any]]:
+        """List uploaded parts with paginated ListParts calls"""
+        kwargs = {"Bucket": self.bucket_name, "Key": file_path, "UploadId": upload_id}
+        parts = []
+        while True:
+            try:
+                response = await self._run(self.s3_client.list_parts, **kwargs)
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'NoSuchUpload':
+                    raise FileNotFoundError(f"Unknown multipart upload {upload_id}") from e
+                raise
+            parts.extend(
+                {"PartNumber": part["PartNumber"], "ETag": part["ETag"], "Size": part["Size"]}
+                for part in response.get("Parts", [])
+            )
+            if not response.get("IsTruncated"):
+                break
+            kwargs["PartNumberMarker"] = response["NextPartNumberMarker"]
+        return sorted(parts, key=lambda part: part["PartNumber"])
+
+    async def complete_multipart_upload(
+        self, file_path: str, upload_id: str, parts: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        await self._run(
+            self.s3_client.complete_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=file_path,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": [
+                {"PartNumber": part["PartNumber"], "ETag": part["ETag"]}
+                for part in sorted(parts, key=lambda part: part["PartNumber"])
+            ]}
+        )
+        file_size = sum(part.get("Size") or 0 for part in parts)
+        logger.info(f"Multipart upload completed for {file_path}: {len(parts)} parts, {file_size} bytes")
+        return {"success": True, "backend": "s3", "bucket": self.bucket_name, "file_path": file_path, "file_size": file_size}
+
+    async def abort_multipart_upload(self, file_path: str, upload_id: str) -> None:
+        try:
+            await self._run(
+                self.s3_client.abort_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=file_path,
+                UploadId=upload_id
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'NoSuchUpload':
+                raise
+    
+    async def _iter_body(self, response: Dict[str, Any]) -> AsyncGenerator[bytes, None]:
+        """Stream an S3 response body without blocking the event loop"""
+        body = response['Body']
+        try:
+            while True:
+                chunk = await self._run(body.read, self.stream_chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+    
+    async def get_file_stream(
+        self,
+        file_path: str,
+        request_headers: Optional[Mapping[str, str]] = None,
+        etag: Optional[str] = None
+    ) -> Response:
         """Get file as streaming response from S3-compatible storage"""
         try:
-            # Get object metadata first
-            head_response = self.s3_client.head_object(Bucket=self.bucket_name, Key=file_path)
+            # Get object metadata first; unchanged objects are answered without a GET
+            head_response = await self._run(self.s3_client.head_object, Bucket=self.bucket_name, Key=file_path)
             file_size = head_response['ContentLength']
             content_type = head_response.get('ContentType', 'application/octet-stream')
             filename = os.path.basename(file_path)
+            etag = etag or head_response.get('ETag')
+            last_modified = head_response.get('LastModified')
+            if is_not_modified(request_headers, etag, last_modified):
+                return not_modified_response(etag, last_modified)
             
             # Stream file from S3
             async def s3_file_stream():
-                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=file_path)
-                body = response['Body']
-                
-                try:
-                    while True:
-                        chunk = body.read(8192)  # 8KB chunks
-                        if not chunk:
-                            break
-                        yield chunk
-                finally:
-                    body.close()
+                response = await self._run(self.s3_client.get_object, Bucket=self.bucket_name, Key=file_path)
+                async for chunk in self._iter_body(response):
+                    yield chunk
             
             response = StreamingResponse(s3_file_stream(), media_type=content_type)
             response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
             response.headers["Content-Length"] = str(file_size)
+            if etag:
+                response.headers["ETag"] = etag
+            if last_modified:
+                response.headers["Last-Modified"] = formatdate(last_modified.timestamp(), usegmt=True)
             
             return response
             
         except ClientError as e:
-            if e.response['Error']['Code'] == 'NoSuchKey':
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail={"error_code": "FILE_NOT_FOUND", "message": "File not found"}
@@ -309,6 +1242,30 @@ class S3StorageBackend(BaseStorageBackend):
                 detail={"error_code": "S3_ERROR", "message": str(e)}
             )
     
+    async def stat(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get size and content type of an S3 object"""
+        try:
+            head_response = await self._run(self.s3_client.head_object, Bucket=self.bucket_name, Key=file_path)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return {
+            "size": head_response['ContentLength'],
+            "content_type": head_response.get('ContentType', 'application/octet-stream'),
+            "last_modified": head_response.get('LastModified'),
+            "etag": head_response.get('ETag')
+        }
+    
+    async def iter_file_range(self, file_path: str, start: int, end: int) -> AsyncGenerator[bytes, None]:
+        """Stream a byte range of an S3 object with a ranged GET"""
+        response = await self._run(
+            self.s3_client.get_object,
+            Bucket=self.bucket_name, Key=file_path, Range=f"bytes={start}-{end}"
+        )
+        async for chunk in self._iter_body(response):
+            yield chunk
+    
     def get_file_url(self, file_path: str, expires_in: int = 3600) -> Optional[str]:
         """Generate presigned URL for direct file access"""
         try:
@@ -321,6 +1278,10 @@ class S3StorageBackend(BaseStorageBackend):
         except Exception as e:
             logger.error(f"Failed to generate presigned URL: {str(e)}")
             return None
+    
+    def close(self):
+        """Release the S3 worker threads"""
+        self._executor.shutdown(wait=False)
 
 # Hybrid storage removed for simplicity - user requested S3 only or local only
 
@@ -330,8 +1291,22 @@ class StorageService:
     
     def __init__(self):
         self.backend = None
+        self.stat_cache = StatCache()
+        self._blob_store = None
         self._initialize_backend()
     
+    @property
+    def blob_store(self):
+        """Reference-counted content-addressed blob registry (the global one unless replaced)"""
+        if self._blob_store is None:
+            from app.services.blob_store import blob_store
+            self._blob_store = blob_store
+        return self._blob_store
+    
+    @blob_store.setter
+    def blob_store(self, value):
+        self._blob_store = value
+    
     def _initialize_backend(self):
         """Initialize storage backend - simple choice: local or S3"""
         storage_type = os.getenv('STORAGE_TYPE', 'local').lower()
@@ -359,6 +1334,12 @@ class StorageService:
             region = os.getenv('S3_REGION') or os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
             use_ssl = os.getenv('S3_USE_SSL', 'true').lower() == 'true'
             addressing_style = os.getenv('S3_ADDRESSING_STYLE', 'path')
+            # Transfer tuning
+            max_pool_connections = int(os.getenv('S3_MAX_POOL_CONNECTIONS', '10'))
+            multipart_threshold = int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '64')) * 1024 * 1024
+            multipart_chunk_size = int(os.getenv('S3_MULTIPART_CHUNK_SIZE_MB', '8')) * 1024 * 1024
+            stream_chunk_size = int(os.getenv('S3_STREAM_CHUNK_SIZE_KB', '1024')) * 1024
+            max_concurrency = int(os.getenv('S3_MAX_CONCURRENCY', '4'))
             
             # For AWS S3, set endpoint_url to None to use default
             if storage_type == 's3' and not endpoint_url:
@@ -385,7 +1366,12 @@ class StorageService:
                         endpoint_url=endpoint_url,
                         region=region,
                         use_ssl=use_ssl,
-                        addressing_style=addressing_style
+                        addressing_style=addressing_style,
+                        max_pool_connections=max_pool_connections,
+                        multipart_threshold=multipart_threshold,
+                        multipart_chunk_size=multipart_chunk_size,
+                        stream_chunk_size=stream_chunk_size,
+                        max_concurrency=max_concurrency
                     )
                     endpoint_info = f" (endpoint: {endpoint_url})" if endpoint_url else ""
                     logger.info(f"Initialized S3 storage backend (bucket: {bucket_name}){endpoint_info}")
@@ -402,6 +1388,81 @@ class StorageService:
             storage_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "storage")
             self.backend = LocalStorageBackend(storage_dir)
     
+    def _build_dataset_file_path(
+        self,
+        original_filename: str,
+        dataset_id: int,
+        organization_id: int,
+        file_hash: str
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """Build the storage path and metadata of a dataset file"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = original_filename.split('.')[-1] if '.' in original_filename else ''
+        
+        safe_filename = f"dataset_{dataset_id}_{timestamp}_{file_hash}.{extension}"
+        file_path = f"org_{organization_id}/{safe_filename}"
+        
+        metadata = {
+            "original_filename": original_filename,
+            "dataset_id": dataset_id,
+            "organization_id": organization_id,
+            "upload_timestamp": timestamp,
+            "file_hash": file_hash
+        }
+        return safe_filename, file_path, metadata
+    
+    async def _store_content(
+        self,
+        sha256: str,
+        original_filename: str,
+        file_size: int,
+        dataset_file_path: str,
+        write
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Store file content, as a shared content-addressed blob when deduplication is enabled
+        
+        Args:
+            sha256: Hash of the content
+            original_filename: Uploaded name (its extension is kept on the blob)
+            file_size: Content size in bytes
+            dataset_file_path: Dataset-specific path used when deduplication is off
+            write: Async callable writing the content to a given path
+            
+        Returns:
+            (storage path, backend result); the result has "deduplicated" set when an
+            existing blob was reused without writing
+        """
+        blob_store = self.blob_store
+        
+        if not blob_store.enabled:
+            result = await write(dataset_file_path)
+            self.stat_cache.invalidate(dataset_file_path)
+            return dataset_file_path, result
+        
+        extension = original_filename.rsplit('.', 1)[-1] if '.' in original_filename else ''
+        file_path = blob_store.blob_path(sha256, extension)
+        
+        registered = await blob_store.acquire(file_path)
+        try:
+            if registered and await self.file_exists(file_path, use_cache=False):
+                blob_store.record_deduplicated(file_size)
+                logger.info(f"♻️ Deduplicated {original_filename}: reusing blob {file_path}")
+                return file_path, {"success": True, "backend": type(self.backend).__name__, "deduplicated": True}
+            
+            # New content (or a registered blob whose object went missing)
+            result = await write(file_path)
+            self.stat_cache.invalidate(file_path)
+        except BaseException:
+            if registered:
+                await blob_store.release(file_path)
+            raise
+        
+        if not registered:
+            await blob_store.register(sha256, file_path, file_size)
+        result["deduplicated"] = False
+        return file_path, result
+    
     async def store_dataset_file(
         self,
         file_content: bytes,
@@ -412,60 +1473,311 @@ class StorageService:
         """Store a dataset file using the configured backend"""
         try:
             # Generate unique file path
-            file_hash = hashlib.sha256(file_content).hexdigest()[:16]
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            extension = original_filename.split('.')[-1] if '.' in original_filename else ''
-            
-            safe_filename = f"dataset_{dataset_id}_{timestamp}_{file_hash}.{extension}"
-            file_path = f"org_{organization_id}/{safe_filename}"
+            sha256 = hashlib.sha256(file_content).hexdigest()
+            file_hash = sha256[:16]
+            safe_filename, file_path, metadata = self._build_dataset_file_path(
+                original_filename, dataset_id, organization_id, file_hash
+            )
             
-            # Prepare metadata
-            metadata = {
-                "original_filename": original_filename,
-                "dataset_id": dataset_id,
-                "organization_id": organization_id,
-                "upload_timestamp": timestamp,
-                "file_hash": file_hash
-            }
+            async def write(path: str) -> Dict[str, Any]:
+                return await self.backend.store_file(file_content, path, metadata)
             
-            # Store using backend
-            result = await self.backend.store_file(file_content, file_path, metadata)
+            # Store using backend (once per distinct content when deduplication is on)
+            file_path, result = await self._store_content(
+                sha256, original_filename, len(file_content), file_path, write
+            )
             
             # Add common fields to result
             result.update({
-                "filename": safe_filename,
+                "filename": os.path.basename(file_path),
                 "original_filename": original_filename,
+                "file_path": file_path,
                 "relative_path": file_path,
                 "file_size": len(file_content),
-                "file_hash": file_hash
+                "file_hash": file_hash,
+                "sha256": sha256
             })
             
-            logger.info(f"File stored successfully: {original_filename} -> {safe_filename}")
+            logger.info(f"File stored successfully: {original_filename} -> {file_path}")
             return result
             
         except Exception as e:
             logger.error(f"File storage failed: {str(e)}")
             raise
     
+    async def store_dataset_file_stream(
+        self,
+        upload_file: UploadFile,
+        original_filename: str,
+        dataset_id: int,
+        organization_id: int,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Stream an uploaded dataset file to the configured backend
+        
+        The upload is read twice in fixed-size chunks: once to compute its size and
+        SHA-256 (which names the stored file), then again to write it to storage.
+        Memory use is bounded by the chunk size regardless of the file size.
+        
+        Args:
+            upload_file: Uploaded file (spooled to disk by the server)
+            original_filename: Name of the file as uploaded
+            dataset_id: Dataset the file belongs to
+            organization_id: Organization owning the dataset
+            chunk_size: Size of each read
+            
+        Returns:
+            Same fields as store_dataset_file, plus the full sha256
+        """
+        try:
+            await upload_file.seek(0)
+            hasher = hashlib.sha256()
+            file_size = 0
+            while chunk := await upload_file.read(chunk_size):
+                hasher.update(chunk)
+                file_size += len(chunk)
+            sha256 = hasher.hexdigest()
+            
+            file_hash = sha256[:16]
+            safe_filename, file_path, metadata = self._build_dataset_file_path(
+                original_filename, dataset_id, organization_id, file_hash
+            )
+            
+            async def write(path: str) -> Dict[str, Any]:
+                await upload_file.seek(0)
+                
+                async def read_chunk() -> bytes:
+                    return await upload_file.read(chunk_size)
+                
+                return await self.backend.store_stream(read_chunk, path, metadata)
+            
+            # Duplicate content is not written again when deduplication is on
+            file_path, result = await self._store_content(
+                sha256, original_filename, file_size, file_path, write
+            )
+            
+            result.update({
+                "filename": os.path.basename(file_path),
+                "original_filename": original_filename,
+                "file_path": file_path,
+                "relative_path": file_path,
+                "file_size": file_size,
+                "file_hash": file_hash,
+                "sha256": sha256
+            })
+            
+            logger.info(f"File streamed successfully: {original_filename} -> {file_path} ({file_size} bytes)")
+            return result
+
+        except Exception as e:
+            logger.error(f"File storage failed: {str(e)}")
+            raise
+
+    async def store_staged_dataset_file(
+        self,
+        staged_path: str,
+        original_filename: str,
+        dataset_id: int,
+        organization_id: int,
+        sha256: str,
+        file_size: int
+    ) -> Dict[str, Any]:
+        """
+        Adopt a file already assembled in storage (a completed upload session) as a dataset file
+
+        The staged object is moved into place rather than written again, or simply
+        deleted when deduplication finds the same content already stored.
+
+        Returns:
+            Same fields as store_dataset_file_stream
+        """
+        file_hash = sha256[:16]
+        safe_filename, file_path, metadata = self._build_dataset_file_path(
+            original_filename, dataset_id, organization_id, file_hash
+        )
+
+        async def write(path: str) -> Dict[str, Any]:
+            await self.backend.move_file(staged_path, path)
+            return {"success": True, "backend": type(self.backend).__name__, "file_path": path, "file_size": file_size}
+
+        file_path, result = await self._store_content(
+            sha256, original_filename, file_size, file_path, write
+        )
+        if result.get("deduplicated"):
+            await self.backend.delete_file(staged_path)
+        self.stat_cache.invalidate(staged_path)
+
+        result.update({
+            "filename": os.path.basename(file_path),
+            "original_filename": original_filename,
+            "file_path": file_path,
+            "relative_path": file_path,
+            "file_size": file_size,
+            "file_hash": file_hash,
+            "sha256": sha256
+        })
+
+        logger.info(f"Staged file adopted: {original_filename} -> {file_path} ({file_size} bytes)")
+        return result
+
     async def retrieve_dataset_file(self, file_path: str) -> Optional[bytes]:
         """Retrieve a dataset file using the configured backend"""
         return await self.backend.retrieve_file(file_path)
     
+    def get_local_path(self, file_path: str) -> Optional[str]:
+        """Get the local filesystem path for a stored file (None for remote backends)"""
+        if os.path.isabs(file_path):
+            return file_path
+        if isinstance(self.backend, LocalStorageBackend):
+            return os.path.join(self.backend.storage_dir, file_path)
+        return None
+    
+    @asynccontextmanager
+    async def local_copy(self, file_path: str, suffix: str = ""):
+        """
+        Yield a local filesystem path holding a stored file's content
+        
+        Local backends yield the stored file itself; remote backends stream the
+        object into a temporary file that is removed on exit.
+        """
+        local_path = self.get_local_path(file_path)
+        if local_path is not None:
+            yield local_path
+            return
+        
+        info = await self.backend.stat(file_path)
+        if info is None:
+            raise FileNotFoundError(file_path)
+        
+        fd, temp_path = tempfile.mkstemp(suffix=suffix)
+        try:
+            async with aiofiles.open(fd, "wb") as f:
+                if info["size"] > 0:
+                    async for chunk in self.backend.iter_file_range(file_path, 0, info["size"] - 1):
+                        await f.write(chunk)
+            yield temp_path
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def get_sidecar_path(self, file_path: str, kind: str) -> str:
+        """Get the storage path of a derived sidecar artefact for a dataset file"""
+        return f"{file_path}{SIDECAR_SUFFIXES[kind]}"
+    
+    def get_sidecar_source_path(self, file_path: str) -> Optional[str]:
+        """Get the dataset file a sidecar belongs to (None if not a sidecar)"""
+        for suffix in SIDECAR_SUFFIXES.values():
+            if file_path.endswith(suffix):
+                return file_path[:-len(suffix)]
+        return None
+    
+    async def store_sidecar(self, file_path: str, kind: str, content: bytes) -> Dict[str, Any]:
+        """Store a sidecar artefact next to a dataset file"""
+        sidecar_path = self.get_sidecar_path(file_path, kind)
+        self.stat_cache.invalidate(sidecar_path)
+        return await self.backend.store_file(content, sidecar_path, {"sidecar_kind": kind, "source_path": file_path})
+    
+    async def store_sidecar_file(
+        self,
+        file_path: str,
+        kind: str,
+        local_path: str,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ) -> Dict[str, Any]:
+        """Stream a sidecar artefact built on local disk next to a dataset file"""
+        sidecar_path = self.get_sidecar_path(file_path, kind)
+        self.stat_cache.invalidate(sidecar_path)
+        async with aiofiles.open(local_path, "rb") as f:
+            async def read_chunk() -> bytes:
+                return await f.read(chunk_size)
+            
+            return await self.backend.store_stream(
+                read_chunk, sidecar_path, {"sidecar_kind": kind, "source_path": file_path}
+            )
+    
+    async def delete_sidecars(self, file_path: str) -> int:
+        """Delete all sidecar artefacts of a dataset file"""
+        deleted = 0
+        for kind in SIDECAR_SUFFIXES:
+            sidecar_path = self.get_sidecar_path(file_path, kind)
+            self.stat_cache.invalidate(sidecar_path)
+            if await self.backend.delete_file(sidecar_path):
+                deleted += 1
+        return deleted
+    
     def get_dataset_file_url(self, file_path: str, expires_in: int = 3600) -> Optional[str]:
         """Get a publicly accessible URL for a dataset file (for MindsDB integration)"""
         return self.backend.get_file_url(file_path, expires_in)
     
-    async def get_dataset_file_stream(self, file_path: str):
-        """Get a streaming response for a dataset file"""
-        return await self.backend.get_file_stream(file_path)
+    def content_etag(self, file_path: str) -> Optional[str]:
+        """Strong ETag from the stored content hash (deduplicated blobs are named by their SHA-256)"""
+        if self.blob_store.is_blob_path(file_path):
+            sha256 = os.path.basename(file_path).split(".", 1)[0]
+            if len(sha256) == 64:
+                return f'"{sha256}"'
+        return None
+    
+    async def get_dataset_file_stream(self, file_path: str, request_headers: Optional[Mapping[str, str]] = None):
+        """Get a response serving a dataset file (304 for matching conditional requests)"""
+        return await self.get_file_stream(file_path, request_headers)
     
     async def delete_dataset_file(self, file_path: str) -> bool:
-        """Delete a dataset file using the configured backend"""
+        """
+        Delete a dataset file and its sidecars using the configured backend
+        
+        Content-addressed blobs are shared, so for those only this file's reference
+        is dropped; the blob is deleted by the collector once nothing uses it.
+        """
+        if await self.blob_store.release(file_path):
+            return True
+        return await self.delete_stored_object(file_path)
+    
+    async def delete_stored_object(self, file_path: str) -> bool:
+        """Delete a stored object and its sidecars regardless of references"""
+        await self.delete_sidecars(file_path)
+        self.stat_cache.invalidate(file_path)
         return await self.backend.delete_file(file_path)
     
-    async def get_file_stream(self, file_path: str) -> StreamingResponse:
-        """Get file as streaming response using the configured backend"""
-        return await self.backend.get_file_stream(file_path)
+    async def get_file_stream(self, file_path: str, request_headers: Optional[Mapping[str, str]] = None) -> Response:
+        """Get a response serving a file using the configured backend"""
+        return await self.backend.get_file_stream(
+            file_path, request_headers=request_headers, etag=self.content_etag(file_path)
+        )
+    
+    async def stat_file(self, file_path: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get size, content type, last modified time and ETag of a stored file (None if missing)
+        
+        Uses a metadata-only lookup (os.stat / S3 HEAD); results are cached briefly
+        so hot paths such as public share links don't hit storage on every request.
+        """
+        if use_cache:
+            found, info = self.stat_cache.get(file_path)
+            if found:
+                return info
+        info = await self.backend.head(file_path)
+        self.stat_cache.put(file_path, info)
+        return info
+    
+    async def file_exists(self, file_path: str, use_cache: bool = True) -> bool:
+        """Check whether a stored file exists without reading its content"""
+        try:
+            return await self.stat_file(file_path, use_cache=use_cache) is not None
+        except Exception as e:
+            logger.debug(f"Existence check failed for {file_path}: {e}")
+            return False
+    
+    async def any_file_exists(self, file_paths: List[str]) -> bool:
+        """Check whether at least one of several stored files exists"""
+        for file_path in file_paths:
+            if file_path and await self.file_exists(file_path):
+                return True
+        return False
+    
+    async def get_file_range_stream(self, file_path: str, ranges: List[Tuple[int, int]]) -> StreamingResponse:
+        """Get a 206 Partial Content response for byte ranges of a stored file"""
+        return await self.backend.get_file_range_stream(file_path, ranges)
     
     def get_file_url(self, file_path: str, expires_in: int = 3600) -> Optional[str]:
         """Get temporary URL for file access (if supported by backend)"""
@@ -544,72 +1856,183 @@ class StorageService:
             logger.error(f"Token validation error: {str(e)}")
             return False
     
-    async def cleanup_orphaned_files(self, db_session) -> Dict[str, Any]:
-        """Clean up files that no longer have corresponding dataset records"""
+    def _referenced_paths(self, db_session) -> Tuple[set, set]:
+        """
+        Mark phase: every storage path referenced by a dataset or dataset file, in one query
+        
+        Returns the set of normalized paths and the set of their basenames (legacy
+        records sometimes store a path relative to a different root).
+        """
+        from sqlalchemy import select, union_all, literal, cast, String
+        from app.models.dataset import Dataset, DatasetFile, StorageBlob
+        from app.models.file_handler import FileUpload
+        
+        # Connector snapshots are keyed by connector and dataset rather than a stored path
+        snapshot_path = (
+            literal(CONNECTOR_SNAPSHOT_PREFIX) + cast(Dataset.connector_id, String)
+            + literal("/") + cast(Dataset.id, String)
+        )
+        
+        # Registered blobs are left to the blob collector, which honours their refcounts
+        query = union_all(
+            select(StorageBlob.storage_path),
+            select(snapshot_path).where(Dataset.connector_id.isnot(None)),
+            # Image renditions are kept while an upload with the same content hash exists
+            select(literal(RENDITION_PREFIX) + FileUpload.file_hash),
+            select(Dataset.file_path).where(Dataset.file_path.isnot(None)),
+            select(Dataset.source_url).where(Dataset.source_url.isnot(None)),
+            select(Dataset.primary_file_path).where(Dataset.primary_file_path.isnot(None)),
+            select(DatasetFile.file_path).where(DatasetFile.file_path.isnot(None)),
+            select(DatasetFile.relative_path).where(DatasetFile.relative_path.isnot(None))
+        )
+        
+        storage_dir = self.backend.storage_dir if isinstance(self.backend, LocalStorageBackend) else None
+        referenced = set()
+        basenames = set()
+        for (path,) in db_session.execute(query):
+            if not path or path.startswith(('http://', 'https://')):
+                continue
+            if storage_dir and os.path.isabs(path):
+                path = os.path.relpath(path, storage_dir)
+            path = path.replace(os.sep, "/")
+            referenced.add(path)
+            basenames.add(os.path.basename(path))
+        return referenced, basenames
+    
+    def _is_referenced(self, path: str, referenced: set, basenames: set) -> bool:
+        # Sidecars are kept as long as their source file is referenced
+        path = self.get_sidecar_source_path(path) or path
+        if path.startswith(RENDITION_PREFIX):
+            return path.rsplit("/", 1)[0] in referenced
+        return path in referenced or os.path.basename(path) in basenames
+    
+    async def cleanup_orphaned_files(
+        self,
+        db_session,
+        dry_run: bool = False,
+        prefix: str = "",
+        cursor: Optional[str] = None,
+        max_objects: Optional[int] = None,
+        min_age_seconds: Optional[int] = None,
+        batch_size: int = LIST_PAGE_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Mark-and-sweep cleanup of files that no longer have corresponding dataset records
+        
+        Referenced paths are loaded in one query, storage is listed in bulk pages
+        (os.scandir / list_objects_v2) and orphans are deleted in batches.
+        
+        Args:
+            db_session: Database session
+            dry_run: Report orphans without deleting them
+            prefix: Only sweep paths under this prefix
+            cursor: Resume the listing after this path (next_cursor of a previous run)
+            max_objects: Stop after listing this many objects and return a cursor
+            min_age_seconds: Skip files modified more recently than this (uploads in flight)
+            batch_size: Keys per batch delete
+        """
+        if min_age_seconds is None:
+            min_age_seconds = int(os.getenv("STORAGE_CLEANUP_MIN_AGE_SECONDS", "3600"))
+        
+        cleanup_result = {
+            "dry_run": dry_run,
+            "deleted_files": [],
+            "orphaned_files": [],
+            "errors": [],
+            "total_scanned": 0,
+            "total_orphaned": 0,
+            "total_cleaned": 0,
+            "total_errors": 0,
+            "bytes_reclaimable": 0,
+            "skipped_recent": 0,
+            "next_cursor": None,
+            "complete": False
+        }
+        started = time.perf_counter()
+        
         try:
-            from app.models.dataset import Dataset
+            referenced, basenames = await asyncio.to_thread(self._referenced_paths, db_session)
+            mark_seconds = time.perf_counter() - started
+            cutoff = datetime.utcnow() - timedelta(seconds=min_age_seconds)
+            
+            pending: List[str] = []
+            
+            async def sweep(paths: List[str]):
+                if dry_run or not paths:
+                    return
+                result = await self.backend.delete_files(paths)
+                for path in result["deleted"]:
+                    self.stat_cache.invalidate(path)
+                cleanup_result["deleted_files"].extend(result["deleted"])
+                cleanup_result["total_cleaned"] += len(result["deleted"])
+                for error in result["errors"]:
+                    cleanup_result["errors"].append(f"Failed to delete {error['path']}: {error['error']}")
+                    cleanup_result["total_errors"] += 1
             
-            cleanup_result = {
-                "deleted_files": [],
-                "errors": [],
-                "total_cleaned": 0,
-                "total_errors": 0
+            last_path = None
+            stopped_early = False
+            async for page in self.backend.list_files(prefix=prefix, start_after=cursor):
+                for item in page:
+                    if max_objects is not None and cleanup_result["total_scanned"] >= max_objects:
+                        stopped_early = True
+                        break
+                    cleanup_result["total_scanned"] += 1
+                    last_path = item["path"]
+                    
+                    if item["path"].startswith(UPLOAD_STAGING_PREFIX):
+                        continue
+                    if self._is_referenced(item["path"], referenced, basenames):
+                        continue
+                    last_modified = item.get("last_modified")
+                    if last_modified is not None:
+                        if last_modified.tzinfo is not None:
+                            last_modified = last_modified.astimezone(timezone.utc).replace(tzinfo=None)
+                        if last_modified > cutoff:
+                            cleanup_result["skipped_recent"] += 1
+                            continue
+                    
+                    cleanup_result["orphaned_files"].append(item["path"])
+                    cleanup_result["total_orphaned"] += 1
+                    cleanup_result["bytes_reclaimable"] += item.get("size") or 0
+                    pending.append(item["path"])
+                    if len(pending) >= batch_size:
+                        await sweep(pending)
+                        pending = []
+                if stopped_early:
+                    break
+            
+            await sweep(pending)
+            
+            if stopped_early:
+                cleanup_result["next_cursor"] = last_path
+            else:
+                cleanup_result["complete"] = True
+            
+            elapsed = time.perf_counter() - started
+            cleanup_result["metrics"] = {
+                "referenced_paths": len(referenced),
+                "mark_seconds": round(mark_seconds, 3),
+                "elapsed_seconds": round(elapsed, 3),
+                "objects_per_second": round(cleanup_result["total_scanned"] / elapsed, 1) if elapsed > 0 else None
             }
             
-            # Get all datasets with file paths
-            datasets_with_files = db_session.query(Dataset).filter(
-                (Dataset.file_path.isnot(None)) | (Dataset.source_url.isnot(None))
-            ).all()
-            
-            # Create a set of valid file paths from existing datasets
-            valid_paths = set()
-            for dataset in datasets_with_files:
-                if dataset.file_path:
-                    valid_paths.add(dataset.file_path)
-                if dataset.source_url and not dataset.source_url.startswith('http'):
-                    valid_paths.add(dataset.source_url)
-            
-            # For local storage, scan the storage directory
-            if isinstance(self.backend, LocalStorageBackend):
-                storage_dir = self.backend.storage_dir
-                
-                if os.path.exists(storage_dir):
-                    for root, dirs, files in os.walk(storage_dir):
-                        for file in files:
-                            full_path = os.path.join(root, file)
-                            relative_path = os.path.relpath(full_path, storage_dir)
-                            
-                            # Check if this file is referenced by any dataset
-                            is_orphaned = True
-                            for valid_path in valid_paths:
-                                if (full_path == valid_path or 
-                                    relative_path == valid_path or
-                                    file in valid_path):
-                                    is_orphaned = False
-                                    break
-                            
-                            if is_orphaned:
-                                try:
-                                    os.remove(full_path)
-                                    cleanup_result["deleted_files"].append(full_path)
-                                    cleanup_result["total_cleaned"] += 1
-                                    logger.info(f"Deleted orphaned file: {full_path}")
-                                except Exception as e:
-                                    error_msg = f"Failed to delete {full_path}: {str(e)}"
-                                    cleanup_result["errors"].append(error_msg)
-                                    cleanup_result["total_errors"] += 1
-                                    logger.error(error_msg)
-            
-            logger.info(f"Cleanup completed: {cleanup_result['total_cleaned']} files deleted, {cleanup_result['total_errors']} errors")
+            action = "found" if dry_run else "deleted"
+            logger.info(
+                f"🧹 Cleanup {'(dry run) ' if dry_run else ''}completed: scanned {cleanup_result['total_scanned']} files, "
+                f"{action} {cleanup_result['total_orphaned'] if dry_run else cleanup_result['total_cleaned']} orphans "
+                f"({cleanup_result['bytes_reclaimable']} bytes), {cleanup_result['total_errors']} errors "
+                f"in {elapsed:.1f}s"
+            )
             return cleanup_result
             
         except Exception as e:
             logger.error(f"Orphaned file cleanup failed: {str(e)}")
-            return {
+            cleanup_result.update({
                 "error": str(e),
-                "total_cleaned": 0,
-                "total_errors": 1
-            }
+                "total_errors": cleanup_result["total_errors"] + 1,
+                "next_cursor": cleanup_result["next_cursor"] or cursor
+            })
+            return cleanup_result
 
     def get_backend_info(self) -> Dict[str, Any]:
         """Get information about the current storage backend"""
@@ -617,14 +2040,23 @@ class StorageService:
         
         info = {
             "backend_type": backend_type,
-            "storage_type": os.getenv('STORAGE_TYPE', 'local')
+            "storage_type": os.getenv('STORAGE_TYPE', 'local'),
+            "stat_cache": self.stat_cache.get_metrics(),
+            "deduplication": self.blob_store.get_metrics()
         }
         
+        from app.services.upload_sessions import upload_session_manager
+        info["upload_sessions"] = upload_session_manager.get_metrics()
+        
         if isinstance(self.backend, S3StorageBackend):
             info.update({
                 "bucket_name": self.backend.bucket_name,
                 "region": self.backend.region,
-                "supports_presigned_urls": True
+                "supports_presigned_urls": True,
+                "max_pool_connections": self.backend.max_pool_connections,
+                "multipart_threshold": self.backend.multipart_threshold,
+                "multipart_chunk_size": self.backend.multipart_chunk_size,
+                "stream_chunk_size": self.backend.stream_chunk_size
             })
         elif isinstance(self.backend, LocalStorageBackend):
             info.update({
@@ -11,7 +11,6 @@ from datetime import datetime, timedelta
 from cryptography.fernet import Fernet
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Request
-import httpx
 import asyncio
 import logging
 import os
@@ -19,6 +18,7 @@ import os
 from app.models.proxy_connector import ProxyConnector, SharedProxyLink, ProxyAccessLog
 from app.models.user import User
 from app.core.database import get_db
+from app.services.http_client_pool import http_client_pool
 
 logger = logging.getLogger(__name__)
 
@@ -481,31 +481,31 @@ class UnifiedProxyService:
             request_headers["Authorization"] = f"Basic {encoded}"
         
         # Execute request
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.request(
-                method=method.upper(),
-                url=full_url,
-                headers=request_headers,
-                params=params,
-                json=data if method.upper() in ["POST", "PUT", "PATCH"] else None
-            )
-            
-            # Parse response
-            content_type = response.headers.get("content-type", "").lower()
-            
-            if "application/json" in content_type:
-                response_data = response.json()
-            elif "text/" in content_type:
-                response_data = response.text
-            else:
-                response_data = f"<binary: {len(response.content)} bytes>"
-            
-            return {
-                "status_code": response.status_code,
-                "data": response_data,
-                "headers": dict(response.headers),
-                "success": response.is_success
-            }
+        client = http_client_pool.get_client(full_url)
+        response = await client.request(
+            method=method.upper(),
+            url=full_url,
+            headers=request_headers,
+            params=params,
+            json=data if method.upper() in ["POST", "PUT", "PATCH"] else None
+        )
+        
+        # Parse response
+        content_type = response.headers.get("content-type", "").lower()
+        
+        if "application/json" in content_type:
+            response_data = response.json()
+        elif "text/" in content_type:
+            response_data = response.text
+        else:
+            response_data = f"<binary: {len(response.content)} bytes>"
+        
+        return {
+            "status_code": response.status_code,
+            "data": response_data,
+            "headers": dict(response.headers),
+            "success": response.is_success
+        }
     
     async def _execute_database_query(
         self,
@@ -5,6 +5,7 @@ Handles processing of various file types with metadata extraction and preview ge
 
 import os
 import json
+import asyncio
 import hashlib
 import logging
 import tempfile
@@ -17,6 +18,7 @@ from sqlalchemy.orm import Session
 from app.models.file_handler import FileUpload, FileType, UploadStatus
 from app.models.dataset import Dataset
 from app.models.user import User
+from app.services import json_stream
 
 logger = logging.getLogger(__name__)
 
@@ -156,6 +158,13 @@ class UniversalFileProcessor:
                     file_upload.image_format = img_info.get('format')
                     file_upload.color_mode = img_info.get('mode')
                 
+                if file_type == FileType.IMAGE:
+                    # Decode the original once here; previews are served from the stored renditions
+                    from app.services.image_processing import image_processing_service
+                    renditions = await image_processing_service.create_renditions(temp_file_path, file_hash)
+                    if renditions:
+                        file_upload.file_metadata = {**metadata, "renditions": renditions}
+                
                 self.db.add(file_upload)
                 self.db.commit()
                 self.db.refresh(file_upload)
@@ -346,31 +355,36 @@ class UniversalFileProcessor:
         return metadata
 
     async def _extract_json_metadata(self, file_path: str) -> Dict[str, Any]:
-        """Extract metadata from JSON files"""
+        """Extract metadata from JSON / NDJSON files in one streaming pass"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
+            info = await asyncio.to_thread(json_stream.scan, file_path, 10)
+            
             metadata = {
                 'type': 'json',
                 'format': 'json',
-                'structure_type': type(data).__name__,
+                'layout': info['layout'],
+                'structure_type': info['structure_type'],
                 'valid_json': True
             }
             
-            if isinstance(data, dict):
-                metadata['top_level_keys'] = list(data.keys())
-                metadata['key_count'] = len(data.keys())
-            elif isinstance(data, list):
-                metadata['items_count'] = len(data)
-                if data and isinstance(data[0], dict):
-                    metadata['common_fields'] = list(data[0].keys())
+            sample = info['sample']
+            if info['structure_type'] == 'dict':
+                metadata['top_level_keys'] = info['top_level_keys']
+                metadata['key_count'] = len(info['top_level_keys'])
+            elif info['structure_type'] == 'list':
+                metadata['items_count'] = info['items_count']
+                if sample and isinstance(sample[0], dict):
+                    metadata['common_fields'] = list(sample[0].keys())
                     metadata['structure_analysis'] = 'array_of_objects'
                 else:
                     metadata['structure_analysis'] = 'array_of_primitives'
             
-            # Add preview of data structure
-            metadata['preview'] = str(data)[:500] if len(str(data)) > 500 else data
+            # Add preview of data structure (small files are returned whole)
+            head = await asyncio.to_thread(json_stream.read_head, file_path, 501)
+            if len(head) > 500:
+                metadata['preview'] = head[:500]
+            else:
+                metadata['preview'] = sample if info['structure_type'] == 'list' else info['document']
             
             return metadata
             
@@ -0,0 +1,507 @@
+"""
+Upload Session Service
+Resumable, chunked uploads for large dataset files. A client creates a session,
+PUTs numbered chunks (in any order, in parallel, retrying any that fail), asks
+which byte ranges have arrived, and finalizes. Chunks are checksum-verified and
+stored as parts of a backend multipart upload (S3 multipart upload on S3, part
+files on local storage), so nothing is buffered beyond one chunk per request.
+
+Session manifests are written to storage next to the staged object, so any API
+worker can serve any chunk of a session; the parts received are listed from the
+backend rather than tracked in memory. Finalizing marks the manifest first, so a
+session becomes exactly one dataset even if the client repeats the request.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, AsyncIterator
+import logging
+
+from fastapi import HTTPException, status
+
+from app.services.storage import UPLOAD_STAGING_PREFIX, S3StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# S3 rejects multipart parts smaller than 5 MB (except the last) and more than 10000 parts
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+
+@dataclass
+class StagedUpload:
+    """A fully assembled upload waiting in staging to become a dataset file"""
+    filename: str
+    content_type: Optional[str]
+    size: int
+    staged_path: str
+    sha256: str
+
+
+def _error(status_code: int, error_code: str, message: str) -> HTTPException:
+    return HTTPException(status_code=status_code, detail={"error_code": error_code, "message": message})
+
+
+class UploadSessionManager:
+    """Creates resumable upload sessions and assembles their chunks through StorageService"""
+
+    def __init__(
+        self,
+        storage=None,
+        chunk_size: Optional[int] = None,
+        max_chunk_size: Optional[int] = None,
+        session_ttl: Optional[float] = None,
+        max_file_size: Optional[int] = None,
+        sweep_interval: Optional[float] = None,
+        finalize_timeout: Optional[float] = None,
+        max_cached_manifests: int = 1000
+    ):
+        self._storage = storage
+        # Each chunk is buffered in memory by the chunk endpoint, so clients cannot ask for more
+        self.max_chunk_size = max_chunk_size or int(os.getenv("UPLOAD_SESSION_MAX_CHUNK_SIZE_MB", "64")) * 1024 * 1024
+        self.chunk_size = min(
+            chunk_size or int(os.getenv("UPLOAD_SESSION_CHUNK_SIZE_MB", "8")) * 1024 * 1024,
+            self.max_chunk_size
+        )
+        self.session_ttl = session_ttl or float(os.getenv("UPLOAD_SESSION_TTL", "86400"))
+        self.max_file_size = max_file_size or int(os.getenv("UPLOAD_SESSION_MAX_FILE_SIZE_MB", "10240")) * 1024 * 1024
+        self.sweep_interval = sweep_interval or float(os.getenv("UPLOAD_SESSION_SWEEP_INTERVAL", "3600"))
+        # A finalize that has not finished after this long is assumed to have died with its worker
+        self.finalize_timeout = finalize_timeout or float(os.getenv("UPLOAD_SESSION_FINALIZE_TIMEOUT", "900"))
+
+        # Only the finalize state changes after creation, and finalizing re-reads it from storage
+        self._manifests: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_cached_manifests = max_cached_manifests
+        self._finalizing: set = set()
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "sessions_created": 0,
+            "chunks_received": 0,
+            "bytes_received": 0,
+            "checksum_failures": 0,
+            "completed": 0,
+            "aborted": 0,
+            "expired": 0
+        }
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from app.services.storage import storage_service
+            self._storage = storage_service
+        return self._storage
+
+    @staticmethod
+    def _manifest_path(session_id: str) -> str:
+        return f"{UPLOAD_STAGING_PREFIX}{session_id}/session.json"
+
+    def _remember(self, manifest: Dict[str, Any]) -> None:
+        self._manifests[manifest["session_id"]] = manifest
+        self._manifests.move_to_end(manifest["session_id"])
+        while len(self._manifests) > self.max_cached_manifests:
+            self._manifests.popitem(last=False)
+
+    def _chunk_size_for(self, file_size: int, requested: Optional[int]) -> int:
+        chunk_size = min(requested or self.chunk_size, self.max_chunk_size)
+        if isinstance(self.storage.backend, S3StorageBackend):
+            chunk_size = max(chunk_size, MIN_PART_SIZE)
+        # Stay within the part count limit however large the file
+        return max(chunk_size, math.ceil(file_size / MAX_PARTS))
+
+    async def create_session(
+        self,
+        owner_id: int,
+        organization_id: int,
+        filename: str,
+        file_size: int,
+        content_type: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        sha256: Optional[str] = None,
+        dataset_options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Start a resumable upload
+
+        Args:
+            owner_id: User uploading the file (only they can use the session)
+            organization_id: Organization the dataset will belong to
+            filename: Original file name
+            file_size: Total size in bytes
+            content_type: MIME type of the file
+            chunk_size: Preferred chunk size (capped at max_chunk_size, raised to the
+                backend's minimum part size)
+            sha256: Optional hash of the whole file, verified on finalize
+            dataset_options: Dataset fields (name, description, sharing_level) used on finalize
+
+        Returns:
+            The session manifest: id, chunk_size, total_chunks and expiry
+        """
+        if file_size <= 0:
+            raise _error(status.HTTP_400_BAD_REQUEST, "EMPTY_UPLOAD", "file_size must be positive")
+        if file_size > self.max_file_size:
+            raise _error(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "FILE_TOO_LARGE",
+                f"File size exceeds {self.max_file_size // (1024 * 1024)}MB limit"
+            )
+
+        session_id = uuid.uuid4().hex
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        staged_path = f"{UPLOAD_STAGING_PREFIX}{session_id}/data" + (f".{extension}" if extension else "")
+        chunk_size = self._chunk_size_for(file_size, chunk_size)
+
+        upload_id = await self.storage.backend.create_multipart_upload(
+            staged_path, {"original_filename": filename, "upload_session": session_id}
+        )
+        now = datetime.utcnow()
+        manifest = {
+            "session_id": session_id,
+            "owner_id": owner_id,
+            "organization_id": organization_id,
+            "filename": filename,
+            "content_type": content_type,
+            "file_size": file_size,
+            "chunk_size": chunk_size,
+            "total_chunks": math.ceil(file_size / chunk_size),
+            "sha256": sha256.lower() if sha256 else None,
+            "staged_path": staged_path,
+            "upload_id": upload_id,
+            "dataset": dataset_options or {},
+            "created_at": now.isoformat(),
+            "expires_at": (now + timedelta(seconds=self.session_ttl)).isoformat()
+        }
+        try:
+            await self._store_manifest(manifest)
+        except BaseException:
+            await self.storage.backend.abort_multipart_upload(staged_path, upload_id)
+            raise
+
+        self._remember(manifest)
+        self.stats["sessions_created"] += 1
+        logger.info(
+            f"📦 Upload session {session_id} created for {filename}: "
+            f"{file_size} bytes in {manifest['total_chunks']} chunks of {chunk_size}"
+        )
+        return manifest
+
+    async def _store_manifest(self, manifest: Dict[str, Any]) -> None:
+        session_id = manifest["session_id"]
+        await self.storage.backend.store_file(
+            json.dumps(manifest).encode(), self._manifest_path(session_id), {"upload_session": session_id}
+        )
+
+    async def _load_manifest(self, session_id: str) -> Dict[str, Any]:
+        content = None
+        if session_id.isalnum():
+            content = await self.storage.backend.retrieve_file(self._manifest_path(session_id))
+        if content is None:
+            raise _error(status.HTTP_404_NOT_FOUND, "UPLOAD_SESSION_NOT_FOUND", "Upload session not found")
+        manifest = json.loads(content)
+        self._remember(manifest)
+        return manifest
+
+    async def get_session(self, session_id: str, owner_id: Optional[int] = None) -> Dict[str, Any]:
+        """Load a session manifest; unknown, expired or foreign sessions are reported as not found"""
+        manifest = self._manifests.get(session_id)
+        if manifest is None:
+            manifest = await self._load_manifest(session_id)
+
+        if owner_id is not None and manifest["owner_id"] != owner_id:
+            raise _error(status.HTTP_404_NOT_FOUND, "UPLOAD_SESSION_NOT_FOUND", "Upload session not found")
+        if datetime.fromisoformat(manifest["expires_at"]) < datetime.utcnow():
+            raise _error(status.HTTP_410_GONE, "UPLOAD_SESSION_EXPIRED", "Upload session has expired")
+        return manifest
+
+    @staticmethod
+    def expected_chunk_size(session: Dict[str, Any], index: int) -> int:
+        return min(session["chunk_size"], session["file_size"] - index * session["chunk_size"])
+
+    async def put_chunk(
+        self,
+        session: Dict[str, Any],
+        index: int,
+        body: bytes,
+        checksum: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Verify and store one chunk; re-sending a chunk replaces it
+
+        Args:
+            session: Session manifest
+            index: Chunk number, from 0
+            body: Chunk content
+            checksum: Hex SHA-256 of the chunk
+        """
+        if not 0 <= index < session["total_chunks"]:
+            raise _error(
+                status.HTTP_400_BAD_REQUEST, "INVALID_CHUNK_INDEX",
+                f"Chunk index must be between 0 and {session['total_chunks'] - 1}"
+            )
+        expected_size = self.expected_chunk_size(session, index)
+        if len(body) != expected_size:
+            raise _error(
+                status.HTTP_400_BAD_REQUEST, "INVALID_CHUNK_SIZE",
+                f"Chunk {index} must be {expected_size} bytes, got {len(body)}"
+            )
+        if not checksum:
+            raise _error(status.HTTP_400_BAD_REQUEST, "CHECKSUM_REQUIRED", "X-Chunk-SHA256 header is required")
+        digest = await asyncio.to_thread(lambda: hashlib.sha256(body).hexdigest())
+        if digest != checksum.strip().lower():
+            self.stats["checksum_failures"] += 1
+            raise _error(
+                status.HTTP_422_UNPROCESSABLE_ENTITY, "CHECKSUM_MISMATCH",
+                f"Chunk {index} does not match its checksum; resend it"
+            )
+
+        try:
+            part = await self.storage.backend.upload_part(
+                session["staged_path"], session["upload_id"], index + 1, body
+            )
+        except FileNotFoundError:
+            raise _error(status.HTTP_409_CONFLICT, "UPLOAD_SESSION_CLOSED", "Upload session is already finalized")
+        self.stats["chunks_received"] += 1
+        self.stats["bytes_received"] += len(body)
+        return {"session_id": session["session_id"], "index": index, "size": len(body), "etag": part["ETag"], "sha256": digest}
+
+    async def _received_parts(self, session: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+        """Parts stored so far keyed by chunk index (only complete, correctly sized ones)"""
+        try:
+            parts = await self.storage.backend.list_parts(session["staged_path"], session["upload_id"])
+        except FileNotFoundError:
+            return {}
+        return {
+            part["PartNumber"] - 1: part for part in parts
+            if 0 < part["PartNumber"] <= session["total_chunks"]
+            and part["Size"] == self.expected_chunk_size(session, part["PartNumber"] - 1)
+        }
+
+    async def get_status(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Received chunks, the byte ranges they cover, and the chunks still missing"""
+        assembled = await self.storage.file_exists(session["staged_path"], use_cache=False)
+        received = sorted(await self._received_parts(session)) if not assembled else list(range(session["total_chunks"]))
+
+        ranges: List[List[int]] = []
+        for index in received:
+            start = index * session["chunk_size"]
+            end = start + self.expected_chunk_size(session, index) - 1
+            if ranges and ranges[-1][1] + 1 == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+
+        received_set = set(received)
+        return {
+            "session_id": session["session_id"],
+            "filename": session["filename"],
+            "file_size": session["file_size"],
+            "chunk_size": session["chunk_size"],
+            "total_chunks": session["total_chunks"],
+            "received_chunks": received,
+            "received_ranges": ranges,
+            "missing_chunks": [i for i in range(session["total_chunks"]) if i not in received_set],
+            "bytes_received": sum(end - start + 1 for start, end in ranges),
+            "complete": len(received_set) == session["total_chunks"],
+            "expires_at": session["expires_at"]
+        }
+
+    async def assemble(self, session: Dict[str, Any]) -> StagedUpload:
+        """
+        Join all chunks into the staged object and hash it
+
+        Safe to retry: once assembled, a later call only re-reads the staged object.
+        """
+        staged_path = session["staged_path"]
+        if not await self.storage.file_exists(staged_path, use_cache=False):
+            parts = await self._received_parts(session)
+            missing = [i for i in range(session["total_chunks"]) if i not in parts]
+            if missing:
+                raise _error(
+                    status.HTTP_409_CONFLICT, "UPLOAD_INCOMPLETE",
+                    f"{len(missing)} chunks missing, first missing chunk is {missing[0]}"
+                )
+            await self.storage.backend.complete_multipart_upload(
+                staged_path, session["upload_id"], [parts[i] for i in range(session["total_chunks"])]
+            )
+            self.storage.stat_cache.invalidate(staged_path)
+
+        # One sequential read of the assembled object names it for deduplication
+        hasher = hashlib.sha256()
+        size = 0
+        async for chunk in self.storage.backend.iter_file_range(staged_path, 0, session["file_size"] - 1):
+            hasher.update(chunk)
+            size += len(chunk)
+        sha256 = hasher.hexdigest()
+
+        if size != session["file_size"]:
+            raise _error(
+                status.HTTP_409_CONFLICT, "UPLOAD_SIZE_MISMATCH",
+                f"Assembled {size} bytes, expected {session['file_size']}"
+            )
+        if session.get("sha256") and session["sha256"] != sha256:
+            self.stats["checksum_failures"] += 1
+            raise _error(
+                status.HTTP_422_UNPROCESSABLE_ENTITY, "CHECKSUM_MISMATCH",
+                "Assembled file does not match the SHA-256 given when the session was created"
+            )
+
+        return StagedUpload(
+            filename=session["filename"],
+            content_type=session.get("content_type"),
+            size=size,
+            staged_path=staged_path,
+            sha256=sha256
+        )
+
+    @asynccontextmanager
+    async def finalizing(self, session: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Hold a session while it is turned into a dataset
+
+        The manifest is marked "finalizing" before anything is assembled; a concurrent
+        finalize gets a 409, as does one after complete() (with the dataset id). If the
+        block fails before complete(), the session is reopened so the client can retry.
+        """
+        session_id = session["session_id"]
+        if session_id in self._finalizing:
+            raise _error(status.HTTP_409_CONFLICT, "UPLOAD_SESSION_FINALIZING", "Upload session is already being finalized")
+        self._finalizing.add(session_id)
+        try:
+            # Re-read from storage: another worker may have finalized the session
+            stored = await self._load_manifest(session_id)
+            if stored.get("state") == "completed":
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={
+                        "error_code": "UPLOAD_SESSION_COMPLETED",
+                        "message": "Upload session is already finalized",
+                        "dataset_id": stored.get("dataset_id")
+                    }
+                )
+            started = stored.get("finalizing_at")
+            if stored.get("state") == "finalizing" and (
+                datetime.utcnow() - datetime.fromisoformat(started)
+            ).total_seconds() < self.finalize_timeout:
+                raise _error(status.HTTP_409_CONFLICT, "UPLOAD_SESSION_FINALIZING", "Upload session is already being finalized")
+
+            manifest = {**stored, "state": "finalizing", "finalizing_at": datetime.utcnow().isoformat()}
+            await self._store_manifest(manifest)
+            self._remember(manifest)
+            try:
+                yield manifest
+            except BaseException:
+                if manifest.get("state") == "finalizing":
+                    reopened = {key: value for key, value in manifest.items() if key not in ("state", "finalizing_at")}
+                    await self._store_manifest(reopened)
+                    self._remember(reopened)
+                raise
+        finally:
+            self._finalizing.discard(session_id)
+
+    async def complete(self, session: Dict[str, Any], dataset_id: int) -> None:
+        """
+        Record that a finalizing session became a dataset and clean up its chunks
+
+        The manifest stays behind (until the session expires) so repeated finalize
+        calls are answered with the dataset instead of creating another one.
+        """
+        session.update({"state": "completed", "dataset_id": dataset_id, "completed_at": datetime.utcnow().isoformat()})
+        await self._store_manifest(session)
+        self._remember(session)
+        try:
+            await self._discard_upload(session)
+        except Exception as e:
+            logger.warning(f"Could not clean up completed upload session {session['session_id']}: {e}")
+        self.stats["completed"] += 1
+
+    async def _discard_upload(self, session: Dict[str, Any]) -> None:
+        """Abort the multipart upload and delete any staged object left behind"""
+        await self.storage.backend.abort_multipart_upload(session["staged_path"], session["upload_id"])
+        await self.storage.backend.delete_files([session["staged_path"]])
+        self.storage.stat_cache.invalidate(session["staged_path"])
+
+    async def close(self, session: Dict[str, Any], outcome: str = "completed") -> None:
+        """
+        Remove a session's manifest, parts and any staged object left behind
+
+        Args:
+            session: Session manifest
+            outcome: "completed" once handed off, otherwise "aborted" or "expired"
+        """
+        backend = self.storage.backend
+        await backend.abort_multipart_upload(session["staged_path"], session["upload_id"])
+        await backend.delete_files([session["staged_path"], self._manifest_path(session["session_id"])])
+        self.storage.stat_cache.invalidate(session["staged_path"])
+        self._manifests.pop(session["session_id"], None)
+        self.stats[outcome] += 1
+
+    async def expire_sessions(self) -> int:
+        """Abort every session past its expiry"""
+        now = datetime.utcnow()
+        expired = 0
+        async for page in self.storage.backend.list_files(prefix=UPLOAD_STAGING_PREFIX):
+            for item in page:
+                if not item["path"].endswith("/session.json"):
+                    continue
+                try:
+                    content = await self.storage.backend.retrieve_file(item["path"])
+                    if content is None:
+                        continue
+                    manifest = json.loads(content)
+                    if datetime.fromisoformat(manifest["expires_at"]) >= now:
+                        continue
+                    if manifest.get("state") == "completed":
+                        # Chunks went with the dataset; only the manifest is left
+                        await self.storage.backend.delete_files([item["path"]])
+                        self._manifests.pop(manifest["session_id"], None)
+                        continue
+                    await self.close(manifest, outcome="expired")
+                    expired += 1
+                except Exception as e:
+                    logger.error(f"Failed to expire upload session {item['path']}: {e}")
+        if expired:
+            logger.info(f"🧹 Expired {expired} abandoned upload sessions")
+        return expired
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.expire_sessions()
+            except Exception as e:
+                logger.error(f"Upload session sweep failed: {e}")
+
+    async def start(self) -> None:
+        """App startup hook"""
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.get_running_loop().create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        """App shutdown hook"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "chunk_size": self.chunk_size,
+            "max_chunk_size": self.max_chunk_size,
+            "session_ttl": self.session_ttl,
+            "finalize_timeout": self.finalize_timeout,
+            "max_file_size": self.max_file_size,
+            **self.stats
+        }
+
+
+# Global instance
+upload_session_manager = UploadSessionManager()
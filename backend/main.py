@@ -329,11 +329,60 @@ async def startup_event():
     
     # Log that proxy services should be started separately
     logger.info("🔗 Use ./start-proxy.sh to start proxy services on separate ports")
+    
+    # Shared keep-alive clients for proxied upstream APIs
+    from app.services.http_client_pool import http_client_pool
+    await http_client_pool.startup()
+    
+    # Batched analytics event writer
+    from app.services.analytics_buffer import analytics_buffer
+    await analytics_buffer.start()
+    
+    # Garbage collection of unreferenced content-addressed blobs
+    from app.services.storage import storage_service
+    await storage_service.blob_store.start_gc(storage_service)
+    
+    # Expiry of abandoned resumable upload sessions
+    from app.services.upload_sessions import upload_session_manager
+    await upload_session_manager.start()
+    
+    # Pre-warm the agent code sandbox workers
+    from app.services.code_sandbox import code_sandbox_pool
+    await code_sandbox_pool.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown event handler."""
     logger.info("🛑 AI Share Platform API is shutting down...")
+    
+    # Write out buffered analytics events before the database goes away
+    from app.services.analytics_buffer import analytics_buffer
+    await analytics_buffer.stop()
+    
+    from app.services.storage import storage_service
+    await storage_service.blob_store.stop_gc()
+    
+    from app.services.upload_sessions import upload_session_manager
+    await upload_session_manager.stop()
+    
+    from app.services.code_sandbox import code_sandbox_pool
+    await code_sandbox_pool.stop()
+    
+    from app.services.pdf_processing import pdf_processing_service
+    pdf_processing_service.shutdown()
+    
+    from app.services.mindsdb_async import mindsdb_async
+    mindsdb_async.shutdown()
+    
+    from app.services.mindsdb import mindsdb_service
+    mindsdb_service.pool.close()
+    
+    # Close pooled upstream database connections held by the proxy
+    from app.services.proxy_connection_pool import proxy_connection_pools
+    await proxy_connection_pools.close_all()
+    
+    from app.services.http_client_pool import http_client_pool
+    await http_client_pool.close_all()
     logger.info(f"📅 Shutdown time: {datetime.now().isoformat()}")
     logger.info("👋 Goodbye!")
 
@@ -7,16 +7,14 @@ import asyncio
 import logging
 import json
 import urllib.parse
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Request, Response, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
 import uvicorn
 from sqlalchemy.orm import Session
-import mysql.connector
-import psycopg2
 import pymongo
 from clickhouse_driver import Client as ClickHouseClient
 
@@ -33,6 +31,9 @@ if str(parent_dir) not in sys.path:
 from app.core.database import get_db
 from app.models.proxy_connector import ProxyConnector, SharedProxyLink
 from app.services.proxy_service import ProxyService
+from app.services.proxy_connection_pool import proxy_connection_pools
+from app.services.http_client_pool import http_client_pool, open_upstream_stream, relay_upstream_response
+from app.services.api_response_cache import api_response_cache
 from app.core.app_config import get_app_config
 
 # Configure logging
@@ -78,7 +79,10 @@ class MultiPortProxyService:
                 "status": "healthy",
                 "proxy_type": proxy_type,
                 "port": port,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "connection_pools": proxy_connection_pools.get_metrics(),
+                "http_clients": http_client_pool.get_metrics(),
+                "response_cache": api_response_cache.get_metrics()
             }
         
         @app.get("/")
@@ -280,8 +284,13 @@ class MultiPortProxyService:
         
         return app
     
-    async def handle_api_proxy(self, proxy_connector: ProxyConnector, request: Request, db: Session) -> Dict:
-        """Handle API proxy operations"""
+    async def handle_api_proxy(self, proxy_connector: ProxyConnector, request: Request, db: Session) -> Union[Dict, StreamingResponse]:
+        """
+        Handle API proxy operations
+        
+        With ?stream=true the upstream response is relayed as-is, chunk by chunk,
+        instead of being buffered and wrapped in a JSON envelope.
+        """
         
         try:
             # Get connection configuration
@@ -340,44 +349,68 @@ class MultiPortProxyService:
             
             logger.info(f"Making API request to: {full_url}")
             
+            stream_requested = request.query_params.get("stream", "").lower() in ("1", "true", "yes")
+            
             # Make HTTP request to external API
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                if request.method == "GET":
-                    # Forward query parameters
-                    params = dict(request.query_params)
-                    # Remove internal parameters
-                    params.pop('token', None)
-                    params.pop('endpoint', None)
-                    
-                    response = await client.get(full_url, headers=headers, params=params)
-                else:
-                    # Forward POST body
-                    body = await request.body()
-                    response = await client.post(full_url, headers=headers, content=body)
+            client = http_client_pool.get_client(full_url)
+            if request.method == "GET":
+                # Forward query parameters
+                params = dict(request.query_params)
+                # Remove internal parameters
+                params.pop('token', None)
+                params.pop('endpoint', None)
+                params.pop('stream', None)
+                
+                if stream_requested:
+                    upstream = await open_upstream_stream(client, "GET", full_url, headers=headers, params=params)
+                    return relay_upstream_response(upstream, f"{proxy_connector.name} {full_url}")
+                
+                async def fetch_upstream(conditional_headers: Dict[str, str]):
+                    return await client.get(full_url, headers={**headers, **conditional_headers}, params=params)
+                
+                # Shared connectors serve many identical GETs; answer them from the cache
+                response = await api_response_cache.fetch(
+                    api_response_cache.build_key(
+                        proxy_connector.id, connection_config, full_url, params,
+                        credentials=proxy_connector.real_credentials
+                    ),
+                    api_response_cache.ttl_for(connection_config),
+                    fetch_upstream
+                )
+            elif stream_requested:
+                # Forward POST body as it arrives
+                upstream = await open_upstream_stream(client, "POST", full_url, headers=headers, content=request.stream())
+                return relay_upstream_response(upstream, f"{proxy_connector.name} {full_url}")
+            else:
+                # Forward POST body
+                body = await request.body()
+                response = await client.post(full_url, headers=headers, content=body)
             
-            logger.info(f"API response status: {response.status_code}")
-            logger.info(f"API response headers: {dict(response.headers)}")
-            logger.info(f"API response content (first 200 chars): {response.text[:200]}")
+            # Decode the body once; logs only ever see a bounded prefix
+            response_text = response.text
+            logger.info(f"API response status: {response.status_code} ({len(response.content)} bytes)")
+            logger.debug(f"API response headers: {dict(response.headers)}")
+            logger.info(f"API response content (first 200 chars): {response_text[:200]}")
             
             # Return response data with better error handling
             try:
                 if response.headers.get('content-type', '').startswith('application/json'):
-                    data = response.json()
+                    data = json.loads(response_text)
                 else:
-                    data = response.text
+                    data = response_text
             except json.JSONDecodeError as e:
                 logger.error(f"JSON decode error: {e}")
-                data = response.text
+                data = response_text
             except Exception as e:
                 logger.error(f"Response parsing error: {e}")
-                data = response.text
+                data = response_text
             
             return {
                 "status": "success",
                 "data": data,
                 "status_code": response.status_code,
                 "headers": dict(response.headers),
-                "raw_response": response.text[:500] if len(response.text) > 500 else response.text,
+                "raw_response": response_text[:500],
                 "full_url": full_url
             }
             
@@ -395,59 +428,11 @@ class MultiPortProxyService:
             }
 
     async def handle_mysql_proxy(self, proxy_connector: ProxyConnector, operation_data: Dict, db: Session) -> Dict:
-        """Handle MySQL proxy operations"""
+        """Handle MySQL proxy operations on a pooled connection"""
         
         try:
-            # Decrypt connection details
-            real_config = json.loads(proxy_connector.real_connection_config)
-            real_credentials = json.loads(proxy_connector.real_credentials)
-            
-            # Apply SSL configuration for development
-            from app.core.config import settings
-            
-            host = real_config.get('host', 'localhost')
-            port = real_config.get('port', 3306)
-            
-            # Get SSL-aware configuration
-            ssl_config = settings.get_ssl_config_for_connector(
-                'mysql', host, port, real_config
-            )
-            
-            # Create MySQL connection
-            config = {
-                'host': host,
-                'port': port,
-                'user': real_credentials.get('username'),
-                'password': real_credentials.get('password'),
-                'database': real_config.get('database'),
-                'connect_timeout': app_config.integrations.CONNECTOR_CONNECTION_TIMEOUT,
-                'ssl_disabled': ssl_config.get('ssl_disabled', False)
-            }
-            
-            connection = mysql.connector.connect(**config)
-            cursor = connection.cursor(dictionary=True)
-            
-            # Execute query
             query = operation_data.get('query', 'SELECT 1')
-            cursor.execute(query)
-            
-            if query.strip().upper().startswith('SELECT'):
-                results = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-            else:
-                results = []
-                columns = []
-                connection.commit()
-            
-            cursor.close()
-            connection.close()
-            
-            return {
-                "status": "success",
-                "data": results,
-                "columns": columns,
-                "row_count": len(results)
-            }
+            return await proxy_connection_pools.execute_query(proxy_connector, 'mysql', query)
             
         except Exception as e:
             logger.error(f"MySQL proxy operation failed: {e}")
@@ -457,57 +442,11 @@ class MultiPortProxyService:
             }
     
     async def handle_postgresql_proxy(self, proxy_connector: ProxyConnector, operation_data: Dict, db: Session) -> Dict:
-        """Handle PostgreSQL proxy operations"""
+        """Handle PostgreSQL proxy operations on a pooled connection"""
         
         try:
-            # Decrypt connection details
-            real_config = json.loads(proxy_connector.real_connection_config)
-            real_credentials = json.loads(proxy_connector.real_credentials)
-            
-            # Apply SSL configuration for development
-            from app.core.config import settings
-            
-            host = real_config.get('host', 'localhost')
-            port = real_config.get('port', 5432)
-            
-            # Get SSL-aware configuration
-            ssl_config = settings.get_ssl_config_for_connector(
-                'postgresql', host, port, real_config
-            )
-            
-            # Create PostgreSQL connection
-            connection = psycopg2.connect(
-                host=host,
-                port=port,
-                user=real_credentials.get('username'),
-                password=real_credentials.get('password'),
-                database=real_config.get('database'),
-                sslmode=ssl_config.get('sslmode', 'prefer')
-            )
-            
-            cursor = connection.cursor()
-            
-            # Execute query
             query = operation_data.get('query', 'SELECT 1')
-            cursor.execute(query)
-            
-            if query.strip().upper().startswith('SELECT'):
-                results = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-            else:
-                results = []
-                columns = []
-                connection.commit()
-            
-            cursor.close()
-            connection.close()
-            
-            return {
-                "status": "success",
-                "data": results,
-                "columns": columns,
-                "row_count": len(results)
-            }
+            return await proxy_connection_pools.execute_query(proxy_connector, 'postgresql', query)
             
         except Exception as e:
             logger.error(f"PostgreSQL proxy operation failed: {e}")
@@ -599,6 +538,7 @@ class MultiPortProxyService:
         """Start all proxy servers on their respective ports"""
         
         logger.info("🚀 Starting Multi-Port Proxy Service...")
+        await http_client_pool.startup()
         
         for proxy_type, port in PROXY_PORTS.items():
             try:
@@ -634,7 +574,11 @@ class MultiPortProxyService:
             logger.info(f"  - {proxy_type.upper()}: http://localhost:{port}")
         
         # Wait for all servers
-        await asyncio.gather(*tasks)
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await proxy_connection_pools.close_all()
+            await http_client_pool.close_all()
 
 # Main execution
 if __name__ == "__main__":
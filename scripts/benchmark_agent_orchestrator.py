@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Agent Orchestrator Setup Benchmark
+
+Compares the per-request agent setup cost of building a fresh orchestrator
+(LM client + DSPy planner and agent modules) with fetching the shared one from
+the process-wide registry.
+
+No LLM calls are made; only orchestrator construction is timed.
+
+Usage:
+    python benchmark_agent_orchestrator.py [--requests 200] [--api-key sk-test]
+
+Options:
+    --requests: Number of simulated requests per strategy
+    --api-key: Fake OpenAI key so the LM client is constructed as well
+    --configs: Number of distinct LLM configurations requests are spread over
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import logging
+
+# Add the backend directory to the Python path
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_dir)
+
+from app.agents.base_agents import create_agent_orchestrator
+from app.services.agent_orchestrator_registry import AgentOrchestratorRegistry
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "mean_ms": statistics.mean(samples) * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        "total_s": sum(samples)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-request agent orchestrator setup")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--configs", type=int, default=2)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    configs = [
+        {
+            "provider": "openai",
+            "model": f"gpt-3.5-turbo-{i}",
+            "api_key": args.api_key,
+            "temperature": 0.1,
+            "max_tokens": 2000
+        }
+        for i in range(args.configs)
+    ]
+
+    # Before: every request builds its own orchestrator
+    per_request = []
+    for i in range(args.requests):
+        started = time.perf_counter()
+        create_agent_orchestrator(configs[i % len(configs)])
+        per_request.append(time.perf_counter() - started)
+
+    # After: requests share one orchestrator per configuration
+    registry = AgentOrchestratorRegistry(factory=create_agent_orchestrator)
+    startup = []
+    for config in configs:
+        started = time.perf_counter()
+        registry.get(config)
+        startup.append(time.perf_counter() - started)
+    shared = []
+    for i in range(args.requests):
+        started = time.perf_counter()
+        registry.get(configs[i % len(configs)])
+        shared.append(time.perf_counter() - started)
+
+    before, after = summarize(per_request), summarize(shared)
+    print(f"Requests: {args.requests} over {len(configs)} LLM configurations")
+    print(f"First build per configuration (startup): {summarize(startup)['mean_ms']:.2f} ms")
+    print(f"{'':24}{'mean':>10}{'p50':>10}{'p95':>10}{'total':>10}")
+    for label, result in (("per-request build", before), ("shared registry", after)):
+        print(
+            f"{label:24}{result['mean_ms']:>8.3f}ms{result['p50_ms']:>8.3f}ms"
+            f"{result['p95_ms']:>8.3f}ms{result['total_s']:>9.3f}s"
+        )
+    if after["mean_ms"] > 0:
+        print(f"Per-request setup is {before['mean_ms'] / after['mean_ms']:.0f}x cheaper with the registry")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 # Test environment setup
 os.environ["TESTING"] = "true"
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+# Blob refcounts live in the database; tests that need deduplication enable it explicitly
+os.environ.setdefault("STORAGE_DEDUP_ENABLED", "false")
 
 
 @pytest.fixture(scope="session")
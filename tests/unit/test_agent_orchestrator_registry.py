@@ -0,0 +1,120 @@
+"""
+Tests for the shared agent orchestrator registry
+"""
+
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers related mappers)
+from app.models.dataset import LLMConfiguration
+from app.services import agent_service as agent_service_module
+from app.services.agent_orchestrator_registry import AgentOrchestratorRegistry
+
+
+class CountingFactory:
+    """Orchestrator factory that records every build"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.built = []
+
+    def __call__(self, llm_config):
+        time.sleep(self.delay)
+        orchestrator = {"llm_config": dict(llm_config)}
+        self.built.append(orchestrator)
+        return orchestrator
+
+
+def test_one_orchestrator_per_config_even_under_concurrency():
+    """Test concurrent requests for a config share a single build"""
+    factory = CountingFactory(delay=0.05)
+    registry = AgentOrchestratorRegistry(factory=factory)
+    config = {"provider": "openai", "model": "gpt-4", "api_key": "sk-1"}
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(registry.get(dict(config)))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    other = registry.get({**config, "model": "gpt-4o"})
+
+    assert len(factory.built) == 2
+    assert all(result is results[0] for result in results)
+    assert other is not results[0]
+    assert registry.stats["hits"] == 7
+    assert "sk-1" not in str(registry.get_metrics())
+
+
+def test_request_right_after_a_build_reuses_it(monkeypatch):
+    """Test a request arriving as a build finishes finds the entry instead of building again"""
+    from types import SimpleNamespace
+    from app.services import agent_orchestrator_registry as registry_module
+
+    factory = CountingFactory()
+    registry = AgentOrchestratorRegistry(factory=factory)
+    config = {"provider": "openai", "model": "gpt-4"}
+    late_results = []
+    late_threads = []
+
+    def perf_counter():
+        if len(factory.built) == 1 and not late_threads:  # Build returned, entry not stored yet
+            thread = threading.Thread(target=lambda: late_results.append(registry.get(dict(config))))
+            late_threads.append(thread)
+            thread.start()
+            thread.join(timeout=0.2)
+        return time.perf_counter()
+    monkeypatch.setattr(registry_module, "time", SimpleNamespace(perf_counter=perf_counter, time=time.time))
+
+    first = registry.get(dict(config))
+    late_threads[0].join()
+
+    assert len(factory.built) == 1
+    assert late_results == [first]
+
+
+def test_invalidation_by_source_and_lru_eviction():
+    """Test a changed configuration source is rebuilt and the least recently used entry evicted"""
+    factory = CountingFactory()
+    registry = AgentOrchestratorRegistry(factory=factory, max_entries=2)
+    first = registry.get({"model": "a"}, source="llm_configuration:1")
+    registry.get({"model": "b"}, source="llm_configuration:2")
+
+    assert registry.invalidate(source="llm_configuration:1") == 1
+    assert registry.get({"model": "a"}, source="llm_configuration:1") is not first
+    registry.get({"model": "c"})
+
+    assert [entry["model"] for entry in registry.get_metrics()["entries"]] == ["a", "c"]
+    assert registry.stats["evictions"] == 1
+
+
+def test_agent_services_share_the_orchestrator_of_their_org_config(monkeypatch):
+    """Test per-request services reuse one orchestrator and pick up edited LLM configurations"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    LLMConfiguration.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(LLMConfiguration(
+        name="default", provider="openai", llm_model_name="gpt-4", organization_id=1,
+        api_key="sk-1", model_params={"temperature": 0.3}, is_default=True, created_by=1
+    ))
+    db.commit()
+
+    factory = CountingFactory()
+    monkeypatch.setattr(agent_service_module, "agent_orchestrator_registry", AgentOrchestratorRegistry(factory=factory))
+
+    first = agent_service_module.create_agent_service(db, organization_id=1)
+    second = agent_service_module.create_agent_service(db, organization_id=1)
+    config = db.query(LLMConfiguration).first()
+    config.llm_model_name = "gpt-4o"
+    db.commit()
+    third = agent_service_module.create_agent_service(db, organization_id=1)
+
+    assert first.orchestrator is second.orchestrator
+    assert first.orchestrator["llm_config"]["temperature"] == 0.3
+    assert third.orchestrator["llm_config"]["model"] == "gpt-4o"
+    assert first.code_execution_service is not second.code_execution_service  # Per-request state
+    assert len(factory.built) == 2
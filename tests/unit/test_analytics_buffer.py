@@ -0,0 +1,159 @@
+"""
+Tests for batched analytics event ingestion
+"""
+
+import asyncio
+import re
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models.dataset  # noqa: F401  (registers related mappers)
+import app.models.organization  # noqa: F401
+import app.models.user  # noqa: F401
+from app.models.analytics import DatasetAccess, UsageStats
+from app.services.analytics_buffer import AnalyticsEventBuffer
+
+
+def _session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    DatasetAccess.__table__.create(engine)
+    UsageStats.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def _access(dataset_id, access_type):
+    return {"access_id": f"{dataset_id}-{access_type}", "dataset_id": dataset_id, "access_type": access_type}
+
+
+def test_events_flush_in_batches_with_aggregated_stats():
+    """Test a full batch triggers one bulk write and counters are summed per hourly bucket"""
+    Session = _session_factory()
+    buffer = AnalyticsEventBuffer(session_factory=Session, batch_size=5, flush_interval=60)
+
+    async def run():
+        for i in range(5):
+            access_type = "view" if i < 3 else "download"
+            row = _access(1, access_type)
+            row["access_id"] += f"-{i}"
+            await buffer.enqueue(DatasetAccess, row, access_type=access_type, dataset_id=1, organization_id=7)
+        for _ in range(100):  # Let the flusher pick up the full batch
+            if buffer.stats["flushes"]:
+                break
+            await asyncio.sleep(0.02)
+        flushed = buffer.stats["flushes"]
+        await buffer.enqueue(DatasetAccess, _access(2, "chat"), access_type="chat", dataset_id=2)
+        await buffer.stop()
+        return flushed
+
+    flushed_before_stop = asyncio.run(run())
+
+    db = Session()
+    assert flushed_before_stop == 1
+    assert db.query(DatasetAccess).count() == 6
+    stats = {row.dataset_id: row for row in db.query(UsageStats).all()}
+    assert (stats[1].total_views, stats[1].total_downloads, stats[1].organization_id) == (3, 2, 7)
+    assert stats[2].total_chats == 1
+    assert buffer.get_metrics()["pending"] == 0
+
+
+def test_existing_hourly_row_is_incremented():
+    """Test a later flush adds to the same hourly UsageStats row instead of duplicating it"""
+    Session = _session_factory()
+    buffer = AnalyticsEventBuffer(session_factory=Session, batch_size=100, flush_interval=60)
+
+    async def run():
+        await buffer.enqueue(DatasetAccess, _access(1, "view"), access_type="view", dataset_id=1)
+        await buffer.flush()
+        row = _access(1, "view")
+        row["access_id"] += "-2"
+        await buffer.enqueue(DatasetAccess, row, access_type="view", dataset_id=1)
+        await buffer.stop()
+
+    asyncio.run(run())
+
+    rows = Session().query(UsageStats).all()
+    assert len(rows) == 1
+    assert rows[0].total_views == 2
+
+
+def test_postgresql_upsert_inserts_every_total_as_zero_or_count():
+    """Test the raw SQL insert covers every zero-defaulted UsageStats total so none start NULL"""
+    statements = []
+    db = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+        execute=lambda statement, params: statements.append((str(statement), params))
+    )
+    counters = {(datetime(2024, 1, 1, 10), 1, 7): {"total_views": 3, "user_id": 5}}
+
+    AnalyticsEventBuffer(session_factory=None)._upsert_usage_stats(db, counters)
+
+    sql, params = statements[0]
+    insert = re.search(r"INSERT INTO usage_stats \((.*?)\)\s*SELECT (.*?)\s*FROM incoming", sql, re.S)
+    inserted = [column.strip() for column in insert.group(1).split(",")]
+    selected = [value.strip() for value in insert.group(2).split(",")]
+    zero_defaults = {
+        column.name for column in UsageStats.__table__.columns
+        if column.default is not None and column.default.arg == 0
+    }
+    assert zero_defaults <= set(inserted) and len(inserted) == len(selected)
+    assert selected[inserted.index("unique_users")] == "0"
+    assert "unique_users = COALESCE(s.unique_users, 0)" in sql
+    assert params["total_views_0"] == 3 and params["total_downloads_0"] == 0
+
+
+def test_backpressure_sheds_when_buffer_stays_full():
+    """Test producers wait for space and events are dropped if none frees up in time"""
+
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    buffer = AnalyticsEventBuffer(
+        session_factory=broken_session, batch_size=100, flush_interval=60,
+        max_pending=2, enqueue_timeout=0.05
+    )
+
+    async def run():
+        results = [
+            await buffer.enqueue(DatasetAccess, _access(i, "view"), access_type="view", dataset_id=i)
+            for i in range(3)
+        ]
+        await buffer.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == [True, True, False]
+    assert buffer.stats["backpressure_waits"] == 1
+    assert buffer.stats["failed_flushes"] >= 1
+    assert buffer.get_metrics()["pending"] == 2  # Failed batch is kept, not lost
+
+
+def test_rejected_row_is_isolated_and_dropped_after_retries():
+    """Test one row the database refuses does not hold back the batch and is dropped after max_retries"""
+    Session = _session_factory()
+    buffer = AnalyticsEventBuffer(session_factory=Session, batch_size=100, flush_interval=60, max_retries=3)
+    rejected = {"access_id": "orphan", "dataset_id": 9, "access_type": None}  # Violates NOT NULL like a stale FK
+
+    async def run():
+        await buffer.enqueue(DatasetAccess, _access(1, "view"), access_type="view", dataset_id=1)
+        await buffer.enqueue(DatasetAccess, rejected)
+        await buffer.enqueue(DatasetAccess, _access(2, "view"), access_type="view", dataset_id=2)
+        written = [await buffer.flush()]
+        pending_after_first = buffer.get_metrics()["pending"]
+        written += [await buffer.flush(), await buffer.flush()]
+        await buffer.stop()
+        return written, pending_after_first
+
+    written, pending_after_first = asyncio.run(run())
+
+    db = Session()
+    assert written == [2, 0, 0]
+    assert pending_after_first == 1
+    assert {row.access_id for row in db.query(DatasetAccess).all()} == {"1-view", "2-view"}
+    assert db.query(UsageStats).count() == 2
+    assert buffer.stats["rejected"] == 1 and buffer.get_metrics()["pending"] == 0
+    assert not buffer._row_rejections
@@ -0,0 +1,144 @@
+"""
+Tests for the proxied API response cache
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services.api_response_cache import APIResponseCache
+
+
+class Upstream:
+    """Fake upstream recording calls and honouring If-None-Match"""
+
+    def __init__(self, body=b'{"ok": true}', etag='"v1"', delay=0.0):
+        self.body = body
+        self.etag = etag
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, conditional_headers):
+        self.calls.append(conditional_headers)
+        await asyncio.sleep(self.delay)
+        if self.etag and conditional_headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, headers={"etag": self.etag})
+        headers = {"content-type": "application/json"}
+        if self.etag:
+            headers["etag"] = self.etag
+        return httpx.Response(200, headers=headers, content=self.body)
+
+
+def test_key_normalizes_params():
+    """Test parameter order and single-value lists don't split the cache"""
+    key = APIResponseCache.build_key(1, {"base_url": "x"}, "https://api/x", {"a": "1", "b": "2"})
+    assert key == APIResponseCache.build_key(1, {"base_url": "x"}, "https://api/x", {"b": ["2"], "a": 1})
+    assert key != APIResponseCache.build_key(2, {"base_url": "x"}, "https://api/x", {"a": "1", "b": "2"})
+    assert key != APIResponseCache.build_key(1, {"base_url": "y"}, "https://api/x", {"a": "1", "b": "2"})
+
+
+def test_key_changes_when_credentials_rotate():
+    """Test responses fetched with old credentials are not served after a rotation"""
+    config = {"base_url": "x"}
+    old = APIResponseCache.build_key(1, config, "https://api/x", credentials={"api_key": "old"})
+
+    assert old == APIResponseCache.build_key(1, config, "https://api/x", credentials={"api_key": "old"})
+    assert old != APIResponseCache.build_key(1, config, "https://api/x", credentials={"api_key": "new"})
+    assert old != APIResponseCache.build_key(1, config, "https://api/x", credentials="gAAAA-encrypted")
+    assert "old" not in old
+
+
+def test_hit_then_revalidate_with_etag():
+    """Test fresh entries are served locally and expired ones revalidate with a 304"""
+    cache = APIResponseCache(default_ttl=60)
+    upstream = Upstream()
+
+    async def run():
+        first = await cache.fetch("1:a", 60, upstream)
+        second = await cache.fetch("1:a", 60, upstream)
+        cache._entries["1:a"].expires_at = 0  # Force expiry
+        third = await cache.fetch("1:a", 60, upstream)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert len(upstream.calls) == 2
+    assert upstream.calls[1] == {"If-None-Match": '"v1"'}
+    assert second.json() == {"ok": True}
+    assert third.status_code == 200 and third.content == first.content
+    assert cache.stats["hits"] == 1 and cache.stats["revalidated"] == 1
+
+
+def test_concurrent_misses_are_coalesced():
+    """Test identical concurrent misses make a single upstream call"""
+    cache = APIResponseCache()
+    upstream = Upstream(delay=0.02)
+
+    async def run():
+        return await asyncio.gather(*(cache.fetch("1:a", 60, upstream) for _ in range(10)))
+
+    responses = asyncio.run(run())
+
+    assert len(upstream.calls) == 1
+    assert all(response.status_code == 200 for response in responses)
+    assert cache.stats["coalesced"] == 9
+
+
+def test_byte_bounded_lru_and_bypass():
+    """Test least recently used entries are evicted by size, and TTL 0 bypasses the cache"""
+    cache = APIResponseCache(max_bytes=2500, max_entry_bytes=2000)
+    upstream = Upstream(body=b"x" * 1000, etag=None)
+
+    async def run():
+        await cache.fetch("1:a", 60, upstream)
+        await cache.fetch("1:b", 60, upstream)
+        await cache.fetch("1:a", 60, upstream)  # Touch a so b is least recent
+        await cache.fetch("1:c", 60, upstream)
+        await cache.fetch("2:z", 0, upstream)
+
+    asyncio.run(run())
+
+    assert set(cache._entries) == {"1:a", "1:c"}
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["bypassed"] == 1
+    assert cache.invalidate_connector(1) == 2
+    assert cache.get_metrics()["bytes"] == 0
+
+
+def test_multi_port_proxy_misses_after_credential_rotation(monkeypatch):
+    """Test the multi-port API proxy keys its cache by the connector's credentials"""
+    pytest.importorskip("pymongo")
+    pytest.importorskip("clickhouse_driver")
+    import proxy_server
+
+    seen = []
+
+    def upstream(request):
+        seen.append(request.headers.get("authorization"))
+        return httpx.Response(200, json={"token": request.headers.get("authorization")})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    monkeypatch.setattr(proxy_server.http_client_pool, "get_client", lambda url: client)
+    monkeypatch.setattr(proxy_server, "api_response_cache", APIResponseCache(default_ttl=60))
+    service = proxy_server.MultiPortProxyService.__new__(proxy_server.MultiPortProxyService)
+    connector = SimpleNamespace(
+        id=1, name="posts", real_connection_config=json.dumps({"base_url": "https://api.example.com"}),
+        real_credentials=json.dumps({"api_key": "old"})
+    )
+    request = SimpleNamespace(method="GET", query_params={"endpoint": "/posts"})
+
+    async def run():
+        first = await service.handle_api_proxy(connector, request, db=None)
+        cached = await service.handle_api_proxy(connector, request, db=None)
+        connector.real_credentials = json.dumps({"api_key": "new"})
+        rotated = await service.handle_api_proxy(connector, request, db=None)
+        await client.aclose()
+        return first, cached, rotated
+
+    first, cached, rotated = asyncio.run(run())
+
+    assert seen == ["Bearer old", "Bearer new"]
+    assert cached["data"] == first["data"] and rotated["data"] == {"token": "Bearer new"}
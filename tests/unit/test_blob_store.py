@@ -0,0 +1,117 @@
+"""
+Tests for content-addressed deduplicated storage
+"""
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers related mappers)
+from app.core.database import Base
+from app.models.dataset import Dataset, DatasetFile, StorageBlob
+from app.services.blob_store import BlobStore
+from app.services.storage import StorageService, LocalStorageBackend
+
+
+def _upload_file(content, filename="data.csv"):
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+    spooled.write(content)
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename=filename)
+
+
+class CountingBackend(LocalStorageBackend):
+    def __init__(self, storage_dir):
+        super().__init__(storage_dir)
+        self.writes = 0
+
+    async def store_stream(self, read_chunk, file_path, metadata):
+        self.writes += 1
+        return await super().store_stream(read_chunk, file_path, metadata)
+
+
+@pytest.fixture
+def storage(temp_dir):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[StorageBlob.__table__, Dataset.__table__, DatasetFile.__table__])
+    storage = StorageService()
+    storage.backend = CountingBackend(os.path.join(temp_dir, "storage"))
+    storage.blob_store = BlobStore(session_factory=sessionmaker(bind=engine), enabled=True, gc_grace_seconds=0)
+    return storage
+
+
+def _blob(storage, path):
+    db = storage.blob_store.session_factory()
+    try:
+        return db.query(StorageBlob).filter(StorageBlob.storage_path == path).first()
+    finally:
+        db.close()
+
+
+def test_duplicate_uploads_share_one_blob(storage):
+    """Test identical content is written once and referenced by every upload"""
+    content = b"id,name\n1,a\n2,b\n"
+
+    async def run():
+        first = await storage.store_dataset_file_stream(_upload_file(content), "team_a.csv", 1, 1)
+        second = await storage.store_dataset_file_stream(_upload_file(content), "team_b.csv", 2, 2)
+        other = await storage.store_dataset_file(content, "export.txt", 3, 1)
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+
+    assert first["relative_path"] == second["relative_path"]
+    assert first["relative_path"].startswith("blobs/") and first["relative_path"].endswith(".csv")
+    assert not first["deduplicated"] and second["deduplicated"]
+    assert storage.backend.writes == 1
+    assert _blob(storage, first["relative_path"]).ref_count == 2
+    assert other["relative_path"] != first["relative_path"]  # Extension is part of the blob path
+    assert storage.blob_store.stats["bytes_deduplicated"] == len(content)
+
+
+def test_gc_collects_only_unreferenced_blobs(storage):
+    """Test deletes decrement refcounts and the collector removes blobs only at zero"""
+    async def run():
+        result = await storage.store_dataset_file_stream(_upload_file(b"x,y\n"), "data.csv", 1, 1)
+        path = result["relative_path"]
+        await storage.store_dataset_file_stream(_upload_file(b"x,y\n"), "data.csv", 2, 1)
+
+        await storage.delete_dataset_file(path)
+        kept = await storage.blob_store.collect(storage)
+        exists_after_first_delete = await storage.file_exists(path, use_cache=False)
+
+        await storage.delete_dataset_file(path)
+        collected = await storage.blob_store.collect(storage)
+        return path, kept, exists_after_first_delete, collected
+
+    path, kept, exists_after_first_delete, collected = asyncio.run(run())
+
+    assert kept["collected"] == 0 and exists_after_first_delete
+    assert collected["collected"] == 1 and collected["bytes_collected"] == 4
+    assert _blob(storage, path) is None
+    assert not os.path.exists(os.path.join(storage.backend.storage_dir, path))
+
+
+def test_gc_repairs_refcount_of_blob_still_in_use(storage):
+    """Test a zero-refcount blob that a dataset file still points at is kept"""
+    async def run():
+        result = await storage.store_dataset_file(b"a\n1\n", "data.csv", 1, 1)
+        path = result["relative_path"]
+        db = storage.blob_store.session_factory()
+        db.add(DatasetFile(dataset_id=1, filename="data.csv", file_path=path, relative_path=path))
+        db.commit()
+        db.close()
+        await storage.delete_dataset_file(path)
+        return path, await storage.blob_store.collect(storage)
+
+    path, result = asyncio.run(run())
+
+    assert result["collected"] == 0 and result["repaired"] == 1
+    assert _blob(storage, path).ref_count == 1
+    assert os.path.exists(os.path.join(storage.backend.storage_dir, path))
@@ -0,0 +1,147 @@
+"""
+Tests for the pooled agent code sandbox
+"""
+
+import asyncio
+import os
+import pickle
+from types import SimpleNamespace
+
+import pandas as pd
+import pyarrow as pa
+
+from app.services.code_sandbox import HEADER, CodeSandboxPool, SandboxWorkerError, _SandboxWorker
+from app.services.code_execution_service import CodeExecutionService
+from app.services.columnar_cache import ColumnarCacheService
+from app.services.storage import StorageService, LocalStorageBackend
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def test_code_runs_against_real_dataset_from_arrow_sample(temp_dir):
+    """Test sandboxed code sees the real dataset through the exported Arrow sample"""
+    storage = StorageService()
+    storage.backend = LocalStorageBackend(os.path.join(temp_dir, "storage"))
+    cache = ColumnarCacheService(storage=storage, cache_dir=os.path.join(temp_dir, "cache"))
+    csv_path = os.path.join(temp_dir, "storage", "sales.csv")
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    pd.DataFrame({"region": ["north", "south", "east"] * 100, "amount": range(300)}).to_csv(csv_path, index=False)
+    assert run(cache.build_sidecar(csv_path, "sales.csv", "csv"))["success"]
+
+    full_path = cache.export_arrow_sample("sales.csv", max_rows=1000)
+    sample_path = cache.export_arrow_sample("sales.csv", max_rows=50)
+    assert cache.export_arrow_sample("sales.csv", max_rows=1000) == full_path  # Reused while fresh
+
+    pool = CodeSandboxPool(workers=1, cpu_seconds=10, memory_mb=0, timeout=30)
+    service = CodeExecutionService(sandbox=pool)
+    try:
+        result = run(service.execute_agent_code(
+            "print(len(df), int(df['amount'].sum()), sorted(df['region'].unique()))",
+            {"name": "sales"},
+            data_path=full_path
+        ))
+        sampled = run(pool.execute("df['amount'] = 0\nprint(len(df))", sample_path))
+        again = run(pool.execute("print(int(df['amount'].sum()))", sample_path))
+    finally:
+        run(pool.stop())
+
+    assert result["success"]
+    assert result["output"].strip() == "300 44850 ['east', 'north', 'south']"
+    assert sampled["output"].strip() == "50"
+    assert again["output"].strip() != "0"  # One job's mutations do not leak into the next
+    assert pa.ipc.open_file(pa.memory_map(full_path)).read_all().num_rows == 300
+
+
+def test_wall_clock_timeout_kills_and_replaces_worker():
+    """Test a job that never finishes is killed and the pool keeps serving"""
+    pool = CodeSandboxPool(workers=1, cpu_seconds=60, memory_mb=0, timeout=2)
+    try:
+        first_pid = run(pool.execute("import os\nprint(os.getpid())"))["output"].strip()
+        hung = run(pool.execute("import time\ntime.sleep(30)"))
+        after = run(pool.execute("import os\nprint(os.getpid())"))
+    finally:
+        run(pool.stop())
+
+    assert not hung["success"]
+    assert "timed out" in hung["error"]
+    assert after["success"]
+    assert after["output"].strip() != first_pid
+    assert pool.stats["timeouts"] == 1
+    assert pool.stats["workers_started"] == 2
+
+
+def test_errors_and_cpu_limit_are_reported_without_losing_the_worker():
+    """Test exceptions and CPU-time overruns come back as failures from a surviving worker"""
+    pool = CodeSandboxPool(workers=1, cpu_seconds=1, memory_mb=0, timeout=30)
+    try:
+        failed = run(pool.execute("raise ValueError('bad column')"))
+        spun = run(pool.execute("while True:\n    pass"))
+        ok = run(pool.execute("print(1 + 1)"))
+    finally:
+        run(pool.stop())
+
+    assert not failed["success"]
+    assert "ValueError: bad column" in failed["error"]
+    assert not spun["success"]
+    assert "CPU time limit" in spun["error"]
+    assert ok["output"].strip() == "2"
+    assert pool.stats["workers_started"] == 1
+    assert pool.get_metrics()["failed"] == 2
+
+
+class _Exploit:
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return (os.mkdir, (self.marker,))
+
+
+def test_worker_frames_are_never_unpickled(temp_dir):
+    """Test the parent parses worker output as JSON only, so a forged pickle cannot run code"""
+    marker = os.path.join(temp_dir, "exploited")
+    results = []
+    for payload in (b'{"success": true, "output": "ok"}', pickle.dumps({"result": _Exploit(marker)}), b"[1, 2]"):
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, HEADER.pack(len(payload)) + payload)
+        os.close(write_fd)
+        worker = object.__new__(_SandboxWorker)
+        worker.process = SimpleNamespace(stdout=os.fdopen(read_fd, "rb"), poll=lambda: None)
+        try:
+            results.append(worker.receive(timeout=5))
+        except SandboxWorkerError as e:
+            results.append(str(e))
+        finally:
+            worker.process.stdout.close()
+
+    assert results[0] == {"success": True, "output": "ok"}
+    assert results[1].startswith("Malformed frame") and results[2].startswith("Malformed frame")
+    assert not os.path.exists(marker)
+
+
+def test_execute_endpoint_code_runs_in_the_sandbox_pool():
+    """Test /agents/execute code goes to a sandbox worker with the dataset, not a placeholder"""
+    from app.services.agent_service import AgentService
+
+    jobs = []
+
+    class Sandbox:
+        async def execute(self, code, data_path=None):
+            jobs.append((code, data_path))
+            return {"success": True, "output": "3\n", "plotly_figures": ['{"data": [], "layout": {}}']}
+
+    service = AgentService.__new__(AgentService)
+    service.code_execution_service = CodeExecutionService(sandbox=Sandbox())
+
+    async def sandbox_data(dataset):
+        return "/tmp/sales.arrow"
+    service._prepare_sandbox_data = sandbox_data
+    dataset = SimpleNamespace(id=4, name="sales", description=None, file_type="csv", created_at=None)
+
+    result = run(service.execute_code_safely("print(len(df))", dataset))
+
+    assert jobs == [("print(len(df))", "/tmp/sales.arrow")]
+    assert result["success"] and result["output"] == "3\n"
+    assert result["plotly_figures"][0]["type"] == "plotly"
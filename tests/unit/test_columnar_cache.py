@@ -0,0 +1,177 @@
+"""
+Tests for the columnar Parquet sidecar cache
+"""
+
+import os
+import asyncio
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.services.storage import StorageService, LocalStorageBackend
+from app.services.columnar_cache import ColumnarCacheService
+
+
+@pytest.fixture
+def cache(temp_dir):
+    storage = StorageService()
+    storage.backend = LocalStorageBackend(os.path.join(temp_dir, "storage"))
+    return ColumnarCacheService(storage=storage, cache_dir=os.path.join(temp_dir, "cache"))
+
+
+def _write_csv(cache, relative_path, rows):
+    full_path = cache.storage.get_local_path(relative_path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "w") as f:
+        f.write("id,name,score\n")
+        for i in range(rows):
+            f.write(f"{i},name_{i},{i * 0.5}\n")
+    return full_path
+
+
+def test_build_and_read_rows(cache):
+    """Test a CSV sidecar serves exact counts, paginated slices and projections"""
+    cache.ROW_GROUP_SIZE = 100
+    source = _write_csv(cache, "org_1/data.csv", 1050)
+
+    result = asyncio.run(cache.build_sidecar(source, "org_1/data.csv", "csv"))
+
+    assert result["success"] is True
+    assert cache.num_rows("org_1/data.csv") == 1050
+    assert os.path.exists(source + ".columnar.parquet")
+
+    page = cache.read_rows("org_1/data.csv", offset=995, limit=10)
+    assert page["id"].tolist() == list(range(995, 1005))
+
+    projected = cache.read_rows("org_1/data.csv", offset=1045, limit=10, columns=["name"])
+    assert projected.columns.tolist() == ["name"]
+    assert len(projected) == 5
+
+    assert len(cache.read_rows("org_1/data.csv", offset=5000, limit=10)) == 0
+
+
+def test_sample_is_bounded(cache):
+    """Test visualization sampling caps the number of rows"""
+    source = _write_csv(cache, "org_1/data.csv", 500)
+    asyncio.run(cache.build_sidecar(source, "org_1/data.csv", "csv"))
+
+    assert len(cache.read_sample("org_1/data.csv", max_rows=100)) == 100
+    assert len(cache.read_sample("org_1/data.csv", max_rows=1000)) == 500
+
+
+def test_sample_reads_only_sampled_row_groups(cache, monkeypatch):
+    """Test sampling decodes just the row groups holding sampled rows, never the whole file"""
+    import numpy as np
+    import pyarrow.parquet as pq
+
+    cache.ROW_GROUP_SIZE = 100
+    source = _write_csv(cache, "org_1/data.csv", 1050)
+    asyncio.run(cache.build_sidecar(source, "org_1/data.csv", "csv"))
+    full = pq.read_table(cache.local_sidecar_path("org_1/data.csv"))
+    expected = np.sort(np.random.default_rng(42).choice(1050, 3, replace=False))
+
+    groups_read = []
+    read_row_group = pq.ParquetFile.read_row_group
+
+    def spy(self, i, *args, **kwargs):
+        groups_read.append(i)
+        return read_row_group(self, i, *args, **kwargs)
+
+    def no_full_read(self, *args, **kwargs):
+        raise AssertionError("whole sidecar read")
+    monkeypatch.setattr(pq.ParquetFile, "read_row_group", spy)
+    monkeypatch.setattr(pq.ParquetFile, "read", no_full_read)
+
+    sample = cache.read_sample("org_1/data.csv", max_rows=3, columns=["id", "score"])
+
+    assert sample["id"].tolist() == full.take(expected).column("id").to_pylist()
+    assert sample.columns.tolist() == ["id", "score"]
+    assert groups_read == sorted(set(int(i) // 100 for i in expected))
+
+
+def test_invalidate_and_stale_source(cache):
+    """Test sidecars are dropped on invalidation and ignored once the source changes"""
+    source = _write_csv(cache, "org_1/data.csv", 10)
+    asyncio.run(cache.build_sidecar(source, "org_1/data.csv", "csv"))
+    assert cache.has_sidecar("org_1/data.csv")
+
+    future = os.path.getmtime(source) + 60
+    os.utime(source, (future, future))
+    assert cache.read_rows("org_1/data.csv") is None
+
+    asyncio.run(cache.invalidate("org_1/data.csv"))
+    assert not os.path.exists(source + ".columnar.parquet")
+
+
+def test_sidecars_survive_orphan_cleanup(cache):
+    """Test the orphan scan maps sidecars back to their source file"""
+    storage = cache.storage
+    assert storage.get_sidecar_source_path("org_1/data.csv.columnar.parquet") == "org_1/data.csv"
+    assert storage.get_sidecar_source_path("org_1/data.csv") is None
+
+
+def test_date_columns_read_back_as_pandas_does(cache, monkeypatch):
+    """Test date/time columns keep the string values pd.read_csv gives, so schema metadata stays JSON-serializable"""
+    import json
+    import pandas as pd
+    from pathlib import Path
+    from types import SimpleNamespace
+    from app.services import metadata
+    from app.services.metadata import MetadataService
+
+    source = cache.storage.get_local_path("org_1/events.csv")
+    os.makedirs(os.path.dirname(source), exist_ok=True)
+    with open(source, "w") as f:
+        f.write("id,day,at,clock\n")
+        for i in range(1, 4):
+            f.write(f"{i},2024-01-0{i},2024-01-0{i} 10:00:00,10:0{i}:00\n")
+    asyncio.run(cache.build_sidecar(source, "org_1/events.csv", "csv"))
+    monkeypatch.setattr(metadata, "columnar_cache", cache)
+    dataset = SimpleNamespace(id=1, type=SimpleNamespace(value="csv"), connector_id=None,
+                              file_path="org_1/events.csv", source_url=None)
+
+    sidecar = cache.read_rows("org_1/events.csv")
+    schema = asyncio.run(MetadataService(db=None)._analyze_csv_schema(Path(source), dataset))
+
+    pd.testing.assert_frame_equal(sidecar, pd.read_csv(source))
+    assert schema["sample_data"][0]["day"] == "2024-01-01"
+    json.dumps(schema)
+
+
+def test_remote_build_converts_off_loop_and_streams_upload(cache, monkeypatch):
+    """Test conversion runs in a worker thread and the sidecar is streamed to remote storage"""
+    import threading
+    from app.services.storage import BaseStorageBackend
+
+    class RemoteBackend(BaseStorageBackend):
+        def __init__(self):
+            self.streamed = {}
+
+        async def store_stream(self, read_chunk, file_path, metadata):
+            chunks = []
+            while chunk := await read_chunk():
+                chunks.append(chunk)
+            self.streamed[file_path] = b"".join(chunks)
+            return {"success": True}
+
+        async def store_file(self, file_content, file_path, metadata):
+            raise AssertionError("sidecar must not be uploaded from memory")
+
+    source = _write_csv(cache, "org_1/data.csv", 50)
+    cache.storage.backend = RemoteBackend()
+    threads = []
+    write_sidecar = cache._write_sidecar
+
+    def recording_write(*args):
+        threads.append(threading.current_thread())
+        return write_sidecar(*args)
+    monkeypatch.setattr(cache, "_write_sidecar", recording_write)
+
+    result = asyncio.run(cache.build_sidecar(source, "org_1/data.csv", "csv"))
+
+    assert result["success"] is True
+    assert threads and threads[0] is not threading.main_thread()
+    sidecar_path = cache.storage.get_sidecar_path("org_1/data.csv", cache.SIDECAR_KIND)
+    with open(cache.local_sidecar_path("org_1/data.csv"), "rb") as f:
+        assert cache.storage.backend.streamed[sidecar_path] == f.read()
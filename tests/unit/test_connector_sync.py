@@ -0,0 +1,212 @@
+"""
+Tests for the incremental connector sync engine
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.services.columnar_cache import ColumnarCacheService
+from app.services.connector_sync import ConnectorSyncEngine, SqlTableSource, ApiSource, MongoCollectionSource
+from app.services.storage import StorageService, LocalStorageBackend
+
+
+def sqlite_timestamp(value):
+    # SQLite compares DATETIME values as text, in the format SQLAlchemy binds them
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+@pytest.fixture
+def cache(temp_dir):
+    storage = StorageService()
+    storage.backend = LocalStorageBackend(os.path.join(temp_dir, "storage"))
+    return ColumnarCacheService(storage=storage, cache_dir=os.path.join(temp_dir, "cache"))
+
+
+@pytest.fixture
+def source_db(temp_dir):
+    engine = create_engine(f"sqlite:///{os.path.join(temp_dir, 'source.db')}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY, amount FLOAT, updated_at DATETIME)"))
+        connection.execute(text("CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT)"))
+        for i in range(1, 8):
+            # Several rows share a watermark value, so batches must not skip ties
+            connection.execute(
+                text("INSERT INTO orders VALUES (:id, :amount, :ts)"),
+                {"id": i, "amount": i * 10.0, "ts": sqlite_timestamp(datetime(2024, 1, 1 + i // 3))}
+            )
+            connection.execute(text("INSERT INTO events VALUES (:id, :name)"), {"id": i, "name": f"e{i}"})
+    yield engine
+    engine.dispose()
+
+
+def make_engine(cache, sql_engine, **kwargs):
+    return ConnectorSyncEngine(
+        columnar=cache,
+        source_factory=lambda connector, table, shared: SqlTableSource(sql_engine, table),
+        **kwargs
+    )
+
+
+def dataset(dataset_id, table, **sync_options):
+    return SimpleNamespace(
+        id=dataset_id, connector_id=1, mindsdb_table_name=table, source_url=table,
+        connection_params={"sync": sync_options} if sync_options else None
+    )
+
+
+def test_watermark_sync_picks_up_only_changed_rows(cache, source_db):
+    """Test a second sync fetches updated and inserted rows and upserts them by key"""
+    engine = make_engine(cache, source_db, batch_size=2)
+    connector = SimpleNamespace(id=1, connector_type="postgresql")
+    orders = dataset(10, "orders")
+
+    first = run(engine.sync_connector(connector, [orders]))
+    with source_db.begin() as connection:
+        connection.execute(text("UPDATE orders SET amount = 999, updated_at = '2024-02-01 00:00:00.000000' WHERE id = 2"))
+        connection.execute(text("INSERT INTO orders VALUES (8, 80, '2024-02-02 00:00:00.000000')"))
+    second = run(engine.sync_connector(connector, [orders]))
+    third = run(engine.sync_connector(connector, [orders]))
+
+    table = first["tables"][0]
+    assert table["mode"] == "upsert" and not table["incremental"]
+    assert first["rows_synced"] == 7 and table["batches"] == 4
+    assert second["tables"][0]["incremental"] and second["rows_synced"] == 2
+    assert third["rows_synced"] == 0
+
+    key = cache.storage_key_for_dataset(orders)
+    df = cache.read_rows(key).sort_values("id")
+    assert list(df["id"]) == list(range(1, 9))
+    assert df.loc[df["id"] == 2, "amount"].item() == 999
+    assert engine.read_state(cache.local_sidecar_path(key))["watermark_column"] == "updated_at"
+
+
+def test_parallel_tables_append_by_id_and_full_refresh_on_schema_change(cache, source_db):
+    """Test tables sync concurrently, monotonic ids append and a changed schema forces a full refresh"""
+    engine = make_engine(cache, source_db, workers=2)
+    connector = SimpleNamespace(id=1, connector_type="mysql")
+    datasets = [dataset(10, "orders"), dataset(11, "events"), dataset(12, "missing_table")]
+
+    first = run(engine.sync_connector(connector, datasets))
+    with source_db.begin() as connection:
+        connection.execute(text("INSERT INTO events VALUES (8, 'e8')"))
+    second = run(engine.sync_connector(connector, [datasets[1]]))
+    with source_db.begin() as connection:
+        connection.execute(text("ALTER TABLE events ADD COLUMN source TEXT"))
+    third = run(engine.sync_connector(connector, [datasets[1]]))
+
+    assert first["tables_synced"] == 2 and first["tables_failed"] == 1
+    assert not first["success"]
+    events = second["tables"][0]
+    assert events["mode"] == "append" and events["rows_fetched"] == 1 and events["snapshot_rows"] == 8
+    assert third["tables"][0]["rows_fetched"] == 8 and not third["tables"][0]["incremental"]
+    assert "source" in cache.column_names(cache.storage_key_for_dataset(datasets[1]))
+    assert engine.get_metrics()["full_refreshes"] == 1
+
+
+class FakeCollection:
+    """Just enough of a pymongo collection for the sync queries"""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    @staticmethod
+    def _matches(document, query):
+        for field, condition in query.items():
+            if field == "$or":
+                if not any(FakeCollection._matches(document, q) for q in condition):
+                    return False
+                continue
+            value = document.get(field)
+            if not isinstance(condition, dict):
+                if value != condition:
+                    return False
+            elif "$gt" in condition and (value is None or not value > condition["$gt"]):
+                return False
+            elif "$ne" in condition and value == condition["$ne"]:
+                return False
+        return True
+
+    def find(self, query):
+        found = [d for d in self.documents if self._matches(d, query)]
+        cursor = SimpleNamespace()
+        cursor.sort = lambda keys: SimpleNamespace(limit=lambda n: sorted(
+            found, key=lambda d: tuple((d.get(k) is None, d.get(k)) for k, _ in keys))[:n])
+        return cursor
+
+
+def test_first_load_keeps_rows_without_watermark(cache, source_db):
+    """Test NULL-watermark rows reach the initial snapshot and later runs stay incremental"""
+    with source_db.begin() as connection:
+        connection.execute(text("INSERT INTO orders VALUES (20, 5, NULL)"))
+    collection = FakeCollection([{"_id": i, "v": i, "changed": i if i % 2 else None} for i in range(1, 6)])
+    sources = {"orders": SqlTableSource(source_db, "orders"), "docs": MongoCollectionSource(collection)}
+    engine = ConnectorSyncEngine(
+        columnar=cache,
+        source_factory=lambda connector, table, shared: sources[table],
+        batch_size=2
+    )
+    connector = SimpleNamespace(id=1, connector_type="postgresql")
+    orders = dataset(10, "orders")
+    docs = dataset(11, "docs", watermark_column="changed")
+
+    first = run(engine.sync_connector(connector, [orders, docs]))
+    with source_db.begin() as connection:
+        connection.execute(text("INSERT INTO orders VALUES (21, 6, '2024-03-01 00:00:00.000000')"))
+    collection.documents.append({"_id": 6, "v": 6, "changed": 7})
+    second = run(engine.sync_connector(connector, [orders, docs]))
+
+    assert first["rows_synced"] == 8 + 5
+    assert all(t["incremental"] for t in second["tables"]) and second["rows_synced"] == 2
+    assert sorted(cache.read_rows(cache.storage_key_for_dataset(orders))["id"]) == list(range(1, 8)) + [20, 21]
+    assert sorted(cache.read_rows(cache.storage_key_for_dataset(docs))["_id"]) == list(range(1, 7))
+
+
+class FakeCursorApi:
+    """Cursor-paginated API over an in-memory item list"""
+
+    def __init__(self, items, page_size):
+        self.items = items
+        self.page_size = page_size
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append(dict(params))
+        start = int(params.get("cursor") or 0)
+        page = self.items[start:start + self.page_size]
+        body = {"data": page, "next_cursor": str(start + len(page)) if page else params.get("cursor")}
+        return SimpleNamespace(json=lambda: body, raise_for_status=lambda: None)
+
+
+def test_api_sync_resumes_from_stored_cursor(cache):
+    """Test an API dataset resumes from its last cursor and upserts items by key"""
+    api = FakeCursorApi([{"id": i, "value": {"n": i}} for i in range(5)], page_size=2)
+    engine = ConnectorSyncEngine(
+        columnar=cache,
+        source_factory=lambda connector, table, shared: ApiSource(api, "https://api.example.com/items")
+    )
+    connector = SimpleNamespace(id=2, connector_type="api")
+    feed = SimpleNamespace(
+        id=20, connector_id=2, mindsdb_table_name="items", source_url="items",
+        connection_params={"sync": {"key_column": "id", "pagination": {"type": "cursor", "items_path": "data"}}}
+    )
+
+    first = run(engine.sync_connector(connector, [feed]))
+    api.items.append({"id": 5, "value": {"n": 5}})
+    api.requests.clear()
+    second = run(engine.sync_connector(connector, [feed]))
+
+    assert first["rows_synced"] == 5
+    assert api.requests[0]["cursor"] == "5"  # No re-read of the pages already synced
+    assert second["rows_synced"] == 1
+    df = cache.read_rows(cache.storage_key_for_dataset(feed))
+    assert sorted(df["id"]) == [0, 1, 2, 3, 4, 5]
+    assert df.loc[df["id"] == 5, "value"].item() == '{"n": 5}'
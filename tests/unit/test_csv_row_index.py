@@ -0,0 +1,89 @@
+"""
+Tests for the sparse CSV row-offset index
+"""
+
+import os
+import json
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+
+from app.services.csv_row_index import CSVRowIndexService
+
+
+def _write_csv(path, rows):
+    with open(path, "w") as f:
+        f.write("id,comment\n")
+        for i in range(rows):
+            if i % 7 == 0:
+                f.write(f'{i},"multi\nline, {i}"\n')
+            else:
+                f.write(f"{i},plain {i}\n")
+
+
+def test_index_counts_rows_with_quoted_newlines(temp_dir):
+    """Test quoted newlines don't break row boundaries"""
+    path = os.path.join(temp_dir, "data.csv")
+    _write_csv(path, 250)
+
+    index = CSVRowIndexService(interval=10).build_index(path)
+
+    assert index["total_rows"] == 250
+    assert len(index["offsets"]) == 25
+
+
+def test_read_rows_matches_full_parse(temp_dir):
+    """Test seeking to a page returns the same rows as a full read"""
+    path = os.path.join(temp_dir, "data.csv")
+    _write_csv(path, 250)
+    service = CSVRowIndexService(interval=10)
+    with open(service.index_path_for(path), "w") as f:
+        json.dump(service.build_index(path), f)
+
+    index = service.load_index(path)
+    page = service.read_rows(path, index, offset=123, limit=20)
+    expected = pd.read_csv(path).iloc[123:143].reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(page, expected)
+    assert len(service.read_rows(path, index, offset=245, limit=20)) == 5
+    assert len(service.read_rows(path, index, offset=900, limit=20)) == 0
+
+
+def test_stale_index_is_ignored(temp_dir):
+    """Test an index is not used once the CSV changes size"""
+    path = os.path.join(temp_dir, "data.csv")
+    _write_csv(path, 20)
+    service = CSVRowIndexService(interval=5)
+    with open(service.index_path_for(path), "w") as f:
+        json.dump(service.build_index(path), f)
+
+    with open(path, "a") as f:
+        f.write("999,appended\n")
+
+    assert service.load_index(path) is None
+
+
+def test_build_and_store_scans_in_worker_thread(temp_dir, monkeypatch):
+    """Test the full-file scan runs off the event loop and the index is stored"""
+    path = os.path.join(temp_dir, "data.csv")
+    _write_csv(path, 30)
+    stored = {}
+
+    async def store_sidecar(file_path, kind, content):
+        stored[(file_path, kind)] = json.loads(content)
+    service = CSVRowIndexService(storage=SimpleNamespace(store_sidecar=store_sidecar), interval=10)
+    threads = []
+    build_index = service.build_index
+
+    def recording_build(source_local_path):
+        threads.append(threading.current_thread())
+        return build_index(source_local_path)
+    monkeypatch.setattr(service, "build_index", recording_build)
+
+    result = asyncio.run(service.build_and_store(path, "org_1/data.csv"))
+
+    assert result == {"success": True, "total_rows": 30, "entries": 3}
+    assert threads[0] is not threading.main_thread()
+    assert stored[("org_1/data.csv", "row_index")]["total_rows"] == 30
@@ -0,0 +1,121 @@
+"""
+Tests for the dataset upload endpoint and the shared dataset creation helper
+"""
+
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import datasets
+from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.models.dataset import DatasetStatus
+from app.services.storage import StorageService, LocalStorageBackend
+
+
+class FakeSession:
+    """Just enough of a SQLAlchemy session for the upload path"""
+
+    def __init__(self):
+        self.added = []
+        self.next_id = 1
+
+    def add(self, obj):
+        if obj not in self.added:
+            self.added.append(obj)
+
+    def refresh(self, obj):
+        if getattr(obj, "id", None) is None:
+            obj.id = self.next_id
+            self.next_id += 1
+
+    def commit(self):
+        for obj in self.added:
+            self.refresh(obj)
+
+    def rollback(self):
+        pass
+
+    def delete(self, obj):
+        self.added.remove(obj)
+
+
+class FakeMindsDB:
+    def process_file_content(self, path, file_type):
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        return {"success": True, "content": content, "metadata": {"element_count": 4}}
+
+    def create_dataset_ml_model(self, **kwargs):
+        return {"success": True, "chat_model": f"dataset_{kwargs['dataset_id']}_chat_model"}
+
+
+@pytest.fixture
+def client(temp_dir, monkeypatch):
+    storage = StorageService()
+    storage.backend = LocalStorageBackend(os.path.join(temp_dir, "storage"))
+    monkeypatch.setattr(datasets, "storage_service", storage)
+    monkeypatch.setattr(datasets, "mindsdb_service", FakeMindsDB())
+
+    async def no_sidecar(*args, **kwargs):
+        return None
+    monkeypatch.setattr(datasets.columnar_cache, "build_sidecar", no_sidecar)
+    monkeypatch.setattr(datasets.csv_row_index, "build_and_store", no_sidecar)
+
+    session = FakeSession()
+    app = FastAPI()
+    app.include_router(datasets.router, prefix="/api/datasets")
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=3, organization_id=1)
+    return TestClient(app), session
+
+
+@pytest.mark.parametrize("filename, content", [
+    ("sales.csv", b"region,total\nnorth,10\nsouth,20\n"),
+    ("sales.json", json.dumps([{"region": "north"}, {"region": "south"}]).encode("utf-8")),
+])
+def test_upload_creates_active_dataset_with_schema_metadata(client, filename, content):
+    """Test an upload runs through the helper and records the primary file's name"""
+    http, session = client
+
+    response = http.post("/api/datasets/upload", files={"file": (filename, content, "application/octet-stream")})
+
+    assert response.status_code == 200, response.text
+    dataset = session.added[0]
+    assert dataset.status == DatasetStatus.ACTIVE and dataset.name == "sales"
+    assert dataset.schema_metadata["original_filename"] == filename
+    assert response.json()["ai_chat_available"] is True
+
+
+def test_repeated_complete_of_upload_session_creates_one_dataset(client, monkeypatch):
+    """Test completing an upload session again answers 409 with the dataset instead of creating another"""
+    import asyncio
+    import hashlib
+    from app.services.upload_sessions import UploadSessionManager
+
+    http, session = client
+    manager = UploadSessionManager(storage=datasets.storage_service, chunk_size=8)
+    monkeypatch.setattr(datasets, "upload_session_manager", manager)
+    content = b"region,total\nnorth,10\nsouth,20\n"
+
+    async def upload():
+        upload_session = await manager.create_session(3, 1, "sales.csv", len(content))
+        for index in range(upload_session["total_chunks"]):
+            chunk = content[index * 8:(index + 1) * 8]
+            await manager.put_chunk(upload_session, index, chunk, hashlib.sha256(chunk).hexdigest())
+        return upload_session["session_id"]
+    session_id = asyncio.run(upload())
+
+    first = http.post(f"/api/datasets/uploads/{session_id}/complete")
+    second = http.post(f"/api/datasets/uploads/{session_id}/complete")
+
+    assert first.status_code == 200, first.text
+    assert second.status_code == 409
+    detail = second.json()["detail"]
+    assert detail["error_code"] == "UPLOAD_SESSION_COMPLETED" and detail["dataset_id"] == first.json()["dataset"]["id"]
+    datasets_created = [obj for obj in session.added if isinstance(obj, datasets.Dataset)]
+    assert len(datasets_created) == 1 and manager.stats["completed"] == 1
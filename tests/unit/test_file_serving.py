@@ -0,0 +1,95 @@
+"""
+Tests for conditional, zero-copy serving of local storage files
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import file_server
+from app.services.storage import LocalFileResponse, LocalStorageBackend, storage_service
+
+
+@pytest.fixture
+def client(temp_dir, monkeypatch):
+    monkeypatch.setattr(storage_service, "backend", LocalStorageBackend(os.path.join(temp_dir, "storage")))
+    app = FastAPI()
+    app.include_router(file_server.router, prefix="/api/files")
+    return TestClient(app)
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def test_repeated_fetch_of_unchanged_file_gets_304(client):
+    """Test served files carry validators and conditional requests skip the body"""
+    path = os.path.join(storage_service.backend.storage_dir, "org_1", "sales.csv")
+    _write(path, b"id,amount\n1,10\n")
+
+    first = client.get("/api/files/serve/org_1/sales.csv")
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+    by_etag = client.get("/api/files/serve/org_1/sales.csv", headers={"If-None-Match": f'"other", W/{etag}'})
+    by_date = client.get("/api/files/serve/org_1/sales.csv", headers={"If-Modified-Since": last_modified})
+
+    assert first.status_code == 200 and first.content == b"id,amount\n1,10\n"
+    assert first.headers["content-type"].startswith("text/csv")
+    assert 'filename="sales.csv"' in first.headers["content-disposition"]
+    assert by_etag.status_code == 304 and by_etag.content == b"" and by_etag.headers["etag"] == etag
+    assert by_date.status_code == 304
+
+    _write(path, b"id,amount\n1,10\n2,20\n")
+    os.utime(path, (time.time() + 5, time.time() + 5))
+    changed = client.get("/api/files/serve/org_1/sales.csv", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert client.get("/api/files/serve/org_1/missing.csv").status_code == 404
+
+
+def test_deduplicated_blobs_get_strong_content_hash_etag(client):
+    """Test blob files are validated by their SHA-256 rather than mtime"""
+    sha256 = "ab" * 32
+    blob_path = storage_service.blob_store.blob_path(sha256, "csv")
+    _write(os.path.join(storage_service.backend.storage_dir, blob_path), b"a,b\n1,2\n")
+
+    response = client.get(f"/api/files/serve/{blob_path}")
+    revalidated = client.get(f"/api/files/serve/{blob_path}", headers={"If-None-Match": f'"{sha256}"'})
+    ranged = client.get(f"/api/files/serve/{blob_path}", headers={"Range": "bytes=4-6"})
+
+    assert response.headers["etag"] == f'"{sha256}"'
+    assert revalidated.status_code == 304
+    assert ranged.status_code == 206 and ranged.content == b"1,2"
+
+
+def test_pathsend_hands_the_file_to_the_server(temp_dir):
+    """Test servers supporting pathsend get the path instead of the bytes"""
+    path = os.path.join(temp_dir, "big.bin")
+    _write(path, b"x" * 3_000_000)
+
+    def call(extensions, headers=()):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def receive():
+            return {"type": "http.request"}
+
+        scope = {"type": "http", "method": "GET", "headers": list(headers), "extensions": extensions}
+        response = LocalFileResponse(path, stat_result=os.stat(path))
+        asyncio.new_event_loop().run_until_complete(response(scope, receive, send))
+        return messages
+
+    zero_copy = call({"http.response.pathsend": {}})
+    streamed = call({})
+    ranged = call({"http.response.pathsend": {}}, [(b"range", b"bytes=0-9")])
+
+    assert [message["type"] for message in zero_copy] == ["http.response.start", "http.response.pathsend"]
+    assert zero_copy[1]["path"] == path
+    assert len([m for m in streamed if m["type"] == "http.response.body"]) == 3  # 1 MB chunks
+    assert ranged[0]["status"] == 206
@@ -0,0 +1,65 @@
+"""
+Tests for the shared upstream HTTP client pool
+"""
+
+import asyncio
+
+import httpx
+
+from app.services.http_client_pool import HTTPClientPool
+
+
+def test_origin_normalization():
+    """Test URLs on the same scheme/host/port share an origin"""
+    assert HTTPClientPool.origin_for("https://API.example.com/posts?x=1") == "https://api.example.com:443"
+    assert HTTPClientPool.origin_for("http://example.com:8080/a") == "http://example.com:8080"
+    assert HTTPClientPool.origin_for("http://example.com/a") == "http://example.com:80"
+
+
+def test_one_client_per_upstream_host():
+    """Test clients are reused per origin and recreated after shutdown"""
+    pool = HTTPClientPool(max_connections=10, max_keepalive_connections=5, http2=False)
+
+    async def run():
+        first = pool.get_client("https://api.example.com/posts")
+        same = pool.get_client("https://api.example.com/comments?page=2")
+        other = pool.get_client("https://other.example.com/")
+        metrics = pool.get_metrics()
+        await pool.close_all()
+        reopened = pool.get_client("https://api.example.com/posts")
+        await pool.close_all()
+        return first, same, other, metrics, reopened
+
+    first, same, other, metrics, reopened = asyncio.run(run())
+
+    assert first is same
+    assert other is not first
+    assert metrics["upstreams"]["https://api.example.com:443"]["requests"] == 2
+    assert first.is_closed
+    assert reopened is not first
+
+
+def test_pooled_clients_do_not_share_cookies():
+    """Test a Set-Cookie from one proxied response is not replayed on later requests"""
+    seen = []
+
+    def upstream(request):
+        seen.append(request.headers.get("cookie"))
+        return httpx.Response(200, headers={"set-cookie": "session=user-a; Path=/"})
+
+    pool = HTTPClientPool(http2=False)
+
+    async def run():
+        client = pool.get_client("https://api.example.com/")
+        client._transport = httpx.MockTransport(upstream)
+        await client.get("https://api.example.com/login")
+        await client.get("https://api.example.com/data")
+        await client.get("https://api.example.com/data", cookies={"token": "explicit"})
+        jar_size = len(client.cookies.jar)
+        await pool.close_all()
+        return jar_size
+
+    jar_size = asyncio.run(run())
+
+    assert seen == [None, None, "token=explicit"]
+    assert jar_size == 0
@@ -0,0 +1,102 @@
+"""
+Tests for cached image preview renditions
+"""
+
+import asyncio
+import io
+import os
+
+from PIL import Image
+
+from app.services.image_processing import ImageProcessingService, RENDITIONS
+from app.services.storage import StorageService, LocalStorageBackend
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def test_large_jpeg_is_decoded_at_reduced_scale(temp_dir):
+    """Test a large JPEG is opened with DCT scaling and every rendition fits its box"""
+    path = os.path.join(temp_dir, "photo.jpg")
+    Image.new("RGB", (6000, 4000), (200, 30, 30)).save(path, quality=90)
+    service = ImageProcessingService()
+
+    with service._open_for_size(path, RENDITIONS["thumbnail"]["size"]) as image:
+        image.load()
+        assert image.size == (750, 500)  # 1/8 scale, still covers the thumbnail box
+
+    renditions = service.generate_renditions(path)
+    assert set(renditions) == set(RENDITIONS)
+    for name, rendition in renditions.items():
+        spec = RENDITIONS[name]
+        decoded = Image.open(io.BytesIO(rendition["content"]))
+        assert decoded.format == spec["format"]
+        assert decoded.size == (rendition["width"], rendition["height"])
+        assert max(decoded.size) == spec["size"][0]
+    assert renditions["thumbnail"]["height"] == 213
+
+
+def test_pyramidal_tiff_uses_smallest_covering_level(temp_dir):
+    """Test a multi-resolution TIFF is read from the reduced level, not the full page"""
+    path = os.path.join(temp_dir, "scan.tiff")
+    levels = [Image.new("RGBA", (4096 // 2 ** i, 2048 // 2 ** i), (0, 90, 0, 128)) for i in range(4)]
+    levels[0].save(path, save_all=True, append_images=levels[1:])
+    service = ImageProcessingService()
+
+    with service._open_for_size(path, (320, 320)) as image:
+        assert image.size == (512, 256)
+    with service._open_for_size(path, (1280, 1280)) as image:
+        assert image.size == (2048, 1024)
+
+    renditions = service.generate_renditions(path)
+    assert (renditions["medium"]["width"], renditions["medium"]["height"]) == (1280, 640)
+    assert Image.open(io.BytesIO(renditions["webp"]["content"])).mode == "RGBA"  # WebP keeps alpha
+
+
+def test_renditions_are_stored_by_content_hash_and_kept_by_cleanup(temp_dir):
+    """Test renditions land under the source hash and survive the orphan sweep while referenced"""
+    storage = StorageService()
+    storage.backend = LocalStorageBackend(os.path.join(temp_dir, "storage"))
+    service = ImageProcessingService()
+    service.storage = storage
+    path = os.path.join(temp_dir, "logo.png")
+    Image.new("P", (800, 600)).save(path)
+
+    manifest = run(service.create_renditions(path, "ab" * 32))
+    failed = run(service.create_renditions(os.path.join(temp_dir, "missing.png"), "cd" * 32))
+
+    assert failed == {} and service.get_metrics()["renditions_failed"] == 1
+    assert manifest["thumbnail"]["path"] == f"renditions/{'ab' * 32}/thumbnail.jpg"
+    stored = run(storage.backend.retrieve_file(manifest["webp"]["path"]))
+    assert len(stored) == manifest["webp"]["size"]
+    referenced = {f"renditions/{'ab' * 32}"}
+    assert storage._is_referenced(manifest["medium"]["path"], referenced, set())
+    assert not storage._is_referenced(f"renditions/{'cd' * 32}/medium.jpg", referenced, set())
+
+
+def test_rendition_revalidation_parses_if_none_match():
+    """Test the rendition endpoint evaluates If-None-Match as a tag list, not a substring"""
+    from types import SimpleNamespace
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api import file_handler
+    from app.core.auth import get_current_active_user
+    from app.core.database import get_db
+
+    upload = SimpleNamespace(file_hash="a" * 64, file_metadata={}, file_path=None)
+    query = SimpleNamespace(filter=lambda *args: SimpleNamespace(first=lambda: upload))
+    app = FastAPI()
+    app.include_router(file_handler.router, prefix="/api/files")
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(query=lambda model: query)
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(id=1, organization_id=1)
+    http = TestClient(app)
+    etag = f'"{"a" * 16}-thumbnail"'
+
+    def status_for(if_none_match):
+        return http.get("/api/files/1/renditions/thumbnail", headers={"If-None-Match": if_none_match}).status_code
+
+    assert status_for(f'"other", W/{etag}') == 304
+    assert status_for("*") == 304
+    # Not a match, so the rendition is looked up (and this one has nothing stored)
+    assert status_for(f'"x{etag[1:]}') == 404
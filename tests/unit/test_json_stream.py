@@ -0,0 +1,149 @@
+"""
+Tests for streaming, bounded-memory JSON / NDJSON ingestion
+"""
+
+import asyncio
+import json
+import os
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from app.services import json_stream
+from app.services.format_converter import FormatConverter
+from app.services.metadata import MetadataService
+from app.services.preview import PreviewService
+from app.services.universal_file_processor import UniversalFileProcessor
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+RECORDS = [
+    {"id": i, "name": f"item {i}", "price": i * 1.5, "tags": ["a", "b"][: i % 3], **({"extra": True} if i % 7 == 0 else {})}
+    for i in range(1, 251)
+]
+
+
+@pytest.mark.parametrize("layout", ["array", "ndjson", "object", "large_object"])
+def test_scan_matches_full_parse_for_every_layout(temp_dir, layout):
+    """Test streamed sampling, counting and structure agree with json.load, across tiny chunk boundaries"""
+    document = {"document_info": {"source_format": "excel"}, "data": RECORDS}
+    if layout == "ndjson":
+        text = "\n".join(json.dumps(record) for record in RECORDS) + "\n"
+    else:
+        text = json.dumps(document if "object" in layout else RECORDS, indent=1)
+    path = write(os.path.join(temp_dir, "records.json"), text)
+    options = {"chunk_size": 37}
+    if layout == "large_object":
+        options["max_object_size"] = 500  # Forces the key-by-key object walk
+
+    info = json_stream.scan(path, sample_size=20, count_all_elements=True, **options)
+
+    expected = json.loads(text) if layout != "ndjson" else RECORDS
+    assert info["layout"] == ("object" if "object" in layout else layout)
+    assert info["items_count"] == 250 and info["sample"] == RECORDS[:20]
+    assert info["element_count"] == json_stream.count_elements(expected)
+    assert list(info["field_types"]) == ["id", "name", "price", "tags", "extra"]
+    if "object" in layout:
+        assert info["top_level_keys"] == ["document_info", "data"] and info["records_key"] == "data"
+        assert info["structure"]["properties"]["data"]["length"] == 250
+    else:
+        assert info["structure"]["length"] == 250 and info["structure_type"] == "list"
+    assert [len(batch) for batch in json_stream.iter_batches(path, 100, **options)] == [100, 100, 50]
+
+    with pytest.raises(json.JSONDecodeError):
+        json_stream.scan(write(os.path.join(temp_dir, "broken.json"), text[:-3] + "}}}"), chunk_size=37)
+
+
+def test_large_array_is_scanned_with_bounded_memory(temp_dir):
+    """Test counting a multi-megabyte array keeps only a chunk and a sample in memory"""
+    path = os.path.join(temp_dir, "big.json")
+    record = {"id": 0, "payload": "x" * 200, "nested": {"values": list(range(10))}}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        f.write(",".join(json.dumps({**record, "id": i}) for i in range(30000)))
+        f.write("]")
+    size = os.path.getsize(path)
+
+    tracemalloc.start()
+    try:
+        info = json_stream.scan(path, sample_size=10, chunk_size=64 * 1024)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert size > 8 * 1024 * 1024
+    assert info["items_count"] == 30000 and info["sample"][9]["id"] == 9
+    assert peak < size / 8
+
+
+def test_services_read_json_through_the_stream(temp_dir, monkeypatch):
+    """Test metadata, preview and conversion stream the file instead of json.load-ing it"""
+    path = write(os.path.join(temp_dir, "records.json"), json.dumps(RECORDS))
+    ndjson_path = write(os.path.join(temp_dir, "records.ndjson"), "\n".join(json.dumps(r) for r in RECORDS))
+    dataset = SimpleNamespace(id=1, type=SimpleNamespace(value="json"))
+
+    def no_full_load(*args, **kwargs):
+        raise AssertionError("whole document loaded with json.load")
+    monkeypatch.setattr(json, "load", no_full_load)
+
+    metadata = run(UniversalFileProcessor(db=None)._extract_json_metadata(path))
+    schema = run(MetadataService(db=None)._analyze_json_schema(Path(ndjson_path), dataset))
+    preview = run(PreviewService(db=None)._generate_json_preview(Path(path), dataset, rows=10, include_stats=False, page=3))
+    converter = FormatConverter()
+    csv_path = run(converter.convert_file(ndjson_path, "json", "csv"))
+    parquet_path = run(converter.convert_file(path, "json", "parquet"))
+
+    assert metadata["items_count"] == 250 and metadata["structure_analysis"] == "array_of_objects"
+    assert len(metadata["preview"]) == 500
+    assert schema["layout"] == "ndjson" and schema["items_count"] == 250 and schema["top_level_type"] == "list"
+    assert [item["id"] for item in preview["items"]] == list(range(21, 31))
+    assert preview["estimated_total_items"] == 250 and preview["is_sample"]
+
+    expected = pd.DataFrame(RECORDS)
+    converted = pd.read_csv(csv_path)
+    assert list(converted.columns) == list(expected.columns) and len(converted) == 250
+    assert converted["extra"].notna().sum() == expected["extra"].notna().sum()
+    table = pq.read_table(parquet_path)
+    assert table.num_rows == 250 and table.column_names == list(expected.columns)
+    assert json.loads(table.column("tags")[1].as_py()) == ["a", "b"]
+
+
+def test_object_documents_convert_to_text_without_full_load(temp_dir, monkeypatch):
+    """Test object-wrapped documents are pretty-printed member by member, exactly as json.dump would"""
+    document = {
+        "document_info": {"source_format": "excel", "columns": ["id", "name"], "note": "naïve\nline"},
+        "data": RECORDS[:30],
+        "empty": [],
+        "nested": [[1, 2], {}],
+        "count": 30
+    }
+    path = write(os.path.join(temp_dir, "wrapped.json"), json.dumps(document))
+    empty_path = write(os.path.join(temp_dir, "empty.json"), "{}")
+
+    def no_full_load(*args, **kwargs):
+        raise AssertionError("whole document loaded with json.load")
+    monkeypatch.setattr(json, "load", no_full_load)
+
+    converter = FormatConverter()
+    text_path = run(converter.convert_file(path, "json", "txt"))
+    empty_text_path = run(converter.convert_file(empty_path, "json", "txt"))
+
+    with open(text_path, encoding="utf-8") as f:
+        assert f.read() == json.dumps(document, indent=2, ensure_ascii=False)
+    with open(empty_text_path, encoding="utf-8") as f:
+        assert f.read() == "{}"
+    members = json_stream.iter_object_members(path, chunk_size=37)
+    assert [key for key, _ in members] == list(document)
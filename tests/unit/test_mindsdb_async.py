@@ -0,0 +1,120 @@
+"""
+Tests for the async MindsDB facade and its bounded thread pool
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.mindsdb_async import (
+    AsyncMindsDBService, MindsDBBusyError, MindsDBCallCancelled, MindsDBTimeoutError, cancellable_sleep
+)
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+class SlowMindsDB:
+    """Stand-in MindsDBService whose calls block like the SDK does"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.finished = []
+
+    def execute_query(self, query):
+        self.release.wait(5)
+        self.finished.append(query)
+        return {"data": [{"query": query}]}
+
+    def ai_chat(self, message, model_name=None):
+        cancellable_sleep(5)
+        self.finished.append(message)
+        return {"answer": message}
+
+    def health_check(self):
+        raise RuntimeError("connection refused")
+
+
+class DisconnectingRequest:
+    def __init__(self, after):
+        self.disconnect_at = time.monotonic() + after
+
+    async def is_disconnected(self):
+        return time.monotonic() >= self.disconnect_at
+
+
+def test_blocking_calls_leave_the_event_loop_free():
+    """Test slow SDK calls run on the pool while the loop keeps serving other work"""
+    mindsdb = SlowMindsDB()
+    facade = AsyncMindsDBService(service=mindsdb, max_workers=2, max_pending=4)
+
+    async def scenario():
+        calls = [asyncio.ensure_future(facade.execute_query(f"SELECT {i}")) for i in range(3)]
+        ticks = 0
+        while ticks < 5:
+            await asyncio.sleep(0.01)  # The loop is not blocked by the queries
+            ticks += 1
+        metrics = facade.get_metrics()
+        mindsdb.release.set()
+        return metrics, await asyncio.gather(*calls)
+
+    metrics, results = run(scenario())
+    facade.shutdown()
+
+    assert metrics["running"] == 2 and metrics["queued"] == 1
+    assert [result["data"][0]["query"] for result in results] == ["SELECT 0", "SELECT 1", "SELECT 2"]
+    assert facade.get_metrics()["completed"] == 3 and facade.stats["max_queue_depth"] >= 1
+
+
+def test_timeouts_errors_and_backpressure():
+    """Test a slow call times out, method errors propagate and a full queue rejects new calls"""
+    mindsdb = SlowMindsDB()
+    facade = AsyncMindsDBService(service=mindsdb, max_workers=1, max_pending=2, timeout=0.2)
+
+    async def scenario():
+        first = asyncio.ensure_future(facade.execute_query("SELECT slow"))
+        second = asyncio.ensure_future(facade.execute_query("SELECT queued"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(MindsDBBusyError):
+            await facade.execute_query("SELECT rejected")
+        with pytest.raises(MindsDBTimeoutError) as timed_out:
+            await first
+        with pytest.raises(MindsDBTimeoutError):
+            await second
+        mindsdb.release.set()
+        with pytest.raises(RuntimeError, match="connection refused"):
+            await facade.health_check()
+        return timed_out.value
+
+    timed_out = run(scenario())
+    facade.shutdown()
+
+    assert timed_out.status_code == 504
+    assert "SELECT queued" not in mindsdb.finished  # Cancelled before it ever started
+    metrics = facade.get_metrics()
+    assert metrics["timeouts"] == 2 and metrics["rejected"] == 1 and metrics["failed"] == 1
+    assert metrics["queued"] == 0 and metrics["running"] == 0
+
+
+def test_client_disconnect_cancels_running_call():
+    """Test a disconnect stops a running call at its next wait and frees the worker"""
+    mindsdb = SlowMindsDB()
+    facade = AsyncMindsDBService(service=mindsdb, max_workers=1, disconnect_poll_interval=0.02)
+
+    async def scenario():
+        started = time.monotonic()
+        with pytest.raises(MindsDBCallCancelled):
+            await facade.ai_chat("hello", request=DisconnectingRequest(after=0.1))
+        mindsdb.release.set()
+        result = await facade.execute_query("SELECT after")
+        return time.monotonic() - started, result
+
+    elapsed, result = run(scenario())
+    facade.shutdown()
+
+    assert elapsed < 2  # The 5 second wait inside ai_chat was interrupted
+    assert mindsdb.finished == ["SELECT after"] and result["data"]
+    assert facade.get_metrics()["cancelled"] == 1
@@ -0,0 +1,120 @@
+"""
+Tests for the pool of MindsDB SDK connections
+"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from app.services.mindsdb import MindsDBService
+from app.services.mindsdb_pool import MindsDBConnectionPool, MindsDBPoolTimeout
+
+
+class FakeServer:
+    """Stand-in SDK connection: one HTTP session against a shared fake server"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.alive = True
+
+    def query(self, sql):
+        server = self
+
+        class Query:
+            def fetch(self):
+                return server.backend.run(server, sql)
+        return Query()
+
+
+class FakeBackend:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.servers = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        server = FakeServer(self)
+        self.servers.append(server)
+        return server
+
+    def run(self, server, sql):
+        if not server.alive:
+            raise requests.ConnectionError("Connection aborted: server closed the connection")
+        if sql == "SELECT broken":
+            raise RuntimeError("Syntax error near 'broken'")
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return pd.DataFrame({"result": [sql]})
+
+
+def test_concurrent_queries_use_separate_connections_up_to_max_size():
+    """Test queries run in parallel on their own connections and reuse them afterwards"""
+    backend = FakeBackend(delay=0.05)
+    pool = MindsDBConnectionPool(connect=backend.connect, max_size=3)
+
+    threads = [threading.Thread(target=pool.query(f"SELECT {i}").fetch) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.query("SELECT again").fetch()
+
+    metrics = pool.get_metrics()
+    assert backend.max_active == 3  # Parallel, but never above max_size
+    assert len(backend.servers) == 3 and metrics["created"] == 3
+    assert metrics["reused"] == 4 and metrics["open"] == 3 and metrics["in_use"] == 0
+
+
+def test_dead_connections_are_replaced_and_the_query_retried():
+    """Test a dropped connection is discarded, idle ones re-created, and the query still succeeds"""
+    backend = FakeBackend()
+    pool = MindsDBConnectionPool(connect=backend.connect, max_size=2, health_check_interval=300)
+    pool.query("SELECT 1").fetch()
+    for server in backend.servers:
+        server.alive = False  # MindsDB restarted
+
+    result = pool.query("SELECT 2").fetch()
+    with pytest.raises(RuntimeError, match="Syntax error"):
+        pool.query("SELECT broken").fetch()
+
+    metrics = pool.get_metrics()
+    assert result["result"][0] == "SELECT 2"
+    assert metrics["retries"] == 1 and metrics["discarded"] == 1 and metrics["created"] == 2
+    assert metrics["open"] == 1 and metrics["idle"] == 1  # The query error kept its healthy connection
+
+
+def test_liveness_check_on_checkout_and_checkout_timeout():
+    """Test stale idle connections are pinged before reuse and an exhausted pool times out"""
+    backend = FakeBackend()
+    pool = MindsDBConnectionPool(connect=backend.connect, max_size=1, checkout_timeout=0.1, health_check_interval=0)
+    pool.query("SELECT 1").fetch()
+    backend.servers[0].alive = False
+
+    assert pool.query("SELECT 2").fetch()["result"][0] == "SELECT 2"
+    assert pool.stats["health_check_failures"] == 1 and len(backend.servers) == 2
+
+    with pool.connection():
+        with pytest.raises(MindsDBPoolTimeout):
+            pool.query("SELECT 3").fetch()
+    assert pool.get_metrics()["timeouts"] == 1
+
+
+def test_health_check_reports_pool_statistics(monkeypatch):
+    """Test MindsDBService queries through its pool and reports it in the health check"""
+    backend = FakeBackend()
+    service = MindsDBService()
+    service.pool = MindsDBConnectionPool(connect=backend.connect, max_size=2)
+
+    health = service.health_check()
+
+    assert health["status"] == "healthy"
+    assert health["pool"]["max_size"] == 2 and health["pool"]["open"] == 1
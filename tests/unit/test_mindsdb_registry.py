@@ -0,0 +1,107 @@
+"""
+Tests for the MindsDB engine/model registry
+"""
+
+import pandas as pd
+
+from app.services.mindsdb import MindsDBService
+from app.services.mindsdb_registry import MindsDBObjectRegistry
+
+
+class FakeResult:
+    def __init__(self, df):
+        self.df = df
+
+    def fetch(self):
+        return self.df
+
+
+class FakeConnection:
+    """Records every statement and answers SHOW / SELECT like MindsDB would"""
+
+    def __init__(self, engines=(), models=None, ready_after=0):
+        self.engines = list(engines)
+        self.models = dict(models or {})
+        self.ready_after = ready_after
+        self.queries = []
+
+    def query(self, sql):
+        sql = " ".join(sql.split())
+        self.queries.append(sql)
+        if sql == "SHOW ML_ENGINES":
+            return FakeResult(pd.DataFrame({"name": self.engines}))
+        if sql.startswith("SHOW MODELS"):
+            if "WHERE" in sql and self.ready_after:
+                self.ready_after -= 1
+            elif "WHERE" in sql or not self.ready_after:
+                self.models = {name: "complete" for name in self.models}
+            names = [name for name in self.models if "WHERE" not in sql or f"'{name}'" in sql]
+            return FakeResult(pd.DataFrame({"NAME": names, "STATUS": [self.models[n] for n in names]}))
+        if sql.startswith("CREATE MODEL"):
+            self.models[sql.split()[2]] = "generating"
+        elif sql.startswith("SELECT response"):
+            return FakeResult(pd.DataFrame({"response": ["42"]}))
+        return FakeResult(pd.DataFrame())
+
+
+def make_service(connection, monkeypatch, registry):
+    monkeypatch.setattr("app.services.mindsdb.mindsdb_registry", registry)
+    service = MindsDBService()
+    service.connection = connection
+    monkeypatch.setattr(service, "_ensure_connection", lambda: True)
+    return service
+
+
+def test_steady_state_chat_runs_only_the_model_query(monkeypatch):
+    """Test repeated chats reuse the registry instead of SHOW / CREATE round trips"""
+    connection = FakeConnection(engines=["google_gemini_engine"], models={"gemini_chat_assistant": "complete"})
+    registry = MindsDBObjectRegistry(ttl=300)
+    service = make_service(connection, monkeypatch, registry)
+    service.engine_name, service.chat_model_name = "google_gemini_engine", "gemini_chat_assistant"
+
+    for _ in range(3):
+        assert service.ai_chat("meaning of life?")["answer"] == "42"
+
+    assert connection.queries.count("SHOW MODELS") == 1  # Initial load only
+    assert not [q for q in connection.queries if q.startswith("CREATE")]
+    assert len([q for q in connection.queries if q.startswith("SELECT response")]) == 3
+    assert registry.stats["hits"] == 3 and registry.stats["refreshes"] == 1
+
+
+def test_missing_model_is_created_and_polled_until_ready(monkeypatch):
+    """Test CREATE MODEL is followed by backoff polling rather than a fixed sleep"""
+    connection = FakeConnection(engines=["google_gemini_engine"], ready_after=3)
+    registry = MindsDBObjectRegistry(ttl=300)
+    sleeps = []
+    monkeypatch.setattr("app.services.mindsdb_registry.cancellable_sleep", sleeps.append)
+    service = make_service(connection, monkeypatch, registry)
+    service.engine_name = "google_gemini_engine"
+
+    result = service.create_gemini_model("sales_chat")
+
+    assert result["status"] == "created" and result["model_status"] == "complete"
+    assert sleeps == [0.25, 0.5, 1.0]  # Exponential backoff between polls
+    assert len([q for q in connection.queries if q.startswith("CREATE MODEL")]) == 1
+    assert service.create_gemini_model("sales_chat")["status"] == "exists"
+    assert len([q for q in connection.queries if q.startswith("CREATE MODEL")]) == 1
+
+
+def test_registry_reloads_after_ttl_or_invalidation():
+    """Test the registry re-lists objects when stale or after a failure"""
+    connection = FakeConnection(engines=["google_gemini_engine"], models={"a": "complete"})
+    registry = MindsDBObjectRegistry(ttl=300)
+
+    assert registry.has_engine("google_gemini_engine", connection)
+    assert registry.model_status("a", connection) == "complete"
+    assert registry.model_status("b", connection) is None
+    assert registry.stats["refreshes"] == 1
+
+    connection.models["b"] = "complete"
+    registry.invalidate()
+    assert registry.model_status("b", connection) == "complete"
+
+    registry.forget_model("b")
+    registry.ttl = 0
+    assert registry.model_status("b", connection) == "complete"
+    metrics = registry.get_metrics()
+    assert metrics["refreshes"] == 3 and metrics["invalidations"] == 1 and metrics["models"] == 2
@@ -0,0 +1,104 @@
+"""
+Tests for the mark-and-sweep orphan cleanup
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services.storage import StorageService, LocalStorageBackend, S3StorageBackend
+
+
+class ReferencedPaths:
+    """Stand-in session returning the referenced-paths query result"""
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.queries = 0
+
+    def execute(self, query):
+        self.queries += 1
+        return [(path,) for path in self.paths]
+
+
+def _write(storage_dir, path, age_seconds=7200):
+    full_path = os.path.join(storage_dir, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "wb") as f:
+        f.write(b"x" * 10)
+    mtime = time.time() - age_seconds
+    os.utime(full_path, (mtime, mtime))
+
+
+@pytest.fixture
+def storage(temp_dir):
+    storage = StorageService()
+    storage.backend = LocalStorageBackend(os.path.join(temp_dir, "storage"))
+    storage_dir = storage.backend.storage_dir
+    _write(storage_dir, "org_1/kept.csv")
+    _write(storage_dir, "org_1/kept.csv.rowindex.json")
+    for i in range(5):
+        _write(storage_dir, f"org_1/orphan_{i}.csv")
+    _write(storage_dir, "org_2/uploading.csv", age_seconds=0)
+    _write(storage_dir, "org_2/multi/part.csv")
+    return storage
+
+
+def test_dry_run_reports_without_deleting(storage):
+    """Test a dry run lists orphans in one query and leaves storage untouched"""
+    db = ReferencedPaths([os.path.join(storage.backend.storage_dir, "org_1/kept.csv"), "org_2/multi/part.csv", "https://api"])
+
+    result = asyncio.run(storage.cleanup_orphaned_files(db, dry_run=True))
+
+    assert db.queries == 1
+    assert result["total_scanned"] == 9
+    assert sorted(result["orphaned_files"]) == [f"org_1/orphan_{i}.csv" for i in range(5)]
+    assert result["skipped_recent"] == 1
+    assert result["bytes_reclaimable"] == 50
+    assert result["total_cleaned"] == 0 and result["complete"]
+    assert os.path.exists(os.path.join(storage.backend.storage_dir, "org_1/orphan_0.csv"))
+
+
+def test_sweep_resumes_from_cursor(storage):
+    """Test a sweep bounded by max_objects returns a cursor that picks up where it stopped"""
+    db = ReferencedPaths(["org_1/kept.csv", "org_2/multi/part.csv"])
+
+    first = asyncio.run(storage.cleanup_orphaned_files(db, max_objects=4, batch_size=2))
+    second = asyncio.run(storage.cleanup_orphaned_files(db, cursor=first["next_cursor"], batch_size=2))
+
+    assert not first["complete"] and first["next_cursor"] == "org_1/orphan_1.csv"
+    assert first["deleted_files"] == ["org_1/orphan_0.csv", "org_1/orphan_1.csv"]
+    assert second["complete"] and second["next_cursor"] is None
+    assert second["total_scanned"] == 5
+    assert second["total_cleaned"] == 3
+    remaining = sorted(
+        os.path.relpath(os.path.join(root, name), storage.backend.storage_dir)
+        for root, _, names in os.walk(storage.backend.storage_dir) for name in names
+    )
+    assert remaining == ["org_1/kept.csv", "org_1/kept.csv.rowindex.json", "org_2/multi/part.csv", "org_2/uploading.csv"]
+
+
+def test_s3_listing_pages_and_batch_delete():
+    """Test S3 listings paginate with StartAfter and deletes go out in DeleteObjects batches"""
+    moto = pytest.importorskip("moto")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        backend = S3StorageBackend(bucket_name="test-bucket", access_key="testing", secret_key="testing")
+        backend.s3_client.create_bucket(Bucket="test-bucket")
+        for i in range(7):
+            backend.s3_client.put_object(Bucket="test-bucket", Key=f"org_1/f{i}.csv", Body=b"x")
+
+        async def run():
+            pages = [page async for page in backend.list_files(prefix="org_1/", start_after="org_1/f1.csv", page_size=2)]
+            deleted = await backend.delete_files([item["path"] for page in pages for item in page])
+            rest = [page async for page in backend.list_files()]
+            return pages, deleted, rest
+
+        pages, deleted, rest = asyncio.run(run())
+        backend.close()
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert len(deleted["deleted"]) == 5 and not deleted["errors"]
+    assert [item["path"] for page in rest for item in page] == ["org_1/f0.csv", "org_1/f1.csv"]
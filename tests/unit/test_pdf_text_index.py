@@ -0,0 +1,93 @@
+"""
+Tests for page-parallel PDF text extraction and the per-page text index
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import fitz
+import pytest
+
+from app.services.metadata import MetadataService
+from app.services.pdf_processing import PDFProcessingService
+from app.services.preview import PreviewService
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def make_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        page = doc.new_page()
+        if number % 5:  # Every fifth page is blank
+            page.insert_text((72, 72), f"page {number} quarterly revenue report")
+    doc.set_metadata({"title": "Quarterly report"})
+    doc.save(path)
+    doc.close()
+
+
+@pytest.fixture
+def pdf_path(temp_dir):
+    path = os.path.join(temp_dir, "report.pdf")
+    make_pdf(path, 23)
+    return path
+
+
+def test_parallel_extraction_writes_ordered_page_index(pdf_path):
+    """Test page ranges extracted across worker processes come back in page order"""
+    service = PDFProcessingService(workers=2, parallel_min_pages=4, chunk_pages=3)
+    try:
+        info = service.build_text_index(pdf_path)
+    finally:
+        service.shutdown()
+
+    assert service.stats["parallel_builds"] == 1
+    assert info["page_count"] == 23 and info["pages_with_text"] == 19
+    assert info["total_words"] == 19 * 5
+    assert info["pdf_metadata"]["title"] == "Quarterly report"
+    pages = service.read_pages(pdf_path, 9, 12)
+    assert [page["page_number"] for page in pages] == [10, 11, 12]
+    assert pages[0]["text"] == "" and pages[1]["text"].startswith("page 11 ")
+    assert service.extract_text(pdf_path).split("\n")[0] == "page 1 quarterly revenue report"
+
+
+def test_index_is_built_once_and_rebuilt_when_the_pdf_changes(pdf_path):
+    """Test concurrent callers share one build and a modified PDF invalidates the index"""
+    service = PDFProcessingService(workers=1)
+
+    async def concurrent():
+        return await asyncio.gather(*(service.ensure_text_index(pdf_path) for _ in range(4)))
+
+    infos = run(concurrent())
+    assert service.stats["indexes_built"] == 1 and service.stats["index_hits"] == 3
+    assert {info["page_count"] for info in infos} == {23}
+    assert service.process_pdf(pdf_path)["pages"] == 23
+    assert service.stats["indexes_built"] == 1
+
+    make_pdf(pdf_path, 7)
+    assert service.load_index_info(pdf_path) is None
+    assert run(service.ensure_text_index(pdf_path))["page_count"] == 7
+    assert service.stats["indexes_built"] == 2
+
+
+def test_preview_and_schema_analysis_read_from_the_index(pdf_path, monkeypatch):
+    """Test PDF preview pages and schema analysis come from the cached index"""
+    dataset = SimpleNamespace(id=1, type=SimpleNamespace(value="pdf"))
+    run(PreviewService(db=None)._generate_pdf_preview(Path(pdf_path), dataset, rows=5, include_stats=False))
+
+    def no_reopen(*args, **kwargs):
+        raise AssertionError("PDF reopened instead of served from the text index")
+    monkeypatch.setattr(fitz, "open", no_reopen)
+
+    preview = run(PreviewService(db=None)._generate_pdf_preview(Path(pdf_path), dataset, rows=5, include_stats=False, page=2))
+    schema = run(MetadataService(db=None)._analyze_pdf_schema(Path(pdf_path), dataset))
+
+    assert preview["page_count"] == 23
+    assert [page["page_number"] for page in preview["pages"]] == [6, 7, 8, 9, 10]
+    assert preview["pagination"]["total_pages"] == 5
+    assert schema["page_count"] == 23 and schema["has_text"] and not schema["has_images"]
+    assert schema["sample_text"].startswith("page 1 quarterly")
@@ -0,0 +1,169 @@
+"""
+Tests for the pooled proxy database connections
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.proxy_connection_pool import ConnectionPool, ProxyConnectionPoolRegistry
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+
+    def close(self):
+        self.closed = True
+
+
+def _ping(conn):
+    if not conn.healthy:
+        raise ConnectionError("gone")
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def _pool(executor, **kwargs):
+    created = []
+
+    def connect():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    return ConnectionPool("fake", connect, _ping, executor, **kwargs), created
+
+
+def test_connections_are_reused_and_bounded(executor):
+    """Test sequential borrows reuse one connection and concurrency is capped at max_size"""
+    pool, created = _pool(executor, max_size=2)
+    peak = 0
+
+    async def borrow():
+        nonlocal peak
+        async with pool.connection():
+            peak = max(peak, pool.get_metrics()["in_use"])
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await borrow()
+        await borrow()
+        await asyncio.gather(*(borrow() for _ in range(6)))
+
+    asyncio.run(run())
+
+    metrics = pool.get_metrics()
+    assert len(created) == 2
+    assert peak == 2
+    assert metrics["open"] == 2 and metrics["in_use"] == 0
+    assert metrics["waits"] > 0
+
+
+class FakeOperationalError(Exception):
+    pass
+
+
+def test_unhealthy_and_broken_connections_are_dropped(executor):
+    """Test failed pings and connection errors never hand a connection out again, query errors do not discard"""
+    pool, created = _pool(executor, health_check_interval=0, connection_errors=(FakeOperationalError,))
+
+    async def run():
+        async with pool.connection() as conn:
+            conn.healthy = False
+        with pytest.raises(ValueError):
+            async with pool.connection():
+                raise ValueError("syntax error at or near 'SELEC'")
+        async with pool.connection() as reused:
+            pass
+        with pytest.raises(FakeOperationalError):
+            async with pool.connection():
+                raise FakeOperationalError("server closed the connection unexpectedly")
+        return reused
+
+    reused = asyncio.run(run())
+
+    metrics = pool.get_metrics()
+    assert created[0].closed and created[1].closed and reused is created[1]
+    assert metrics["health_check_failures"] == 1
+    assert metrics["errors"] == 2 and metrics["discarded"] == 1
+    assert metrics["open"] == 0
+
+
+def test_idle_eviction(executor):
+    """Test connections idle past the timeout are closed by the sweep"""
+    pool, created = _pool(executor, idle_timeout=0.01)
+
+    async def run():
+        async with pool.connection():
+            pass
+        await asyncio.sleep(0.05)
+        return await pool.evict_idle()
+
+    assert asyncio.run(run()) == 1
+    assert created[0].closed
+    assert pool.get_metrics()["evicted"] == 1
+
+
+def test_registry_recycles_pool_when_config_changes(monkeypatch):
+    """Test a connector gets one pool per config, replaced when its config changes"""
+    registry = ProxyConnectionPoolRegistry(max_size=1, idle_timeout=60, health_check_interval=60, max_workers=2)
+    monkeypatch.setitem(
+        registry.DRIVERS, "mysql",
+        (lambda config, credentials: config, lambda kwargs: FakeConnection(), _ping, True)
+    )
+    connector = SimpleNamespace(id=1, name="orders", real_connection_config='{"host": "a"}', real_credentials="{}")
+
+    async def run():
+        first = await registry.get_pool(connector, "mysql")
+        same = await registry.get_pool(connector, "mysql")
+        connector.real_connection_config = '{"host": "b"}'
+        replaced = await registry.get_pool(connector, "mysql")
+        metrics = registry.get_metrics()
+        await registry.close_all()
+        return first, same, replaced, metrics
+
+    first, same, replaced, metrics = asyncio.run(run())
+
+    assert first is same
+    assert replaced is not first
+    assert metrics["totals"]["pools"] == 1
+    assert "mysql:1" in metrics["pools"]
+
+
+def test_concurrent_config_change_swaps_pool_once(monkeypatch):
+    """Test concurrent callers share one replacement pool and the retired pool closes borrowed connections"""
+    registry = ProxyConnectionPoolRegistry(max_size=2, idle_timeout=60, health_check_interval=60, max_workers=2)
+    connections = []
+
+    def connect(kwargs):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    def kwargs_for(config, credentials):
+        return config
+    monkeypatch.setitem(registry.DRIVERS, "mysql", (kwargs_for, connect, _ping, True))
+    connector = SimpleNamespace(id=1, name="orders", real_connection_config='{"host": "a"}', real_credentials="{}")
+
+    async def run():
+        old = await registry.get_pool(connector, "mysql")
+        async with old.connection() as borrowed:
+            async with old.connection() as idle:
+                pass  # Left idle, so retiring the pool has to wait on closing it
+            connector.real_connection_config = '{"host": "b"}'
+            replacements = await asyncio.gather(*(registry.get_pool(connector, "mysql") for _ in range(5)))
+        await registry.close_all()
+        return old, borrowed, idle, replacements
+
+    old, borrowed, idle, replacements = asyncio.run(run())
+
+    assert len({id(pool) for pool in replacements}) == 1 and replacements[0] is not old
+    assert idle.closed and borrowed.closed and old.get_metrics()["open"] == 0
@@ -0,0 +1,43 @@
+"""
+Tests for streaming pass-through of proxied API responses
+"""
+
+import asyncio
+
+import httpx
+
+from app.services.http_client_pool import open_upstream_stream, relay_upstream_response
+
+
+def _client(body, headers):
+    async def handler(request):
+        return httpx.Response(200, headers=headers, stream=httpx.ByteStream(body))
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_relay_passes_bytes_and_headers_through():
+    """Test the upstream body is relayed unmodified with its end-to-end headers"""
+    body = b'{"items": [' + b",".join(b'{"id": %d}' % i for i in range(5000)) + b"]}"
+    headers = {
+        "content-type": "application/json",
+        "content-length": str(len(body)),
+        "etag": '"abc"',
+        "connection": "keep-alive"
+    }
+
+    async def run():
+        async with _client(body, headers) as client:
+            upstream = await open_upstream_stream(client, "GET", "https://api.example.com/items")
+            response = relay_upstream_response(upstream, "test", log_prefix_bytes=16)
+            relayed = b"".join([chunk async for chunk in response.body_iterator])
+            return response, relayed, upstream
+
+    response, relayed, upstream = asyncio.run(run())
+
+    assert relayed == body
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["content-length"] == str(len(body))
+    assert response.headers["etag"] == '"abc"'
+    assert "connection" not in response.headers
+    assert upstream.is_closed
@@ -0,0 +1,109 @@
+"""
+Tests for the MindsDB query result cache
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from app.services.mindsdb import MindsDBService
+from app.services.proxy_service import ProxyService
+from app.services.query_result_cache import QueryResultCache, normalize_sql
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+class CountingConnection:
+    def __init__(self):
+        self.queries = []
+
+    def query(self, sql):
+        self.queries.append(sql)
+        return SimpleNamespace(fetch=lambda: pd.DataFrame({"region": ["north", "south"], "total": [10, 20]}))
+
+
+def make_service(monkeypatch, cache):
+    monkeypatch.setattr("app.services.mindsdb.query_result_cache", cache)
+    service = MindsDBService()
+    service.connection = CountingConnection()
+    monkeypatch.setattr(service, "_ensure_connection", lambda: True)
+    return service
+
+
+def test_repeated_queries_are_served_from_cache(monkeypatch):
+    """Test equivalent SQL hits one entry, results are copies, and writes invalidate reads"""
+    cache = QueryResultCache()
+    service = make_service(monkeypatch, cache)
+
+    first = service.execute_query("SELECT region, total FROM files.sales;")
+    first["rows"].append({"region": "mutated"})
+    second = service.execute_query("SELECT region, total\n  FROM files.sales")
+    third = service.execute_query("SELECT   region, total FROM files.sales")
+    service.execute_query("DROP TABLE files.sales")
+    service.execute_query("SELECT region, total FROM files.sales")
+
+    assert normalize_sql("SELECT  'a  b' ,\n x ;") == "SELECT 'a  b' , x"
+    assert second["row_count"] == 2 and len(third["rows"]) == 2  # Unaffected by the caller's mutation
+    assert len(service.connection.queries) == 3  # First read, the DROP, and the re-read after it
+    metrics = cache.get_metrics()
+    assert metrics["hits"] == 2 and metrics["stores"] == 2 and metrics["invalidations"] == 1
+
+
+def test_dataset_version_and_source_ttl(monkeypatch):
+    """Test entries are keyed by dataset version, use per-source TTLs, and are invalidated per dataset"""
+    cache = QueryResultCache(ttls={"file": 3600, "connector": 120, "web": 0, "sql": 60})
+    service = make_service(monkeypatch, cache)
+    dataset = SimpleNamespace(id=7, type=SimpleNamespace(value="csv"), connector_id=None,
+                              updated_at=datetime(2024, 1, 1), file_path="org_1/sales.csv")
+    web = SimpleNamespace(id=8, type=SimpleNamespace(value="api"), connector_id=None, updated_at=None, file_path=None)
+    sql = "SELECT * FROM files.sales LIMIT 10"
+
+    context = cache.context_for_dataset(dataset)
+    service.execute_query(sql, cache_context=context)
+    service.execute_query(sql, cache_context=context)
+    dataset.updated_at = datetime(2024, 1, 2)  # Edited: new version, new key
+    service.execute_query(sql, cache_context=cache.context_for_dataset(dataset))
+    service.execute_query(sql, cache_context=cache.context_for_dataset(web))
+    service.execute_query(sql, cache_context=cache.context_for_dataset(web))
+
+    assert context["ttl"] == 3600 and cache.source_type(SimpleNamespace(type="database")) == "connector"
+    assert len(service.connection.queries) == 4  # Web datasets with a 0 TTL are never cached
+    assert cache.invalidate_dataset(7) == 2 and cache.get_metrics()["entries"] == 0
+
+
+def test_lru_eviction_is_bounded_by_size():
+    """Test the least recently used results are evicted once the byte budget is exceeded"""
+    cache = QueryResultCache(max_bytes=2500, max_entry_bytes=2000)
+    rows = {"rows": [{"value": "x" * 900}]}
+    for name in ("a", "b", "c"):
+        cache.set(cache.build_key(f"SELECT * FROM {name}"), rows, ttl=60)
+        cache.get(cache.build_key("SELECT * FROM a"))  # Keep "a" recently used
+    cache.set(cache.build_key("SELECT * FROM huge"), {"rows": ["x" * 5000]}, ttl=60)
+
+    assert cache.get(cache.build_key("SELECT * FROM a")) == rows
+    assert cache.get(cache.build_key("SELECT * FROM b")) is None
+    assert cache.get(cache.build_key("SELECT * FROM huge")) is None
+    metrics = cache.get_metrics()
+    assert metrics["evictions"] == 1 and metrics["bytes"] <= 2500 and metrics["bypassed"] == 1
+
+
+def test_cache_context_is_keyword_only(monkeypatch):
+    """Test connector config cannot be passed positionally as a cache context"""
+    cache = QueryResultCache()
+    service = make_service(monkeypatch, cache)
+    proxy = ProxyService.__new__(ProxyService)
+    proxy.mindsdb_service = service
+
+    with pytest.raises(TypeError):
+        service.execute_query("SELECT 1", {"scope": "dataset:1"})
+    result = run(proxy._execute_database_operation(
+        {"host": "db.internal"}, {"password": "secret"}, {"query": "SELECT region FROM sales"}
+    ))
+
+    assert result["status"] == "success" and result["row_count"] == 2
+    assert all(key.startswith("sql:") for key in cache._entries)
@@ -0,0 +1,66 @@
+"""
+Tests for HTTP Range support in the storage layer
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.storage import LocalStorageBackend, parse_range_header
+
+
+def _collect(response):
+    async def consume():
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(consume())
+
+
+@pytest.fixture
+def backend(temp_dir):
+    backend = LocalStorageBackend(temp_dir)
+    backend.chunk_size = 7  # Force several reads per range
+    asyncio.run(backend.store_file(bytes(range(100)), "org_1/data.bin", {}))
+    return backend
+
+
+def test_parse_range_header():
+    """Test open-ended, suffix, multi and malformed ranges"""
+    assert parse_range_header("bytes=10-", 100) == [(10, 99)]
+    assert parse_range_header("bytes=-10", 100) == [(90, 99)]
+    assert parse_range_header("bytes=0-9,20-29", 100) == [(0, 9), (20, 29)]
+    assert parse_range_header("bytes=0-9,5-19", 100) == [(0, 19)]
+    assert parse_range_header("bytes=90-500", 100) == [(90, 99)]
+    assert parse_range_header("items=0-9", 100) is None
+    assert parse_range_header("bytes=abc", 100) is None
+    assert parse_range_header(None, 100) is None
+
+
+def test_unsatisfiable_range():
+    """Test ranges entirely past the end of the file produce 416"""
+    with pytest.raises(HTTPException) as exc_info:
+        parse_range_header("bytes=200-300", 100)
+    assert exc_info.value.status_code == 416
+    assert exc_info.value.headers["Content-Range"] == "bytes */100"
+
+
+def test_single_range_response(backend):
+    """Test a single range is served as 206 with Content-Range"""
+    response = asyncio.run(backend.get_file_range_stream("org_1/data.bin", [(10, 29)]))
+
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == "bytes 10-29/100"
+    assert response.headers["Content-Length"] == "20"
+    assert _collect(response) == bytes(range(10, 30))
+
+
+def test_multi_range_response(backend):
+    """Test multiple ranges are served as multipart/byteranges"""
+    response = asyncio.run(backend.get_file_range_stream("org_1/data.bin", [(0, 4), (95, 99)]))
+    body = _collect(response)
+
+    assert response.status_code == 206
+    assert response.media_type.startswith("multipart/byteranges; boundary=")
+    assert int(response.headers["Content-Length"]) == len(body)
+    assert b"Content-Range: bytes 0-4/100\r\n\r\n" + bytes(range(5)) in body
+    assert b"Content-Range: bytes 95-99/100\r\n\r\n" + bytes(range(95, 100)) in body
@@ -0,0 +1,79 @@
+"""
+Tests for metadata-only existence checks and the stat cache
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from app.services.storage import StorageService, LocalStorageBackend, StatCache
+
+
+class CountingBackend(LocalStorageBackend):
+    """Local backend counting metadata lookups and content reads"""
+
+    def __init__(self, storage_dir):
+        super().__init__(storage_dir)
+        self.heads = 0
+        self.reads = 0
+
+    async def head(self, file_path):
+        self.heads += 1
+        return await super().head(file_path)
+
+    async def retrieve_file(self, file_path):
+        self.reads += 1
+        return await super().retrieve_file(file_path)
+
+
+@pytest.fixture
+def storage(temp_dir):
+    storage = StorageService()
+    storage.backend = CountingBackend(os.path.join(temp_dir, "storage"))
+    storage.stat_cache = StatCache(ttl=30, negative_ttl=30)
+    return storage
+
+
+def test_local_head_and_exists(temp_dir):
+    """Test local metadata lookups report size and ETag and ignore directories"""
+    backend = LocalStorageBackend(temp_dir)
+    asyncio.run(backend.store_file(b"a,b\n1,2\n", "org_1/data.csv", {}))
+
+    info = asyncio.run(backend.head("org_1/data.csv"))
+
+    assert info["size"] == 8
+    assert info["content_type"] == "text/csv"
+    assert info["etag"].startswith('"')
+    assert asyncio.run(backend.exists("org_1/data.csv"))
+    assert not asyncio.run(backend.exists("org_1"))
+    assert not asyncio.run(backend.exists("org_1/missing.csv"))
+
+
+def test_existence_checks_are_cached_without_reading_content(storage):
+    """Test repeated checks hit storage once and never download the file"""
+    asyncio.run(storage.backend.store_file(b"x" * 1024, "org_1/data.csv", {}))
+
+    async def run():
+        return [await storage.file_exists("org_1/data.csv") for _ in range(5)]
+
+    assert asyncio.run(run()) == [True] * 5
+    assert storage.backend.heads == 1
+    assert storage.backend.reads == 0
+    assert storage.stat_cache.stats["hits"] == 4
+
+
+def test_writes_and_deletes_invalidate_cached_lookups(storage):
+    """Test a cached hit or miss is dropped when the file is stored or deleted"""
+    path = asyncio.run(storage.store_dataset_file(b"a,b\n", "data.csv", 1, 1))["relative_path"]
+    sidecar_path = storage.get_sidecar_path(path, "row_index")
+
+    assert asyncio.run(storage.file_exists(path))
+    assert not asyncio.run(storage.file_exists(sidecar_path))
+
+    asyncio.run(storage.store_sidecar(path, "row_index", b"{}"))
+    assert asyncio.run(storage.file_exists(sidecar_path))
+
+    asyncio.run(storage.delete_dataset_file(path))
+    assert not asyncio.run(storage.file_exists(path))
+    assert not asyncio.run(storage.any_file_exists([None, path, sidecar_path]))
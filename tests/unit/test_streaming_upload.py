@@ -0,0 +1,107 @@
+"""
+Tests for streaming uploads from UploadFile to storage
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.storage import StorageService, LocalStorageBackend, S3StorageBackend
+
+MB = 1024 * 1024
+
+
+def _upload_file(content, filename="data.csv"):
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+    spooled.write(content)
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename=filename)
+
+
+@pytest.fixture
+def storage(temp_dir):
+    storage = StorageService()
+    storage.backend = LocalStorageBackend(os.path.join(temp_dir, "storage"))
+    return storage
+
+
+def test_stream_to_local_storage(storage):
+    """Test size and hash are computed incrementally and the file lands intact"""
+    content = os.urandom(3 * MB + 17)
+    upload = _upload_file(content)
+
+    result = asyncio.run(storage.store_dataset_file_stream(upload, "data.csv", 7, 1, chunk_size=64 * 1024))
+
+    sha256 = hashlib.sha256(content).hexdigest()
+    assert result["file_size"] == len(content)
+    assert result["sha256"] == sha256
+    assert result["file_hash"] == sha256[:16]
+    assert result["relative_path"].startswith("org_1/dataset_7_")
+    with open(storage.get_local_path(result["relative_path"]), "rb") as f:
+        assert f.read() == content
+
+
+def test_stream_hash_matches_buffered_store(storage):
+    """Test streamed and buffered stores name the file from the same hash"""
+    content = b"id,name\n1,a\n2,b\n"
+
+    streamed = asyncio.run(storage.store_dataset_file_stream(_upload_file(content), "data.csv", 1, 1, chunk_size=4))
+    buffered = asyncio.run(storage.store_dataset_file(content, "data.csv", 1, 1))
+
+    assert streamed["file_hash"] == buffered["file_hash"]
+    assert streamed["file_size"] == buffered["file_size"]
+
+
+def test_local_copy_of_local_file_is_the_stored_file(storage):
+    """Test local backends hand out the stored file without copying it"""
+    result = asyncio.run(storage.store_dataset_file_stream(_upload_file(b"a,b\n1,2\n"), "data.csv", 1, 1))
+
+    async def resolve():
+        async with storage.local_copy(result["relative_path"]) as path:
+            return path
+
+    path = asyncio.run(resolve())
+    assert path == storage.get_local_path(result["relative_path"])
+    assert os.path.exists(path)
+
+
+def test_stream_to_s3_switches_to_multipart():
+    """Test S3 streams small files in one PUT and large files in parts, and local_copy streams them back"""
+    moto = pytest.importorskip("moto")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        backend = S3StorageBackend(
+            bucket_name="test-bucket",
+            access_key="testing",
+            secret_key="testing",
+            multipart_threshold=6 * MB,
+            multipart_chunk_size=5 * MB,
+            stream_chunk_size=64 * 1024
+        )
+        backend.s3_client.create_bucket(Bucket="test-bucket")
+        storage = StorageService()
+        storage.backend = backend
+        try:
+            small = asyncio.run(storage.store_dataset_file_stream(_upload_file(b"x" * 100), "small.bin", 1, 1))
+            content = os.urandom(11 * MB)
+            large = asyncio.run(storage.store_dataset_file_stream(_upload_file(content, "large.bin"), "large.bin", 2, 1))
+
+            head = backend.s3_client.head_object(Bucket="test-bucket", Key=large["relative_path"])
+            assert head["ETag"].strip('"').endswith("-3")
+            assert small["file_size"] == 100
+            assert large["file_size"] == len(content)
+
+            async def copy_back():
+                async with storage.local_copy(large["relative_path"], suffix=".bin") as path:
+                    with open(path, "rb") as f:
+                        return path, f.read()
+
+            path, copied = asyncio.run(copy_back())
+            assert copied == content
+            assert not os.path.exists(path)
+        finally:
+            backend.close()
@@ -0,0 +1,188 @@
+"""
+Tests for resumable chunked upload sessions
+"""
+
+import asyncio
+import hashlib
+import os
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.schemas.dataset import UploadSessionCreate
+
+from app.services.storage import StorageService, LocalStorageBackend, S3StorageBackend
+from app.services.upload_sessions import UploadSessionManager
+
+
+def _chunks(content, chunk_size):
+    return [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def storage(temp_dir):
+    storage = StorageService()
+    storage.backend = LocalStorageBackend(os.path.join(temp_dir, "storage"))
+    return storage
+
+
+def test_out_of_order_chunks_assemble_and_are_adopted(storage):
+    """Test chunks sent in parallel and out of order are verified, tracked and assembled"""
+    manager = UploadSessionManager(storage=storage, chunk_size=4)
+    content = b"id,name\n1,alpha\n2,beta\n"
+
+    async def run():
+        session = await manager.create_session(1, 1, "data.csv", len(content), sha256=_sha(content))
+        chunks = _chunks(content, session["chunk_size"])
+        await asyncio.gather(*(
+            manager.put_chunk(session, i, chunks[i], _sha(chunks[i])) for i in reversed(range(0, len(chunks), 2))
+        ))
+        partial = await manager.get_status(session)
+        for i in range(1, len(chunks), 2):
+            await manager.put_chunk(session, i, chunks[i], _sha(chunks[i]))
+        staged = await manager.assemble(session)
+        result = await storage.store_staged_dataset_file(
+            staged.staged_path, staged.filename, 7, 1, staged.sha256, staged.size
+        )
+        await manager.close(session)
+        return session, partial, staged, result
+
+    session, partial, staged, result = asyncio.run(run())
+
+    assert session["total_chunks"] == 6
+    assert partial["received_chunks"] == [0, 2, 4] and partial["missing_chunks"] == [1, 3, 5]
+    assert partial["received_ranges"] == [[0, 3], [8, 11], [16, 19]]
+    assert staged.sha256 == _sha(content) and staged.size == len(content)
+    stored_path = os.path.join(storage.backend.storage_dir, result["relative_path"])
+    with open(stored_path, "rb") as f:
+        assert f.read() == content
+    remaining = [name for _, _, names in os.walk(os.path.join(storage.backend.storage_dir, "upload-sessions")) for name in names]
+    assert remaining == []
+
+
+def test_corrupt_chunks_and_early_finalize_are_rejected(storage):
+    """Test checksum mismatches, wrong sizes and missing chunks are refused"""
+    manager = UploadSessionManager(storage=storage, chunk_size=4)
+
+    async def run():
+        session = await manager.create_session(1, 1, "data.csv", 10)
+        errors = []
+        for index, body, checksum in [(0, b"abcd", _sha(b"abce")), (0, b"abc", _sha(b"abc")), (3, b"ab", _sha(b"ab"))]:
+            try:
+                await manager.put_chunk(session, index, body, checksum)
+            except HTTPException as e:
+                errors.append(e.detail["error_code"])
+        await manager.put_chunk(session, 2, b"ij", _sha(b"ij"))
+        try:
+            await manager.assemble(session)
+        except HTTPException as e:
+            errors.append(e.detail["error_code"])
+        return errors
+
+    assert asyncio.run(run()) == ["CHECKSUM_MISMATCH", "INVALID_CHUNK_SIZE", "INVALID_CHUNK_INDEX", "UPLOAD_INCOMPLETE"]
+    assert manager.stats["checksum_failures"] == 1
+
+
+def test_sessions_are_owned_and_expire(storage):
+    """Test other users cannot see a session and expired sessions are cleaned up"""
+    manager = UploadSessionManager(storage=storage, chunk_size=4, session_ttl=0.01)
+
+    async def run():
+        session = await manager.create_session(1, 1, "data.csv", 8)
+        await manager.put_chunk(session, 0, b"abcd", _sha(b"abcd"))
+        other = UploadSessionManager(storage=storage)  # Another worker, no cached manifest
+        with pytest.raises(HTTPException) as not_owner:
+            await other.get_session(session["session_id"], owner_id=2)
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as expired:
+            await other.get_session(session["session_id"], owner_id=1)
+        return not_owner.value.status_code, expired.value.status_code, await other.expire_sessions()
+
+    assert asyncio.run(run()) == (404, 410, 1)
+    staging_dir = os.path.join(storage.backend.storage_dir, "upload-sessions")
+    assert [name for _, _, names in os.walk(staging_dir) for name in names] == []
+
+
+def test_requested_chunk_size_is_capped(storage):
+    """Test clients cannot request chunks larger than the configured maximum"""
+    manager = UploadSessionManager(storage=storage, chunk_size=4, max_chunk_size=16)
+
+    async def run():
+        huge = await manager.create_session(1, 1, "data.csv", 100, chunk_size=1024 ** 3)
+        small = await manager.create_session(1, 1, "data.csv", 100, chunk_size=8)
+        return huge, small
+
+    huge, small = asyncio.run(run())
+
+    assert huge["chunk_size"] == 16 and huge["total_chunks"] == 7
+    assert small["chunk_size"] == 8
+    assert UploadSessionManager(storage=storage, chunk_size=64, max_chunk_size=16).chunk_size == 16
+    with pytest.raises(ValidationError):
+        UploadSessionCreate(filename="data.csv", file_size=100, chunk_size=-1)
+
+
+def test_s3_chunks_map_to_multipart_upload_parts():
+    """Test S3 sessions use 5MB parts, listed with ListParts and completed server-side"""
+    moto = pytest.importorskip("moto")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        storage = StorageService()
+        storage.backend = S3StorageBackend(bucket_name="test-bucket", access_key="testing", secret_key="testing")
+        storage.backend.s3_client.create_bucket(Bucket="test-bucket")
+        manager = UploadSessionManager(storage=storage, chunk_size=1024)
+        content = os.urandom(5 * 1024 * 1024 + 100)
+
+        async def run():
+            session = await manager.create_session(1, 1, "data.csv", len(content))
+            chunks = _chunks(content, session["chunk_size"])
+            await asyncio.gather(*(manager.put_chunk(session, i, c, _sha(c)) for i, c in enumerate(chunks)))
+            status = await manager.get_status(session)
+            staged = await manager.assemble(session)
+            return session, status, staged
+
+        session, status, staged = asyncio.run(run())
+        body = storage.backend.s3_client.get_object(Bucket="test-bucket", Key=staged.staged_path)["Body"].read()
+        storage.backend.close()
+
+    assert session["chunk_size"] == 5 * 1024 * 1024 and session["total_chunks"] == 2
+    assert status["complete"] and status["received_ranges"] == [[0, len(content) - 1]]
+    assert body == content and staged.sha256 == _sha(content)
+
+
+def test_concurrent_finalize_is_refused_and_failures_reopen(storage):
+    """Test a second finalize of a session in progress gets a 409, and a failed one can be retried"""
+    manager = UploadSessionManager(storage=storage, chunk_size=4)
+
+    async def run():
+        session = await manager.create_session(1, 1, "data.csv", 4)
+        codes = []
+        try:
+            async with manager.finalizing(session):
+                try:
+                    async with manager.finalizing(session):
+                        pass
+                except HTTPException as e:
+                    codes.append(e.detail["error_code"])
+                # Another worker only sees the manifest in storage
+                other = UploadSessionManager(storage=storage)
+                try:
+                    async with other.finalizing(await other.get_session(session["session_id"])):
+                        pass
+                except HTTPException as e:
+                    codes.append(e.detail["error_code"])
+                raise RuntimeError("dataset creation failed")
+        except RuntimeError:
+            pass
+        async with manager.finalizing(session) as held:
+            await manager.complete(held, dataset_id=5)
+        return codes, await manager.get_session(session["session_id"])
+
+    codes, stored = asyncio.run(run())
+
+    assert codes == ["UPLOAD_SESSION_FINALIZING", "UPLOAD_SESSION_FINALIZING"]
+    assert stored["state"] == "completed" and stored["dataset_id"] == 5